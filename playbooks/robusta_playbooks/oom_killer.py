@@ -1,6 +1,5 @@
 import abc
 import logging
-import time
 from datetime import datetime, timedelta
 from typing import List, Optional, Tuple
 
@@ -55,12 +54,30 @@ NODE_MEMORY_THRESHOLD = 0.95
 
 def get_oomkilled_graph(oomkilled_container: PodContainer, pod: Pod, params: OOMGraphEnricherParams,
                         metrics_legends_labels: Optional[List[str]] = None,) -> GraphBlock:
-    if params.delay_graph_s > 0:
-        time.sleep(params.delay_graph_s)
     return create_container_graph(params, pod, oomkilled_container, show_limit=True,
                                   metrics_legends_labels=metrics_legends_labels)
 
 
+def add_delayed_oomkilled_graph(
+    event: PodEvent,
+    oomkilled_container: PodContainer,
+    pod: Pod,
+    params: OOMGraphEnricherParams,
+    metrics_legends_labels: Optional[List[str]] = None,
+):
+    """
+    Add the graph after delay_graph_s, so the memory spike is recorded. The event worker thread isn't held meanwhile
+    """
+
+    def add_graph(delayed_event: PodEvent):
+        container_graph = get_oomkilled_graph(
+            oomkilled_container, pod, params, metrics_legends_labels=metrics_legends_labels
+        )
+        delayed_event.add_enrichment([container_graph], enrichment_type=EnrichmentType.graph, title="Container Info")
+
+    event.add_delayed_enrichment(params.delay_graph_s, add_graph)
+
+
 @action
 def oomkilled_container_graph_enricher(event: PodEvent, params: OOMGraphEnricherParams):
     """
@@ -74,6 +91,9 @@ def oomkilled_container_graph_enricher(event: PodEvent, params: OOMGraphEnricher
     if not oomkilled_container:
         logging.error("Unable to find oomkilled container")
         return
+    if params.delay_graph_s > 0:
+        add_delayed_oomkilled_graph(event, oomkilled_container, pod, params, metrics_legends_labels=["container"])
+        return
     container_graph = get_oomkilled_graph(oomkilled_container, pod, params,
                                           metrics_legends_labels=["container"])
     event.add_enrichment([container_graph], enrichment_type=EnrichmentType.graph, title="Container Info")
@@ -128,6 +148,7 @@ def pod_oom_killer_enricher(event: PodEvent, params: OomKillParams):
     else:
         logging.warning(f"Node {pod.spec.nodeName} not found for OOMKilled pod {pod.metadata.name}")
 
+    delayed_graph = params.container_memory_graph and params.delay_graph_s > 0
     oomkilled_container = pod_most_recent_oom_killed_container(pod)
     if not oomkilled_container or not oomkilled_container.state:
         logging.error(f"could not find OOMKilled status in pod {pod.metadata.name}")
@@ -152,7 +173,7 @@ def pod_oom_killer_enricher(event: PodEvent, params: OomKillParams):
             ["field", "value"],
             table_name="*Container Info*",
         )]
-        if params.container_memory_graph:
+        if params.container_memory_graph and not delayed_graph:
             container_graph = get_oomkilled_graph(oomkilled_container, pod, params,
                                                   metrics_legends_labels=["pod"])
             blocks.append(container_graph)
@@ -161,6 +182,9 @@ def pod_oom_killer_enricher(event: PodEvent, params: OomKillParams):
                                title="Container Info")
 
     event.add_finding(finding)
+    if container_name is not None and delayed_graph:
+        # added to the finding, as a separate enrichment, when the graph is ready
+        add_delayed_oomkilled_graph(event, oomkilled_container, pod, params, metrics_legends_labels=["pod"])
     if params.attach_logs and container_name is not None:
         logs_enricher(event, LogEnricherParams(container_name=container_name))
 
@@ -208,6 +208,7 @@ from robusta.integrations.kubernetes.api_client_utils import (
     wait_for_pod_status,
     wait_until,
     wait_until_job_complete,
+    watch_pod_status,
 )
 from robusta.integrations.kubernetes.autogenerated.events import (
     KIND_TO_EVENT_CLASS,
@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from kubernetes import client
+from kubernetes.client import ApiClient, Configuration
+
+from robusta.core.model.cluster_status import ClusterStats
+from robusta.core.model.env_vars import (
+    CLUSTER_STATS_CACHE_TTL_SEC,
+    CLUSTER_STATS_COUNTS_MAX_AGE_SEC,
+    CLUSTER_STATS_PAGE_SIZE,
+)
+from robusta.utils.cluster_provider_discovery import cluster_provider
+
+# kind to the all namespaces list path
+KIND_LIST_PATHS: Dict[str, str] = {
+    "Deployment": "/apis/apps/v1/deployments",
+    "StatefulSet": "/apis/apps/v1/statefulsets",
+    "DaemonSet": "/apis/apps/v1/daemonsets",
+    "ReplicaSet": "/apis/apps/v1/replicasets",
+    "Pod": "/api/v1/pods",
+    "Node": "/api/v1/nodes",
+    "Job": "/apis/batch/v1/jobs",
+}
+
+# ask the api server for the objects metadata only. Falls back to full objects on servers that don't support it
+METADATA_ONLY_ACCEPT = "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1,application/json"
+
+
+class ClusterStatsProvider:
+    """
+    Provides the cluster objects counts, for the cluster status heartbeats.
+
+    Counts reported by discovery (the relisted results, or the informers stores) are used when fresh.
+    Missing counts are fetched from the api server concurrently, using metadata only lists.
+    The stats are cached for CLUSTER_STATS_CACHE_TTL_SEC.
+    """
+
+    def __init__(
+        self,
+        ttl_sec: int = CLUSTER_STATS_CACHE_TTL_SEC,
+        counts_max_age_sec: int = CLUSTER_STATS_COUNTS_MAX_AGE_SEC,
+        api_client: Optional[ApiClient] = None,
+    ):
+        self.__ttl_sec = ttl_sec
+        self.__counts_max_age_sec = counts_max_age_sec
+        self.__api_client = api_client
+        self.__lock = threading.Lock()
+        self.__stats: Optional[ClusterStats] = None
+        self.__stats_time = 0.0
+        self.__counts: Dict[str, int] = {}
+        self.__counts_time = 0.0
+
+    def update_counts(self, counts: Dict[str, int]):
+        """Report the objects count per kind, as seen by discovery"""
+        with self.__lock:
+            self.__counts = dict(counts)
+            self.__counts_time = time.time()
+
+    def invalidate(self):
+        with self.__lock:
+            self.__stats = None
+
+    def get_stats(self) -> ClusterStats:
+        # hold the lock while collecting, so concurrent callers share one collection
+        with self.__lock:
+            now = time.time()
+            if self.__stats and now - self.__stats_time < self.__ttl_sec:
+                return self.__stats
+
+            counts = self.__counts if now - self.__counts_time < self.__counts_max_age_sec else {}
+            self.__stats = self.__collect(counts)
+            self.__stats_time = now
+            return self.__stats
+
+    def __get_api_client(self) -> ApiClient:
+        if not self.__api_client:
+            configuration = Configuration.get_default_copy()
+            configuration.connection_pool_maxsize = max(configuration.connection_pool_maxsize, len(KIND_LIST_PATHS))
+            self.__api_client = ApiClient(configuration)
+        return self.__api_client
+
+    def __collect(self, cached_counts: Dict[str, int]) -> ClusterStats:
+        missing_kinds = [kind for kind in KIND_LIST_PATHS.keys() if kind not in cached_counts]
+        with ThreadPoolExecutor(max_workers=len(missing_kinds) + 1) as executor:
+            version_future = executor.submit(self.__get_k8s_version)
+            count_futures = {kind: executor.submit(self.__safe_count, kind) for kind in missing_kinds}
+            counts = {**cached_counts, **{kind: future.result() for kind, future in count_futures.items()}}
+            k8s_version = version_future.result()
+
+        return ClusterStats(
+            deployments=counts["Deployment"],
+            statefulsets=counts["StatefulSet"],
+            daemonsets=counts["DaemonSet"],
+            replicasets=counts["ReplicaSet"],
+            pods=counts["Pod"],
+            nodes=counts["Node"],
+            jobs=counts["Job"],
+            provider=cluster_provider.get_cluster_provider(),
+            k8s_version=k8s_version,
+        )
+
+    def __get_k8s_version(self) -> Optional[str]:
+        try:
+            return client.VersionApi(self.__get_api_client()).get_code().git_version
+        except Exception:
+            logging.exception("Failed to get k8s server version")
+            return None
+
+    def __safe_count(self, kind: str) -> int:
+        try:
+            return self.count_objects(kind)
+        except Exception:
+            logging.error(f"Failed to count {kind}", exc_info=True)
+            return -1
+
+    def count_objects(self, kind: str) -> int:
+        """
+        Count the objects of a kind, using metadata only lists.
+        Some api servers don't return remainingItemCount. In that case, all the pages are listed and counted
+        """
+        count = 0
+        continue_ref: Optional[str] = None
+        while True:
+            query_params = [("limit", CLUSTER_STATS_PAGE_SIZE)]
+            if continue_ref:
+                query_params.append(("continue", continue_ref))
+            page: Dict = self.__get_api_client().call_api(
+                KIND_LIST_PATHS[kind],
+                "GET",
+                query_params=query_params,
+                header_params={"Accept": METADATA_ONLY_ACCEPT},
+                response_type="object",
+                auth_settings=["BearerToken"],
+                _return_http_data_only=True,
+            )
+            metadata = page.get("metadata") or {}
+            count += len(page.get("items") or [])
+            remaining = metadata.get("remainingItemCount")
+            if remaining is not None:
+                return count + remaining
+
+            continue_ref = metadata.get("continue")
+            if not continue_ref:
+                return count
@@ -0,0 +1,264 @@
+"""
+Lightweight discovery decoding.
+
+List responses are requested with `_preload_content=False`, and decoded incrementally, one item at a time.
+Only the fields discovery needs are kept, in compact records, so whole pages of k8s client model objects
+are never built.
+"""
+import codecs
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+from robusta.core.model.env_vars import DISCOVERY_POD_OWNED_PODS
+from robusta.core.model.pods import PodResources
+from robusta.core.model.services import ContainerInfo, EnvVar, Resources, ServiceConfig, ServiceInfo, VolumeInfo
+
+STREAM_CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+
+class StreamingListDecoder:
+    """
+    Incrementally decodes a k8s list response, yielding the list items one by one.
+    Only the current item is held in memory, as a dict. The list metadata is available after the items were consumed.
+    """
+
+    def __init__(self, response, chunk_size: int = STREAM_CHUNK_SIZE):
+        self.metadata: Dict[str, Any] = {}
+        self.__response = response
+        self.__chunks = iter(response.stream(chunk_size))
+        self.__utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.__json = json.JSONDecoder()
+        self.__buffer = ""
+        self.__pos = 0
+
+    def __fill(self) -> bool:
+        chunk = next(self.__chunks, None)
+        if chunk is None:
+            return False
+        self.__buffer = self.__buffer[self.__pos :] + self.__utf8.decode(chunk)
+        self.__pos = 0
+        return True
+
+    def __peek(self) -> str:
+        while True:
+            while self.__pos < len(self.__buffer) and self.__buffer[self.__pos] in WHITESPACE:
+                self.__pos += 1
+            if self.__pos < len(self.__buffer):
+                return self.__buffer[self.__pos]
+            if not self.__fill():
+                raise ValueError("Unexpected end of list response")
+
+    def __expect(self, char: str):
+        if self.__peek() != char:
+            raise ValueError(
+                f"Invalid list response. Expected '{char}' at: {self.__buffer[self.__pos:self.__pos + 50]}"
+            )
+        self.__pos += 1
+
+    def __decode_value(self) -> Any:
+        self.__peek()
+        while True:
+            try:
+                value, end = self.__json.raw_decode(self.__buffer, self.__pos)
+                # a number may continue in the next chunk
+                if end < len(self.__buffer) or isinstance(value, (dict, list, str)) or not self.__fill():
+                    self.__pos = end
+                    return value
+            except json.JSONDecodeError:
+                # the value continues in the next chunk
+                if not self.__fill():
+                    raise
+
+    def __iter_items(self) -> Iterator[Dict]:
+        if self.__peek() == "n":  # null items
+            self.__decode_value()
+            return
+
+        self.__expect("[")
+        while True:
+            char = self.__peek()
+            if char == "]":
+                self.__pos += 1
+                return
+            if char == ",":
+                self.__pos += 1
+                continue
+            yield self.__decode_value()
+
+    def __iter__(self) -> Iterator[Dict]:
+        try:
+            self.__expect("{")
+            while True:
+                char = self.__peek()
+                if char == "}":
+                    return
+                if char == ",":
+                    self.__pos += 1
+                    continue
+
+                key = self.__decode_value()
+                self.__expect(":")
+                if key == "items":
+                    yield from self.__iter_items()
+                elif key == "metadata":
+                    self.metadata = self.__decode_value() or {}
+                else:
+                    self.__decode_value()
+        finally:
+            self.__response.release_conn()
+
+    @property
+    def continue_ref(self) -> Optional[str]:
+        return self.metadata.get("continue")
+
+
+def _parse_ready(conditions: Optional[List[Dict]]) -> bool:
+    for condition in conditions or []:
+        if condition.get("type") == "Ready":
+            return (condition.get("status") or "").lower() == "true"
+    return False
+
+
+class CompactContainer:
+    __slots__ = ("name", "image", "env", "limits", "requests", "ports")
+
+    def __init__(self, container: Dict):
+        resources = container.get("resources") or {}
+        self.name: str = container.get("name")
+        self.image: str = container.get("image")
+        self.env: List[EnvVar] = [
+            EnvVar(name=env["name"], value=env["value"])
+            for env in container.get("env") or []
+            if env.get("name") and env.get("value")
+        ]
+        self.limits: Dict[str, str] = resources.get("limits") or {}
+        self.requests: Dict[str, str] = resources.get("requests") or {}
+        self.ports: List[int] = [port.get("containerPort") for port in container.get("ports") or []]
+
+    def to_container_info(self) -> ContainerInfo:
+        return ContainerInfo(
+            name=self.name,
+            image=self.image,
+            env=self.env,
+            resources=Resources(limits=self.limits, requests=self.requests),
+            ports=self.ports,
+        )
+
+
+class CompactResource:
+    """The fields of a workload or pod needed for discovery. Same semantics as the k8s python api based extraction"""
+
+    __slots__ = (
+        "kind",
+        "name",
+        "namespace",
+        "labels",
+        "annotations",
+        "resource_version",
+        "owner_kinds",
+        "replicas",
+        "containers",
+        "volumes",
+        "total_pods",
+        "ready_pods",
+        "phase",
+        "node_name",
+    )
+
+    def __init__(self, obj: Dict, kind: str):
+        metadata = obj.get("metadata") or {}
+        spec = obj.get("spec") or {}
+        status = obj.get("status") or {}
+        if kind == "Pod":
+            pod_spec = spec
+        elif kind == "ReplicaSet":
+            # like extract_containers and extract_volumes, ReplicaSets are reported without containers and volumes
+            pod_spec = {}
+        else:
+            pod_spec = (spec.get("template") or {}).get("spec") or {}
+
+        self.kind = kind
+        self.name: str = metadata.get("name")
+        self.namespace: str = metadata.get("namespace")
+        self.labels: Dict[str, str] = metadata.get("labels") or {}
+        self.annotations: Dict[str, str] = metadata.get("annotations") or {}
+        self.resource_version = int(metadata.get("resourceVersion") or 0)
+        self.owner_kinds: List[str] = [owner.get("kind", "") for owner in metadata.get("ownerReferences") or []]
+        self.replicas: Optional[int] = spec.get("replicas")
+        self.containers = [CompactContainer(container) for container in pod_spec.get("containers") or []]
+        self.volumes: List[VolumeInfo] = [self.__volume_info(volume) for volume in pod_spec.get("volumes") or []]
+        self.phase: Optional[str] = status.get("phase")
+        self.node_name: Optional[str] = spec.get("nodeName")
+
+        if kind in ["Deployment", "StatefulSet"]:
+            self.total_pods = self.replicas if self.replicas is not None else 1
+            self.ready_pods = status.get("readyReplicas") or 0
+        elif kind == "DaemonSet":
+            self.total_pods = status.get("desiredNumberScheduled") or 0
+            self.ready_pods = status.get("numberReady") or 0
+        elif kind == "Pod":
+            self.total_pods = 1
+            self.ready_pods = 1 if _parse_ready(status.get("conditions")) else 0
+        else:
+            self.total_pods = 0
+            self.ready_pods = 0
+
+    @staticmethod
+    def __volume_info(volume: Dict) -> VolumeInfo:
+        claim = volume.get("persistentVolumeClaim")
+        if claim and claim.get("claimName"):
+            return VolumeInfo(name=volume.get("name"), persistent_volume_claim={"claim_name": claim["claimName"]})
+        return VolumeInfo(name=volume.get("name"))
+
+    def should_report(self) -> bool:
+        if self.kind == "ReplicaSet":
+            return not self.owner_kinds and (self.replicas or 0) > 0
+        if self.kind == "Pod":
+            if (self.phase or "").lower() in ["succeeded", "failed"]:
+                return False
+            if not self.owner_kinds:
+                return True
+            if DISCOVERY_POD_OWNED_PODS:
+                return all(kind.lower() == "pod" for kind in self.owner_kinds)
+            return False
+        return True
+
+    def requests(self) -> PodResources:
+        return PodResources(
+            pod_name=self.name,
+            cpu=sum(PodResources.parse_cpu(container.requests.get("cpu", 0.0)) for container in self.containers),
+            memory=sum(
+                PodResources.parse_mem(container.requests.get("memory", "0Mi")) for container in self.containers
+            ),
+        )
+
+    def to_service_info(self) -> ServiceInfo:
+        # imported here, since discovery imports this module
+        from robusta.core.discovery.discovery import is_release_managed_by_helm
+
+        return ServiceInfo(
+            resource_version=self.resource_version,
+            name=self.name,
+            namespace=self.namespace,
+            service_type=self.kind,
+            service_config=ServiceConfig(
+                labels=self.labels,
+                containers=[container.to_container_info() for container in self.containers],
+                volumes=self.volumes,
+            ),
+            ready_pods=self.ready_pods,
+            total_pods=self.total_pods,
+            is_helm_release=is_release_managed_by_helm(labels=self.labels, annotations=self.annotations),
+        )
+
+
+class CompactPodMeta:
+    """Pod metadata used to match pods to jobs"""
+
+    __slots__ = ("name", "namespace", "labels")
+
+    def __init__(self, pod: CompactResource):
+        self.name = pod.name
+        self.namespace = pod.namespace
+        self.labels = pod.labels
@@ -1,48 +1,54 @@
+import json
 import logging
 import os
 import threading
 import time
-from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from concurrent.futures.process import ProcessPoolExecutor
-from typing import Dict, List, Optional, Union
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import prometheus_client
 from hikaru.model.rel_1_26 import Container, DaemonSet, Deployment, Job, Pod, ReplicaSet, StatefulSet, Volume
 from kubernetes import client
 from kubernetes.client import (
+    ApiClient,
+    Configuration,
     V1Container,
     V1DaemonSet,
-    V1DaemonSetList,
     V1Deployment,
-    V1DeploymentList,
     V1Job,
     V1JobList,
     V1NodeList,
     V1ObjectMeta,
     V1Pod,
     V1PodList,
-    V1ReplicaSetList,
+    V1ReplicaSet,
     V1StatefulSet,
-    V1StatefulSetList,
     V1Volume,
 )
 from pydantic import BaseModel
 
 from robusta.core.discovery import utils
+from robusta.core.discovery.cluster_stats import ClusterStatsProvider
+from robusta.core.discovery.compact import CompactPodMeta, CompactResource, StreamingListDecoder
 from robusta.core.model.cluster_status import ClusterStats
 from robusta.core.model.env_vars import (
     DISABLE_HELM_MONITORING,
     DISCOVERY_BATCH_SIZE,
+    DISCOVERY_COMPACT_DECODE,
+    DISCOVERY_LIST_WORKERS,
     DISCOVERY_MAX_BATCHES,
+    DISCOVERY_PARALLEL_LISTING,
     DISCOVERY_POD_OWNED_PODS,
     DISCOVERY_PROCESS_TIMEOUT_SEC,
 )
 from robusta.core.model.helm_release import HelmRelease
 from robusta.core.model.jobs import JobInfo
 from robusta.core.model.namespaces import NamespaceInfo
+from robusta.core.model.pods import PodResources
 from robusta.core.model.services import ContainerInfo, ServiceConfig, ServiceInfo, VolumeInfo
 from robusta.patch.patch import create_monkey_patches
-from robusta.utils.cluster_provider_discovery import cluster_provider
 from robusta.utils.stack_tracer import StackTracer
 
 discovery_errors_count = prometheus_client.Counter("discovery_errors", "Number of discovery process failures.")
@@ -50,6 +56,12 @@ discovery_process_time = prometheus_client.Summary(
     "discovery_process_time",
     "Total discovery process time (seconds)",
 )
+discovery_list_time = prometheus_client.Histogram(
+    "discovery_list_time",
+    "Discovery list time per kind (seconds)",
+    labelnames=("kind",),
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
 
 
 class DiscoveryResults(BaseModel):
@@ -60,6 +72,18 @@ class DiscoveryResults(BaseModel):
     namespaces: List[NamespaceInfo] = []
     helm_releases: List[HelmRelease] = []
     pods_running_count: int = 0
+    list_durations: Dict[str, float] = {}  # list time (seconds) per kind
+    object_counts: Dict[str, int] = {}  # number of listed objects per kind, including the ones not reported
+
+    class Config:
+        arbitrary_types_allowed = True
+
+
+class PodsDiscoveryResults(BaseModel):
+    services: List[ServiceInfo] = []
+    pods_metadata: List[Union[V1ObjectMeta, CompactPodMeta]] = []
+    node_requests: Dict[str, List[PodResources]] = {}  # node name to requests of pods running on it
+    pods_running_count: int = 0
 
     class Config:
         arbitrary_types_allowed = True
@@ -135,269 +159,284 @@ class Discovery:
         )
 
     @staticmethod
-    def discovery_process() -> DiscoveryResults:
-        create_monkey_patches()
-        Discovery.stacktrace_thread_active = True
-        threading.Thread(target=Discovery.stack_dump_on_signal).start()
-        pods_metadata: List[V1ObjectMeta] = []
-        node_requests = defaultdict(list)  # map between node name, to request of pods running on it
-        active_services: List[ServiceInfo] = []
-        # discover micro services
-        try:
-            # discover deployments
-            # using k8s api `continue` to load in batches
-            continue_ref: Optional[str] = None
-            for _ in range(DISCOVERY_MAX_BATCHES):
-                deployments: V1DeploymentList = client.AppsV1Api().list_deployment_for_all_namespaces(
-                    limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref
-                )
-                active_services.extend(
-                    [
-                        Discovery.__create_service_info(
-                            deployment.metadata,
-                            "Deployment",
-                            extract_containers(deployment),
-                            extract_volumes(deployment),
-                            extract_total_pods(deployment),
-                            extract_ready_pods(deployment),
-                            is_helm_release=is_release_managed_by_helm(
-                                annotations=deployment.metadata.annotations, labels=deployment.metadata.labels
-                            ),
-                        )
-                        for deployment in deployments.items
-                    ]
-                )
-                continue_ref = deployments.metadata._continue
-                if not continue_ref:
-                    break
+    def create_api_service_info(
+        obj: Union[V1Deployment, V1DaemonSet, V1StatefulSet, V1ReplicaSet, V1Pod], kind: str
+    ) -> ServiceInfo:
+        """Same as create_service_info, for k8s python api objects (rather than hikaru)"""
+        return Discovery.__create_service_info(
+            obj.metadata,
+            kind,
+            extract_containers(obj),
+            extract_volumes(obj),
+            extract_total_pods(obj),
+            extract_ready_pods(obj),
+            is_helm_release=is_release_managed_by_helm(
+                annotations=obj.metadata.annotations, labels=obj.metadata.labels
+            ),
+        )
 
-            # discover statefulsets
-            continue_ref = None
-            for _ in range(DISCOVERY_MAX_BATCHES):
-                statefulsets: V1StatefulSetList = client.AppsV1Api().list_stateful_set_for_all_namespaces(
-                    limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref
-                )
-                active_services.extend(
-                    [
-                        Discovery.__create_service_info(
-                            statefulset.metadata,
-                            "StatefulSet",
-                            extract_containers(statefulset),
-                            extract_volumes(statefulset),
-                            extract_total_pods(statefulset),
-                            extract_ready_pods(statefulset),
-                            is_helm_release=is_release_managed_by_helm(
-                                annotations=statefulset.metadata.annotations, labels=statefulset.metadata.labels
-                            ),
-                        )
-                        for statefulset in statefulsets.items
-                    ]
+    @staticmethod
+    def __discover_services(
+        list_fn: Callable, kind: str, object_counts: Dict[str, int], should_report: Callable = None
+    ) -> List[ServiceInfo]:
+        # using k8s api `continue` to load in batches
+        services: List[ServiceInfo] = []
+        object_counts[kind] = 0
+        continue_ref: Optional[str] = None
+        for _ in range(DISCOVERY_MAX_BATCHES):
+            if DISCOVERY_COMPACT_DECODE:
+                page = StreamingListDecoder(
+                    list_fn(limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref, _preload_content=False)
                 )
-                continue_ref = statefulsets.metadata._continue
+                for item in page:
+                    object_counts[kind] += 1
+                    resource = CompactResource(item, kind)
+                    if resource.should_report():
+                        services.append(resource.to_service_info())
+                continue_ref = page.continue_ref
                 if not continue_ref:
                     break
+                continue
+
+            resources = list_fn(limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref)
+            object_counts[kind] += len(resources.items)
+            services.extend(
+                [
+                    Discovery.create_api_service_info(resource, kind)
+                    for resource in resources.items
+                    if should_report is None or should_report(resource)
+                ]
+            )
+            continue_ref = resources.metadata._continue
+            if not continue_ref:
+                break
+        return services
 
-            # discover daemonsets
-            continue_ref = None
-            for _ in range(DISCOVERY_MAX_BATCHES):
-                daemonsets: V1DaemonSetList = client.AppsV1Api().list_daemon_set_for_all_namespaces(
-                    limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref
-                )
-                active_services.extend(
-                    [
-                        Discovery.__create_service_info(
-                            daemonset.metadata,
-                            "DaemonSet",
-                            extract_containers(daemonset),
-                            extract_volumes(daemonset),
-                            extract_total_pods(daemonset),
-                            extract_ready_pods(daemonset),
-                            is_helm_release=is_release_managed_by_helm(
-                                annotations=daemonset.metadata.annotations, labels=daemonset.metadata.labels
-                            ),
-                        )
-                        for daemonset in daemonsets.items
-                    ]
+    @staticmethod
+    def __discover_pods(core_api: client.CoreV1Api) -> PodsDiscoveryResults:
+        results = PodsDiscoveryResults()
+        continue_ref: Optional[str] = None
+        for _ in range(DISCOVERY_MAX_BATCHES):
+            if DISCOVERY_COMPACT_DECODE:
+                page = StreamingListDecoder(
+                    core_api.list_pod_for_all_namespaces(
+                        limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref, _preload_content=False
+                    )
                 )
-                continue_ref = daemonsets.metadata._continue
+                for item in page:
+                    pod = CompactResource(item, "Pod")
+                    results.pods_metadata.append(CompactPodMeta(pod))
+                    if pod.should_report():
+                        results.services.append(pod.to_service_info())
+                    if pod.phase in ["Running", "Unknown", "Pending"] and pod.node_name:
+                        results.node_requests.setdefault(pod.node_name, []).append(pod.requests())
+                    if pod.phase == "Running":
+                        results.pods_running_count += 1
+                continue_ref = page.continue_ref
                 if not continue_ref:
                     break
+                continue
 
-            # discover replicasets
-            continue_ref = None
-            for _ in range(DISCOVERY_MAX_BATCHES):
-                replicasets: V1ReplicaSetList = client.AppsV1Api().list_replica_set_for_all_namespaces(
-                    limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref
-                )
-                active_services.extend(
-                    [
-                        Discovery.__create_service_info(
-                            replicaset.metadata,
-                            "ReplicaSet",
-                            extract_containers(replicaset),
-                            extract_volumes(replicaset),
-                            extract_total_pods(replicaset),
-                            extract_ready_pods(replicaset),
-                            is_helm_release=is_release_managed_by_helm(
-                                annotations=replicaset.metadata.annotations, labels=replicaset.metadata.labels
-                            ),
-                        )
-                        for replicaset in replicasets.items
-                        if not replicaset.metadata.owner_references and replicaset.spec.replicas > 0
-                    ]
-                )
-                continue_ref = replicasets.metadata._continue
-                if not continue_ref:
-                    break
+            pods: V1PodList = core_api.list_pod_for_all_namespaces(limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref)
+            for pod in pods.items:
+                results.pods_metadata.append(pod.metadata)
+                if should_report_pod(pod):
+                    results.services.append(Discovery.create_api_service_info(pod, "Pod"))
 
-            # discover pods
-            continue_ref = None
-            pods_running_count = 0
-            for _ in range(DISCOVERY_MAX_BATCHES):
-                pods: V1PodList = client.CoreV1Api().list_pod_for_all_namespaces(
-                    limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref
+                pod_status = pod.status.phase
+                if pod_status in ["Running", "Unknown", "Pending"] and pod.spec.node_name:
+                    results.node_requests.setdefault(pod.spec.node_name, []).append(utils.k8s_pod_requests(pod))
+                if pod_status == "Running":
+                    results.pods_running_count += 1
+
+            continue_ref = pods.metadata._continue
+            if not continue_ref:
+                break
+        return results
+
+    @staticmethod
+    def __iter_jobs_page(batch_api: client.BatchV1Api, continue_ref: Optional[str]) -> Tuple[Iterator[V1Job], Callable]:
+        """Returns the page jobs, and a function returning the continue reference, to call after iterating the jobs"""
+        if DISCOVERY_COMPACT_DECODE:
+            # JobInfo needs most of the job, so jobs are deserialized. But only one at a time, and not the whole page
+            page = StreamingListDecoder(
+                batch_api.list_job_for_all_namespaces(
+                    limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref, _preload_content=False
                 )
-                for pod in pods.items:
-                    pods_metadata.append(pod.metadata)
-                    if should_report_pod(pod):
-                        active_services.append(
-                            Discovery.__create_service_info(
-                                pod.metadata,
-                                "Pod",
-                                extract_containers(pod),
-                                extract_volumes(pod),
-                                extract_total_pods(pod),
-                                extract_ready_pods(pod),
-                                is_helm_release=is_release_managed_by_helm(
-                                    annotations=pod.metadata.annotations, labels=pod.metadata.labels
-                                ),
-                            )
+            )
+            api_client = batch_api.api_client
+            jobs = (api_client.deserialize(SimpleNamespace(data=json.dumps(item)), "V1Job") for item in page)
+            return jobs, lambda: page.continue_ref
+
+        current_jobs: V1JobList = batch_api.list_job_for_all_namespaces(
+            limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref
+        )
+        return iter(current_jobs.items), lambda: current_jobs.metadata._continue
+
+    @staticmethod
+    def __discover_jobs(batch_api: client.BatchV1Api, get_pods_metadata: Callable[[], List[Any]]) -> List[JobInfo]:
+        active_jobs: List[JobInfo] = []
+        continue_ref: Optional[str] = None
+        for _ in range(DISCOVERY_MAX_BATCHES):
+            jobs, get_continue_ref = Discovery.__iter_jobs_page(batch_api, continue_ref)
+            pods_metadata = None
+            for job in jobs:
+                # job pods are matched using the pods metadata. When listing in parallel, this waits for the pods
+                if pods_metadata is None:
+                    pods_metadata = get_pods_metadata()
+
+                job_pods = []
+                job_labels = extract_job_pod_labels(job)
+                if job_labels:  # add job pods only if we found a valid selector
+                    job_pods = [
+                        pod_meta.name
+                        for pod_meta in pods_metadata
+                        if (
+                            (job.metadata.namespace == pod_meta.namespace)
+                            and (job_labels.items() <= (pod_meta.labels or {}).items())
                         )
+                    ]
 
-                    pod_status = pod.status.phase
-                    if pod_status in ["Running", "Unknown", "Pending"] and pod.spec.node_name:
-                        node_requests[pod.spec.node_name].append(utils.k8s_pod_requests(pod))
-                    if pod_status == "Running":
-                        pods_running_count += 1
+                active_jobs.append(JobInfo.from_api_server(job, job_pods))
 
-                continue_ref = pods.metadata._continue
-                if not continue_ref:
-                    break
+            continue_ref = get_continue_ref()
+            if not continue_ref:
+                break
+        return active_jobs
 
+    @staticmethod
+    def __timed(kind: str, list_durations: Dict[str, float], fn: Callable, *args):
+        start = time.time()
+        try:
+            return fn(*args)
         except Exception as e:
-            logging.error(
-                "Failed to run periodic service discovery",
-                exc_info=True,
-            )
+            logging.error(f"Failed to run periodic {kind} discovery", exc_info=True)
             raise e
+        finally:
+            list_durations[kind] = time.time() - start
+
+    @staticmethod
+    def discovery_process() -> DiscoveryResults:
+        create_monkey_patches()
+        Discovery.stacktrace_thread_active = True
+        threading.Thread(target=Discovery.stack_dump_on_signal).start()
+
+        if DISCOVERY_PARALLEL_LISTING:
+            # list all kinds at the same time, sharing one pooled api client
+            configuration = Configuration.get_default_copy()
+            configuration.connection_pool_maxsize = max(configuration.connection_pool_maxsize, DISCOVERY_LIST_WORKERS)
+            api_client = ApiClient(configuration)
+            apps_api = client.AppsV1Api(api_client)
+            core_api = client.CoreV1Api(api_client)
+            batch_api = client.BatchV1Api(api_client)
+            executor = ThreadPoolExecutor(max_workers=DISCOVERY_LIST_WORKERS)
+        else:
+            apps_api = client.AppsV1Api()
+            core_api = client.CoreV1Api()
+            batch_api = client.BatchV1Api()
+            executor = None
+
+        list_durations: Dict[str, float] = {}
+        object_counts: Dict[str, int] = {}
+        workload_listers = {
+            "Deployment": (apps_api.list_deployment_for_all_namespaces, None),
+            "StatefulSet": (apps_api.list_stateful_set_for_all_namespaces, None),
+            "DaemonSet": (apps_api.list_daemon_set_for_all_namespaces, None),
+            "ReplicaSet": (
+                apps_api.list_replica_set_for_all_namespaces,
+                lambda replicaset: not replicaset.metadata.owner_references and replicaset.spec.replicas > 0,
+            ),
+        }
+
+        def submit(kind: str, fn: Callable, *args) -> Future:
+            if executor:
+                return executor.submit(Discovery.__timed, kind, list_durations, fn, *args)
+            # serial listing. Run now, and wrap the result
+            future = Future()
+            future.set_result(Discovery.__timed(kind, list_durations, fn, *args))
+            return future
 
-        # discover nodes - no need for batching. Number of nodes is not big enough
         try:
-            current_nodes: V1NodeList = client.CoreV1Api().list_node()
-        except Exception as e:
-            logging.error(
-                "Failed to run periodic nodes discovery",
-                exc_info=True,
+            # the pods are submitted first, since jobs discovery uses the pods metadata
+            pods_future = submit("Pod", Discovery.__discover_pods, core_api)
+            workloads_futures = [
+                submit(kind, Discovery.__discover_services, list_fn, kind, object_counts, should_report)
+                for kind, (list_fn, should_report) in workload_listers.items()
+            ]
+            # discover nodes - no need for batching. Number of nodes is not big enough
+            nodes_future = submit("Node", core_api.list_node)
+            jobs_future = submit(
+                "Job", Discovery.__discover_jobs, batch_api, lambda: pods_future.result().pods_metadata
+            )
+            helm_future = None
+            if not DISABLE_HELM_MONITORING:
+                helm_future = submit("HelmRelease", Discovery.discover_helm_releases, core_api)
+            namespaces_future = submit(
+                "Namespace", lambda: [NamespaceInfo.from_api_server(ns) for ns in core_api.list_namespace().items]
             )
-            raise e
 
-        # discover jobs
-        active_jobs: List[JobInfo] = []
+            pods_results: PodsDiscoveryResults = pods_future.result()
+            active_services: List[ServiceInfo] = []
+            for workloads_future in workloads_futures:
+                active_services.extend(workloads_future.result())
+            active_services.extend(pods_results.services)
+            nodes: V1NodeList = nodes_future.result()
+            jobs: List[JobInfo] = jobs_future.result()
+            object_counts.update(Pod=len(pods_results.pods_metadata), Node=len(nodes.items), Job=len(jobs))
+
+            results = DiscoveryResults(
+                services=active_services,
+                nodes=nodes,
+                node_requests=pods_results.node_requests,
+                jobs=jobs,
+                namespaces=namespaces_future.result(),
+                helm_releases=helm_future.result() if helm_future else [],
+                pods_running_count=pods_results.pods_running_count,
+                list_durations=list_durations,
+                object_counts=object_counts,
+            )
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        Discovery.stacktrace_thread_active = False
+        return results
+
+    @staticmethod
+    def discover_helm_releases(core_api: Optional[client.CoreV1Api] = None) -> List[HelmRelease]:
+        core_api = core_api or client.CoreV1Api()
+        helm_releases_map: dict[str, HelmRelease] = {}
         try:
             continue_ref: Optional[str] = None
             for _ in range(DISCOVERY_MAX_BATCHES):
-                current_jobs: V1JobList = client.BatchV1Api().list_job_for_all_namespaces(
-                    limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref
-                )
-                for job in current_jobs.items:
-                    job_pods = []
-                    job_labels = {}
-                    if job.spec.selector:
-                        job_labels = job.spec.selector.match_labels
-                    elif job.metadata.labels:
-                        job_name = job.metadata.labels.get("job-name", None)
-                        if job_name:
-                            job_labels = {"job-name": job_name}
-
-                    if job_labels:  # add job pods only if we found a valid selector
-                        job_pods = [
-                            pod_meta.name
-                            for pod_meta in pods_metadata
-                            if (
-                                (job.metadata.namespace == pod_meta.namespace)
-                                and (job_labels.items() <= (pod_meta.labels or {}).items())
-                            )
-                        ]
-
-                    active_jobs.append(JobInfo.from_api_server(job, job_pods))
-
-                continue_ref = current_jobs.metadata._continue
-                if not continue_ref:
+                secrets = core_api.list_secret_for_all_namespaces(label_selector="owner=helm", _continue=continue_ref)
+                if not secrets.items:
                     break
 
-        except Exception as e:
-            logging.error(
-                "Failed to run periodic jobs discovery",
-                exc_info=True,
-            )
-            raise e
+                for secret_item in secrets.items:
+                    release_data = secret_item.data.get("release", None)
+                    if not release_data:
+                        continue
 
-        helm_releases_map: dict[str, HelmRelease] = {}
-        if not DISABLE_HELM_MONITORING:
-            # discover helm state
-            try:
-                continue_ref: Optional[str] = None
-                for _ in range(DISCOVERY_MAX_BATCHES):
-                    secrets = client.CoreV1Api().list_secret_for_all_namespaces(
-                        label_selector="owner=helm", _continue=continue_ref
-                    )
-                    if not secrets.items:
-                        break
-
-                    for secret_item in secrets.items:
-                        release_data = secret_item.data.get("release", None)
-                        if not release_data:
-                            continue
-
-                        try:
-                            decoded_release_row = HelmRelease.from_api_server(secret_item.data["release"])
-                            # we use map here to deduplicate and pick only the latest release data
-                            helm_releases_map[decoded_release_row.get_service_key()] = decoded_release_row
-                        except Exception as e:
-                            logging.error(f"an error occurred while decoding helm releases: {e}")
-
-                    continue_ref = secrets.metadata._continue
-                    if not continue_ref:
-                        break
-
-            except Exception as e:
-                logging.error(
-                    "Failed to run periodic helm discovery",
-                    exc_info=True,
-                )
-                raise e
+                    try:
+                        decoded_release_row = HelmRelease.from_api_server(secret_item.data["release"])
+                        # we use map here to deduplicate and pick only the latest release data
+                        helm_releases_map[decoded_release_row.get_service_key()] = decoded_release_row
+                    except Exception as e:
+                        logging.error(f"an error occurred while decoding helm releases: {e}")
+
+                continue_ref = secrets.metadata._continue
+                if not continue_ref:
+                    break
 
-        # discover namespaces
-        try:
-            namespaces: List[NamespaceInfo] = [
-                NamespaceInfo.from_api_server(namespace) for namespace in client.CoreV1Api().list_namespace().items
-            ]
         except Exception as e:
             logging.error(
-                "Failed to run periodic namespaces discovery",
+                "Failed to run periodic helm discovery",
                 exc_info=True,
             )
             raise e
-        Discovery.stacktrace_thread_active = False
-        return DiscoveryResults(
-            services=active_services,
-            nodes=current_nodes,
-            node_requests=node_requests,
-            jobs=active_jobs,
-            namespaces=namespaces,
-            helm_releases=list(helm_releases_map.values()),
-            pods_running_count=pods_running_count,
-        )
+
+        return list(helm_releases_map.values())
 
     @staticmethod
     @discovery_errors_count.count_exceptions()
@@ -405,7 +444,11 @@ class Discovery:
     def discover_resources() -> DiscoveryResults:
         try:
             future = Discovery.executor.submit(Discovery.discovery_process)
-            return future.result(timeout=DISCOVERY_PROCESS_TIMEOUT_SEC)
+            results: DiscoveryResults = future.result(timeout=DISCOVERY_PROCESS_TIMEOUT_SEC)
+            # the discovery process has its own metrics registry, so the list times are reported from here
+            for kind, duration in results.list_durations.items():
+                discovery_list_time.labels(kind).observe(duration)
+            return results
         except Exception as e:
             # We've seen this and believe the process is killed due to oom kill
             # The process pool becomes not usable, so re-creating it
@@ -417,79 +460,8 @@ class Discovery:
 
     @staticmethod
     def discover_stats() -> ClusterStats:
-        deploy_count = -1
-        sts_count = -1
-        dms_count = -1
-        rs_count = -1
-        pod_count = -1
-        node_count = -1
-        job_count = -1
-        try:
-            deps: V1DeploymentList = client.AppsV1Api().list_deployment_for_all_namespaces(limit=1, _continue=None)
-            remaining = deps.metadata.remaining_item_count or 0
-            deploy_count = remaining + len(deps.items)
-        except Exception:
-            logging.error("Failed to count deployments", exc_info=True)
-
-        try:
-            sts: V1StatefulSetList = client.AppsV1Api().list_stateful_set_for_all_namespaces(limit=1, _continue=None)
-            remaining = sts.metadata.remaining_item_count or 0
-            sts_count = remaining + len(sts.items)
-        except Exception:
-            logging.error("Failed to count statefulsets", exc_info=True)
-
-        try:
-            dms: V1DaemonSetList = client.AppsV1Api().list_daemon_set_for_all_namespaces(limit=1, _continue=None)
-            remaining = dms.metadata.remaining_item_count or 0
-            dms_count = remaining + len(dms.items)
-        except Exception:
-            logging.error("Failed to count daemonsets", exc_info=True)
-
-        try:
-            rs: V1ReplicaSetList = client.AppsV1Api().list_replica_set_for_all_namespaces(limit=1, _continue=None)
-            remaining = rs.metadata.remaining_item_count or 0
-            rs_count = remaining + len(rs.items)
-        except Exception:
-            logging.error("Failed to count replicasets", exc_info=True)
-
-        try:
-            pods: V1PodList = client.CoreV1Api().list_pod_for_all_namespaces(limit=1, _continue=None)
-            remaining = pods.metadata.remaining_item_count or 0
-            pod_count = remaining + len(pods.items)
-        except Exception:
-            logging.error("Failed to count pods", exc_info=True)
-
-        try:
-            nodes: V1NodeList = client.CoreV1Api().list_node(limit=1, _continue=None)
-            remaining = nodes.metadata.remaining_item_count or 0
-            node_count = remaining + len(nodes.items)
-        except Exception:
-            logging.error("Failed to count nodes", exc_info=True)
-
-        try:
-            jobs: V1JobList = client.BatchV1Api().list_job_for_all_namespaces(limit=1, _continue=None)
-            remaining = jobs.metadata.remaining_item_count or 0
-            job_count = remaining + len(jobs.items)
-        except Exception:
-            logging.error("Failed to count jobs", exc_info=True)
-
-        k8s_version: str = None
-        try:
-            k8s_version = client.VersionApi().get_code().git_version
-        except Exception:
-            logging.exception("Failed to get k8s server version")
-
-        return ClusterStats(
-            deployments=deploy_count,
-            statefulsets=sts_count,
-            daemonsets=dms_count,
-            replicasets=rs_count,
-            pods=pod_count,
-            nodes=node_count,
-            jobs=job_count,
-            provider=cluster_provider.get_cluster_provider(),
-            k8s_version=k8s_version,
-        )
+        """Uncached cluster stats. Use a shared ClusterStatsProvider for periodic stats"""
+        return ClusterStatsProvider(ttl_sec=0, counts_max_age_sec=0).get_stats()
 
 
 # This section below contains utility related to k8s python api objects (rather than hikaru)
@@ -534,6 +506,17 @@ def extract_containers_k8(resource) -> List[Container]:
     return []
 
 
+def extract_job_pod_labels(job: V1Job) -> Dict[str, str]:
+    """Labels selecting the pods of a k8s python api job (not hikaru). Empty if no valid selector found"""
+    if job.spec.selector:
+        return job.spec.selector.match_labels or {}
+    elif job.metadata.labels:
+        job_name = job.metadata.labels.get("job-name", None)
+        if job_name:
+            return {"job-name": job_name}
+    return {}
+
+
 def is_pod_ready(pod) -> bool:
     conditions = []
     if isinstance(pod, V1Pod):
@@ -0,0 +1,422 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import prometheus_client
+from kubernetes import client, watch
+from kubernetes.client import ApiException, V1Job, V1Namespace, V1Node, V1Pod
+from pydantic import BaseModel
+
+from robusta.core.discovery import utils
+from robusta.core.discovery.discovery import Discovery, extract_job_pod_labels, should_report_pod
+from robusta.core.model.env_vars import (
+    DISCOVERY_BATCH_SIZE,
+    DISCOVERY_MAX_BATCHES,
+    DISCOVERY_WATCH_TIMEOUT_SEC,
+)
+from robusta.core.model.jobs import SERVICE_TYPE_JOB, JobInfo
+from robusta.core.model.k8s_operation_type import K8sOperationType
+from robusta.core.model.namespaces import NamespaceInfo
+from robusta.core.model.pods import PodResources
+from robusta.core.model.services import ServiceInfo
+
+HTTP_GONE = 410
+WATCH_RETRY_DELAY_SEC = 5
+
+informer_relists = prometheus_client.Counter(
+    "discovery_informer_relists", "Number of full relists done by the discovery informers", labelnames=("kind",)
+)
+informer_events = prometheus_client.Counter(
+    "discovery_informer_events",
+    "Number of watch events handled by the discovery informers",
+    labelnames=("kind", "type"),
+)
+
+# operation, object key (namespace/name), object. The object is None for objects found missing on relist
+InformerCallback = Callable[[K8sOperationType, str, Optional[Any]], None]
+
+
+class ResourceInformer:
+    """
+    Lists a resource kind once, and then keeps a local store of it current, using resourceVersion based watches.
+    The resource is relisted only when the watched resource version is too old (410 Gone), or when a resync is requested.
+
+    The store only holds the resource version of each object. Whatever else is needed should be kept by the callback.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        list_fn: Callable,
+        on_event: InformerCallback,
+        stream_fn: Optional[Callable[[str], Iterable[Dict]]] = None,
+    ):
+        self.kind = kind
+        self.resource_version: Optional[str] = None
+        self.synced = threading.Event()
+        self.__list_fn = list_fn
+        self.__on_event = on_event
+        self.__stream_fn = stream_fn or self.__watch_stream
+        self.__store: Dict[str, str] = {}  # object key to resource version
+        self.__watch: Optional[watch.Watch] = None
+        self.__active = True
+        self.__resync = False
+
+    @staticmethod
+    def object_key(obj) -> str:
+        return f"{obj.metadata.namespace or ''}/{obj.metadata.name}"
+
+    def __watch_stream(self, resource_version: str) -> Iterable[Dict]:
+        self.__watch = watch.Watch()
+        return self.__watch.stream(
+            self.__list_fn,
+            resource_version=resource_version,
+            timeout_seconds=DISCOVERY_WATCH_TIMEOUT_SEC,
+            allow_watch_bookmarks=True,
+        )
+
+    def count(self) -> Optional[int]:
+        """Number of objects in the store. None before the first list"""
+        if self.resource_version is None:
+            return None
+        return len(self.__store)
+
+    def stop(self):
+        self.__active = False
+        if self.__watch:
+            self.__watch.stop()
+
+    def resync(self):
+        """Relist, and send all the objects to the callback, even the ones that didn't change"""
+        self.__resync = True
+        if self.__watch:
+            self.__watch.stop()
+
+    def run(self):
+        while self.__active:
+            try:
+                if self.__resync or self.resource_version is None:
+                    force = self.__resync
+                    self.__resync = False
+                    self.relist(force)
+
+                self.watch()
+            except ApiException as e:
+                if e.status == HTTP_GONE:
+                    logging.info(f"{self.kind} watch resource version {self.resource_version} expired, relisting")
+                    self.resource_version = None
+                else:
+                    logging.error(f"Failed to watch {self.kind}: {e}")
+                    time.sleep(WATCH_RETRY_DELAY_SEC)
+            except Exception:
+                logging.error(f"Failed to watch {self.kind}", exc_info=True)
+                time.sleep(WATCH_RETRY_DELAY_SEC)
+
+        logging.info(f"{self.kind} informer stopped")
+
+    def relist(self, force: bool = False):
+        informer_relists.labels(self.kind).inc()
+        listed: Dict[str, str] = {}
+        resource_version: Optional[str] = None
+        continue_ref: Optional[str] = None
+        for _ in range(DISCOVERY_MAX_BATCHES):
+            page = self.__list_fn(limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref)
+            resource_version = page.metadata.resource_version
+            for obj in page.items:
+                key = self.object_key(obj)
+                version = obj.metadata.resource_version
+                listed[key] = version
+                if force or self.__store.get(key) != version:
+                    operation = K8sOperationType.UPDATE if key in self.__store else K8sOperationType.CREATE
+                    self.__on_event(operation, key, obj)
+
+            continue_ref = page.metadata._continue
+            if not continue_ref:
+                break
+
+        # objects deleted while we weren't watching
+        for key in self.__store.keys() - listed.keys():
+            self.__on_event(K8sOperationType.DELETE, key, None)
+
+        self.__store = listed
+        self.resource_version = resource_version
+        self.synced.set()
+
+    def watch(self):
+        for event in self.__stream_fn(self.resource_version):
+            event_type = event["type"]
+            informer_events.labels(self.kind, event_type).inc()
+            if event_type == "BOOKMARK":
+                self.resource_version = event["raw_object"]["metadata"]["resourceVersion"]
+                continue
+
+            obj = event["object"]
+            key = self.object_key(obj)
+            if event_type == "DELETED":
+                self.__store.pop(key, None)
+                self.__on_event(K8sOperationType.DELETE, key, obj)
+            else:
+                operation = K8sOperationType.UPDATE if key in self.__store else K8sOperationType.CREATE
+                self.__store[key] = obj.metadata.resource_version
+                self.__on_event(operation, key, obj)
+
+            self.resource_version = obj.metadata.resource_version
+            if not self.__active or self.__resync:
+                break
+
+
+class PodSummary:
+    """The parts of a pod that discovery needs after the pod event itself was handled"""
+
+    __slots__ = ("labels", "node_name", "requests", "running")
+
+    def __init__(self, pod: V1Pod):
+        phase = pod.status.phase if pod.status else None
+        self.labels: Dict[str, str] = pod.metadata.labels or {}
+        self.running: bool = phase == "Running"
+        # only pods that are scheduled, and not finished, are counted in the node requests
+        self.node_name: Optional[str] = (
+            pod.spec.node_name if phase in ["Running", "Unknown", "Pending"] and pod.spec.node_name else None
+        )
+        self.requests: Optional[PodResources] = utils.k8s_pod_requests(pod) if self.node_name else None
+
+
+class DiscoveryKeys(BaseModel):
+    services: Set[str] = set()
+    jobs: Set[str] = set()
+    nodes: Set[str] = set()
+    namespaces: Set[str] = set()
+
+
+class DiscoveryDeltas(BaseModel):
+    """
+    Discovery changes accumulated since the last drain.
+    A None value means the resource was deleted.
+    """
+
+    services: Dict[str, Optional[ServiceInfo]] = {}
+    jobs: Dict[str, Optional[JobInfo]] = {}
+    nodes: Dict[str, Optional[V1Node]] = {}
+    node_requests: Dict[str, List[PodResources]] = {}
+    namespaces: Dict[str, Optional[NamespaceInfo]] = {}
+    pods_running_count: int = 0
+    object_counts: Dict[str, int] = {}  # number of objects per kind, for the listed kinds
+    # Set once, when all the informers finished their initial list. Contains the keys of everything that exists in
+    # the cluster, so resources that were deleted before the informers started can be removed as well
+    synced_keys: Optional[DiscoveryKeys] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+
+class DiscoveryInformers:
+    """
+    Informer based cluster discovery.
+
+    Keeps discovery data current using one ResourceInformer per kind, and accumulates the changes into DiscoveryDeltas.
+    Superseded changes to the same resource are merged, so draining the deltas periodically is cheap.
+    """
+
+    WORKLOAD_KINDS = ["Deployment", "StatefulSet", "DaemonSet", "ReplicaSet"]
+
+    def __init__(
+        self,
+        listers: Optional[Dict[str, Callable]] = None,
+        stream_factory: Optional[Callable[[str], Callable[[str], Iterable[Dict]]]] = None,
+    ):
+        listers = listers or self.default_listers()
+        self.__lock = threading.Lock()
+        self.__deltas = DiscoveryDeltas()
+        self.__sync_reported = False
+        self.__service_keys: Set[str] = set()
+        self.__job_keys: Set[str] = set()
+        self.__namespaces: Set[str] = set()
+        self.__nodes: Dict[str, V1Node] = {}
+        self.__dirty_nodes: Set[str] = set()
+        self.__pods: Dict[str, Dict[str, PodSummary]] = defaultdict(dict)  # namespace to pod name to pod summary
+        self.__node_pods: Dict[str, Set[str]] = defaultdict(set)  # node name to pod keys
+        self.__pods_running_count = 0
+
+        handlers: Dict[str, InformerCallback] = {kind: self.__workload_handler(kind) for kind in self.WORKLOAD_KINDS}
+        handlers["Pod"] = self.__on_pod
+        handlers["Job"] = self.__on_job
+        handlers["Node"] = self.__on_node
+        handlers["Namespace"] = self.__on_namespace
+        self.informers: List[ResourceInformer] = [
+            ResourceInformer(kind, listers[kind], handler, stream_factory(kind) if stream_factory else None)
+            for kind, handler in handlers.items()
+        ]
+
+    @staticmethod
+    def default_listers() -> Dict[str, Callable]:
+        return {
+            "Deployment": client.AppsV1Api().list_deployment_for_all_namespaces,
+            "StatefulSet": client.AppsV1Api().list_stateful_set_for_all_namespaces,
+            "DaemonSet": client.AppsV1Api().list_daemon_set_for_all_namespaces,
+            "ReplicaSet": client.AppsV1Api().list_replica_set_for_all_namespaces,
+            "Pod": client.CoreV1Api().list_pod_for_all_namespaces,
+            "Job": client.BatchV1Api().list_job_for_all_namespaces,
+            "Node": client.CoreV1Api().list_node,
+            "Namespace": client.CoreV1Api().list_namespace,
+        }
+
+    def start(self):
+        for informer in self.informers:
+            threading.Thread(target=informer.run, name=f"{informer.kind}-informer", daemon=True).start()
+
+    def stop(self):
+        for informer in self.informers:
+            informer.stop()
+
+    def resync(self):
+        """
+        Resend the full cluster state on the next drains.
+        Used when the consumer lost track of the deltas, for example after an error while publishing them.
+        """
+        with self.__lock:
+            self.__sync_reported = False
+            for informer in self.informers:
+                informer.synced.clear()
+                informer.resync()
+
+    def is_synced(self) -> bool:
+        return all(informer.synced.is_set() for informer in self.informers)
+
+    def object_counts(self) -> Dict[str, int]:
+        counts = {informer.kind: informer.count() for informer in self.informers}
+        return {kind: count for kind, count in counts.items() if count is not None}
+
+    def drain(self) -> DiscoveryDeltas:
+        with self.__lock:
+            deltas = self.__deltas
+            self.__deltas = DiscoveryDeltas()
+            for node_name in self.__dirty_nodes:
+                node = self.__nodes.get(node_name)
+                if node:
+                    deltas.nodes[node_name] = node
+                    deltas.node_requests[node_name] = self.__node_requests(node_name)
+            self.__dirty_nodes = set()
+            deltas.pods_running_count = self.__pods_running_count
+            deltas.object_counts = self.object_counts()
+
+            if not self.__sync_reported and self.is_synced():
+                self.__sync_reported = True
+                deltas.synced_keys = DiscoveryKeys(
+                    services=set(self.__service_keys),
+                    jobs=set(self.__job_keys),
+                    nodes=set(self.__nodes.keys()),
+                    namespaces=set(self.__namespaces),
+                )
+
+        return deltas
+
+    def __node_requests(self, node_name: str) -> List[PodResources]:
+        requests = []
+        for pod_key in self.__node_pods.get(node_name, []):
+            namespace, name = pod_key.split("/", 1)
+            pod = self.__pods[namespace].get(name)
+            if pod and pod.requests:
+                requests.append(pod.requests)
+        return requests
+
+    def __set_service(self, service_key: str, service: Optional[ServiceInfo]):
+        # must be called with the lock held
+        if service:
+            self.__service_keys.add(service_key)
+            self.__deltas.services[service_key] = service
+        elif service_key in self.__service_keys:
+            self.__service_keys.discard(service_key)
+            self.__deltas.services[service_key] = None
+
+    def __workload_handler(self, kind: str) -> InformerCallback:
+        def on_event(operation: K8sOperationType, key: str, obj: Optional[Any]):
+            namespace, name = key.split("/", 1)
+            service = None
+            if operation != K8sOperationType.DELETE and self.__should_report_workload(kind, obj):
+                service = Discovery.create_api_service_info(obj, kind)
+            with self.__lock:
+                self.__set_service(f"{namespace}/{kind}/{name}", service)
+
+        return on_event
+
+    @staticmethod
+    def __should_report_workload(kind: str, obj: Any) -> bool:
+        if kind == "ReplicaSet":
+            return not obj.metadata.owner_references and (obj.spec.replicas or 0) > 0
+        return True
+
+    def __on_pod(self, operation: K8sOperationType, key: str, pod: Optional[V1Pod]):
+        namespace, name = key.split("/", 1)
+        service = None
+        summary = None
+        if operation != K8sOperationType.DELETE:
+            summary = PodSummary(pod)
+            if should_report_pod(pod):
+                service = Discovery.create_api_service_info(pod, "Pod")
+
+        with self.__lock:
+            previous = self.__pods[namespace].pop(name, None)
+            if previous:
+                self.__pods_running_count -= previous.running
+                if previous.node_name:
+                    self.__node_pods[previous.node_name].discard(key)
+                    self.__dirty_nodes.add(previous.node_name)
+
+            if summary:
+                self.__pods[namespace][name] = summary
+                self.__pods_running_count += summary.running
+                if summary.node_name:
+                    self.__node_pods[summary.node_name].add(key)
+                    self.__dirty_nodes.add(summary.node_name)
+            elif not self.__pods[namespace]:
+                del self.__pods[namespace]
+
+            self.__set_service(f"{namespace}/Pod/{name}", service)
+
+    def __job_pods(self, job: V1Job) -> List[str]:
+        # must be called with the lock held
+        job_labels = extract_job_pod_labels(job)
+        if not job_labels:
+            return []
+        return [
+            name
+            for name, pod in self.__pods.get(job.metadata.namespace, {}).items()
+            if job_labels.items() <= pod.labels.items()
+        ]
+
+    def __on_job(self, operation: K8sOperationType, key: str, job: Optional[V1Job]):
+        namespace, name = key.split("/", 1)
+        job_key = f"{namespace}/{SERVICE_TYPE_JOB}/{name}"
+        with self.__lock:
+            if operation == K8sOperationType.DELETE:
+                self.__job_keys.discard(job_key)
+                self.__deltas.jobs[job_key] = None
+                return
+
+            self.__job_keys.add(job_key)
+            self.__deltas.jobs[job_key] = JobInfo.from_api_server(job, self.__job_pods(job))
+
+    def __on_node(self, operation: K8sOperationType, key: str, node: Optional[V1Node]):
+        name = key.split("/", 1)[1]
+        with self.__lock:
+            if operation == K8sOperationType.DELETE:
+                self.__nodes.pop(name, None)
+                self.__dirty_nodes.discard(name)
+                self.__deltas.nodes[name] = None
+                return
+
+            self.__nodes[name] = node
+            self.__dirty_nodes.add(name)
+
+    def __on_namespace(self, operation: K8sOperationType, key: str, namespace: Optional[V1Namespace]):
+        name = key.split("/", 1)[1]
+        with self.__lock:
+            if operation == K8sOperationType.DELETE:
+                self.__namespaces.discard(name)
+                self.__deltas.namespaces[name] = None
+                return
+
+            self.__namespaces.add(name)
+            self.__deltas.namespaces[name] = NamespaceInfo.from_api_server(namespace)
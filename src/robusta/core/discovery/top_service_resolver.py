@@ -6,6 +6,7 @@ from typing import Dict, List, Optional
 from pydantic.main import BaseModel
 
 from robusta.core.model.env_vars import RESOURCE_UPDATES_CACHE_TTL_SEC
+from robusta.utils.prefix_trie import RadixTrie
 
 
 class TopLevelResource(BaseModel):
@@ -20,33 +21,45 @@ class TopLevelResource(BaseModel):
 class CachedResourceInfo(BaseModel):
     resource: TopLevelResource
     event_time: float
+    deleted: bool = False
 
 
 class TopServiceResolver:
+    """
+    Guesses the top level resource of a k8s object, by name.
+    The resources of each namespace are kept in a compressed trie, so the longest resource name that is a prefix of
+    the object name is found in O(name length). foo-bar-1234 resolves to foo-bar, even if foo exists too.
+    """
+
     __recent_resource_updates: Dict[str, CachedResourceInfo] = {}
-    __namespace_to_resource: Dict[str, List[TopLevelResource]] = defaultdict(list)
+    __namespace_to_resource: Dict[str, RadixTrie[TopLevelResource]] = {}
+    # serializes the changes. Lookups don't lock, the tries support concurrent reads while they're changed
     __cached_updates_lock = threading.Lock()
 
     @classmethod
     def store_cached_resources(cls, resources: List[TopLevelResource]):
-        new_store = defaultdict(list)
+        new_store: Dict[str, RadixTrie[TopLevelResource]] = defaultdict(RadixTrie)
         for resource in resources:
-            new_store[resource.namespace].append(resource)
+            new_store[resource.namespace].add(resource.name, resource)
 
         # The resources are stored periodically, after reading it from the API server. If, between reads
         # new resources are added, they will be missing from the cache. So, in addition to the periodic read, we
-        # update the cache from listening to add/update API server events.
-        # append recent updates, to avoid race conditions between events and api server read
+        # update the cache from listening to add/update/delete API server events.
+        # apply recent updates, to avoid race conditions between events and api server read
         with cls.__cached_updates_lock:
             recent_updates_keys = list(cls.__recent_resource_updates.keys())
             for resource_key in recent_updates_keys:
                 recent_update = cls.__recent_resource_updates[resource_key]
+                resource = recent_update.resource
                 if time.time() - recent_update.event_time > RESOURCE_UPDATES_CACHE_TTL_SEC:
                     del cls.__recent_resource_updates[resource_key]
+                elif recent_update.deleted:
+                    new_store[resource.namespace].remove(resource.name, resource)
                 else:
-                    new_store[recent_update.resource.namespace].append(recent_update.resource)
+                    new_store[resource.namespace].add(resource.name, resource)
 
-        cls.__namespace_to_resource = new_store
+            # swapped at once, lookups use either the previous or the new tries
+            cls.__namespace_to_resource = dict(new_store)
 
     # TODO remove this guess function
     # temporary try to guess who the owner service is.
@@ -62,15 +75,31 @@ class TopServiceResolver:
         if name is None or namespace is None:
             return None
 
-        for cached_resource in cls.__namespace_to_resource[namespace]:
-            if name.startswith(cached_resource.name):
-                return cached_resource
-        return None
+        resources = cls.__namespace_to_resource.get(namespace)
+        if resources is None:
+            return None
+        return resources.longest_match(name)
 
     @classmethod
     def add_cached_resource(cls, resource: TopLevelResource):
-        cls.__namespace_to_resource[resource.namespace].append(resource)
         with cls.__cached_updates_lock:
+            cls.__namespace_resources(resource.namespace).add(resource.name, resource)
             cls.__recent_resource_updates[resource.get_resource_key()] = CachedResourceInfo(
                 resource=resource, event_time=time.time()
             )
+
+    @classmethod
+    def remove_cached_resource(cls, resource: TopLevelResource):
+        with cls.__cached_updates_lock:
+            cls.__namespace_resources(resource.namespace).remove(resource.name, resource)
+            cls.__recent_resource_updates[resource.get_resource_key()] = CachedResourceInfo(
+                resource=resource, event_time=time.time(), deleted=True
+            )
+
+    @classmethod
+    def __namespace_resources(cls, namespace: str) -> RadixTrie[TopLevelResource]:
+        resources = cls.__namespace_to_resource.get(namespace)
+        if resources is None:
+            resources = RadixTrie()
+            cls.__namespace_to_resource[namespace] = resources
+        return resources
@@ -23,17 +23,81 @@ PLAYBOOKS_CONFIG_FILE_PATH = os.environ.get("PLAYBOOKS_CONFIG_FILE_PATH")
 INSTALLATION_NAMESPACE = os.environ.get("INSTALLATION_NAMESPACE", "robusta")
 DISCOVERY_PERIOD_SEC = int(os.environ.get("DISCOVERY_PERIOD_SEC", 90))
 CLUSTER_STATUS_PERIOD_SEC = int(os.environ.get("CLUSTER_STATUS_PERIOD_SEC", 60 * 15))  # 15 min
+CLUSTER_STATS_CACHE_TTL_SEC = int(os.environ.get("CLUSTER_STATS_CACHE_TTL_SEC", DISCOVERY_PERIOD_SEC))
+# objects counts reported by discovery are used for the cluster stats, if not older than this
+CLUSTER_STATS_COUNTS_MAX_AGE_SEC = int(os.environ.get("CLUSTER_STATS_COUNTS_MAX_AGE_SEC", 60 * 10))  # 10 min
+CLUSTER_STATS_PAGE_SIZE = int(os.environ.get("CLUSTER_STATS_PAGE_SIZE", 500))
 DISCOVERY_CHECK_THRESHOLD_SEC = int(os.environ.get("DISCOVERY_CHECK_THRESHOLD_SEC", 60 * 50))  # 50 min
 DISCOVERY_PROCESS_TIMEOUT_SEC = int(os.environ.get("DISCOVERY_PROCESS_TIMEOUT_SEC", 60 * 120))  # 120 min
 DISCOVERY_WATCHDOG_CHECK_SEC = int(os.environ.get("DISCOVERY_WATCHDOG_CHECK_SEC", 15 * 120))  # 15 min
 SUPABASE_LOGIN_RATE_LIMIT_SEC = int(os.environ.get("SUPABASE_LOGIN_RATE_LIMIT_SEC", 900))
 SUPABASE_TIMEOUT_SECONDS = int(os.environ.get("SUPABASE_TIMEOUT_SECONDS", 60))
+# findings, evidence and events rows are buffered, and written in multi row requests every flush interval
+SUPABASE_WRITE_BEHIND = load_bool("SUPABASE_WRITE_BEHIND", False)
+SUPABASE_WRITE_FLUSH_SEC = float(os.environ.get("SUPABASE_WRITE_FLUSH_SEC", 0.5))
+SUPABASE_WRITE_BATCH_SIZE = int(os.environ.get("SUPABASE_WRITE_BATCH_SIZE", 500))
+# serialized size cap of one multi row request. A larger row is written in a request of its own
+SUPABASE_WRITE_BATCH_MAX_BYTES = int(os.environ.get("SUPABASE_WRITE_BATCH_MAX_BYTES", 4 * 1024 * 1024))
+SUPABASE_WRITE_BUFFER_MAX_ROWS = int(os.environ.get("SUPABASE_WRITE_BUFFER_MAX_ROWS", 20000))
+# evidence rows carry files, so the buffer is bounded by the rows serialized size too
+SUPABASE_WRITE_BUFFER_MAX_BYTES = int(os.environ.get("SUPABASE_WRITE_BUFFER_MAX_BYTES", 64 * 1024 * 1024))
+SUPABASE_WRITE_BLOCK_TIMEOUT_SEC = float(os.environ.get("SUPABASE_WRITE_BLOCK_TIMEOUT_SEC", 5))
+SUPABASE_WRITE_MAX_RETRIES = int(os.environ.get("SUPABASE_WRITE_MAX_RETRIES", 5))
+SUPABASE_WRITE_MAX_BACKOFF_SEC = float(os.environ.get("SUPABASE_WRITE_MAX_BACKOFF_SEC", 30))
+# legacy or compressed. The compressed encoding requires a platform version that reads compressed, chunked evidence
+EVIDENCE_ENCODING = os.environ.get("EVIDENCE_ENCODING", "legacy")
+EVIDENCE_COMPRESS_MIN_BYTES = int(os.environ.get("EVIDENCE_COMPRESS_MIN_BYTES", 64 * 1024))
+EVIDENCE_CHUNK_BYTES = int(os.environ.get("EVIDENCE_CHUNK_BYTES", 1024 * 1024))
 GRAFANA_RENDERER_URL = os.environ.get("GRAFANA_RENDERER_URL", "http://127.0.0.1:8281/render")
 RESOURCE_UPDATES_CACHE_TTL_SEC = os.environ.get("RESOURCE_UPDATES_CACHE_TTL_SEC", 120)
 INTERNAL_PLAYBOOKS_ROOT = os.environ.get("INTERNAL_PLAYBOOKS_ROOT", "/app/src/robusta/core/playbooks/internal")
 DEFAULT_TIMEZONE = pytz.timezone(os.environ.get("DEFAULT_TIMEZONE", "UTC"))
 NUM_EVENT_THREADS = int(os.environ.get("NUM_EVENT_THREADS", 20))
 INCOMING_EVENTS_QUEUE_MAX_SIZE = int(os.environ.get("INCOMING_EVENTS_QUEUE_MAX_SIZE", 500))
+# per object ordering, priorities and coalescing of superseded updates for incoming events
+INCOMING_EVENTS_KEYED_QUEUE = load_bool("INCOMING_EVENTS_KEYED_QUEUE", False)
+# merge consecutive k8s updates of the same object, received within this window. 0 to disable
+INCOMING_EVENTS_COALESCE_WINDOW_SEC = float(os.environ.get("INCOMING_EVENTS_COALESCE_WINDOW_SEC", 0))
+INCOMING_EVENTS_COALESCE_MAX_PENDING = int(os.environ.get("INCOMING_EVENTS_COALESCE_MAX_PENDING", 10000))
+
+# deliver findings to each sink from its own queue and workers, instead of the event worker thread
+SINKS_ASYNC_DELIVERY = load_bool("SINKS_ASYNC_DELIVERY", False)
+SINK_DELIVERY_WORKERS = int(os.environ.get("SINK_DELIVERY_WORKERS", 1))
+SINK_DELIVERY_QUEUE_SIZE = int(os.environ.get("SINK_DELIVERY_QUEUE_SIZE", 1000))
+SINK_DELIVERY_SPILL_DIR = os.environ.get("SINK_DELIVERY_SPILL_DIR", "/tmp/robusta-sinks-spill")
+
+# k8s objects of prometheus alerts are loaded concurrently, and cached briefly, so alerts storms share the reads
+ALERT_OBJECTS_LOADER_WORKERS = int(os.environ.get("ALERT_OBJECTS_LOADER_WORKERS", 10))
+ALERT_OBJECTS_CACHE_TTL_SEC = float(os.environ.get("ALERT_OBJECTS_CACHE_TTL_SEC", 10))
+ALERT_OBJECTS_CACHE_MAX_SIZE = int(os.environ.get("ALERT_OBJECTS_CACHE_MAX_SIZE", 5000))
+# minimal interval between nodes relists, when looking for a node address that isn't known yet
+NODES_IP_INDEX_RELIST_SEC = int(os.environ.get("NODES_IP_INDEX_RELIST_SEC", 60))
+
+# number of threads running the scheduled jobs
+SCHEDULER_WORKERS = int(os.environ.get("SCHEDULER_WORKERS", 10))
+# scheduled jobs states are persisted in the background, every SCHEDULER_STATE_FLUSH_SEC
+SCHEDULER_STATE_FLUSH_SEC = float(os.environ.get("SCHEDULER_STATE_FLUSH_SEC", 5))
+# configmaps are limited to 1MiB. Jobs states are stored in additional configmaps when reaching this size
+SCHEDULER_STATE_SHARD_MAX_BYTES = int(os.environ.get("SCHEDULER_STATE_SHARD_MAX_BYTES", 900000))
+
+# number of threads running delayed enrichments, off the event worker threads
+DELAYED_ENRICHMENT_WORKERS = int(os.environ.get("DELAYED_ENRICHMENT_WORKERS", 5))
+# findings with delayed enrichments are sent to the sinks at most this long after the last enrichment was due
+DELAYED_ENRICHMENT_TIMEOUT_SEC = float(os.environ.get("DELAYED_ENRICHMENT_TIMEOUT_SEC", 60))
+
+# rate limited operations state. Keys are spread over lock striped shards, and the least recently used keys are
+# evicted above RATE_LIMITER_MAX_KEYS
+RATE_LIMITER_SHARDS = int(os.environ.get("RATE_LIMITER_SHARDS", 16))
+RATE_LIMITER_MAX_KEYS = int(os.environ.get("RATE_LIMITER_MAX_KEYS", 100000))
+
+# debugger pods are kept warm per node and image, and reused by exec based enrichers, until idle for the idle ttl
+DEBUGGER_POD_POOL_ENABLED = load_bool("DEBUGGER_POD_POOL_ENABLED", False)
+DEBUGGER_POD_POOL_MAX_PODS_PER_NODE = int(os.environ.get("DEBUGGER_POD_POOL_MAX_PODS_PER_NODE", 2))
+DEBUGGER_POD_POOL_IDLE_TTL_SEC = float(os.environ.get("DEBUGGER_POD_POOL_IDLE_TTL_SEC", 120))
+# pooled pods are replaced after this age. Kubernetes stops pods that were orphaned, by a runner restart, after it
+DEBUGGER_POD_POOL_MAX_AGE_SEC = int(os.environ.get("DEBUGGER_POD_POOL_MAX_AGE_SEC", 1800))
+DEBUGGER_POD_POOL_ACQUIRE_TIMEOUT_SEC = float(os.environ.get("DEBUGGER_POD_POOL_ACQUIRE_TIMEOUT_SEC", 120))
+DEBUGGER_POD_POOL_IMAGE_PULL_POLICY = os.environ.get("DEBUGGER_POD_POOL_IMAGE_PULL_POLICY", "IfNotPresent")
 
 FLOAT_PRECISION_LIMIT = int(os.environ.get("FLOAT_PRECISION_LIMIT", 11))
 
@@ -64,10 +128,19 @@ ROBUSTA_TELEMETRY_ENDPOINT = os.environ.get("ROBUSTA_TELEMETRY_ENDPOINT", "https
 ENABLE_TELEMETRY = os.environ.get("ENABLE_TELEMETRY", "true").lower() == "true"
 SEND_ADDITIONAL_TELEMETRY = os.environ.get("SEND_ADDITIONAL_TELEMETRY", "false").lower() == "true"
 RELEASE_NAME = os.environ.get("RELEASE_NAME", "robusta")
+# the runner pod name. Kubernetes sets the hostname of a pod to its name
+RUNNER_POD_NAME = os.environ.get("RUNNER_POD_NAME", os.environ.get("HOSTNAME", ""))
 
 TELEMETRY_PERIODIC_SEC = int(os.environ.get("TELEMETRY_PERIODIC_SEC", 60 * 60 * 24))  # 24H
 
 SLACK_TABLE_COLUMNS_LIMIT = int(os.environ.get("SLACK_TABLE_COLUMNS_LIMIT", 3))
+# concurrent files uploads of one slack message
+SLACK_UPLOAD_WORKERS = int(os.environ.get("SLACK_UPLOAD_WORKERS", 4))
+# slack api calls are throttled by the methods rate limits tiers. Rate limited calls are retried after Retry-After
+SLACK_RATE_LIMIT_ENABLED = load_bool("SLACK_RATE_LIMIT_ENABLED", True)
+SLACK_RATE_LIMIT_RETRIES = int(os.environ.get("SLACK_RATE_LIMIT_RETRIES", 3))
+# calls that would wait longer for the rate limit are rejected, so event worker threads aren't held for minutes
+SLACK_RATE_LIMIT_MAX_WAIT_SEC = float(os.environ.get("SLACK_RATE_LIMIT_MAX_WAIT_SEC", 10))
 DISCORD_TABLE_COLUMNS_LIMIT = int(os.environ.get("DISCORD_TABLE_COLUMNS_LIMIT", 4))
 RSA_KEYS_PATH = os.environ.get("RSA_KEYS_PATH", "/etc/robusta/auth")
 
@@ -90,6 +163,15 @@ ADDITIONAL_CERTIFICATE: str = os.environ.get("CERTIFICATE", "")
 DISCOVERY_MAX_BATCHES = int(os.environ.get("DISCOVERY_MAX_BATCHES", 25))
 DISCOVERY_BATCH_SIZE = int(os.environ.get("DISCOVERY_BATCH_SIZE", 30000))
 DISCOVERY_POD_OWNED_PODS = load_bool("DISCOVERY_POD_OWNED_PODS", False)
+# list all the kinds at the same time, instead of one after the other
+DISCOVERY_PARALLEL_LISTING = load_bool("DISCOVERY_PARALLEL_LISTING", False)
+DISCOVERY_LIST_WORKERS = int(os.environ.get("DISCOVERY_LIST_WORKERS", 4))
+# decode discovery list responses incrementally, keeping only the needed fields, instead of building k8s client models
+DISCOVERY_COMPACT_DECODE = load_bool("DISCOVERY_COMPACT_DECODE", False)
+# list once, then keep the discovery data current using k8s watches, instead of periodically re-listing everything
+DISCOVERY_WATCH_MODE = load_bool("DISCOVERY_WATCH_MODE", False)
+DISCOVERY_WATCH_TIMEOUT_SEC = int(os.environ.get("DISCOVERY_WATCH_TIMEOUT_SEC", 300))
+DISCOVERY_WATCH_FLUSH_SEC = int(os.environ.get("DISCOVERY_WATCH_FLUSH_SEC", 10))
 
 DISABLE_HELM_MONITORING = load_bool("DISABLE_HELM_MONITORING", False)
 
@@ -1,10 +1,9 @@
-import copy
 import logging
 import uuid
 from collections import defaultdict
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
 
 from pydantic import BaseModel
 
@@ -28,6 +27,12 @@ class EventType(Enum):
     SCHEDULED_TRIGGER = 4
 
 
+class DelayedEnrichment(NamedTuple):
+    event: "ExecutionBaseEvent"
+    delay_sec: float
+    enricher: Callable[["ExecutionBaseEvent"], None]
+
+
 class ExecutionEventBaseParams(BaseModel):
     named_sinks: Optional[List[str]] = None
 
@@ -53,6 +58,9 @@ class ExecutionBaseEvent:
     #  Response returned to caller. For admission or manual triggers for example
     response: Dict[str, Any] = None  # type: ignore
     stop_processing: bool = False
+    # Enrichers to run after a delay. The findings are sent to the sinks once they finished.
+    # Shared between different playbooks that are triggered by the same event, like sink_findings
+    delayed_enrichments: List[DelayedEnrichment] = field(default_factory=list)
     _scheduler: Optional[PlaybooksScheduler] = None
     _context: Optional[ExecutionContext] = None
 
@@ -106,6 +114,14 @@ class ExecutionBaseEvent:
             self.sink_findings[sink][0].add_enrichment(enrichment_blocks, annotations, True,
                                                        enrichment_type=enrichment_type, title=title)
 
+    def add_delayed_enrichment(self, delay_sec: float, enricher: Callable[["ExecutionBaseEvent"], None]):
+        """
+        Run the enricher on this event after delay_sec, without holding the event worker thread.
+        The enricher adds its enrichments to the event, like an action. The findings are sent to the sinks when all
+        the delayed enrichers finished, or DELAYED_ENRICHMENT_TIMEOUT_SEC after the last one was due
+        """
+        self.delayed_enrichments.append(DelayedEnrichment(self, delay_sec, enricher))
+
     def add_finding(self, finding: Finding, suppress_warning: bool = False):
         finding.dirty = True  # Warn if new enrichments are added to this finding directly
         first = True  # no need to clone the finding on the first sink. Use the orig finding
@@ -113,7 +129,7 @@ class ExecutionBaseEvent:
             if (len(self.sink_findings[sink]) > 0) and not suppress_warning:
                 logging.warning(f"Overriding active finding for {sink}. new finding: {finding}")
             if not first:
-                finding = copy.deepcopy(finding)
+                finding = finding.copy_for_sink()
             self.sink_findings[sink].insert(0, finding)
             first = False
 
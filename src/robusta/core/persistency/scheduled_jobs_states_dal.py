@@ -1,66 +1,219 @@
 import json
 import logging
-from threading import Lock
-from typing import List, Optional
+import threading
+from typing import Dict, List, Optional, Set
 
-import kubernetes
-from hikaru.model.rel_1_26 import ObjectMeta
+from kubernetes import client
+from kubernetes.client import ApiException, V1ConfigMap, V1ObjectMeta
 
-from robusta.core.model.env_vars import INSTALLATION_NAMESPACE
+from robusta.core.model.env_vars import (
+    INSTALLATION_NAMESPACE,
+    SCHEDULER_STATE_FLUSH_SEC,
+    SCHEDULER_STATE_SHARD_MAX_BYTES,
+)
 from robusta.core.schedule.model import ScheduledJob
-from robusta.integrations.kubernetes.autogenerated.v1.models import ConfigMap
 
 JOBS_CONFIGMAP_NAME = "scheduled-jobs"
 CONFIGMAP_NAMESPACE = INSTALLATION_NAMESPACE
+# the additional configmaps, created when the first one is full, are found by this label
+JOBS_SHARD_LABEL = "robusta.dev/scheduled-jobs-shard"
+MERGE_PATCH_CONTENT_TYPE = "application/merge-patch+json"
 
 
-class SchedulerDal:
-    mutex = Lock()
+class _Shard:
+    """One jobs states configmap"""
 
-    def __init__(self):
-        self.__init_scheduler_dal()
+    def __init__(self, name: str, resource_version: Optional[str], data: Dict[str, str]):
+        self.name = name
+        self.resource_version = resource_version
+        self.sizes: Dict[str, int] = {job_id: len(job_id) + len(state) for job_id, state in data.items()}
 
-    def __load_config_map(self) -> ConfigMap:
-        return ConfigMap.readNamespacedConfigMap(JOBS_CONFIGMAP_NAME, CONFIGMAP_NAMESPACE).obj
+    def size(self) -> int:
+        return sum(self.sizes.values())
 
-    def __init_scheduler_dal(self):
-        try:
-            self.__load_config_map()
-        except kubernetes.client.exceptions.ApiException as e:
-            # we only want to catch exceptions because the config map doesn't exist
-            if e.reason != "Not Found":
-                raise
-            # job states configmap doesn't exists, create it
-            self.mutex.acquire()
-            try:
-                conf_map = ConfigMap(metadata=ObjectMeta(name=JOBS_CONFIGMAP_NAME, namespace=CONFIGMAP_NAMESPACE))
-                conf_map.createNamespacedConfigMap(conf_map.metadata.namespace)
-                logging.info(f"created jobs states configmap {JOBS_CONFIGMAP_NAME} {CONFIGMAP_NAMESPACE}")
-            finally:
-                self.mutex.release()
+
+class SchedulerDal:
+    """
+    Scheduled jobs states store.
+
+    The states are kept in memory, which is the authoritative copy, and are persisted to configmaps in the background.
+    Every SCHEDULER_STATE_FLUSH_SEC, the changed jobs are written in one merge patch per configmap. Each patch is
+    guarded by the configmap resourceVersion, and only sets the changed jobs, so concurrent writers don't override
+    each other. When a configmap is close to SCHEDULER_STATE_SHARD_MAX_BYTES, new jobs are stored in another one.
+    """
+
+    def __init__(
+        self,
+        api: Optional[client.CoreV1Api] = None,
+        flush_interval_sec: float = SCHEDULER_STATE_FLUSH_SEC,
+        shard_max_bytes: int = SCHEDULER_STATE_SHARD_MAX_BYTES,
+    ):
+        self.__api = api or client.CoreV1Api()
+        self.__shard_max_bytes = shard_max_bytes
+        self.__lock = threading.Lock()
+        self.__flush_lock = threading.Lock()
+        self.__jobs: Dict[str, str] = {}  # job id to the job json
+        self.__jobs_shards: Dict[str, str] = {}  # job id to the name of the configmap storing it
+        self.__shards: Dict[str, _Shard] = {}
+        self.__dirty: Set[str] = set()
+        self.__removals: Dict[str, Set[str]] = {}  # configmap name to the deleted or moved jobs to remove from it
+        self.__load()
+        self.__stopped = threading.Event()
+        if flush_interval_sec > 0:
+            threading.Thread(target=self.__flush_loop, args=(flush_interval_sec,), daemon=True).start()
 
     def save_scheduled_job(self, job: ScheduledJob):
-        self.mutex.acquire()
-        try:
-            confMap = self.__load_config_map()
-            confMap.data[job.job_id] = job.json()
-            confMap.replaceNamespacedConfigMap(confMap.metadata.name, confMap.metadata.namespace)
-        finally:
-            self.mutex.release()
+        with self.__lock:
+            self.__jobs[job.job_id] = job.json()
+            self.__dirty.add(job.job_id)
 
     def get_scheduled_job(self, job_id: str) -> Optional[ScheduledJob]:
-        state_data = self.__load_config_map().data.get(job_id)
+        state_data = self.__jobs.get(job_id)
         return ScheduledJob(**json.loads(state_data)) if state_data is not None else None
 
     def del_scheduled_job(self, job_id: str):
-        self.mutex.acquire()
-        try:
-            confMap = self.__load_config_map()
-            if confMap.data.get(job_id) is not None:
-                del confMap.data[job_id]
-                confMap.replaceNamespacedConfigMap(confMap.metadata.name, confMap.metadata.namespace)
-        finally:
-            self.mutex.release()
+        with self.__lock:
+            if self.__jobs.pop(job_id, None) is not None:
+                self.__dirty.add(job_id)
 
     def list_scheduled_jobs(self) -> List[ScheduledJob]:
-        return [self.get_scheduled_job(job_id) for job_id in self.__load_config_map().data.keys()]
+        with self.__lock:
+            states = list(self.__jobs.values())
+        return [ScheduledJob(**json.loads(state_data)) for state_data in states]
+
+    def stop(self):
+        """Stop the background flushes, and write the pending changes"""
+        self.__stopped.set()
+        self.flush()
+
+    def flush(self):
+        """Write the changed jobs states"""
+        with self.__flush_lock:
+            with self.__lock:
+                dirty = self.__dirty
+                self.__dirty = set()
+                patches = self.__build_patches(dirty)
+
+            for shard_name, patch in patches.items():
+                try:
+                    self.__patch_shard(shard_name, patch)
+                except Exception:
+                    logging.error(f"Failed to save scheduled jobs states to {shard_name}", exc_info=True)
+                    with self.__lock:
+                        # retried on the next flush. The removals are kept until written
+                        self.__dirty.update(job_id for job_id, state in patch.items() if state is not None)
+                    continue
+
+                with self.__lock:
+                    removed = {job_id for job_id, state in patch.items() if state is None}
+                    self.__removals.get(shard_name, set()).difference_update(removed)
+
+    def __flush_loop(self, flush_interval_sec: float):
+        while not self.__stopped.wait(flush_interval_sec):
+            self.flush()
+
+    def __load(self):
+        try:
+            base = self.__api.read_namespaced_config_map(JOBS_CONFIGMAP_NAME, CONFIGMAP_NAMESPACE)
+        except ApiException as e:
+            # we only want to catch exceptions because the config map doesn't exist
+            if e.status != 404:
+                raise
+            base = self.__create_config_map(JOBS_CONFIGMAP_NAME, labels=None)
+
+        config_maps = [base] + self.__api.list_namespaced_config_map(
+            CONFIGMAP_NAMESPACE, label_selector=JOBS_SHARD_LABEL
+        ).items
+        for config_map in config_maps:
+            data = config_map.data or {}
+            shard = _Shard(config_map.metadata.name, config_map.metadata.resource_version, data)
+            self.__shards[shard.name] = shard
+            for job_id, state in data.items():
+                self.__jobs[job_id] = state
+                self.__jobs_shards[job_id] = shard.name
+
+    def __create_config_map(self, name: str, labels: Optional[Dict[str, str]]) -> V1ConfigMap:
+        config_map = V1ConfigMap(metadata=V1ObjectMeta(name=name, namespace=CONFIGMAP_NAMESPACE, labels=labels))
+        config_map = self.__api.create_namespaced_config_map(CONFIGMAP_NAMESPACE, config_map)
+        logging.info(f"created jobs states configmap {name} {CONFIGMAP_NAMESPACE}")
+        return config_map
+
+    def __build_patches(self, dirty: Set[str]) -> Dict[str, Dict[str, Optional[str]]]:
+        """The data patch of each configmap. A None value deletes the job. Updates the shards sizes"""
+        patches: Dict[str, Dict[str, Optional[str]]] = {}
+        for job_id in sorted(dirty):
+            state = self.__jobs.get(job_id)
+            current_shard = self.__jobs_shards.get(job_id)
+            if state is None:
+                if current_shard:
+                    self.__remove_from_shard(job_id, current_shard)
+                    del self.__jobs_shards[job_id]
+                continue
+
+            shard = self.__shard_for(job_id, len(job_id) + len(state))
+            if current_shard and current_shard != shard.name:
+                # moved, since its configmap is full
+                self.__remove_from_shard(job_id, current_shard)
+            self.__removals.get(shard.name, set()).discard(job_id)
+            patches.setdefault(shard.name, {})[job_id] = state
+            shard.sizes[job_id] = len(job_id) + len(state)
+            self.__jobs_shards[job_id] = shard.name
+
+        for shard_name, removals in self.__removals.items():
+            for job_id in removals:
+                patches.setdefault(shard_name, {})[job_id] = None
+        return patches
+
+    def __remove_from_shard(self, job_id: str, shard_name: str):
+        self.__shards[shard_name].sizes.pop(job_id, None)
+        self.__removals.setdefault(shard_name, set()).add(job_id)
+
+    def __shard_for(self, job_id: str, size: int) -> _Shard:
+        current_shard = self.__shards.get(self.__jobs_shards.get(job_id))
+        if current_shard and current_shard.size() - current_shard.sizes.get(job_id, 0) + size <= self.__shard_max_bytes:
+            return current_shard
+
+        for shard in self.__shards.values():
+            if shard.size() + size <= self.__shard_max_bytes:
+                return shard
+
+        # created on the first write
+        name = f"{JOBS_CONFIGMAP_NAME}-{len(self.__shards)}"
+        while name in self.__shards:
+            name = f"{name}-0"
+        shard = _Shard(name, None, {})
+        self.__shards[name] = shard
+        return shard
+
+    def __patch_shard(self, shard_name: str, data: Dict[str, Optional[str]]):
+        shard = self.__shards[shard_name]
+        if shard.resource_version is None:
+            try:
+                config_map = self.__create_config_map(shard_name, labels={JOBS_SHARD_LABEL: "true"})
+            except ApiException as e:
+                if e.status != 409:
+                    raise
+                config_map = self.__api.read_namespaced_config_map(shard_name, CONFIGMAP_NAMESPACE)
+            shard.resource_version = config_map.metadata.resource_version
+
+        while True:
+            body = {"metadata": {"resourceVersion": shard.resource_version}, "data": data}
+            try:
+                patched = self.__api.api_client.call_api(
+                    "/api/v1/namespaces/{namespace}/configmaps/{name}",
+                    "PATCH",
+                    {"namespace": CONFIGMAP_NAMESPACE, "name": shard_name},
+                    header_params={"Content-Type": MERGE_PATCH_CONTENT_TYPE, "Accept": "application/json"},
+                    body=body,
+                    response_type="object",
+                    auth_settings=["BearerToken"],
+                    _return_http_data_only=True,
+                )
+                shard.resource_version = patched["metadata"]["resourceVersion"]
+                return
+            except ApiException as e:
+                if e.status != 409:
+                    raise
+                # changed by another writer. The patch has only our changes, so retry with the new version
+                current = self.__api.read_namespaced_config_map(shard_name, CONFIGMAP_NAMESPACE)
+                shard.resource_version = current.metadata.resource_version
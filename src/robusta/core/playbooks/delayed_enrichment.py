@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+import prometheus_client
+
+from robusta.core.model.env_vars import DELAYED_ENRICHMENT_TIMEOUT_SEC, DELAYED_ENRICHMENT_WORKERS
+from robusta.core.model.events import DelayedEnrichment, ExecutionBaseEvent
+from robusta.core.schedule.job_timer import JobTimer, TimerJob
+
+delayed_enrichments_pending = prometheus_client.Gauge(
+    "delayed_enrichments_pending", "Current number of delayed enrichments, that didn't run yet"
+)
+delayed_enrichment_findings_pending = prometheus_client.Gauge(
+    "delayed_enrichment_findings_pending", "Current number of events, with findings waiting for delayed enrichments"
+)
+delayed_enrichments = prometheus_client.Counter(
+    "delayed_enrichments", "Number of delayed enrichments, per status", labelnames=("status",)
+)
+delayed_enrichment_findings_wait = prometheus_client.Histogram(
+    "delayed_enrichment_findings_wait_seconds",
+    "Time from the event processing, until its findings were sent to the sinks with the delayed enrichments (seconds)",
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600),
+)
+
+
+class _PendingFindings:
+    """The findings of one event, waiting for its delayed enrichments"""
+
+    def __init__(self, execution_event: ExecutionBaseEvent, remaining: int):
+        self.execution_event = execution_event
+        self.remaining = remaining
+        self.created = time.monotonic()
+        self.delivered = False
+        self.timeout_job: Optional[TimerJob] = None
+        self.lock = threading.Lock()
+        # enrichers of the same findings run one at a time, since they change the same findings
+        self.run_lock = threading.Lock()
+
+
+class DelayedEnrichmentRunner:
+    """
+    Runs the delayed enrichments of events, and then sends their findings to the sinks.
+
+    The event worker thread only schedules the enrichments, and moves on. A timer runs each enrichment when it's due,
+    on a small pool of workers. The findings are delivered when the last enrichment finished, or timeout_sec after
+    the last one was due. Enrichments that didn't finish by then are dropped.
+    """
+
+    def __init__(
+        self,
+        deliver: Callable[[ExecutionBaseEvent], None],
+        workers: int = DELAYED_ENRICHMENT_WORKERS,
+        timeout_sec: float = DELAYED_ENRICHMENT_TIMEOUT_SEC,
+    ):
+        self.deliver = deliver
+        self.workers = workers
+        self.timeout_sec = timeout_sec
+        self.__timer: Optional[JobTimer] = None
+        self.__timer_lock = threading.Lock()
+
+    def run_later(self, execution_event: ExecutionBaseEvent, enrichments: List[DelayedEnrichment]):
+        pending = _PendingFindings(execution_event, len(enrichments))
+        delayed_enrichments_pending.inc(len(enrichments))
+        delayed_enrichment_findings_pending.inc()
+        timer = self.__get_timer()
+        max_delay = max(enrichment.delay_sec for enrichment in enrichments)
+        pending.timeout_job = timer.schedule(max_delay + self.timeout_sec, self.__timeout, {"pending": pending})
+        for enrichment in enrichments:
+            timer.schedule(enrichment.delay_sec, self.__run, {"pending": pending, "enrichment": enrichment})
+
+    @staticmethod
+    def run_now(enrichments: List[DelayedEnrichment]):
+        """Run the delayed enrichments on the calling thread, for findings that are returned synchronously"""
+        start_time = time.monotonic()
+        for enrichment in sorted(enrichments, key=lambda e: e.delay_sec):
+            time.sleep(max(0.0, start_time + enrichment.delay_sec - time.monotonic()))
+            DelayedEnrichmentRunner.__enrich(enrichment)
+
+    def __get_timer(self) -> JobTimer:
+        # created on first use, so runners without delayed enrichments don't start threads
+        with self.__timer_lock:
+            if self.__timer is None:
+                self.__timer = JobTimer(self.workers, name="delayed-enrichment", report_metrics=False)
+            return self.__timer
+
+    @staticmethod
+    def __enrich(enrichment: DelayedEnrichment) -> bool:
+        try:
+            enrichment.enricher(enrichment.event)
+            return True
+        except Exception:
+            logging.exception(f"Delayed enrichment {enrichment.enricher} failed")
+            return False
+
+    def __run(self, pending: _PendingFindings, enrichment: DelayedEnrichment):
+        if pending.delivered:
+            return  # timed out. Already counted as expired
+
+        with pending.run_lock:
+            success = self.__enrich(enrichment)
+
+        with pending.lock:
+            if pending.delivered:
+                logging.warning(f"Delayed enrichment {enrichment.enricher} finished after its findings were sent")
+                return
+            pending.remaining -= 1
+            done = pending.remaining == 0
+            if done:
+                pending.delivered = True
+        delayed_enrichments_pending.dec()
+        delayed_enrichments.labels("completed" if success else "failed").inc()
+        if done:
+            pending.timeout_job.cancel()
+            self.__deliver(pending)
+
+    def __timeout(self, pending: _PendingFindings):
+        with pending.lock:
+            if pending.delivered:
+                return
+            pending.delivered = True
+            expired = pending.remaining
+        logging.warning(f"{expired} delayed enrichments didn't finish in time. Sending the findings without them")
+        delayed_enrichments_pending.dec(expired)
+        delayed_enrichments.labels("expired").inc(expired)
+        self.__deliver(pending)
+
+    def __deliver(self, pending: _PendingFindings):
+        delayed_enrichment_findings_pending.dec()
+        delayed_enrichment_findings_wait.observe(time.monotonic() - pending.created)
+        self.deliver(pending.execution_event)
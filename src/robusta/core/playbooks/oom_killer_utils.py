@@ -1,5 +1,4 @@
 import logging
-import time
 
 from robusta.api import (
     ExecutionBaseEvent,
@@ -12,6 +11,8 @@ from robusta.api import (
 )
 from robusta.core.reporting.base import EnrichmentType
 
+LOGS_RETRY_BACKOFF_SEC = 2
+
 
 def start_log_enrichment(
     event: ExecutionBaseEvent,
@@ -34,8 +35,6 @@ def start_log_enrichment(
     else:
         container = ""
 
-    tries: int = 2
-    backoff_seconds: int = 2
     regex_replacement_style = (
         RegexReplacementStyle[params.regex_replacement_style] if params.regex_replacement_style else None
     )
@@ -45,7 +44,8 @@ def start_log_enrichment(
         #  container when a container inside a pod was oomkilled. I can imagine it could cause
         #  similar problems in other cases.
         container = pod.spec.containers[0].name
-    for _ in range(tries - 1):
+
+    def add_logs(logs_event: ExecutionBaseEvent) -> bool:
         log_data = pod.get_logs(
             container=container,
             regex_replacer_patterns=params.regex_replacer_patterns,
@@ -54,18 +54,19 @@ def start_log_enrichment(
             previous=params.previous,
         )
         if not log_data:
-            logging.info("log data is empty, retrying...")
-            time.sleep(backoff_seconds)
-            continue
+            return False
 
-        log_name = pod.metadata.name
-        log_name += f"/{container}"
-        event.add_enrichment(
+        logs_event.add_enrichment(
             [FileBlock(filename=f"{pod.metadata.name}.log", contents=log_data.encode())],
             enrichment_type=EnrichmentType.text_file,
             title="Pod Logs"
         )
-        break
+        return True
+
+    if not add_logs(event):
+        # retried after a backoff, without holding the event worker thread
+        logging.info("log data is empty, retrying...")
+        event.add_delayed_enrichment(LOGS_RETRY_BACKOFF_SEC, add_logs)
 
 
 def logs_enricher(event: PodEvent, params: LogEnricherParams):
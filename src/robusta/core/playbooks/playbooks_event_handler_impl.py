@@ -1,4 +1,3 @@
-import copy
 import logging
 import sys
 import time
@@ -9,8 +8,9 @@ from typing import Any, Dict, List, Optional
 import prometheus_client
 from prometrix import PrometheusNotFound
 
-from robusta.core.model.events import ExecutionBaseEvent, ExecutionContext
+from robusta.core.model.events import DelayedEnrichment, ExecutionBaseEvent, ExecutionContext
 from robusta.core.playbooks.base_trigger import BaseTrigger, TriggerEvent
+from robusta.core.playbooks.delayed_enrichment import DelayedEnrichmentRunner
 from robusta.core.playbooks.playbook_utils import merge_global_params, to_safe_str
 from robusta.core.playbooks.playbooks_event_handler import PlaybooksEventHandler
 from robusta.core.playbooks.trigger import Trigger
@@ -18,6 +18,7 @@ from robusta.core.reporting import MarkdownBlock
 from robusta.core.reporting.base import Finding
 from robusta.core.reporting.consts import SYNC_RESPONSE_SINK
 from robusta.core.sinks.robusta.dal.model_conversion import ModelConversion
+from robusta.integrations.kubernetes.custom_models import debugger_pod_pool
 from robusta.model.alert_relabel_config import AlertRelabel
 from robusta.model.config import Registry
 from robusta.model.playbook_action import PlaybookAction
@@ -36,6 +37,7 @@ playbooks_summary = prometheus_client.Summary(
 class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
     def __init__(self, registry: Registry):
         self.registry = registry
+        self.delayed_enrichment_runner = DelayedEnrichmentRunner(deliver=self.__handle_findings)
 
     def handle_trigger(self, trigger_event: TriggerEvent) -> Optional[Dict[str, Any]]:
         playbooks = self.registry.get_playbooks().get_playbooks(trigger_event)
@@ -45,6 +47,7 @@ class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
         execution_response = None
         execution_event: Optional[ExecutionBaseEvent] = None
         sink_findings: Dict[str, List[Finding]] = defaultdict(list)
+        delayed_enrichments: List[DelayedEnrichment] = []
         build_context: Dict[str, Any] = {}
         for playbook in playbooks:
             fired_trigger = self.__get_fired_trigger(trigger_event, playbook.triggers, playbook.get_id(), build_context)
@@ -55,6 +58,7 @@ class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
                     # sink_findings needs to be shared between playbooks.
                     # build_execution_event returns a different instance because it's running in a child process
                     execution_event.sink_findings = sink_findings
+                    execution_event.delayed_enrichments = delayed_enrichments
                 except Exception:
                     logging.error(
                         f"Failed to build execution event for {trigger_event.get_event_description()}, Event: {trigger_event}",
@@ -78,7 +82,10 @@ class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
                         break
 
         if execution_event:
-            self.__handle_findings(execution_event)
+            if delayed_enrichments:
+                self.delayed_enrichment_runner.run_later(execution_event, delayed_enrichments)
+            else:
+                self.__handle_findings(execution_event)
 
         return execution_response
 
@@ -102,7 +109,13 @@ class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
             execution_event,
             actions,
         )
-        self.__handle_findings(execution_event)
+        if not execution_event.delayed_enrichments:
+            self.__handle_findings(execution_event)
+        elif sync_response:  # the findings are returned with the response, so the enrichments can't be deferred
+            DelayedEnrichmentRunner.run_now(execution_event.delayed_enrichments)
+            self.__handle_findings(execution_event)
+        else:
+            self.delayed_enrichment_runner.run_later(execution_event, execution_event.delayed_enrichments)
 
         if sync_response:  # add the findings to the response
             execution_response["findings"] = [
@@ -306,10 +319,10 @@ class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
 
                     # only write the finding if is matching against the sink matchers
                     if sink.accepts(finding):
-                        # create deep copy, so that iterating on one sink enrichments won't affect the others
-                        # Each sink has a different findings, but enrichments are shared
-                        finding_copy = copy.deepcopy(finding)
-                        sink.write_finding(finding_copy, self.registry.get_sinks().platform_enabled)
+                        # copy the finding and its enrichments, so changes made by one sink won't affect the others
+                        # the enrichment blocks are shared by all the sinks, and are not copied
+                        finding_copy = finding.copy_for_sink()
+                        sink.deliver_finding(finding_copy, self.registry.get_sinks().platform_enabled)
 
                         sink_info = sinks_info[sink_name]
                         sink_info.type = sink.__class__.__name__
@@ -356,5 +369,12 @@ class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
         if receiver is not None:
             receiver.stop()
 
+        scheduler = self.registry.get_scheduler()
+        if scheduler is not None:
+            scheduler.stop()
+
+        # the pooled debugger pods are privileged, so they aren't left running
+        debugger_pod_pool.clear()
+
         self.set_cluster_active(False)
         sys.exit(0)
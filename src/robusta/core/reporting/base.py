@@ -1,3 +1,4 @@
+import copy
 import hashlib
 import logging
 import re
@@ -5,7 +6,7 @@ import urllib.parse
 import uuid
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 from urllib.parse import urlencode
 
 from pydantic.main import BaseModel
@@ -120,17 +121,30 @@ class Enrichment:
     def __str__(self):
         return f"annotations: {self.annotations} Enrichment: {self.blocks} "
 
+    def copy_for_sink(self) -> "Enrichment":
+        """A copy with its own blocks list and annotations. The blocks themselves are shared"""
+        enrichment = copy.copy(self)
+        enrichment.blocks = list(self.blocks)
+        enrichment.annotations = dict(self.annotations)
+        return enrichment
+
 
 class Filterable:
     @property
     def attribute_map(self) -> Dict[str, Union[str, Dict[str, str]]]:
         raise NotImplementedError
 
+    def attribute_names(self) -> Iterable[str]:
+        return self.attribute_map.keys()
+
+    def get_attribute(self, attribute: str) -> Union[str, Dict[str, str]]:
+        return self.attribute_map[attribute]
+
     def get_invalid_attributes(self, attributes: List[str]) -> List:
-        return list(set(attributes) - set(self.attribute_map))
+        return list(set(attributes) - set(self.attribute_names()))
 
     def attribute_matches(self, attribute: str, expression: Union[str, List[str], Dict, List[Dict]]) -> bool:
-        value: Union[str, Dict[str, str]] = self.attribute_map[attribute]
+        value: Union[str, Dict[str, str]] = self.get_attribute(attribute)
         if isinstance(expression, str) or isinstance(expression, Dict):
             return Filterable.__value_match(value, expression)
         else:  # expression is list of values
@@ -158,6 +172,88 @@ class Filterable:
         return True
 
 
+# re.match of an expression without these characters, is a prefix match
+REGEX_SPECIAL_CHARS = set(".^$*+?{}[]\\|()")
+
+
+class _AttributeMatcher:
+    """
+    Matches an attribute value against any of the attribute expressions, like Filterable.attribute_matches.
+    Literal expressions are matched with string comparisons. Other expressions are compiled regexes.
+    """
+
+    __slots__ = ("prefixes", "exact", "regexes", "dicts", "has_strings")
+
+    def __init__(self, expressions: List[Union[str, Dict]]):
+        prefixes: List[str] = []
+        self.exact: Set[str] = set()
+        self.regexes: List[re.Pattern] = []
+        self.dicts: List[Dict] = [expression for expression in expressions if isinstance(expression, dict)]
+        string_expressions = [expression for expression in expressions if isinstance(expression, str)]
+        self.has_strings = bool(string_expressions)
+        for expression in string_expressions:
+            literal = expression[1:] if expression.startswith("^") else expression
+            is_exact = literal.endswith("$")
+            if is_exact:
+                literal = literal[:-1]
+            if REGEX_SPECIAL_CHARS.intersection(literal):
+                try:
+                    self.regexes.append(re.compile(expression))
+                except re.error:
+                    logging.error(f"Illegal matcher regex {expression}. Matcher is ignored")
+            elif is_exact:
+                # like re.match, $ also matches before a trailing newline
+                self.exact.update((literal, literal + "\n"))
+            else:
+                prefixes.append(literal)
+        self.prefixes = tuple(prefixes)
+
+    def matches(self, value: Union[str, Dict[str, str]]) -> bool:
+        if isinstance(value, str) and self.has_strings:
+            return (
+                value in self.exact
+                or (self.prefixes and value.startswith(self.prefixes))
+                or any(regex.match(value) for regex in self.regexes)
+            )
+        elif isinstance(value, dict) and self.dicts:
+            items = value.items()
+            return any(expression.items() <= items for expression in self.dicts)
+        else:
+            logging.error(f"Failed to evaluate matcher. Finding value: {value} matcher: {self}")
+            return False
+
+    def __str__(self):
+        return f"prefixes: {self.prefixes} exact: {self.exact} regexes: {self.regexes} dicts: {self.dicts}"
+
+
+class FilterableMatcher:
+    """
+    Filterable.matches requirements, compiled once.
+    Matching doesn't build the filterable attribute map, and doesn't parse the expressions again.
+    """
+
+    def __init__(self, requirements: Dict[str, Union[str, List[str], Dict, List[Dict]]]):
+        self.__attributes = set(requirements.keys())
+        self.__matchers: List[Tuple[str, _AttributeMatcher]] = [
+            (attribute, _AttributeMatcher([expression] if isinstance(expression, (str, dict)) else expression))
+            for attribute, expression in requirements.items()
+        ]
+
+    def matches(self, filterable: Filterable) -> bool:
+        if not self.__matchers:
+            return True
+
+        invalid_attributes = self.__attributes.difference(filterable.attribute_names())
+        if invalid_attributes:
+            logging.warning(f"Invalid match attributes: {list(invalid_attributes)}")
+            return False
+
+        for attribute, matcher in self.__matchers:
+            if not matcher.matches(filterable.get_attribute(attribute)):
+                return False
+        return True
+
+
 class FindingSubject:
     def __init__(
         self,
@@ -232,21 +328,29 @@ class Finding(Filterable):
         self.ends_at = ends_at
         self.dirty = False
 
+    ATTRIBUTES: Dict[str, Callable[["Finding"], Union[str, Dict[str, str]]]] = {
+        "title": lambda finding: str(finding.title),
+        "identifier": lambda finding: str(finding.aggregation_key),
+        "severity": lambda finding: str(finding.severity.name),
+        "source": lambda finding: str(finding.source.name),
+        "type": lambda finding: str(finding.finding_type.name),
+        "kind": lambda finding: str(finding.subject.subject_type.value),
+        "namespace": lambda finding: str(finding.subject.namespace),
+        "node": lambda finding: str(finding.subject.node),
+        "name": lambda finding: str(finding.subject.name),
+        "labels": lambda finding: finding.subject.labels,
+        "annotations": lambda finding: finding.subject.annotations,
+    }
+
     @property
     def attribute_map(self) -> Dict[str, Union[str, Dict[str, str]]]:
-        return {
-            "title": str(self.title),
-            "identifier": str(self.aggregation_key),
-            "severity": str(self.severity.name),
-            "source": str(self.source.name),
-            "type": str(self.finding_type.name),
-            "kind": str(self.subject.subject_type.value),
-            "namespace": str(self.subject.namespace),
-            "node": str(self.subject.node),
-            "name": str(self.subject.name),
-            "labels": self.subject.labels,
-            "annotations": self.subject.annotations,
-        }
+        return {attribute: get_value(self) for attribute, get_value in self.ATTRIBUTES.items()}
+
+    def attribute_names(self) -> Iterable[str]:
+        return self.ATTRIBUTES.keys()
+
+    def get_attribute(self, attribute: str) -> Union[str, Dict[str, str]]:
+        return self.ATTRIBUTES[attribute](self)
 
     def _map_service_to_uri(self):
         if not self.service:
@@ -297,6 +401,17 @@ class Finding(Filterable):
         self.enrichments.append(Enrichment(blocks=enrichment_blocks, annotations=annotations,
                                            enrichment_type=enrichment_type, title=title))
 
+    def copy_for_sink(self) -> "Finding":
+        """
+        A copy of the finding, for one sink.
+        Sinks can replace the copy attributes, enrichments and enrichment blocks, without affecting the other sinks.
+        The blocks are shared by all the copies, so they must not be changed in place.
+        """
+        finding = copy.copy(self)
+        finding.enrichments = [enrichment.copy_for_sink() for enrichment in self.enrichments]
+        finding.video_links = list(self.video_links)
+        return finding
+
     def add_video_link(self, video_link: VideoLink, suppress_warning: bool = False):
         if self.dirty and not suppress_warning:
             logging.warning("Updating a finding after it was added to the event is not allowed!")
@@ -101,6 +101,12 @@ class FileBlock(BaseBlock):
             logging.error(f"Unexpected error occurred while zipping file {self.filename}")
             logging.exception(exc)
 
+    def zipped(self) -> "FileBlock":
+        """A zipped copy of this block. Blocks can be shared between sinks, so this block isn't changed"""
+        zipped_block = self.copy()
+        zipped_block.zip()
+        return zipped_block
+
     def truncate_content(self, max_file_size_bytes: int) -> bytes:
         """
         Truncates the log file by removing lines from the beginning until its size is within the given limit.
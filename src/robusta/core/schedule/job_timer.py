@@ -0,0 +1,102 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+import prometheus_client
+
+from robusta.core.model.env_vars import SCHEDULER_WORKERS
+
+scheduler_jobs_due = prometheus_client.Counter("scheduler_jobs_due", "Number of scheduled job runs that were due")
+scheduler_pending_jobs = prometheus_client.Gauge("scheduler_pending_jobs", "Current number of scheduled job runs")
+scheduler_dispatch_lag = prometheus_client.Histogram(
+    "scheduler_dispatch_lag_seconds",
+    "Time from the scheduled run time of a job, until it started running (seconds)",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60),
+)
+scheduler_job_run_time = prometheus_client.Summary("scheduler_job_run_seconds", "Scheduled jobs run time (seconds)")
+
+
+class TimerJob:
+    """A scheduled run of a function. Can be cancelled before it runs"""
+
+    __slots__ = ("func", "kwargs", "due_time", "cancelled")
+
+    def __init__(self, func: Callable, kwargs: Dict, due_time: float):
+        self.func = func
+        self.kwargs = kwargs
+        self.due_time = due_time
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class JobTimer:
+    """
+    Runs functions after a delay.
+
+    One thread keeps the scheduled runs in a heap, by run time, and hands the due runs to a bounded pool of workers.
+    Replaces a threading.Timer, and its thread, per scheduled run.
+    The scheduler_* metrics are reported only by timers with report_metrics, so other timers don't override them.
+    """
+
+    def __init__(self, workers: int = SCHEDULER_WORKERS, name: str = "scheduler", report_metrics: bool = True):
+        self.report_metrics = report_metrics
+        self.__lock = threading.Lock()
+        self.__changed = threading.Condition(self.__lock)
+        self.__heap: List[Tuple[float, int, TimerJob]] = []
+        self.__ids = itertools.count()
+        self.__executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        if report_metrics:
+            scheduler_pending_jobs.set_function(self.pending_count)
+        threading.Thread(target=self.__run, name=f"{name}-timer", daemon=True).start()
+
+    def pending_count(self) -> int:
+        return len(self.__heap)
+
+    def schedule(self, delay: float, func: Callable, kwargs: Dict) -> TimerJob:
+        job = TimerJob(func, kwargs, time.monotonic() + delay)
+        with self.__lock:
+            heapq.heappush(self.__heap, (job.due_time, next(self.__ids), job))
+            # wake up the timer thread, if this job is due before the one it waits for
+            if self.__heap[0][2] is job:
+                self.__changed.notify()
+        return job
+
+    def __next_due(self) -> TimerJob:
+        with self.__changed:
+            while True:
+                while self.__heap and self.__heap[0][2].cancelled:
+                    heapq.heappop(self.__heap)
+                if not self.__heap:
+                    self.__changed.wait()
+                    continue
+
+                wait_time = self.__heap[0][0] - time.monotonic()
+                if wait_time <= 0:
+                    return heapq.heappop(self.__heap)[2]
+                self.__changed.wait(wait_time)
+
+    def __run(self):
+        while True:
+            job = self.__next_due()
+            if self.report_metrics:
+                scheduler_jobs_due.inc()
+            self.__executor.submit(self.__run_job, job)
+
+    def __run_job(self, job: TimerJob):
+        if job.cancelled:
+            return
+        start_time = time.monotonic()
+        if self.report_metrics:
+            scheduler_dispatch_lag.observe(start_time - job.due_time)
+        try:
+            job.func(**job.kwargs)
+        except Exception:
+            logging.exception("Scheduled job failed")
+        if self.report_metrics:
+            scheduler_job_run_time.observe(time.monotonic() - start_time)
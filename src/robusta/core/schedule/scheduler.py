@@ -1,12 +1,12 @@
 import logging
 import os
-import threading
 import time
 from collections import defaultdict
 from typing import List
 from croniter import croniter
 
 from robusta.core.persistency.scheduled_jobs_states_dal import SchedulerDal
+from robusta.core.schedule.job_timer import JobTimer
 from robusta.core.schedule.model import DynamicDelayRepeat, JobStatus, ScheduledJob, SchedulingInfo, CronScheduleRepeat
 
 # this initial delay is important for when the robusta-runner version is updated
@@ -21,12 +21,14 @@ class Scheduler:
     scheduled_jobs = defaultdict(None)
     registered_runnables = {}
     dal = None
+    timer = None
 
     def register_task(self, runnable_name: str, func):
         self.registered_runnables[runnable_name] = func
 
     def init_scheduler(self):
         self.dal = SchedulerDal()
+        self.timer = JobTimer()
         # schedule standalone tasks
         for job in self.__get_standalone_jobs():
             logging.info(f"Scheduling standalone task {job.job_id}")
@@ -56,6 +58,11 @@ class Scheduler:
     def list_scheduled_jobs(self) -> List[ScheduledJob]:
         return self.dal.list_scheduled_jobs()
 
+    def stop(self):
+        """Write the jobs states changed since the last background flush. Called on shutdown"""
+        if self.dal is not None:
+            self.dal.stop()
+
     def unschedule_job(self, job_id):
         self.__remove_scheduler_job(job_id)
         self.dal.del_scheduled_job(job_id)
@@ -113,9 +120,7 @@ class Scheduler:
         logging.info(f"Scheduled job done. job_id {job.job_id} executions {job.state.exec_count}")
 
     def __schedule_job_internal(self, delay, job_id, func, kwargs):
-        job = threading.Timer(delay, func, kwargs=kwargs)
-        self.scheduled_jobs[job_id] = job
-        job.start()
+        self.scheduled_jobs[job_id] = self.timer.schedule(delay, func, kwargs)
 
     def __remove_scheduler_job(self, job_id):
         job = self.scheduled_jobs.get(job_id)
@@ -3,6 +3,7 @@ import sys
 from robusta.core.reporting.base import Finding
 from robusta.core.reporting.blocks import FileBlock
 from robusta.core.sinks.file.file_sink_params import FileSinkConfigWrapper
+from robusta.core.sinks.file.jsonl_writer import JsonlWriter
 from robusta.core.sinks.file.object_traverser import ObjectTraverser
 from robusta.core.sinks.sink_base import SinkBase
 
@@ -15,14 +16,32 @@ class FileSink(SinkBase):
                                                exclude_empty_parent=False,
                                                exclude_patterns=["^\.add_silence_url$", "^\.dirty$"],
                                                ).to_dictionary
-        # TODO: check fromat parameter to support other serialization formats
-        self.__serialize = lambda data: json.dumps(data, indent=2)
+        self.__jsonl_writer = None
+        if sink_config.file_sink.format == "jsonl":
+            self.__jsonl_writer = JsonlWriter(
+                sink_config.file_sink.file_name,
+                buffer_size=sink_config.file_sink.buffer_size,
+                flush_interval_sec=sink_config.file_sink.flush_interval_sec,
+                rotation=sink_config.file_sink.rotation,
+            )
+            self.__serialize = lambda data: json.dumps(data, separators=(",", ":"))
+        else:
+            self.__serialize = lambda data: json.dumps(data, indent=2)
+
+    def stop(self):
+        super().stop()
+        if self.__jsonl_writer:
+            self.__jsonl_writer.close()
 
     def write_finding(self, finding: Finding, platform_enabled: bool):
 
         dict_data = self.__to_dictionary(finding)
         data = self.__serialize(dict_data)
 
+        if self.__jsonl_writer:
+            self.__jsonl_writer.write(data)
+            return
+
         # write to console if file_name not provided
         fout = sys.stdout if self.params.file_name is None else open(self.params.file_name, "a")
         try:
@@ -1,15 +1,40 @@
+from typing import Optional
 
+from pydantic import BaseModel, validator
 
 from robusta.core.sinks.sink_base_params import SinkBaseParams
 from robusta.core.sinks.sink_config import SinkConfigBase
 
 
+class FileRotationParams(BaseModel):
+    max_bytes: int = 100 * 1024 * 1024  # rotate the file when it reaches this size
+    backup_count: int = 5  # number of rotated files to keep
+    compress: bool = False  # gzip the rotated files
+
+    @validator("max_bytes", "backup_count")
+    def check_positive(cls, value: int):
+        if value < 1:
+            raise ValueError("must be at least 1")
+        return value
+
+
 class FileSinkParms(SinkBaseParams):
     file_name: str = None
+    format: str = "json"  # json - indented json per finding. jsonl - buffered, compact json lines
+    # jsonl format only
+    buffer_size: int = 64 * 1024  # flush when the buffered lines reach this size
+    flush_interval_sec: float = 1
+    rotation: Optional[FileRotationParams]
+
+    @validator("format")
+    def check_format(cls, format: str):
+        if format not in ["json", "jsonl"]:
+            raise ValueError(f"unsupported file sink format {format}")
+        return format
 
 
 class FileSinkConfigWrapper(SinkConfigBase):
     file_sink: FileSinkParms
 
     def get_params(self) -> SinkBaseParams:
-        return self.file_sink
\ No newline at end of file
+        return self.file_sink
@@ -0,0 +1,124 @@
+import gzip
+import logging
+import os
+import shutil
+import sys
+import threading
+from typing import BinaryIO, List, Optional
+
+from robusta.core.sinks.file.file_sink_params import FileRotationParams
+
+
+class JsonlWriter:
+    """
+    Buffered json lines writer.
+
+    The file is kept open, and the lines are written when the buffer reaches buffer_size, or every
+    flush_interval_sec. With rotation, when the file reaches max_bytes it's renamed to <file>.1, the older files
+    are shifted, and only backup_count rotated files are kept. Rotated files are optionally compressed in the
+    background, to <file>.<n>.gz
+    """
+
+    def __init__(
+        self,
+        file_name: Optional[str],
+        buffer_size: int,
+        flush_interval_sec: float,
+        rotation: Optional[FileRotationParams] = None,
+    ):
+        self.file_name = file_name
+        self.buffer_size = buffer_size
+        self.rotation = rotation if file_name else None
+        self.__buffer: List[bytes] = []
+        self.__buffered_bytes = 0
+        self.__lock = threading.Lock()
+        self.__file: Optional[BinaryIO] = None
+        self.__compress_thread: Optional[threading.Thread] = None
+        self.__stopped = threading.Event()
+        self.__flush_thread = threading.Thread(
+            target=self.__flush_loop, args=(flush_interval_sec,), name="jsonl-writer-flush", daemon=True
+        )
+        self.__flush_thread.start()
+
+    def write(self, line: str):
+        data = (line + "\n").encode("utf-8")
+        with self.__lock:
+            self.__buffer.append(data)
+            self.__buffered_bytes += len(data)
+            if self.__buffered_bytes >= self.buffer_size:
+                self.__flush()
+
+    def flush(self):
+        with self.__lock:
+            self.__flush()
+
+    def close(self):
+        """Stop the periodic flushes, write the buffered lines and close the file"""
+        self.__stopped.set()
+        self.__flush_thread.join()
+        with self.__lock:
+            self.__flush()
+            if self.__file:
+                self.__file.close()
+                self.__file = None
+        if self.__compress_thread:
+            self.__compress_thread.join()
+
+    def __flush_loop(self, flush_interval_sec: float):
+        while not self.__stopped.wait(flush_interval_sec):
+            try:
+                self.flush()
+            except Exception:
+                logging.exception(f"Failed to write findings to {self.file_name}")
+
+    def __flush(self):
+        if not self.__buffer:
+            return
+        data = b"".join(self.__buffer)
+        self.__buffer = []
+        self.__buffered_bytes = 0
+
+        if self.file_name is None:
+            sys.stdout.write(data.decode("utf-8"))
+            sys.stdout.flush()
+            return
+
+        if self.__file is None:
+            self.__file = open(self.file_name, "ab")
+        self.__file.write(data)
+        self.__file.flush()
+        if self.rotation and self.__file.tell() >= self.rotation.max_bytes:
+            self.__rotate()
+
+    def __rotate(self):
+        self.__file.close()
+        self.__file = None
+        if self.__compress_thread:
+            # the previous rotated file is renamed below, so its compression has to finish first
+            self.__compress_thread.join()
+            self.__compress_thread = None
+
+        for suffix in ["", ".gz"]:
+            oldest = f"{self.file_name}.{self.rotation.backup_count}{suffix}"
+            if os.path.exists(oldest):
+                os.remove(oldest)
+        for index in range(self.rotation.backup_count - 1, 0, -1):
+            for suffix in ["", ".gz"]:
+                source = f"{self.file_name}.{index}{suffix}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.file_name}.{index + 1}{suffix}")
+
+        rotated = f"{self.file_name}.1"
+        os.replace(self.file_name, rotated)
+        if self.rotation.compress:
+            self.__compress_thread = threading.Thread(target=self.__compress, args=(rotated,), daemon=True)
+            self.__compress_thread.start()
+
+    @staticmethod
+    def __compress(file_name: str):
+        try:
+            with open(file_name, "rb") as source, gzip.open(f"{file_name}.gz", "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.remove(file_name)
+        except Exception:
+            logging.exception(f"Failed to compress {file_name}")
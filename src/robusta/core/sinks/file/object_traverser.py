@@ -4,6 +4,11 @@ from enum import Enum
 import re
 from typing import Any, Dict, Iterable, List, Sequence, Set
 
+# paths exclusion decisions cache size. Path shapes include dict keys such as labels, so the cache is bounded
+MAX_CACHED_PATHS = 10000
+# the path of every item of a sequence. Items of a sequence have the same path shape
+SEQUENCE_ITEM_PATH = "*"
+
 
 class ObjectTraverser:
     """
@@ -21,13 +26,15 @@ class ObjectTraverser:
                  exclude_empty_parent=True):
         """
         exclude_types - list of types to exclude 
-        exclude_patterns - list of regex paterns to exclude
+        exclude_patterns - list of regex paterns to exclude. Sequence items paths are `*`, e.g. `.enrichments.*.blocks`
         exclude_empty_parent - drop whole parent object if all its childrens where excluded
         """
         self.exclude_types = tuple(exclude_types)
         self.exclude_empty_parent = exclude_empty_parent,
         # TODO: using jsonpath may simplify the way it works
         self.exclude_regxs = [re.compile(pattern) for pattern in exclude_patterns]
+        # objects of the same type have the same path shapes, so each shape is matched against the patterns once
+        self.__excluded_paths: Dict[str, bool] = {}
 
     def to_dictionary(self, obj: Any) -> Dict[str, Any]:
         """Traverses object and creates dictionary"""
@@ -52,9 +59,9 @@ class ObjectTraverser:
         res = []
         skipped = False
         # run over sequence and try to map each value through _map_value
-        for index, value in enumerate(seq):
+        for value in seq:
             try:
-                res.append(self.__map_value(value, path=path + "." + str(index)))
+                res.append(self.__map_value(value, path=path + "." + SEQUENCE_ITEM_PATH))
             except self.__SkipException:
                 # this value has to be skipped, dont add it to result
                 skipped = True
@@ -68,7 +75,7 @@ class ObjectTraverser:
         # handle types in the skip list
         if isinstance(obj, self.exclude_types):
             raise self.__SkipException
-        if any(regx.match(path) for regx in self.exclude_regxs):
+        if self.exclude_regxs and self.__is_excluded_path(path):
             raise self.__SkipException
 
         # different cases of object mapping
@@ -80,11 +87,20 @@ class ObjectTraverser:
             return obj
         if isinstance(obj, Enum):
             return obj.value
-        elif isinstance(obj, Dict):  # it is dictionary already
+        elif isinstance(obj, dict):  # it is dictionary already
             return self.__map_dict(obj, path)
-        elif isinstance(obj, (Sequence, Set)):  # list, tuple, (but not bytes and str) etc
+        elif isinstance(obj, (list, tuple, Sequence, Set)):  # list, tuple, (but not bytes and str) etc
             return self.__map_sequence(obj, path)
         elif hasattr(obj, "__dict__"):  # any class convertable to dict
             return self.__map_dict(vars(obj), path)
         else:
             return str(obj)
+
+    def __is_excluded_path(self, path: str) -> bool:
+        excluded = self.__excluded_paths.get(path)
+        if excluded is None:
+            excluded = any(regx.match(path) for regx in self.exclude_regxs)
+            # when full, the cached shapes are kept, and new shapes are matched every time
+            if len(self.__excluded_paths) < MAX_CACHED_PATHS:
+                self.__excluded_paths[path] = excluded
+        return excluded
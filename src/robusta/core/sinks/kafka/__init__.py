@@ -1,2 +1,2 @@
 from robusta.core.sinks.kafka.kafka_sink import KafkaSink
-from robusta.core.sinks.kafka.kafka_sink_params import KafkaSinkConfigWrapper, KafkaSinkParams
+from robusta.core.sinks.kafka.kafka_sink_params import KafkaExportMode, KafkaSinkConfigWrapper, KafkaSinkParams
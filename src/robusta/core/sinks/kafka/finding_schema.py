@@ -0,0 +1,119 @@
+import base64
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from robusta.core.reporting import (
+    BaseBlock,
+    FileBlock,
+    Finding,
+    HeaderBlock,
+    JsonBlock,
+    KubernetesDiffBlock,
+    ListBlock,
+    MarkdownBlock,
+    PrometheusBlock,
+    TableBlock,
+)
+from robusta.utils.parsing import datetime_to_db_str
+
+# compact representation of each exported block type. Other block types are not exported
+BLOCK_CONVERTERS: Dict[type, Callable[[Any], Dict[str, Any]]] = {
+    MarkdownBlock: lambda block: {"type": "markdown", "text": block.text},
+    HeaderBlock: lambda block: {"type": "header", "text": block.text},
+    ListBlock: lambda block: {"type": "list", "items": block.items},
+    TableBlock: lambda block: {
+        "type": "table",
+        "name": block.table_name,
+        "headers": block.headers,
+        "rows": block.rows,
+    },
+    JsonBlock: lambda block: {"type": "json", "data": block.json_str},
+    KubernetesDiffBlock: lambda block: {
+        "type": "diff",
+        "resource_name": block.resource_name,
+        "changed_properties": [
+            {"property": ".".join(diff.path), "old": diff.other_value, "new": diff.value} for diff in block.diffs
+        ],
+    },
+    PrometheusBlock: lambda block: {"type": "prometheus", "data": block.data.dict(), "metadata": block.metadata},
+    FileBlock: lambda block: {"type": "file", "filename": block.filename, "contents": block.contents},
+}
+
+
+def block_record(block: BaseBlock) -> Optional[Dict[str, Any]]:
+    # exact type lookup first, and a subclass lookup for derived blocks (e.g. GraphBlock is a FileBlock)
+    converter = BLOCK_CONVERTERS.get(type(block))
+    if converter is None:
+        converter = next((conv for block_type, conv in BLOCK_CONVERTERS.items() if isinstance(block, block_type)), None)
+    if converter is None:
+        logging.debug(f"Kafka sink does not export blocks of type {type(block)}")
+        return None
+    return converter(block)
+
+
+def finding_record(finding: Finding, cluster_name: str) -> Dict[str, Any]:
+    """The whole finding, in the kafka sink export schema"""
+    enrichments: List[Dict[str, Any]] = []
+    for enrichment in finding.enrichments:
+        blocks = [record for record in (block_record(block) for block in enrichment.blocks) if record]
+        if blocks:
+            enrichments.append(
+                {
+                    "type": enrichment.enrichment_type.name if enrichment.enrichment_type else None,
+                    "title": enrichment.title,
+                    "blocks": blocks,
+                }
+            )
+
+    subject = finding.subject
+    return {
+        "id": str(finding.id),
+        "fingerprint": finding.fingerprint,
+        "cluster_name": cluster_name,
+        "title": finding.title,
+        "description": finding.description,
+        "aggregation_key": finding.aggregation_key,
+        "source": finding.source.value,
+        "finding_type": finding.finding_type.value,
+        "severity": finding.severity.name,
+        "failure": finding.failure,
+        "starts_at": datetime_to_db_str(finding.starts_at),
+        "ends_at": datetime_to_db_str(finding.ends_at) if finding.ends_at else None,
+        "subject": {
+            "name": subject.name,
+            "namespace": subject.namespace,
+            "kind": subject.subject_type.value,
+            "node": subject.node,
+            "labels": subject.labels,
+            "annotations": subject.annotations,
+        },
+        "enrichments": enrichments,
+    }
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, bytes):
+        return base64.b64encode(obj).decode("ascii")
+    return str(obj)
+
+
+def to_json(record: Dict[str, Any]) -> bytes:
+    """Compact json. Binary file contents are base64 encoded"""
+    return json.dumps(record, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def to_msgpack(record: Dict[str, Any]) -> bytes:
+    """msgpack. Binary file contents are kept as binary"""
+    return msgpack.packb(record, default=str)
+
+
+SERIALIZERS: Dict[str, Callable[[Dict[str, Any]], bytes]] = {
+    "json": to_json,
+    "msgpack": to_msgpack,
+}
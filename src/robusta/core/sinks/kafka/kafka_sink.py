@@ -1,5 +1,8 @@
 import json
 import logging
+from typing import Optional
+
+import prometheus_client
 
 try:
     from kafka import KafkaProducer
@@ -11,21 +14,50 @@ except ImportError:
 
 from robusta.core.reporting.base import Enrichment, Finding
 from robusta.core.reporting.blocks import JsonBlock, KubernetesDiffBlock
-from robusta.core.sinks.kafka.kafka_sink_params import KafkaSinkConfigWrapper
+from robusta.core.sinks.kafka import finding_schema
+from robusta.core.sinks.kafka.kafka_sink_params import KafkaExportMode, KafkaSinkConfigWrapper
 from robusta.core.sinks.sink_base import SinkBase
 
+kafka_sink_messages = prometheus_client.Counter(
+    "kafka_sink_messages", "Number of kafka sink messages, per sink and delivery status", labelnames=("sink", "status")
+)
+
 
 class KafkaSink(SinkBase):
     def __init__(self, sink_config: KafkaSinkConfigWrapper, registry):
         super().__init__(sink_config.kafka_sink, registry)
 
+        params = sink_config.kafka_sink
+        if params.export == KafkaExportMode.Findings and params.serializer == "msgpack" and not finding_schema.msgpack:
+            raise ImportError("msgpack is not installed")
+
         self.producer = KafkaProducer(
-            bootstrap_servers=sink_config.kafka_sink.kafka_url,
-            **sink_config.kafka_sink.auth,
+            bootstrap_servers=params.kafka_url,
+            linger_ms=params.linger_ms,
+            batch_size=params.batch_size,
+            compression_type=params.compression_type,
+            **params.auth,
         )
-        self.topic = sink_config.kafka_sink.topic
+        self.topic = params.topic
+        self.export = params.export
+        self.serialize = finding_schema.SERIALIZERS[params.serializer]
+        self.flush_timeout_sec = params.flush_timeout_sec
+
+    def stop(self):
+        super().stop()
+        try:
+            self.producer.flush(timeout=self.flush_timeout_sec)
+            self.producer.close(timeout=self.flush_timeout_sec)
+        except Exception:
+            logging.exception(f"Failed to flush kafka sink {self.sink_name} messages")
 
     def write_finding(self, finding: Finding, platform_enabled: bool):
+        if self.export == KafkaExportMode.Findings:
+            # keyed by fingerprint, so all the updates of the same finding go to the same partition, in order
+            record = finding_schema.finding_record(finding, self.cluster_name)
+            self.__send(self.serialize(record), key=finding.fingerprint)
+            return
+
         for enrichment in finding.enrichments:
             self.send_enrichment(
                 enrichment,
@@ -77,4 +109,21 @@ class KafkaSink(SinkBase):
                 json_obj["cluster_name"] = self.cluster_name
                 message_payload = json.dumps(json_obj).encode("utf-8")
 
-            self.producer.send(self.topic, value=message_payload)
+            self.__send(message_payload)
+
+    def __send(self, value: bytes, key: Optional[str] = None):
+        """Send a message asynchronously. The delivery status is reported by the producer callbacks"""
+        try:
+            future = self.producer.send(self.topic, value=value, key=key.encode("utf-8") if key else None)
+        except Exception:
+            logging.exception(f"Failed to send message to kafka topic {self.topic}")
+            kafka_sink_messages.labels(self.sink_name, "failed").inc()
+            return
+        future.add_callback(self.__on_delivered).add_errback(self.__on_failed)
+
+    def __on_delivered(self, record_metadata):
+        kafka_sink_messages.labels(self.sink_name, "delivered").inc()
+
+    def __on_failed(self, exception: Exception):
+        logging.error(f"Failed to deliver message to kafka topic {self.topic}: {exception}")
+        kafka_sink_messages.labels(self.sink_name, "failed").inc()
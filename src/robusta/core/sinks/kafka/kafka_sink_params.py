@@ -1,11 +1,34 @@
+from enum import Enum
+from typing import Optional
+
+from pydantic import validator
+
 from robusta.core.sinks.sink_base_params import SinkBaseParams
 from robusta.core.sinks.sink_config import SinkConfigBase
 
 
+class KafkaExportMode(str, Enum):
+    Blocks = "blocks"  # a message per diff or json block
+    Findings = "findings"  # a message per finding, with the whole finding
+
+
 class KafkaSinkParams(SinkBaseParams):
     kafka_url: str
     topic: str
     auth: dict = {}
+    export: KafkaExportMode = KafkaExportMode.Blocks
+    serializer: str = "json"  # findings export only. json or msgpack
+    # producer batching settings
+    linger_ms: int = 50
+    batch_size: int = 64 * 1024
+    compression_type: Optional[str] = "gzip"  # gzip, snappy, lz4, zstd or None. All but gzip require extra packages
+    flush_timeout_sec: float = 10  # waiting for the pending messages when the sink is stopped
+
+    @validator("serializer")
+    def check_serializer(cls, serializer: str):
+        if serializer not in ["json", "msgpack"]:
+            raise ValueError(f"unsupported kafka serializer {serializer}")
+        return serializer
 
 
 class KafkaSinkConfigWrapper(SinkConfigBase):
@@ -0,0 +1,121 @@
+import base64
+import json
+import zlib
+from typing import Any, Dict, Iterator, List
+
+from robusta.core.model.env_vars import (
+    EVIDENCE_CHUNK_BYTES,
+    EVIDENCE_COMPRESS_MIN_BYTES,
+    EVIDENCE_ENCODING,
+)
+
+# input slices size, when compressing and encoding file contents. A multiple of 3, so base64 slices can be joined
+ENCODE_SLICE_BYTES = 3 * 256 * 1024
+GZIP_WBITS = 31  # zlib wbits for a gzip header and trailer
+# already compressed file types, that are not compressed again with the compressed encoding
+COMPRESSED_FILE_TYPES = {"png", "jpg", "jpeg", "gif", "gz", "zip"}
+
+LEGACY_ENCODING = "legacy"
+COMPRESSED_ENCODING = "compressed"
+
+
+def gzip_base64(contents: bytes, compress: bool) -> Iterator[str]:
+    """
+    Base64 of the (gzip compressed) contents, in pieces. Contents are compressed and encoded slice by slice, so
+    neither the full compressed contents nor the full base64 bytes are held in memory at once
+    """
+    compressor = zlib.compressobj(wbits=GZIP_WBITS) if compress else None
+    pending = b""  # compressed bytes that are not a multiple of 3 yet
+    view = memoryview(contents)
+    for start in range(0, len(view), ENCODE_SLICE_BYTES):
+        data = view[start : start + ENCODE_SLICE_BYTES]
+        if compressor:
+            data = pending + compressor.compress(data)
+            encoded_length = len(data) - len(data) % 3
+            pending = data[encoded_length:]
+            data = data[:encoded_length]
+        if data:
+            yield base64.b64encode(data).decode("ascii")
+    if compressor:
+        yield base64.b64encode(pending + compressor.flush()).decode("ascii")
+
+
+class StructuredDataWriter:
+    """
+    Serializes evidence structured data, in the same format as json.dumps of the structured data list.
+
+    Entries are kept as serialized pieces, and joined once, so large files don't need several full size copies.
+    With the compressed encoding, entries with data larger than EVIDENCE_COMPRESS_MIN_BYTES have their data gzip
+    compressed, and encoded data larger than EVIDENCE_CHUNK_BYTES is split into chunks. The other keys are kept:
+    {"type": ..., <other keys>, "encoding": "gzip", "chunks": [<base64>, ...]}
+    """
+
+    def __init__(
+        self,
+        encoding: str = EVIDENCE_ENCODING,
+        compress_min_bytes: int = EVIDENCE_COMPRESS_MIN_BYTES,
+        chunk_bytes: int = EVIDENCE_CHUNK_BYTES,
+    ):
+        self.encoding = encoding
+        self.compress_min_bytes = compress_min_bytes
+        self.chunk_bytes = chunk_bytes
+        self.__entries: List[List[str]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.__entries)
+
+    def add(self, entry: Dict[str, Any]):
+        if self.encoding == COMPRESSED_ENCODING and "data" in entry:
+            data = json.dumps(entry["data"]).encode("utf-8")
+            if len(data) >= self.compress_min_bytes:
+                fields = {key: value for key, value in entry.items() if key != "data"}
+                self.__add_encoded(fields, gzip_base64(data, compress=True), encoding="gzip")
+                return
+        self.__entries.append([json.dumps(entry)])
+
+    def add_file(self, filename: str, contents: bytes, compress: bool):
+        """
+        A file entry, typed by the file extension. With the legacy encoding, compressed files are typed gz, and the
+        data is str() of the base64 bytes, like the platform expects. Contents are compressed while encoded
+        """
+        file_type = filename[filename.rindex(".") + 1 :]
+        if self.encoding == COMPRESSED_ENCODING:
+            compress = file_type not in COMPRESSED_FILE_TYPES and len(contents) >= self.compress_min_bytes
+            self.__add_encoded(
+                {"type": file_type}, gzip_base64(contents, compress), encoding="gzip" if compress else ""
+            )
+            return
+
+        if compress:
+            file_type = "gz"
+        # base64 characters don't need json escaping
+        entry = [f'{{"type": {json.dumps(file_type)}, "data": "b\'']
+        entry.extend(gzip_base64(contents, compress))
+        entry.append("'\"}")
+        self.__entries.append(entry)
+
+    def __add_encoded(self, fields: Dict[str, Any], pieces: Iterator[str], encoding: str):
+        # the fields, without the closing brace, followed by the chunks
+        entry = [json.dumps({**fields, "encoding": encoding})[:-1], ', "chunks": ["']
+        chunk_length = 0
+        for piece in pieces:
+            # pieces are split on chunk boundaries, so chunks are exactly chunk_bytes long
+            while piece:
+                if chunk_length == self.chunk_bytes:
+                    entry.append('", "')
+                    chunk_length = 0
+                part = piece[: self.chunk_bytes - chunk_length]
+                piece = piece[len(part) :]
+                entry.append(part)
+                chunk_length += len(part)
+        entry.append('"]}')
+        self.__entries.append(entry)
+
+    def to_json(self) -> str:
+        pieces = ["["]
+        for index, entry in enumerate(self.__entries):
+            if index:
+                pieces.append(", ")
+            pieces.extend(entry)
+        pieces.append("]")
+        return "".join(pieces)
@@ -1,5 +1,3 @@
-import base64
-import json
 import logging
 import uuid
 from datetime import datetime
@@ -23,6 +21,7 @@ from robusta.core.reporting import (
 )
 from robusta.core.reporting.blocks import GraphBlock
 from robusta.core.reporting.callbacks import ExternalActionRequestBuilder
+from robusta.core.sinks.robusta.dal.evidence_encoding import StructuredDataWriter
 from robusta.core.sinks.transformer import Transformer
 from robusta.utils.parsing import datetime_to_db_str
 
@@ -63,14 +62,6 @@ class ModelConversion:
 
         return finding_json
 
-    @staticmethod
-    def get_file_object(block: FileBlock):
-        last_dot_idx = block.filename.rindex(".")
-        return {
-            "type": block.filename[last_dot_idx + 1 :],
-            "data": str(base64.b64encode(block.contents)),
-        }
-
     @staticmethod
     def to_evidence_json(
         account_id: str,
@@ -80,49 +71,45 @@ class ModelConversion:
         finding_id: uuid.UUID,
         enrichment: Enrichment,
     ) -> Dict[Any, Any]:
-        structured_data = []
+        structured_data = StructuredDataWriter()
         for block in enrichment.blocks:
             if isinstance(block, MarkdownBlock):
                 if not block.text:
                     continue
-                structured_data.append(
+                structured_data.add(
                     {
                         "type": "markdown",
                         "data": Transformer.to_github_markdown(block.text),
                     }
                 )
             elif isinstance(block, DividerBlock):
-                structured_data.append({"type": "divider"})
+                structured_data.add({"type": "divider"})
             elif isinstance(block, GraphBlock):
                 if ENABLE_GRAPH_BLOCK:
-                    structured_data.append(
+                    structured_data.add(
                         {"type": "prometheus", "data": block.graph_data.dict(), "metadata": block.graph_data.metadata, "version": 1.0}
                     )
                 else:
-                    if block.is_text_file():
-                        block.zip()
-                    structured_data.append(ModelConversion.get_file_object(block))
+                    structured_data.add_file(block.filename, block.contents, compress=block.is_text_file())
             elif isinstance(block, FileBlock):
-                if block.is_text_file():
-                    block.zip()
-                structured_data.append(ModelConversion.get_file_object(block))
+                structured_data.add_file(block.filename, block.contents, compress=block.is_text_file())
             elif isinstance(block, HeaderBlock):
-                structured_data.append({"type": "header", "data": block.text})
+                structured_data.add({"type": "header", "data": block.text})
             elif isinstance(block, ListBlock):
-                structured_data.append({"type": "list", "data": block.items})
+                structured_data.add({"type": "list", "data": block.items})
             elif isinstance(block, PrometheusBlock):
-                structured_data.append(
+                structured_data.add(
                     {"type": "prometheus", "data": block.data.dict(), "metadata": block.metadata, "version": 1.0}
                 )
             elif isinstance(block, TableBlock):
                 if block.table_name:
-                    structured_data.append(
+                    structured_data.add(
                         {
                             "type": "markdown",
                             "data": Transformer.to_github_markdown(block.table_name),
                         }
                     )
-                structured_data.append(
+                structured_data.add(
                     {
                         "type": "table",
                         "data": {
@@ -133,7 +120,7 @@ class ModelConversion:
                     }
                 )
             elif isinstance(block, KubernetesDiffBlock):
-                structured_data.append(
+                structured_data.add(
                     {
                         "type": "diff",
                         "data": {
@@ -164,11 +151,11 @@ class ModelConversion:
                         }
                     )
 
-                structured_data.append({"type": "callbacks", "data": callbacks})
+                structured_data.add({"type": "callbacks", "data": callbacks})
             elif isinstance(block, JsonBlock):
-                structured_data.append({"type": "json", "data": block.json_str})
+                structured_data.add({"type": "json", "data": block.json_str})
             elif isinstance(block, EventsRef):
-                structured_data.append({"type": "events_ref", "data": block.dict()})
+                structured_data.add({"type": "events_ref", "data": block.dict()})
             else:
                 logging.error(f"cannot convert block of type {type(block)} to robusta platform format block: {block}")
                 continue  # no reason to crash the entire report
@@ -179,7 +166,7 @@ class ModelConversion:
         return {
             "issue_id": str(finding_id),
             "file_type": "structured_data",
-            "data": json.dumps(structured_data),
+            "data": structured_data.to_json(),
             "account_id": account_id,
             "enrichment_type": enrichment.enrichment_type.name if enrichment.enrichment_type else None,
             "title": enrichment.title if enrichment else None,
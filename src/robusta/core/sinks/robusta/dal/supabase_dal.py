@@ -12,7 +12,7 @@ from supabase import create_client
 from supabase.lib.client_options import ClientOptions
 
 from robusta.core.model.cluster_status import ClusterStatus
-from robusta.core.model.env_vars import SUPABASE_LOGIN_RATE_LIMIT_SEC, SUPABASE_TIMEOUT_SECONDS
+from robusta.core.model.env_vars import SUPABASE_LOGIN_RATE_LIMIT_SEC, SUPABASE_TIMEOUT_SECONDS, SUPABASE_WRITE_BEHIND
 from robusta.core.model.helm_release import HelmRelease
 from robusta.core.model.jobs import JobInfo
 from robusta.core.model.namespaces import NamespaceInfo
@@ -23,6 +23,7 @@ from robusta.core.reporting.base import Finding
 from robusta.core.reporting.blocks import EventsBlock, EventsRef, ScanReportBlock, ScanReportRow
 from robusta.core.reporting.consts import EnrichmentAnnotation
 from robusta.core.sinks.robusta.dal.model_conversion import ModelConversion
+from robusta.core.sinks.robusta.dal.write_buffer import Row, WriteBuffer, WriteMode
 from robusta.core.sinks.robusta.rrm.account_resource_fetcher import AccountResourceFetcher
 from robusta.core.sinks.robusta.rrm.types import AccountResource, ResourceKind, \
     AccountResourceStatusType, AccountResourceStatusInfo
@@ -73,6 +74,24 @@ class SupabaseDal(AccountResourceFetcher):
         self.sink_name = sink_name
         self.persist_events = persist_events
         self.signing_key = signing_key
+        self.write_buffer: Optional[WriteBuffer] = None
+        if SUPABASE_WRITE_BEHIND:
+            # evidence first, so a finding is written after its evidence and events
+            self.write_buffer = WriteBuffer(
+                self.__write_rows,
+                on_error=self.handle_supabase_error,
+                tables_order=[EVIDENCE_TABLE, RESOURCE_EVENTS, ISSUES_TABLE],
+            )
+
+    def stop(self):
+        if self.write_buffer:
+            self.write_buffer.stop()
+
+    def __write_rows(self, table: str, mode: WriteMode, rows: List[Row]):
+        if mode == WriteMode.Upsert:
+            self.client.table(table).upsert(rows, ignore_duplicates=True, returning=ReturnMethod.minimal).execute()
+        else:
+            self.client.table(table).insert(rows, returning=ReturnMethod.minimal).execute()
 
     def __to_db_scanResult(self, scanResult: ScanReportRow) -> Dict[Any, Any]:
         db_sr = scanResult.dict()
@@ -133,10 +152,21 @@ class SupabaseDal(AccountResourceFetcher):
             if not evidence:
                 continue
 
+            if self.write_buffer:
+                self.write_buffer.add(EVIDENCE_TABLE, [evidence])
+                continue
+
             try:
                 self.client.table(EVIDENCE_TABLE).insert(evidence, returning=ReturnMethod.minimal).execute()
             except Exception as e:
                 logging.error(f"Failed to persist finding {finding.id} enrichment {enrichment} error: {e}")
+
+        if self.write_buffer:
+            # written after the evidence rows, added before it
+            finding_json = ModelConversion.to_finding_json(self.account_id, self.cluster, finding)
+            self.write_buffer.add(ISSUES_TABLE, [finding_json])
+            return
+
         try:
             (
                 self.client.table(ISSUES_TABLE)
@@ -497,6 +527,10 @@ class SupabaseDal(AccountResourceFetcher):
             row["cluster_id"] = self.cluster
             db_events.append(row)
 
+        if self.write_buffer:
+            self.write_buffer.add(RESOURCE_EVENTS, db_events, WriteMode.Upsert)
+            return
+
         try:
             self.client.table(RESOURCE_EVENTS).upsert(
                 db_events, ignore_duplicates=True, returning=ReturnMethod.minimal
@@ -0,0 +1,259 @@
+import json
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import prometheus_client
+
+from robusta.core.model.env_vars import (
+    SUPABASE_WRITE_BATCH_MAX_BYTES,
+    SUPABASE_WRITE_BATCH_SIZE,
+    SUPABASE_WRITE_BLOCK_TIMEOUT_SEC,
+    SUPABASE_WRITE_BUFFER_MAX_BYTES,
+    SUPABASE_WRITE_BUFFER_MAX_ROWS,
+    SUPABASE_WRITE_FLUSH_SEC,
+    SUPABASE_WRITE_MAX_BACKOFF_SEC,
+    SUPABASE_WRITE_MAX_RETRIES,
+)
+
+supabase_write_buffer_rows = prometheus_client.Gauge(
+    "supabase_write_buffer_rows", "Current number of rows waiting to be written to the robusta platform"
+)
+supabase_write_buffer_bytes = prometheus_client.Gauge(
+    "supabase_write_buffer_bytes", "Current serialized size of the rows waiting to be written to the robusta platform"
+)
+supabase_write_flush_latency = prometheus_client.Histogram(
+    "supabase_write_flush_seconds",
+    "Duration of multi row writes to the robusta platform, per table (seconds)",
+    labelnames=("table",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+supabase_write_rows = prometheus_client.Counter(
+    "supabase_write_rows", "Number of rows written to the robusta platform, per table and status", ("table", "status")
+)
+
+
+class WriteMode(str, Enum):
+    Insert = "insert"
+    Upsert = "upsert"  # ignoring duplicates
+
+
+Row = Dict[str, Any]
+# table, write mode
+WriteKey = Tuple[str, WriteMode]
+# writes rows of the same table, mode and columns in one request
+RowsWriter = Callable[[str, WriteMode, List[Row]], None]
+
+
+class _BufferedRow(NamedTuple):
+    row: Row
+    size: int  # serialized bytes
+
+
+class WriteBuffer:
+    """
+    Write behind buffer of table rows.
+
+    Rows are buffered, and written every flush_interval_sec, in multi row requests of up to batch_size rows and
+    batch_max_bytes serialized bytes. Tables are written by tables_order, and then the other tables in the order they
+    were added, so a finding can be written after its evidence, like the synchronous writes. Failed writes are retried
+    with exponential backoff. After max_retries, the request is split in halves, recursively, so only the rows that
+    can't be written alone are dropped.
+    When the buffer has max_rows rows or max_bytes serialized bytes, adding rows blocks for up to block_timeout_sec,
+    and then drops them.
+    """
+
+    def __init__(
+        self,
+        writer: RowsWriter,
+        on_error: Callable[[], None] = lambda: None,
+        tables_order: Optional[List[str]] = None,
+        flush_interval_sec: float = SUPABASE_WRITE_FLUSH_SEC,
+        batch_size: int = SUPABASE_WRITE_BATCH_SIZE,
+        batch_max_bytes: int = SUPABASE_WRITE_BATCH_MAX_BYTES,
+        max_rows: int = SUPABASE_WRITE_BUFFER_MAX_ROWS,
+        max_bytes: int = SUPABASE_WRITE_BUFFER_MAX_BYTES,
+        block_timeout_sec: float = SUPABASE_WRITE_BLOCK_TIMEOUT_SEC,
+        max_retries: int = SUPABASE_WRITE_MAX_RETRIES,
+        max_backoff_sec: float = SUPABASE_WRITE_MAX_BACKOFF_SEC,
+    ):
+        self.writer = writer
+        self.on_error = on_error
+        self.tables_order = tables_order or []
+        self.flush_interval_sec = flush_interval_sec
+        self.batch_size = batch_size
+        self.batch_max_bytes = batch_max_bytes
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.block_timeout_sec = block_timeout_sec
+        self.max_retries = max_retries
+        self.max_backoff_sec = max_backoff_sec
+        self.__pending: Dict[WriteKey, List[_BufferedRow]] = {}
+        self.__rows = 0
+        self.__bytes = 0
+        self.__failures = 0
+        self.__lock = threading.Lock()
+        self.__has_room = threading.Condition(self.__lock)
+        self.__flush_lock = threading.Lock()
+        self.__wakeup = threading.Event()
+        self.__stop_event = threading.Event()
+        self.__stopped = False
+        supabase_write_buffer_rows.set_function(self.size)
+        supabase_write_buffer_bytes.set_function(lambda: self.__bytes)
+        self.__thread = threading.Thread(target=self.__flush_loop, name="supabase-write-buffer", daemon=True)
+        self.__thread.start()
+
+    def size(self) -> int:
+        return self.__rows
+
+    def add(self, table: str, rows: List[Row], mode: WriteMode = WriteMode.Insert) -> bool:
+        """Buffer rows for writing. Returns False if the rows were dropped"""
+        if not rows:
+            return True
+        buffered = [_BufferedRow(row, len(json.dumps(row, default=str))) for row in rows]
+        size = sum(buffered_row.size for buffered_row in buffered)
+        with self.__lock:
+            deadline = time.time() + self.block_timeout_sec
+            # rows larger than the buffer are added when it's empty
+            while (
+                self.__rows
+                and (self.__rows + len(rows) > self.max_rows or self.__bytes + size > self.max_bytes)
+                and not self.__stopped
+            ):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    logging.error(f"Write buffer is full. Dropping {len(rows)} {table} rows")
+                    supabase_write_rows.labels(table, "dropped").inc(len(rows))
+                    return False
+                self.__has_room.wait(remaining)
+
+            self.__pending.setdefault((table, mode), []).extend(buffered)
+            self.__rows += len(rows)
+            self.__bytes += size
+            if self.__rows >= self.batch_size or self.__bytes >= self.batch_max_bytes:
+                self.__wakeup.set()
+        return True
+
+    def stop(self):
+        """Stop the background flushes, and try writing the buffered rows once"""
+        with self.__lock:
+            self.__stopped = True
+            self.__has_room.notify_all()
+        self.__stop_event.set()
+        self.__wakeup.set()
+        self.__thread.join()
+        self.flush()
+
+    def flush(self) -> bool:
+        """Write the buffered rows. Returns False if a write failed, and the unwritten rows were kept for retry"""
+        with self.__flush_lock:
+            with self.__lock:
+                pending = self.__pending
+                self.__pending = {}
+
+            # sorted is stable, so the other tables keep the order they were added in
+            ordered = sorted(pending.items(), key=lambda item: self.__table_rank(item[0][0]))
+            chunks = [
+                (key, chunk)
+                for key, rows in ordered
+                for columns_rows in self.__group_by_columns(rows)
+                for chunk in self.__chunks(columns_rows)
+            ]
+            for index, ((table, mode), buffered_chunk) in enumerate(chunks):
+                chunk = [buffered_row.row for buffered_row in buffered_chunk]
+                try:
+                    with supabase_write_flush_latency.labels(table).time():
+                        self.writer(table, mode, chunk)
+                except Exception:
+                    self.__failures += 1
+                    logging.exception(f"Failed to write {len(chunk)} {table} rows. Attempt {self.__failures}")
+                    self.on_error()
+                    if self.__failures > self.max_retries:
+                        self.__failures = 0
+                        if len(chunk) > 1:
+                            logging.error(f"Writing {len(chunk)} {table} rows in smaller requests")
+                            self.__write_split(table, mode, chunk)
+                        else:
+                            self.__drop(table, chunk)
+                        index += 1
+                    self.__requeue(chunks[index:], written=sum(len(rows) for _, rows in chunks[:index]))
+                    return False
+
+                self.__failures = 0
+                supabase_write_rows.labels(table, "written").inc(len(chunk))
+
+            self.__requeue([], written=sum(len(rows) for _, rows in chunks))
+            return True
+
+    def __write_split(self, table: str, mode: WriteMode, rows: List[Row]):
+        """Write the rows in halves, without retries. Halves that fail are split again, down to single rows"""
+        middle = len(rows) // 2
+        for part in [rows[:middle], rows[middle:]]:
+            try:
+                with supabase_write_flush_latency.labels(table).time():
+                    self.writer(table, mode, part)
+                supabase_write_rows.labels(table, "written").inc(len(part))
+            except Exception:
+                if len(part) > 1:
+                    self.__write_split(table, mode, part)
+                else:
+                    self.__drop(table, part)
+
+    @staticmethod
+    def __drop(table: str, rows: List[Row]):
+        logging.exception(f"Dropping {len(rows)} {table} rows that failed to be written")
+        supabase_write_rows.labels(table, "dropped").inc(len(rows))
+
+    def __requeue(self, unwritten: List[Tuple[WriteKey, List[_BufferedRow]]], written: int):
+        """Put the unwritten rows back, before the rows added during the flush"""
+        with self.__lock:
+            merged: Dict[WriteKey, List[_BufferedRow]] = {}
+            for key, rows in unwritten:
+                merged.setdefault(key, []).extend(rows)
+            for key, rows in self.__pending.items():
+                merged.setdefault(key, []).extend(rows)
+            self.__pending = merged
+            self.__rows = sum(len(rows) for rows in merged.values())
+            self.__bytes = sum(buffered_row.size for rows in merged.values() for buffered_row in rows)
+            if written:
+                self.__has_room.notify_all()
+
+    def __flush_loop(self):
+        while not self.__stopped:
+            if self.__failures:
+                # backoff isn't shortened by a full buffer
+                self.__stop_event.wait(min(self.flush_interval_sec * 2**self.__failures, self.max_backoff_sec))
+            else:
+                self.__wakeup.wait(self.flush_interval_sec)
+            self.__wakeup.clear()
+            if not self.__stopped:
+                self.flush()
+
+    def __table_rank(self, table: str) -> int:
+        return self.tables_order.index(table) if table in self.tables_order else len(self.tables_order)
+
+    @staticmethod
+    def __group_by_columns(rows: List[_BufferedRow]) -> List[List[_BufferedRow]]:
+        # rows of one multi row request must have the same columns
+        groups: Dict[Tuple[str, ...], List[_BufferedRow]] = {}
+        for buffered_row in rows:
+            groups.setdefault(tuple(sorted(buffered_row.row.keys())), []).append(buffered_row)
+        return list(groups.values())
+
+    def __chunks(self, rows: List[_BufferedRow]) -> List[List[_BufferedRow]]:
+        chunks: List[List[_BufferedRow]] = []
+        chunk: List[_BufferedRow] = []
+        chunk_bytes = 0
+        for buffered_row in rows:
+            # evidence rows carry files, so requests are capped by size too
+            if chunk and (len(chunk) >= self.batch_size or chunk_bytes + buffered_row.size > self.batch_max_bytes):
+                chunks.append(chunk)
+                chunk = []
+                chunk_bytes = 0
+            chunk.append(buffered_row)
+            chunk_bytes += buffered_row.size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
@@ -9,13 +9,18 @@ from typing import Dict, List, Optional, Union
 from hikaru.model.rel_1_26 import DaemonSet, Deployment, Job, Node, Pod, ReplicaSet, StatefulSet
 from kubernetes.client import V1Node, V1NodeCondition, V1NodeList, V1Taint
 
+from robusta.core.discovery.cluster_stats import ClusterStatsProvider
 from robusta.core.discovery.discovery import DISCOVERY_STACKTRACE_TIMEOUT_S, Discovery, DiscoveryResults
+from robusta.core.discovery.informer import DiscoveryDeltas, DiscoveryInformers
 from robusta.core.discovery.top_service_resolver import TopLevelResource, TopServiceResolver
 from robusta.core.model.cluster_status import ActivityStats, ClusterStats, ClusterStatus
 from robusta.core.model.env_vars import (
     CLUSTER_STATUS_PERIOD_SEC,
     DISCOVERY_CHECK_THRESHOLD_SEC,
+    DISABLE_HELM_MONITORING,
     DISCOVERY_PERIOD_SEC,
+    DISCOVERY_WATCH_FLUSH_SEC,
+    DISCOVERY_WATCH_MODE,
     DISCOVERY_WATCHDOG_CHECK_SEC,
     MANAGED_CONFIGURATION_ENABLED,
 )
@@ -80,6 +85,7 @@ class RobustaSink(SinkBase):
         )
         self.__rrm_checker = RRM(dal=self.dal, cluster=self.cluster_name, account_id=self.account_id)
         self.__pods_running_count: int = 0
+        self.__cluster_stats = ClusterStatsProvider()
         self.__update_cluster_status()  # send runner version initially, then force prometheus alert time periodically.
 
         # start cluster discovery
@@ -167,6 +173,8 @@ class RobustaSink(SinkBase):
 
     def stop(self):
         self.__active = False
+        super().stop()
+        self.dal.stop()
 
     def is_healthy(self) -> bool:
         if self.last_send_time == 0:
@@ -309,6 +317,7 @@ class RobustaSink(SinkBase):
             self.__publish_new_namespaces(results.namespaces)
 
             self.__pods_running_count = results.pods_running_count
+            self.__cluster_stats.update_counts(results.object_counts)
             # save the cached services for the resolver.
             RobustaSink.__save_resolver_resources(
                 list(self.__services_cache.values()), list(self.__jobs_cache.values())
@@ -492,7 +501,7 @@ class RobustaSink(SinkBase):
             activity_stats.relayConnection = receiver.healthy
 
         try:
-            cluster_stats: ClusterStats = Discovery.discover_stats()
+            cluster_stats: ClusterStats = self.__cluster_stats.get_stats()
             self.__pods_running_count = cluster_stats.pods
 
             cluster_status = ClusterStatus(
@@ -542,7 +551,151 @@ class RobustaSink(SinkBase):
             time.sleep(DISCOVERY_WATCHDOG_CHECK_SEC)
         logging.warning("Watchdog finished")
 
+    def __publish_discovery_deltas(self, deltas: DiscoveryDeltas) -> bool:
+        try:
+            self.__assert_services_cache_initialized()
+            self.__assert_node_cache_initialized()
+            self.__assert_jobs_cache_initialized()
+            self.__assert_namespaces_cache_initialized()
+            synced_keys = deltas.synced_keys
+            with self.services_publish_lock:
+                updated_services: List[ServiceInfo] = []
+                deleted_services = [key for key, service in deltas.services.items() if service is None]
+                if synced_keys:  # services deleted before the informers started
+                    deleted_services.extend(self.__services_cache.keys() - synced_keys.services)
+                for service_key in deleted_services:
+                    cached_service = self.__services_cache.pop(service_key, None)
+                    if cached_service:
+                        cached_service.deleted = True
+                        updated_services.append(cached_service)
+
+                for service_key, service in deltas.services.items():
+                    if service is None:
+                        continue
+                    cached_service = self.__services_cache.get(service_key)
+                    if cached_service and cached_service.resource_version > service.resource_version:
+                        continue
+                    if cached_service != service:
+                        updated_services.append(service)
+                        self.__services_cache[service_key] = service
+
+                updated_nodes: List[NodeInfo] = []
+                deleted_nodes = [name for name, node in deltas.nodes.items() if node is None]
+                if synced_keys:
+                    deleted_nodes.extend(self.__nodes_cache.keys() - synced_keys.nodes)
+                for node_name in deleted_nodes:
+                    cached_node = self.__nodes_cache.pop(node_name, None)
+                    if cached_node:
+                        cached_node.deleted = True
+                        updated_nodes.append(cached_node)
+
+                for node_name, node in deltas.nodes.items():
+                    if node is None:
+                        continue
+                    node_info = self.__from_api_server_node(node, deltas.node_requests.get(node_name, []))
+                    if self.__nodes_cache.get(node_name) != node_info:
+                        updated_nodes.append(node_info)
+                        self.__nodes_cache[node_name] = node_info
+
+                updated_jobs: List[JobInfo] = []
+                deleted_jobs = [key for key, job in deltas.jobs.items() if job is None]
+                if synced_keys:
+                    deleted_jobs.extend(self.__jobs_cache.keys() - synced_keys.jobs)
+                for job_key in deleted_jobs:
+                    self.__safe_delete_job(job_key)
+
+                for job_key, job in deltas.jobs.items():
+                    if job is not None and self.__jobs_cache.get(job_key) != job:
+                        updated_jobs.append(job)
+                        self.__jobs_cache[job_key] = job
+
+                updated_namespaces: List[NamespaceInfo] = []
+                deleted_namespaces = [name for name, namespace in deltas.namespaces.items() if namespace is None]
+                if synced_keys:
+                    deleted_namespaces.extend(self.__namespaces_cache.keys() - synced_keys.namespaces)
+                for namespace_name in deleted_namespaces:
+                    cached_namespace = self.__namespaces_cache.pop(namespace_name, None)
+                    if cached_namespace:
+                        cached_namespace.deleted = True
+                        updated_namespaces.append(cached_namespace)
+
+                for namespace_name, namespace in deltas.namespaces.items():
+                    if namespace is not None and self.__namespaces_cache.get(namespace_name) != namespace:
+                        updated_namespaces.append(namespace)
+                        self.__namespaces_cache[namespace_name] = namespace
+
+                self.__pods_running_count = deltas.pods_running_count
+                self.__cluster_stats.update_counts(deltas.object_counts)
+
+            if updated_services:
+                self.__discovery_metrics.on_services_updated(len(updated_services))
+                self.dal.persist_services(updated_services)
+            if updated_nodes:
+                self.__discovery_metrics.on_nodes_updated(len(updated_nodes))
+                self.dal.publish_nodes(updated_nodes)
+            if updated_jobs:
+                self.__discovery_metrics.on_jobs_updated(len(updated_jobs))
+                self.dal.publish_jobs(updated_jobs)
+            if updated_namespaces:
+                self.dal.publish_namespaces(updated_namespaces)
+
+            if updated_services or updated_jobs or deleted_jobs:
+                RobustaSink.__save_resolver_resources(
+                    list(self.__services_cache.values()), list(self.__jobs_cache.values())
+                )
+            return True
+        except Exception:
+            # we lost track of these deltas. Reset caches to align the data with the storage
+            self.__reset_caches()
+            logging.error(f"Failed to publish discovery changes for {self.sink_name}", exc_info=True)
+            return False
+
+    def __discover_helm_releases(self) -> List[HelmRelease]:
+        try:
+            helm_releases = Discovery.discover_helm_releases()
+            self.__assert_helm_releases_cache_initialized()
+            self.__publish_new_helm_releases(helm_releases)
+            return helm_releases
+        except Exception:
+            self.__helm_releases_cache = None
+            logging.error(f"Failed to publish helm releases for {self.sink_name}", exc_info=True)
+            return []
+
+    def __watch_cluster(self):
+        """
+        Discover the cluster using k8s watches. The cluster is listed only once, and then the discovery data is updated
+        from the watch events. Changes are accumulated by the informers and published every DISCOVERY_WATCH_FLUSH_SEC
+        """
+        logging.info("Cluster watch discovery initialized")
+        get_history = self.__should_run_history()
+        informers = DiscoveryInformers()
+        informers.start()
+        last_helm_discovery = 0
+        while self.__active:
+            self.__periodic_cluster_status()
+            if not self.__publish_discovery_deltas(informers.drain()):
+                informers.resync()
+
+            if get_history and informers.is_synced():
+                self.__get_events_history()
+                get_history = False
+
+            if not DISABLE_HELM_MONITORING and time.time() - last_helm_discovery > self.__discovery_period_sec:
+                last_helm_discovery = time.time()
+                helm_releases = self.__discover_helm_releases()
+                if helm_releases:
+                    self.__send_helm_release_events(release_data=helm_releases)
+
+            time.sleep(DISCOVERY_WATCH_FLUSH_SEC)
+
+        informers.stop()
+        logging.info(f"Watch discovery for sink {self.sink_name} ended.")
+
     def __discover_cluster(self):
+        if DISCOVERY_WATCH_MODE:
+            self.__watch_cluster()
+            return
+
         logging.info("Cluster discovery initialized")
         get_history = self.__should_run_history()
         while self.__active:
@@ -1,8 +1,10 @@
-from typing import Any
+from typing import Any, Optional
 
+from robusta.core.model.env_vars import SINKS_ASYNC_DELIVERY
 from robusta.core.model.k8s_operation_type import K8sOperationType
-from robusta.core.reporting.base import Finding
-from robusta.core.sinks.sink_base_params import SinkBaseParams, ActivityParams, ActivityInterval
+from robusta.core.reporting.base import Finding, FilterableMatcher
+from robusta.core.sinks.sink_base_params import SinkBaseParams, ActivityParams, ActivityInterval, DeliveryParams
+from robusta.core.sinks.sink_delivery import SinkDeliveryQueue
 from robusta.core.sinks.timing import TimeSlice, TimeSliceAlways
 
 
@@ -19,6 +21,12 @@ class SinkBase:
         self.signing_key = global_config.get("signing_key", "")
 
         self.time_slices = self._build_time_slices_from_params(self.params.activity)
+        self.matcher = FilterableMatcher(self.params.match)
+
+        self.delivery_queue: Optional[SinkDeliveryQueue] = None
+        delivery_params = self.params.delivery or (DeliveryParams() if SINKS_ASYNC_DELIVERY else None)
+        if delivery_params:
+            self.delivery_queue = SinkDeliveryQueue(self, delivery_params)
 
     def _build_time_slices_from_params(self, params: ActivityParams):
         if params is None:
@@ -39,10 +47,18 @@ class SinkBase:
         return self.account_id != account_id or self.cluster_name != cluster_name or self.signing_key != signing_key
 
     def stop(self):
-        pass
+        if self.delivery_queue:
+            self.delivery_queue.stop()
 
     def accepts(self, finding: Finding) -> bool:
-        return finding.matches(self.params.match) and any(time_slice.is_active_now for time_slice in self.time_slices)
+        return self.matcher.matches(finding) and any(time_slice.is_active_now for time_slice in self.time_slices)
+
+    def deliver_finding(self, finding: Finding, platform_enabled: bool):
+        """Write the finding to the sink, or hand it off to the sink delivery queue, if the sink has one"""
+        if self.delivery_queue:
+            self.delivery_queue.submit(finding, platform_enabled)
+        else:
+            self.write_finding(finding, platform_enabled)
 
     def write_finding(self, finding: Finding, platform_enabled: bool):
         raise NotImplementedError(f"write_finding not implemented for sink {self.sink_name}")
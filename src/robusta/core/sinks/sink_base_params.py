@@ -1,10 +1,12 @@
 import logging
 import re
+from enum import Enum
 from typing import Dict, List, Optional, Union
 
 from pydantic import BaseModel, root_validator, validator
 import pytz
 
+from robusta.core.model.env_vars import SINK_DELIVERY_QUEUE_SIZE, SINK_DELIVERY_WORKERS
 from robusta.core.playbooks.playbook_utils import replace_env_vars_values
 from robusta.core.sinks.timing import DAY_NAMES
 
@@ -55,6 +57,26 @@ class ActivityParams(BaseModel):
         return intervals
 
 
+class DeliveryOverflowPolicy(str, Enum):
+    Block = "block"  # wait for room in the queue, up to block_timeout_sec, and then drop the finding
+    DropNewest = "drop_newest"
+    DropOldest = "drop_oldest"
+    Spill = "spill"  # keep the overflowing findings on disk, until the queue has room
+
+
+class DeliveryParams(BaseModel):
+    workers: int = SINK_DELIVERY_WORKERS
+    queue_size: int = SINK_DELIVERY_QUEUE_SIZE
+    overflow: DeliveryOverflowPolicy = DeliveryOverflowPolicy.Block
+    block_timeout_sec: float = 5
+
+    @validator("workers", "queue_size")
+    def check_positive(cls, value: int):
+        if value < 1:
+            raise ValueError("must be at least 1")
+        return value
+
+
 class SinkBaseParams(BaseModel):
     name: str
     send_svg: bool = False
@@ -62,6 +84,7 @@ class SinkBaseParams(BaseModel):
     match: dict = {}
     activity: Optional[ActivityParams]
     stop: bool = False  # Stop processing if this sink has been matched
+    delivery: Optional[DeliveryParams]  # asynchronous delivery, from a queue. Set for all sinks by SINKS_ASYNC_DELIVERY
 
     @root_validator
     def env_values_validation(cls, values: Dict):
@@ -0,0 +1,178 @@
+import logging
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+import prometheus_client
+
+from robusta.core.model.env_vars import SINK_DELIVERY_SPILL_DIR
+from robusta.core.reporting.base import Finding
+from robusta.core.sinks.sink_base_params import DeliveryOverflowPolicy, DeliveryParams
+
+sink_delivery_events = prometheus_client.Counter(
+    "sink_delivery_events", "Number of findings delivery events, per sink and status", labelnames=("sink", "status")
+)
+sink_delivery_queue_size = prometheus_client.Gauge(
+    "sink_delivery_queue_size", "Current number of findings waiting for delivery, per sink", labelnames=("sink",)
+)
+sink_delivery_latency = prometheus_client.Histogram(
+    "sink_delivery_latency_seconds",
+    "Time from handing a finding off to a sink, until it was written (seconds)",
+    labelnames=("sink",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+
+# finding, platform enabled, hand off time
+Delivery = Tuple[Finding, bool, float]
+
+
+class SinkDeliveryQueue:
+    """
+    Bounded delivery queue of one sink, with its own workers.
+
+    Findings are handed off to the queue, and written by the sink workers, so a slow sink doesn't delay the events
+    processing or the other sinks. When the queue is full, the sink overflow policy applies.
+    With the spill policy, overflowing findings are kept on disk, and are delivered after the queued findings.
+    """
+
+    def __init__(self, sink, params: DeliveryParams):
+        self.sink = sink
+        self.params = params
+        self.__name = sink.sink_name
+        self.__queue: Deque[Delivery] = deque()
+        self.__spilled: Deque[str] = deque()  # spilled findings files, by hand off order
+        self.__spill_dir = None
+        self.__lock = threading.Lock()
+        self.__not_empty = threading.Condition(self.__lock)
+        self.__not_full = threading.Condition(self.__lock)
+        self.__all_delivered = threading.Condition(self.__lock)
+        self.__in_progress = 0
+        self.__active = True
+        sink_delivery_queue_size.labels(self.__name).set_function(self.size)
+        for i in range(params.workers):
+            threading.Thread(target=self.__worker, name=f"sink-{self.__name}-{i}", daemon=True).start()
+
+    def size(self) -> int:
+        return len(self.__queue) + len(self.__spilled)
+
+    def submit(self, finding: Finding, platform_enabled: bool) -> bool:
+        """Hand off a finding for delivery. Returns False if the finding was dropped"""
+        delivery: Delivery = (finding, platform_enabled, time.time())
+        with self.__lock:
+            if not self.__active:
+                logging.warning(f"Sink {self.__name} is stopped. Dropping finding {finding.title}")
+                return self.__dropped()
+
+            if self.__spilled or len(self.__queue) >= self.params.queue_size:
+                policy = self.params.overflow
+                if policy == DeliveryOverflowPolicy.Spill:
+                    return self.__spill(delivery)
+                if policy == DeliveryOverflowPolicy.DropNewest:
+                    return self.__dropped()
+                if policy == DeliveryOverflowPolicy.DropOldest:
+                    self.__queue.popleft()
+                    self.__dropped()
+                elif not self.__not_full.wait_for(
+                    lambda: len(self.__queue) < self.params.queue_size or not self.__active,
+                    self.params.block_timeout_sec,
+                ):
+                    return self.__dropped()
+
+            self.__queue.append(delivery)
+            self.__not_empty.notify()
+
+        sink_delivery_events.labels(self.__name, "queued").inc()
+        return True
+
+    def stop(self):
+        """Stop accepting findings. The workers exit after delivering the pending findings"""
+        with self.__lock:
+            self.__active = False
+            self.__not_empty.notify_all()
+            self.__not_full.notify_all()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all the handed off findings were delivered"""
+        with self.__all_delivered:
+            return self.__all_delivered.wait_for(self.__is_idle, timeout)
+
+    def __is_idle(self) -> bool:
+        return not self.__queue and not self.__spilled and self.__in_progress == 0
+
+    def __dropped(self) -> bool:
+        sink_delivery_events.labels(self.__name, "dropped").inc()
+        return False
+
+    def __spill(self, delivery: Delivery) -> bool:
+        try:
+            if not self.__spill_dir:
+                os.makedirs(SINK_DELIVERY_SPILL_DIR, exist_ok=True)
+                prefix = re.sub(r"[^\w.-]", "_", self.__name)
+                self.__spill_dir = tempfile.mkdtemp(prefix=f"{prefix}-", dir=SINK_DELIVERY_SPILL_DIR)
+            fd, path = tempfile.mkstemp(suffix=".pkl", dir=self.__spill_dir)
+            with os.fdopen(fd, "wb") as spill_file:
+                pickle.dump(delivery, spill_file)
+        except Exception:
+            logging.error(f"Failed to spill finding for sink {self.__name}", exc_info=True)
+            return self.__dropped()
+
+        self.__spilled.append(path)
+        self.__not_empty.notify()
+        sink_delivery_events.labels(self.__name, "spilled").inc()
+        return True
+
+    def __next_delivery(self):
+        """The next delivery, or a spilled findings file. None when stopped and nothing is left"""
+        with self.__not_empty:
+            self.__not_empty.wait_for(lambda: self.__queue or self.__spilled or not self.__active)
+            if self.__queue:
+                delivery = self.__queue.popleft()
+                self.__not_full.notify()
+            elif self.__spilled:
+                delivery = self.__spilled.popleft()
+            else:
+                return None
+            self.__in_progress += 1
+            return delivery
+
+    def __load_spilled(self, path: str) -> Delivery:
+        try:
+            with open(path, "rb") as spill_file:
+                return pickle.load(spill_file)
+        finally:
+            os.remove(path)
+
+    def __worker(self):
+        while True:
+            delivery = self.__next_delivery()
+            if delivery is None:
+                break
+
+            try:
+                if isinstance(delivery, str):
+                    delivery = self.__load_spilled(delivery)
+                finding, platform_enabled, handed_off_at = delivery
+                self.sink.write_finding(finding, platform_enabled)
+                sink_delivery_latency.labels(self.__name).observe(time.time() - handed_off_at)
+                sink_delivery_events.labels(self.__name, "delivered").inc()
+            except Exception:
+                sink_delivery_events.labels(self.__name, "failed").inc()
+                logging.error(f"Failed to publish finding to sink {self.__name}", exc_info=True)
+            finally:
+                self.__delivery_done()
+
+    def __delivery_done(self):
+        with self.__lock:
+            self.__in_progress -= 1
+            if not self.__is_idle():
+                return
+            self.__all_delivered.notify_all()
+            if not self.__active and self.__spill_dir:
+                shutil.rmtree(self.__spill_dir, ignore_errors=True)
+                self.__spill_dir = None
@@ -1,2 +1,6 @@
 from robusta.core.sinks.webhook.webhook_sink import WebhookSink
-from robusta.core.sinks.webhook.webhook_sink_params import WebhookSinkConfigWrapper, WebhookSinkParams
+from robusta.core.sinks.webhook.webhook_sink_params import (
+    WebhookBatchParams,
+    WebhookSinkConfigWrapper,
+    WebhookSinkParams,
+)
@@ -1,9 +1,12 @@
 import json
 import logging
 import textwrap
-from typing import List
+import threading
+import time
+from typing import Any, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from robusta.core.reporting import HeaderBlock, JsonBlock, KubernetesDiffBlock, ListBlock, MarkdownBlock
 from robusta.core.reporting.base import BaseBlock, Finding
@@ -24,6 +27,36 @@ class WebhookSink(SinkBase):
             else None
         )
         self.size_limit = sink_config.webhook_sink.size_limit
+        self.batch_params = sink_config.webhook_sink.batch
+
+        # connections are reused across findings. pool_block bounds the concurrent requests to the webhook
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=sink_config.webhook_sink.max_connections, pool_block=True
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.__batch: List[str] = []  # serialized findings
+        self.__batch_started: Optional[float] = None
+        self.__batch_lock = threading.Lock()
+        self.__batch_changed = threading.Condition(self.__batch_lock)
+        self.__stopped = False
+        self.__batch_thread: Optional[threading.Thread] = None
+        if self.batch_params:
+            self.__batch_thread = threading.Thread(
+                target=self.__batch_loop, name=f"webhook-{self.sink_name}-batch", daemon=True
+            )
+            self.__batch_thread.start()
+
+    def stop(self):
+        super().stop()
+        with self.__batch_lock:
+            self.__stopped = True
+            self.__batch_changed.notify_all()
+        if self.__batch_thread:
+            self.__batch_thread.join()
+        self.session.close()
 
     def write_finding(self, finding: Finding, platform_enabled: bool):
         if self.format == "text":
@@ -49,30 +82,28 @@ class WebhookSink(SinkBase):
         message_lines.append(f"Source: {self.cluster_name}")
         message_lines.append(finding.description)
 
-        message = ""
-
         for enrichment in finding.enrichments:
             for block in enrichment.blocks:
                 message_lines.extend(self.__to_unformatted_text(block))
 
+        wrapped_lines: List[str] = []
+        message_size = 0
         for line in [line for line in message_lines if line]:
             wrapped = textwrap.dedent(
                 f"""
                 {line}
                 """
             )
-            if len(message.encode('utf-8')) + len(wrapped.encode('utf8')) >= self.size_limit:
+            wrapped_size = len(wrapped.encode("utf-8"))
+            if message_size + wrapped_size >= self.size_limit:
                 break
-            message += wrapped
+            wrapped_lines.append(wrapped)
+            message_size += wrapped_size
 
-        try:
-            r = requests.post(self.url, data=message.encode('utf-8'), headers=self.headers)
-            r.raise_for_status()
-        except Exception:
-            logging.exception(f"Webhook request error\n headers: \n{self.headers}")
+        self.__post("".join(wrapped_lines).encode("utf-8"))
 
     def __write_json(self, finding: Finding, platform_enabled: bool):
-        finding_dict = json.loads(json.dumps(finding, default=lambda o: getattr(o, '__dict__', str(o))))
+        finding_dict = self.__to_json_data(finding)
 
         if platform_enabled:
             finding_dict["investigate"] = finding.get_investigate_uri(self.account_id, self.cluster_name)
@@ -80,20 +111,85 @@ class WebhookSink(SinkBase):
             if finding.add_silence_url:
                 finding_dict["silence"] = finding.get_prometheus_silence_url(self.account_id, self.cluster_name)
 
-        message = {}
+        # each pair is serialized once, and the message is joined from the serialized pairs
+        pairs: List[str] = []
         message_length = 0
 
         for key, value in finding_dict.items():
-            pair_length = len(json.dumps({key: value}).encode('utf-8'))
+            pair = json.dumps({key: value})
+            pair_length = len(pair.encode("utf-8"))
 
             if message_length + pair_length <= self.size_limit:
-                message[key] = value
+                pairs.append(pair[1:-1])
                 message_length += pair_length
             else:
                 break
 
+        message = "{" + ", ".join(pairs) + "}"
+        if self.batch_params:
+            self.__add_to_batch(message)
+        else:
+            self.__post(message.encode("utf-8"), content_type="application/json")
+
+    @classmethod
+    def __to_json_data(cls, obj: Any) -> Any:
+        """
+        Convert an object to json data types. Objects are converted to their __dict__, or to str.
+        The same as a json dumps and loads round trip, without serializing and parsing the finding
+        """
+        if obj is None or isinstance(obj, (str, int, float)):
+            return obj
+        if isinstance(obj, dict):
+            return {key: cls.__to_json_data(value) for key, value in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [cls.__to_json_data(value) for value in obj]
+        return cls.__to_json_data(getattr(obj, "__dict__", str(obj)))
+
+    def __add_to_batch(self, message: str):
+        with self.__batch_lock:
+            if not self.__stopped:
+                if not self.__batch:
+                    self.__batch_started = time.time()
+                self.__batch.append(message)
+                self.__batch_changed.notify_all()
+                return
+
+        logging.warning(f"Webhook sink {self.sink_name} is stopped. Posting finding without batching")
+        self.__post(f"[{message}]".encode("utf-8"), content_type="application/json")
+
+    def __next_batch(self) -> Optional[List[str]]:
+        """Wait until the batch is full, or its first finding waited max_delay_ms. None when stopped"""
+        with self.__batch_lock:
+            while not self.__batch:
+                if self.__stopped:
+                    return None
+                self.__batch_changed.wait()
+
+            deadline = self.__batch_started + self.batch_params.max_delay_ms / 1000
+            while len(self.__batch) < self.batch_params.max_findings and not self.__stopped:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self.__batch_changed.wait(remaining)
+
+            batch = self.__batch[: self.batch_params.max_findings]
+            self.__batch = self.__batch[self.batch_params.max_findings :]
+            self.__batch_started = time.time() if self.__batch else None
+            return batch
+
+    def __batch_loop(self):
+        while True:
+            batch = self.__next_batch()
+            if batch is None:
+                return
+            self.__post(("[" + ", ".join(batch) + "]").encode("utf-8"), content_type="application/json")
+
+    def __post(self, data: bytes, content_type: Optional[str] = None):
+        headers = dict(self.headers or {})
+        if content_type:
+            headers["Content-Type"] = content_type
         try:
-            r = requests.post(self.url, json=message, headers=self.headers)
+            r = self.session.post(self.url, data=data, headers=headers)
             r.raise_for_status()
         except Exception:
             logging.exception(f"Webhook request error\n headers: \n{self.headers}")
@@ -1,14 +1,41 @@
-from pydantic import SecretStr
+from typing import Optional
+
+from pydantic import BaseModel, SecretStr, validator
 
 from robusta.core.sinks.sink_base_params import SinkBaseParams
 from robusta.core.sinks.sink_config import SinkConfigBase
 
 
+class WebhookBatchParams(BaseModel):
+    max_findings: int = 100  # post the batch when it has this many findings
+    max_delay_ms: int = 1000  # post the batch when its first finding waited this long
+
+    @validator("max_findings", "max_delay_ms")
+    def check_positive(cls, value: int):
+        if value < 1:
+            raise ValueError("must be at least 1")
+        return value
+
+
 class WebhookSinkParams(SinkBaseParams):
     url: str
     size_limit: int = 4096
     authorization: SecretStr = None
     format: str = "text"
+    max_connections: int = 10  # maximum concurrent requests to the webhook
+    batch: Optional[WebhookBatchParams]  # json format only. Post a json array of findings
+
+    @validator("max_connections")
+    def check_max_connections(cls, value: int):
+        if value < 1:
+            raise ValueError("must be at least 1")
+        return value
+
+    @validator("batch")
+    def check_batch_format(cls, batch: Optional[WebhookBatchParams], values):
+        if batch and values.get("format") != "json":
+            raise ValueError("batching is supported only for the json format")
+        return batch
 
 
 class WebhookSinkConfigWrapper(SinkConfigBase):
@@ -7,16 +7,17 @@ import tarfile
 import tempfile
 import time
 import traceback
-from typing import List, Optional
+from typing import Any, Callable, List, NamedTuple, Optional
 
 from hikaru.model.rel_1_26 import Job
-from kubernetes import config
-from kubernetes.client.api import core_v1_api
+from kubernetes import config, watch
+from kubernetes.client.api import apps_v1_api, batch_v1_api, core_v1_api
 from kubernetes.client.rest import ApiException
 from kubernetes.stream import stream
 
 RUNNING_STATE = "Running"
 SUCCEEDED_STATE = "Succeeded"
+FAILED_STATE = "Failed"
 
 try:
     if os.getenv("KUBERNETES_SERVICE_HOST"):
@@ -50,50 +51,123 @@ def wait_until(read_function, predicate_function, timeout_sec: float, backoff_wa
     raise Exception("Failed to reach wait condition")
 
 
+class WatchedObject(NamedTuple):
+    """An object to wait for. The functions are the kubernetes client namespaced list and read functions of its kind"""
+
+    name: str
+    namespace: str
+    list_function: Callable
+    read_function: Callable
+
+    def read(self) -> Any:
+        return self.read_function(self.name, self.namespace)
+
+
+def watched_pod(name: str, namespace: str) -> WatchedObject:
+    core_v1 = core_v1_api.CoreV1Api()
+    return WatchedObject(name, namespace, core_v1.list_namespaced_pod, core_v1.read_namespaced_pod)
+
+
+def watched_job(name: str, namespace: str) -> WatchedObject:
+    batch_v1 = batch_v1_api.BatchV1Api()
+    return WatchedObject(name, namespace, batch_v1.list_namespaced_job, batch_v1.read_namespaced_job)
+
+
+def watched_deployment(name: str, namespace: str) -> WatchedObject:
+    apps_v1 = apps_v1_api.AppsV1Api()
+    return WatchedObject(name, namespace, apps_v1.list_namespaced_deployment, apps_v1.read_namespaced_deployment)
+
+
+def wait_until_watched(
+    watched: WatchedObject, predicate_function, timeout_sec: float, poll_interval_sec: float = 1
+) -> Any:
+    """
+    Waits until predicate_function(object) returns True, and returns the object. Raises an exception on timeout,
+    like wait_until.
+    The object is watched, with a field selector on its name, so each change is checked as soon as it happens, with
+    one request instead of a read per backoff. The watch starts with the current object, so a state reached before
+    the watch started isn't missed. If the watch fails, falls back to polling every poll_interval_sec
+    """
+    deadline = time.time() + timeout_sec
+    object_watch = watch.Watch()
+    try:
+        # the api server ends watches after timeout_seconds, so the watch is reopened until the deadline
+        while time.time() < deadline:
+            remaining = deadline - time.time()
+            for event in object_watch.stream(
+                watched.list_function,
+                watched.namespace,
+                field_selector=f"metadata.name={watched.name}",
+                timeout_seconds=max(1, int(remaining)),
+                _request_timeout=remaining + 5,
+            ):
+                if event["type"] != "DELETED" and predicate_function(event["object"]):
+                    return event["object"]
+                if time.time() > deadline:
+                    break
+    except Exception:
+        remaining = deadline - time.time()
+        logging.warning(f"failed watching {watched.name} {watched.namespace}. Polling instead", exc_info=True)
+        if remaining > 0:
+            return wait_until(watched.read, predicate_function, remaining, poll_interval_sec)
+    finally:
+        object_watch.stop()
+
+    raise Exception("Failed to reach wait condition")
+
+
 def wait_until_job_complete(job: Job, timeout):
     """
     wait until a kubernetes Job object either succeeds or fails at least once
     """
 
-    def is_job_complete(j: Job) -> bool:
-        return j.status.completionTime is not None or j.status.failed is not None
+    def is_job_complete(j) -> bool:
+        return j.status.completion_time is not None or j.status.failed is not None
 
-    return wait_until(
-        lambda: Job.readNamespacedJob(job.metadata.name, job.metadata.namespace).obj,
-        is_job_complete,
-        timeout,
-        5,
-    )
+    wait_until_watched(watched_job(job.metadata.name, job.metadata.namespace), is_job_complete, timeout, 5)
+    return Job.readNamespacedJob(job.metadata.name, job.metadata.namespace).obj
 
 
-# TODO: refactor to use wait_until function
 def wait_for_pod_status(name, namespace, status: str, timeout_sec: float, backoff_wait_sec: float) -> str:
+    """
+    Wait for the pod status, by watching the pod. Polls every backoff_wait_sec, only if the watch fails.
+    Returns the status, or FAIL on timeout
+    """
     pod_details = f"pod status: {name} {namespace} {status} {timeout_sec}"
     logging.debug(f"waiting for {pod_details}")
+    try:
+        wait_until_watched(
+            watched_pod(name, namespace), lambda pod: pod.status.phase == status, timeout_sec, backoff_wait_sec
+        )
+        logging.debug(f"reached {pod_details}")
+        return status
+    except Exception:
+        logging.debug(f"failed to reach {pod_details}")
+        return "FAIL"
 
-    start_time_sec = time.time()
-    while start_time_sec + timeout_sec > time.time():
-        try:
-            core_v1 = core_v1_api.CoreV1Api()
-            resp = core_v1.read_namespaced_pod_status(name, namespace)
-
-            if resp.status.phase == status:
-                logging.debug(f"reached {pod_details}")
-                return status
-
-        except ApiException:
-            logging.error(f"failed to get pod status {name} {namespace} {traceback.format_exc()}")
-
-        time.sleep(backoff_wait_sec)
 
-    logging.debug(f"failed to reach {pod_details}")
-    return "FAIL"
+def watch_pod_status(name, namespace, status: str, timeout_sec: float) -> str:
+    """
+    Wait for the pod status, by watching the pod. Returns the status, the failed status if the pod failed first,
+    or FAIL on timeout
+    """
+    pod_details = f"pod status: {name} {namespace} {status} {timeout_sec}"
+    logging.debug(f"watching for {pod_details}")
+    try:
+        pod = wait_until_watched(
+            watched_pod(name, namespace), lambda p: p.status.phase in [status, FAILED_STATE], timeout_sec
+        )
+        logging.debug(f"reached {pod.status.phase} {pod_details}")
+        return pod.status.phase
+    except Exception:
+        logging.debug(f"failed to reach {pod_details}")
+        return "FAIL"
 
 
-def exec_shell_command(name, shell_command: str, namespace="default", container=None):
+def exec_shell_command(name, shell_command: str, namespace="default", container=None, check_running: bool = True):
     commands = default_exec_command.copy()
     commands.append(shell_command)
-    return exec_commands(name, commands, namespace, container)
+    return exec_commands(name, commands, namespace, container, check_running)
 
 
 def upload_file(name: str, destination: str, contents: bytes, namespace="default", container=None):
@@ -197,17 +271,18 @@ def prepare_pod_command(cmd) -> Optional[List[str]]:
         return cmd
 
 
-def exec_commands(name, exec_command, namespace="default", container=None):
+def exec_commands(name, exec_command, namespace="default", container=None, check_running: bool = True):
     logging.debug(
         f"Executing command name: {name} command: {exec_command} namespace: {namespace} container: {container}"
     )
 
-    # verify pod state before connecting
-    pod_status = wait_for_pod_status(name, namespace, RUNNING_STATE, 90, 0.2)  # TODO config
-    if pod_status != RUNNING_STATE:
-        msg = f"Not running exec commands. Pod {name} {namespace} is not in running state"
-        logging.error(msg)
-        return msg
+    # verify pod state before connecting. Skipped for pods that are known to be running, like pooled debugger pods
+    if check_running:
+        pod_status = watch_pod_status(name, namespace, RUNNING_STATE, 90)  # TODO config
+        if pod_status != RUNNING_STATE:
+            msg = f"Not running exec commands. Pod {name} {namespace} is not in running state"
+            logging.error(msg)
+            return msg
 
     wsclient = None
     try:
@@ -71,8 +71,7 @@ class K8sBaseTrigger(BaseTrigger):
         if not isinstance(event, K8sTriggerEvent):
             return False
 
-        k8s_trigger_event = K8sTriggerEvent(**event.dict())
-        k8s_payload = k8s_trigger_event.k8s_payload
+        k8s_payload = event.k8s_payload
         if self.kind != "Any" and self.kind != k8s_payload.kind:
             return False
 
@@ -88,7 +87,7 @@ class K8sBaseTrigger(BaseTrigger):
 
         labels_map = getattr(self, "_labels_map", None)
         if labels_map:
-            obj_labels = meta.get("labels", {})
+            obj_labels = meta.get("labels") or {}
             for label_key, label_value in labels_map.items():
                 if label_value != obj_labels.get(label_key, ""):
                     return False
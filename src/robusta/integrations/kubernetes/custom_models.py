@@ -1,27 +1,39 @@
 import json
 import logging
 import re
-import time
 from enum import Enum, auto
+from functools import lru_cache
 from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Type, TypeVar
 
 import hikaru
 import yaml
 from hikaru.model.rel_1_26 import *  # * import is necessary for hikaru subclasses to work
-from kubernetes.client import ApiException
 from pydantic import BaseModel
 
-from robusta.core.model.env_vars import IMAGE_REGISTRY, INSTALLATION_NAMESPACE, RELEASE_NAME
+from robusta.core.model.env_vars import (
+    DEBUGGER_POD_POOL_ENABLED,
+    DEBUGGER_POD_POOL_IMAGE_PULL_POLICY,
+    DEBUGGER_POD_POOL_MAX_AGE_SEC,
+    IMAGE_REGISTRY,
+    INSTALLATION_NAMESPACE,
+    RELEASE_NAME,
+    RUNNER_POD_NAME,
+)
 from robusta.integrations.kubernetes.api_client_utils import (
+    RUNNING_STATE,
     SUCCEEDED_STATE,
     exec_shell_command,
     get_pod_logs,
     prepare_pod_command,
     to_kubernetes_name,
     upload_file,
-    wait_for_pod_status,
     wait_until_job_complete,
+    wait_until_watched,
+    watch_pod_status,
+    watched_deployment,
+    watched_pod,
 )
+from robusta.integrations.kubernetes.debugger_pod_pool import DebuggerPodKey, DebuggerPodPool
 from robusta.integrations.kubernetes.templates import get_deployment_yaml
 from robusta.utils.parsing import load_json
 
@@ -35,6 +47,12 @@ T = TypeVar("T")
 # TODO: import these from the python-tools project
 PYTHON_DEBUGGER_IMAGE = f"{IMAGE_REGISTRY}/debug-toolkit:v5.0"
 JAVA_DEBUGGER_IMAGE = f"{IMAGE_REGISTRY}/java-toolkit-11:jattach"
+DEBUGGER_POOL_LABEL = "robusta-debugger-pool"
+DEBUGGER_POOL_RELEASE_LABEL = "robusta-release"
+# the runner pod that created the pooled pod
+DEBUGGER_POOL_RUNNER_LABEL = "robusta-runner"
+# kubernetes stops pooled pods after this time, in case the runner that created them didn't delete them
+DEBUGGER_POOL_POD_DEADLINE_SEC = DEBUGGER_POD_POOL_MAX_AGE_SEC + 600
 
 
 class Process(BaseModel):
@@ -222,6 +240,10 @@ class RobustaPod(Pod):
         env: Optional[List[EnvVar]] = None,
         mount_host_root: bool = False,
         custom_annotations: Optional[Dict[str, str]] = None,
+        image_pull_policy: str = "Always",
+        labels: Optional[Dict[str, str]] = None,
+        active_deadline_seconds: Optional[int] = None,
+        owner_references: Optional[List[OwnerReference]] = None,
     ) -> "RobustaPod":
         """
         Creates a debugging pod with high privileges
@@ -240,17 +262,20 @@ class RobustaPod(Pod):
                 name=to_kubernetes_name(pod_name, "debug-"),
                 namespace=INSTALLATION_NAMESPACE,
                 annotations=custom_annotations,
+                labels=labels,
+                ownerReferences=owner_references,
             ),
             spec=PodSpec(
                 serviceAccountName=f"{RELEASE_NAME}-runner-service-account",
                 hostPID=True,
                 nodeName=node_name,
                 restartPolicy="OnFailure",
+                activeDeadlineSeconds=active_deadline_seconds,
                 containers=[
                     Container(
                         name="debugger",
                         image=debug_image,
-                        imagePullPolicy="Always",
+                        imagePullPolicy=image_pull_policy,
                         command=prepare_pod_command(debug_cmd),
                         securityContext=SecurityContext(
                             capabilities=Capabilities(add=["SYS_PTRACE", "SYS_ADMIN"]), privileged=True
@@ -290,7 +315,7 @@ class RobustaPod(Pod):
         try:
             pod_name = debugger.metadata.name
             pod_namespace = debugger.metadata.namespace
-            pod_status = wait_for_pod_status(pod_name, pod_namespace, SUCCEEDED_STATE, 360, 0.2)
+            pod_status = watch_pod_status(pod_name, pod_namespace, SUCCEEDED_STATE, 360)
             if pod_status != SUCCEEDED_STATE:
                 raise Exception(f"pod {pod_name} in {pod_namespace} failed to complete. It is in state {pod_status}")
 
@@ -306,6 +331,12 @@ class RobustaPod(Pod):
         debug_image=PYTHON_DEBUGGER_IMAGE,
         custom_annotations: Optional[Dict[str, str]] = None,
     ) -> str:
+        if DEBUGGER_POD_POOL_ENABLED:
+            with debugger_pod_pool.lease(node_name, debug_image, custom_annotations) as debugger:
+                return exec_shell_command(
+                    debugger.metadata.name, cmd, debugger.metadata.namespace, "debugger", check_running=False
+                )
+
         debugger = RobustaPod.create_debugger_pod(
             pod_name, node_name, debug_image, custom_annotations=custom_annotations
         )
@@ -314,6 +345,70 @@ class RobustaPod(Pod):
         finally:
             RobustaPod.deleteNamespacedPod(debugger.metadata.name, debugger.metadata.namespace)
 
+    @staticmethod
+    def create_pooled_debugger_pod(key: DebuggerPodKey) -> "RobustaPod":
+        """
+        A running debugger pod, for the debugger pods pool.
+        The pod is owned by the runner pod, so kubernetes deletes it when the runner pod is deleted
+        """
+        labels = {"app": DEBUGGER_POOL_LABEL, DEBUGGER_POOL_RELEASE_LABEL: RELEASE_NAME}
+        owner_references = None
+        if RUNNER_POD_NAME:
+            labels[DEBUGGER_POOL_RUNNER_LABEL] = RUNNER_POD_NAME
+            try:
+                owner_references = [get_runner_owner_reference()]
+            except Exception:
+                logging.warning(f"Failed to read the runner pod {RUNNER_POD_NAME}. Debugger pod has no owner")
+
+        debugger = RobustaPod.create_debugger_pod(
+            key.node_name,
+            key.node_name,
+            key.image,
+            custom_annotations=dict(key.annotations) or None,
+            image_pull_policy=DEBUGGER_POD_POOL_IMAGE_PULL_POLICY,
+            labels=labels,
+            active_deadline_seconds=DEBUGGER_POOL_POD_DEADLINE_SEC,
+            owner_references=owner_references,
+        )
+        pod_status = watch_pod_status(debugger.metadata.name, debugger.metadata.namespace, RUNNING_STATE, 90)
+        if pod_status != RUNNING_STATE:
+            RobustaPod.delete_debugger_pod(debugger)
+            raise Exception(f"debugger pod {debugger.metadata.name} failed to start. It is in state {pod_status}")
+        return debugger
+
+    @staticmethod
+    def delete_debugger_pod(debugger: "RobustaPod"):
+        RobustaPod.deleteNamespacedPod(debugger.metadata.name, debugger.metadata.namespace)
+
+    @staticmethod
+    def delete_orphaned_debugger_pods():
+        """
+        Delete the pooled debugger pods of this release, whose runner pod is gone. These are privileged, and would
+        keep running until their active deadline if they weren't garbage collected with their owner.
+        Pods of a runner that's still running, like the previous runner during a rolling update, are kept
+        """
+        try:
+            pods = PodList.listNamespacedPod(
+                INSTALLATION_NAMESPACE,
+                label_selector=f"app={DEBUGGER_POOL_LABEL},{DEBUGGER_POOL_RELEASE_LABEL}={RELEASE_NAME},"
+                f"{DEBUGGER_POOL_RUNNER_LABEL}",
+            ).obj.items
+            if not pods:
+                return
+            existing = {pod.metadata.name for pod in PodList.listNamespacedPod(INSTALLATION_NAMESPACE).obj.items}
+        except Exception:
+            logging.exception("Failed to list orphaned debugger pods")
+            return
+
+        pods = [pod for pod in pods if pod.metadata.labels[DEBUGGER_POOL_RUNNER_LABEL] not in existing]
+        for pod in pods:
+            try:
+                RobustaPod.deleteNamespacedPod(pod.metadata.name, pod.metadata.namespace)
+            except Exception:
+                logging.exception(f"Failed to delete orphaned debugger pod {pod.metadata.name}")
+        if pods:
+            logging.info(f"Deleted {len(pods)} orphaned debugger pods")
+
     @staticmethod
     def extract_container_id(status: ContainerStatus) -> str:
         runtime, container_id = status.containerID.split("://")
@@ -383,19 +478,30 @@ class RobustaPod(Pod):
     @staticmethod
     def wait_for_pod_ready(pod_name: str, namespace: str, timeout: int = 60) -> "RobustaPod":
         """
-        Waits for the pod to be in Running state
+        Waits for the pod to be in Running state. The pod is watched, so it may not exist yet
         """
-        for _ in range(timeout):  # retry for up to timeout seconds
-            try:
-                pod = RobustaPod().read(pod_name, namespace)
-                if pod.status.phase == "Running":
-                    return pod
-            except ApiException as e:
-                if e.status != 404:  # re-raise the exception if it's not a NotFound error
-                    raise
-            time.sleep(1)
-        else:
+        try:
+            wait_until_watched(watched_pod(pod_name, namespace), lambda pod: pod.status.phase == RUNNING_STATE, timeout)
+        except Exception:
             raise RuntimeError(f"Pod {pod_name} in namespace {namespace} is not ready after {timeout} seconds")
+        return RobustaPod().read(pod_name, namespace)
+
+
+@lru_cache(maxsize=1)
+def get_runner_owner_reference() -> OwnerReference:
+    runner = RobustaPod.readNamespacedPod(RUNNER_POD_NAME, INSTALLATION_NAMESPACE).obj
+    return OwnerReference(
+        apiVersion="v1",
+        kind="Pod",
+        name=runner.metadata.name,
+        uid=runner.metadata.uid,
+        blockOwnerDeletion=False,
+    )
+
+
+debugger_pod_pool = DebuggerPodPool(
+    create_pod=RobustaPod.create_pooled_debugger_pod, delete_pod=RobustaPod.delete_debugger_pod
+)
 
 
 class RobustaDeployment(Deployment):
@@ -412,18 +518,17 @@ class RobustaDeployment(Deployment):
     def wait_for_deployment_ready(name: str, namespace: str, timeout: int = 60) -> "RobustaDeployment":
         """
         Waits for the deployment to be ready, i.e., the expected number of pods are running.
+        The deployment is watched, so it may not exist yet
         """
-        for _ in range(timeout):  # retry for up to timeout seconds
-            try:
-                deployment = RobustaDeployment().read(name, namespace)
-                if deployment.status.readyReplicas == deployment.spec.replicas:
-                    return deployment
-            except ApiException as e:
-                if e.status != 404:  # re-raise the exception if it's not a NotFound error
-                    raise
-            time.sleep(1)
-        else:
+        try:
+            wait_until_watched(
+                watched_deployment(name, namespace),
+                lambda deployment: deployment.status.ready_replicas == deployment.spec.replicas,
+                timeout,
+            )
+        except Exception:
             raise RuntimeError(f"Deployment {name} in namespace {namespace} is not ready after {timeout} seconds")
+        return RobustaDeployment().read(name, namespace)
 
 
 class JobSecret(BaseModel):
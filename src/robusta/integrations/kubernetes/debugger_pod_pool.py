@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import prometheus_client
+
+from robusta.core.model.env_vars import (
+    DEBUGGER_POD_POOL_ACQUIRE_TIMEOUT_SEC,
+    DEBUGGER_POD_POOL_IDLE_TTL_SEC,
+    DEBUGGER_POD_POOL_MAX_AGE_SEC,
+    DEBUGGER_POD_POOL_MAX_PODS_PER_NODE,
+)
+
+debugger_pool_pods = prometheus_client.Gauge(
+    "debugger_pool_pods", "Current number of pooled debugger pods, per state", labelnames=("state",)
+)
+debugger_pool_leases = prometheus_client.Counter(
+    "debugger_pool_leases", "Number of debugger pod leases, by a warm or a new pod", labelnames=("pod",)
+)
+debugger_pool_acquire_time = prometheus_client.Histogram(
+    "debugger_pool_acquire_seconds",
+    "Time to get a running debugger pod, including the pod startup for new pods (seconds)",
+    buckets=(0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+
+
+class DebuggerPodKey(NamedTuple):
+    node_name: str
+    image: str
+    annotations: Tuple[Tuple[str, str], ...]
+
+    @staticmethod
+    def create(node_name: str, image: str, annotations: Optional[Dict[str, str]]) -> "DebuggerPodKey":
+        return DebuggerPodKey(node_name, image, tuple(sorted((annotations or {}).items())))
+
+
+class _PooledPod:
+    __slots__ = ("pod", "key", "created", "last_used")
+
+    def __init__(self, pod: Any, key: DebuggerPodKey):
+        self.pod = pod
+        self.key = key
+        self.created = time.monotonic()
+        self.last_used = self.created
+
+
+class DebuggerPodPool:
+    """
+    Warm debugger pods, per node, image and annotations.
+
+    A lease takes an idle running pod of its key, or creates one, and returns it to the pool when the caller is done.
+    Each node has up to max_pods_per_node debugger pods, idle or leased. When they're all leased, callers wait for a
+    pod, up to acquire_timeout_sec. Idle pods of other images are replaced, when a node is at its limit.
+    Pods idle for idle_ttl_sec, pods older than max_age_sec, and pods of failed leases, are deleted.
+    """
+
+    def __init__(
+        self,
+        create_pod: Callable[[DebuggerPodKey], Any],
+        delete_pod: Callable[[Any], None],
+        max_pods_per_node: int = DEBUGGER_POD_POOL_MAX_PODS_PER_NODE,
+        idle_ttl_sec: float = DEBUGGER_POD_POOL_IDLE_TTL_SEC,
+        max_age_sec: float = DEBUGGER_POD_POOL_MAX_AGE_SEC,
+        acquire_timeout_sec: float = DEBUGGER_POD_POOL_ACQUIRE_TIMEOUT_SEC,
+    ):
+        self.create_pod = create_pod
+        self.delete_pod = delete_pod
+        self.max_pods_per_node = max_pods_per_node
+        self.idle_ttl_sec = idle_ttl_sec
+        self.max_age_sec = max_age_sec
+        self.acquire_timeout_sec = acquire_timeout_sec
+        self.__lock = threading.Lock()
+        self.__released = threading.Condition(self.__lock)
+        # most recently used last
+        self.__idle: Dict[DebuggerPodKey, List[_PooledPod]] = defaultdict(list)
+        # pods of each node, idle, leased or starting
+        self.__node_pods: Dict[str, int] = defaultdict(int)
+        self.__reaper: Optional[threading.Thread] = None
+        debugger_pool_pods.labels("idle").set_function(self.idle_count)
+        debugger_pool_pods.labels("total").set_function(lambda: sum(self.__node_pods.values()))
+
+    def idle_count(self) -> int:
+        return sum(len(pods) for pods in self.__idle.values())
+
+    @contextmanager
+    def lease(self, node_name: str, image: str, annotations: Optional[Dict[str, str]] = None) -> Iterator[Any]:
+        """A running debugger pod. The pod is deleted instead of reused, if the caller raised an exception"""
+        pooled = self.__acquire(DebuggerPodKey.create(node_name, image, annotations))
+        healthy = False
+        try:
+            yield pooled.pod
+            healthy = True
+        finally:
+            self.__release(pooled, healthy)
+
+    def clear(self):
+        """Delete the idle pods"""
+        with self.__lock:
+            expired = [pooled for pods in self.__idle.values() for pooled in pods]
+            self.__idle.clear()
+            self.__forget(expired)
+        self.__delete(expired)
+
+    def __acquire(self, key: DebuggerPodKey) -> _PooledPod:
+        start_time = time.monotonic()
+        deadline = start_time + self.acquire_timeout_sec
+        expired: List[_PooledPod] = []
+        pooled: Optional[_PooledPod] = None
+        timed_out = False
+        with self.__lock:
+            self.__start_reaper()
+            while True:
+                pooled = self.__take_idle(key, expired)
+                if pooled:
+                    break
+                if self.__node_pods[key.node_name] < self.max_pods_per_node:
+                    self.__node_pods[key.node_name] += 1
+                    break
+                replaced = self.__take_idle_of_node(key.node_name)
+                if replaced:
+                    # the new pod takes the slot of the replaced pod
+                    expired.append(replaced)
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                self.__released.wait(remaining)
+
+        # pods are deleted outside the lock, it's an api call
+        self.__delete(expired)
+        if timed_out:
+            raise Exception(f"Timed out waiting for a debugger pod on node {key.node_name}")
+        if pooled:
+            debugger_pool_leases.labels("warm").inc()
+        else:
+            try:
+                pooled = _PooledPod(self.create_pod(key), key)
+            except Exception:
+                with self.__lock:
+                    self.__node_pods[key.node_name] -= 1
+                    self.__released.notify_all()
+                raise
+            debugger_pool_leases.labels("new").inc()
+        debugger_pool_acquire_time.observe(time.monotonic() - start_time)
+        return pooled
+
+    def __release(self, pooled: _PooledPod, healthy: bool):
+        now = time.monotonic()
+        with self.__lock:
+            if healthy and now - pooled.created < self.max_age_sec:
+                pooled.last_used = now
+                self.__idle[pooled.key].append(pooled)
+                self.__released.notify_all()
+                return
+            self.__forget([pooled])
+        self.__delete([pooled])
+
+    def __take_idle(self, key: DebuggerPodKey, expired: List[_PooledPod]) -> Optional[_PooledPod]:
+        pods = self.__idle.get(key)
+        while pods:
+            pooled = pods.pop()
+            if time.monotonic() - pooled.created < self.max_age_sec:
+                return pooled
+            self.__forget([pooled])
+            expired.append(pooled)
+        return None
+
+    def __take_idle_of_node(self, node_name: str) -> Optional[_PooledPod]:
+        # the least recently used idle pod of the node
+        candidates = [pods for key, pods in self.__idle.items() if key.node_name == node_name and pods]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda pods: pods[0].last_used).pop(0)
+
+    def __forget(self, pods: List[_PooledPod]):
+        for pooled in pods:
+            self.__node_pods[pooled.key.node_name] -= 1
+            if not self.__node_pods[pooled.key.node_name]:
+                del self.__node_pods[pooled.key.node_name]
+        if pods:
+            self.__released.notify_all()
+
+    def __delete(self, pods: List[_PooledPod]):
+        for pooled in pods:
+            try:
+                self.delete_pod(pooled.pod)
+            except Exception:
+                logging.exception("Failed to delete debugger pod")
+
+    def __start_reaper(self):
+        if self.__reaper is None:
+            self.__reaper = threading.Thread(target=self.__reap_loop, name="debugger-pool-reaper", daemon=True)
+            self.__reaper.start()
+
+    def __reap_loop(self):
+        while True:
+            time.sleep(max(1.0, min(self.idle_ttl_sec, 30) / 2))
+            try:
+                self.__reap()
+            except Exception:
+                logging.exception("Failed to reap idle debugger pods")
+
+    def __reap(self):
+        now = time.monotonic()
+        with self.__lock:
+            expired: List[_PooledPod] = []
+            for pods in self.__idle.values():
+                keep = [p for p in pods if now - p.last_used < self.idle_ttl_sec and now - p.created < self.max_age_sec]
+                expired.extend(p for p in pods if p not in keep)
+                pods[:] = keep
+            self.__forget(expired)
+        if expired:
+            logging.debug(f"Deleting {len(expired)} idle debugger pods")
+        self.__delete(expired)
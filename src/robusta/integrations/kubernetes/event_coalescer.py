@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict
+
+import prometheus_client
+
+from robusta.core.model.env_vars import INCOMING_EVENTS_COALESCE_MAX_PENDING
+from robusta.core.model.k8s_operation_type import K8sOperationType
+from robusta.integrations.kubernetes.base_triggers import IncomingK8sEventPayload
+
+coalescer_events = prometheus_client.Counter(
+    "k8s_event_coalescer_events",
+    "Number of k8s events received by the coalescer, by status. The coalescing ratio is coalesced / received",
+    labelnames=("status",),
+)
+coalescer_delay = prometheus_client.Histogram(
+    "k8s_event_coalescer_delay_seconds",
+    "Time k8s updates are held in the coalescing window (seconds)",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+
+
+def k8s_object_key(k8s_payload: IncomingK8sEventPayload) -> str:
+    metadata = k8s_payload.obj.get("metadata") or {}
+    return f"{k8s_payload.kind}/{metadata.get('namespace', '')}/{metadata.get('name', '')}"
+
+
+def merge_k8s_updates(
+    pending_payload: IncomingK8sEventPayload, new_payload: IncomingK8sEventPayload
+) -> IncomingK8sEventPayload:
+    """Merge two updates of the same object into one update, from the first old object to the last object"""
+    new_payload.oldObj = pending_payload.oldObj
+    return new_payload
+
+
+class _PendingUpdate:
+    __slots__ = ("payload", "received_at")
+
+    def __init__(self, payload: IncomingK8sEventPayload, received_at: float):
+        self.payload = payload
+        self.received_at = received_at
+
+
+class K8sEventCoalescer:
+    """
+    Holds k8s updates for window_sec, merging the updates of the same object received meanwhile.
+    The window starts on the first update of the object, so frequently updated objects are still dispatched every
+    window_sec. Creates and deletes are dispatched immediately, after the pending update of the same object.
+    """
+
+    def __init__(
+        self,
+        window_sec: float,
+        dispatch: Callable[[IncomingK8sEventPayload], None],
+        max_pending: int = INCOMING_EVENTS_COALESCE_MAX_PENDING,
+    ):
+        self.window_sec = window_sec
+        self.max_pending = max_pending
+        self.__dispatch = dispatch
+        self.__lock = threading.Lock()
+        self.__ready = threading.Condition(self.__lock)
+        self.__pending: Dict[str, _PendingUpdate] = OrderedDict()  # by receive time
+        self.__active = True
+        threading.Thread(target=self.__flush_loop, name="k8s-event-coalescer", daemon=True).start()
+
+    def add(self, k8s_payload: IncomingK8sEventPayload):
+        coalescer_events.labels("received").inc()
+        key = k8s_object_key(k8s_payload)
+        # dispatching only queues the event. It's done under the lock, to keep the order of the object events
+        with self.__lock:
+            pending = self.__pending.get(key)
+            if k8s_payload.operation != K8sOperationType.UPDATE.value:
+                if pending:
+                    self.__flush(self.__pending.pop(key), time.time())
+                self.__dispatch(k8s_payload)
+                return
+
+            if pending:
+                pending.payload = merge_k8s_updates(pending.payload, k8s_payload)
+                coalescer_events.labels("coalesced").inc()
+            elif len(self.__pending) >= self.max_pending:
+                self.__dispatch(k8s_payload)
+            else:
+                self.__pending[key] = _PendingUpdate(k8s_payload, time.time())
+                if len(self.__pending) == 1:
+                    self.__ready.notify()
+
+    def pending_count(self) -> int:
+        return len(self.__pending)
+
+    def stop(self):
+        """Stop, and dispatch the pending updates"""
+        with self.__lock:
+            self.__active = False
+            now = time.time()
+            while self.__pending:
+                self.__flush(self.__pending.popitem(last=False)[1], now)
+            self.__ready.notify()
+
+    def __flush(self, pending: _PendingUpdate, now: float):
+        coalescer_delay.observe(now - pending.received_at)
+        coalescer_events.labels("dispatched").inc()
+        self.__dispatch(pending.payload)
+
+    def __flush_loop(self):
+        with self.__lock:
+            while self.__active:
+                now = time.time()
+                timeout = None
+                while self.__pending:
+                    pending = next(iter(self.__pending.values()))
+                    deadline = pending.received_at + self.window_sec
+                    if deadline > now:
+                        timeout = deadline - now
+                        break
+                    self.__flush(self.__pending.popitem(last=False)[1], now)
+                self.__ready.wait(timeout)
@@ -0,0 +1,174 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, Type
+
+from hikaru import HikaruDocumentBase
+from hikaru.model.rel_1_26 import NodeList
+
+from robusta.core.model.env_vars import (
+    ALERT_OBJECTS_CACHE_MAX_SIZE,
+    ALERT_OBJECTS_CACHE_TTL_SEC,
+    NODES_IP_INDEX_RELIST_SEC,
+)
+from robusta.core.model.k8s_operation_type import K8sOperationType
+from robusta.integrations.kubernetes.base_triggers import IncomingK8sEventPayload
+
+# kind, namespace, name
+ObjectKey = Tuple[str, str, str]
+
+
+class _CachedRead(NamedTuple):
+    hikaru_class: Type[HikaruDocumentBase]
+    expires_at: float
+    result: Future
+
+
+class K8sObjectsCache:
+    """
+    Short lived cache of k8s objects read from the api server.
+
+    Concurrent reads of the same object share one api call, and later reads use the cached object until it expires,
+    or until an event of the object is received. Objects that are not found are cached too.
+    Each reader gets its own copy of the object.
+    """
+
+    def __init__(self, ttl_sec: float = ALERT_OBJECTS_CACHE_TTL_SEC, max_size: int = ALERT_OBJECTS_CACHE_MAX_SIZE):
+        self.ttl_sec = ttl_sec
+        self.max_size = max_size
+        self.__lock = threading.Lock()
+        self.__reads: "OrderedDict[ObjectKey, _CachedRead]" = OrderedDict()
+
+    def read(self, hikaru_class: Type[HikaruDocumentBase], name: str, namespace: Optional[str] = None):
+        """Read an object, like hikaru_class().read(). Raises the read error"""
+        key = (hikaru_class.kind, namespace or "", name)
+        with self.__lock:
+            cached = self.__reads.get(key)
+            if self.__is_valid(cached, hikaru_class):
+                owner = False
+            else:
+                owner = True
+                cached = _CachedRead(hikaru_class, time.time() + self.ttl_sec, Future())
+                self.__reads[key] = cached
+                self.__reads.move_to_end(key)
+                while len(self.__reads) > self.max_size:
+                    self.__reads.popitem(last=False)
+
+        if owner:
+            self.__load(key, cached, name, namespace)
+        return cached.result.result().dup()
+
+    def invalidate(self, kind: str, name: str, namespace: Optional[str] = None):
+        with self.__lock:
+            self.__reads.pop((kind, namespace or "", name), None)
+
+    def on_k8s_event(self, k8s_payload: IncomingK8sEventPayload):
+        metadata = k8s_payload.obj.get("metadata") or {}
+        self.invalidate(k8s_payload.kind, metadata.get("name", ""), metadata.get("namespace"))
+
+    def clear(self):
+        with self.__lock:
+            self.__reads.clear()
+
+    @staticmethod
+    def __is_valid(cached: Optional[_CachedRead], hikaru_class: Type[HikaruDocumentBase]) -> bool:
+        if not cached or cached.hikaru_class is not hikaru_class:
+            return False
+        return not cached.result.done() or cached.expires_at > time.time()
+
+    def __load(self, key: ObjectKey, cached: _CachedRead, name: str, namespace: Optional[str]):
+        kwargs = {"name": name}
+        if namespace is not None:
+            kwargs["namespace"] = namespace
+        try:
+            cached.result.set_result(cached.hikaru_class().read(**kwargs))
+        except Exception as e:
+            cached.result.set_exception(e)
+            if getattr(e, "status", None) != 404:
+                # don't keep transient errors. The concurrent readers still share this one
+                with self.__lock:
+                    if self.__reads.get(key) is cached:
+                        del self.__reads[key]
+
+
+class NodesIpIndex:
+    """
+    Node names by node address.
+
+    Kept up to date by node events. Addresses that aren't in the index are looked for by relisting the nodes,
+    at most once every NODES_IP_INDEX_RELIST_SEC.
+    """
+
+    def __init__(self, min_relist_interval_sec: float = NODES_IP_INDEX_RELIST_SEC):
+        self.min_relist_interval_sec = min_relist_interval_sec
+        self.__lock = threading.Lock()
+        self.__relist_lock = threading.Lock()
+        self.__node_names: Dict[str, str] = {}  # address to node name
+        self.__node_addresses: Dict[str, Set[str]] = {}  # node name to addresses
+        self.__listed_at = 0.0
+
+    def on_k8s_event(self, k8s_payload: IncomingK8sEventPayload):
+        if k8s_payload.kind != "Node":
+            return
+        metadata = k8s_payload.obj.get("metadata") or {}
+        status = k8s_payload.obj.get("status") or {}
+        addresses = [address.get("address") for address in status.get("addresses") or []]
+        with self.__lock:
+            if k8s_payload.operation == K8sOperationType.DELETE.value:
+                self.__remove_node(metadata.get("name"))
+            else:
+                self.__set_node(metadata.get("name"), addresses)
+
+    def find_node_name(self, ip: str) -> Optional[str]:
+        with self.__lock:
+            node_name = self.__node_names.get(ip)
+            if node_name or not self.__can_relist():
+                return node_name
+
+        with self.__relist_lock:
+            with self.__lock:
+                # the nodes may have been relisted while waiting
+                if not self.__can_relist():
+                    return self.__node_names.get(ip)
+            self.__relist()
+
+        with self.__lock:
+            return self.__node_names.get(ip)
+
+    def __can_relist(self) -> bool:
+        return time.time() - self.__listed_at >= self.min_relist_interval_sec
+
+    def __relist(self):
+        nodes: Dict[str, List[str]] = {}
+        try:
+            for node in NodeList.listNode().obj.items:
+                nodes[node.metadata.name] = [address.address for address in node.status.addresses or []]
+        except Exception:
+            logging.error("Failed to list nodes", exc_info=True)
+            return
+
+        with self.__lock:
+            self.__node_names.clear()
+            self.__node_addresses.clear()
+            for node_name, addresses in nodes.items():
+                self.__set_node(node_name, addresses)
+            self.__listed_at = time.time()
+
+    def __set_node(self, node_name: Optional[str], addresses: List[str]):
+        if not node_name:
+            return
+        self.__remove_node(node_name)
+        self.__node_addresses[node_name] = {address for address in addresses if address}
+        for address in self.__node_addresses[node_name]:
+            self.__node_names[address] = node_name
+
+    def __remove_node(self, node_name: Optional[str]):
+        for address in self.__node_addresses.pop(node_name, ()):
+            if self.__node_names.get(address) == node_name:
+                del self.__node_names[address]
+
+
+k8s_objects_cache = K8sObjectsCache()
+nodes_ip_index = NodesIpIndex()
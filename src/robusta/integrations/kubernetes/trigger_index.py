@@ -0,0 +1,93 @@
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from robusta.integrations.kubernetes.base_triggers import IncomingK8sEventPayload, K8sBaseTrigger, K8sTriggerEvent
+from robusta.model.playbook_definition import PlaybookDefinition
+from robusta.utils.prefix_trie import PrefixTrie
+
+
+class _TriggersBucket:
+    """The triggers of one (kind, operation), indexed by name prefix, namespace prefix and labels"""
+
+    def __init__(self):
+        self.__triggers: List[Tuple[int, Dict[str, str]]] = []  # trigger id to (playbook position, labels selector)
+        self.__names: PrefixTrie[int] = PrefixTrie()
+        self.__namespaces: PrefixTrie[int] = PrefixTrie()
+        # each trigger with a labels selector is indexed by one of the selector labels
+        self.__labels: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        self.__no_labels: List[int] = []
+
+    def add(self, position: int, trigger: K8sBaseTrigger):
+        trigger_id = len(self.__triggers)
+        labels_map: Dict[str, str] = getattr(trigger, "_labels_map", None) or {}
+        self.__triggers.append((position, labels_map))
+        self.__names.add(trigger.name_prefix or "", trigger_id)
+        self.__namespaces.add(trigger.namespace_prefix or "", trigger_id)
+        # a selector label with an empty value matches objects without that label, so it can't be indexed
+        indexed_label = next(((key, value) for key, value in labels_map.items() if value), None)
+        if indexed_label:
+            self.__labels[indexed_label].append(trigger_id)
+        else:
+            self.__no_labels.append(trigger_id)
+
+    def match(self, name: Optional[str], namespace: Optional[str], labels: Dict[str, str]) -> Iterator[int]:
+        """Positions of the playbooks with a trigger in this bucket matching the object"""
+        candidates: Set[int] = set(self.__names.match(name))
+        if candidates:
+            candidates.intersection_update(self.__namespaces.match(namespace))
+        if not candidates:
+            return
+
+        labels_candidates = set(self.__no_labels)
+        if self.__labels:
+            for label in labels.items():
+                labels_candidates.update(self.__labels.get(label, ()))
+        candidates.intersection_update(labels_candidates)
+
+        for trigger_id in candidates:
+            position, labels_map = self.__triggers[trigger_id]
+            if all(labels.get(key, "") == value for key, value in labels_map.items()):
+                yield position
+
+
+class K8sTriggerIndex:
+    """
+    Index of the playbooks triggered by k8s events.
+
+    The triggers are grouped by (kind, operation), and matched by name prefix, namespace prefix and labels
+    using precomputed tries and a labels index, so finding the playbooks of an event doesn't depend on the total
+    number of playbooks. The returned playbooks are candidates, in their original order. The triggers
+    `should_fire` still decides, since some triggers have additional conditions.
+    """
+
+    ANY_KIND = "Any"
+
+    def __init__(self, playbooks: List[PlaybookDefinition]):
+        self.__playbooks = playbooks
+        self.__buckets: Dict[Tuple[str, Optional[str]], _TriggersBucket] = defaultdict(_TriggersBucket)
+        self.__always: Set[int] = set()  # playbooks with k8s triggers that can't be indexed
+        for position, playbook in enumerate(playbooks):
+            for trigger_definition in playbook.triggers:
+                trigger = trigger_definition.get()
+                if trigger.get_trigger_event() != K8sTriggerEvent.__name__:
+                    continue
+                if isinstance(trigger, K8sBaseTrigger):
+                    operation = trigger.operation.value if trigger.operation else None
+                    self.__buckets[(trigger.kind, operation)].add(position, trigger)
+                else:
+                    self.__always.add(position)
+
+    def get_playbooks(self, k8s_payload: IncomingK8sEventPayload) -> List[PlaybookDefinition]:
+        metadata = k8s_payload.obj.get("metadata") or {}
+        name = metadata.get("name", "")
+        namespace = metadata.get("namespace", "")
+        labels = metadata.get("labels") or {}
+
+        positions = set(self.__always)
+        for kind in (k8s_payload.kind, self.ANY_KIND):
+            for operation in (k8s_payload.operation, None):
+                bucket = self.__buckets.get((kind, operation))
+                if bucket:
+                    positions.update(bucket.match(name, namespace, labels))
+
+        return [self.__playbooks[position] for position in sorted(positions)]
@@ -1,14 +1,17 @@
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any, Dict, List, NamedTuple, Optional, Type, Union
 
-from hikaru.model.rel_1_26 import DaemonSet, HorizontalPodAutoscaler, Job, Node, NodeList, StatefulSet
+from hikaru.model.rel_1_26 import DaemonSet, HorizontalPodAutoscaler, Job, Node, StatefulSet
 from pydantic.main import BaseModel
 
+from robusta.core.model.env_vars import ALERT_OBJECTS_LOADER_WORKERS
 from robusta.core.model.events import ExecutionBaseEvent
 from robusta.core.playbooks.base_trigger import BaseTrigger, TriggerEvent
 from robusta.core.reporting.base import Finding
 from robusta.integrations.helper import exact_match, prefix_match
 from robusta.integrations.kubernetes.custom_models import RobustaDeployment, RobustaJob, RobustaPod
+from robusta.integrations.kubernetes.objects_cache import k8s_objects_cache, nodes_ip_index
 from robusta.integrations.prometheus.models import PrometheusAlert, PrometheusKubernetesAlert
 from robusta.utils.cluster_provider_discovery import cluster_provider
 
@@ -111,15 +114,16 @@ class PrometheusAlertTriggers(BaseModel):
 
 
 class AlertEventBuilder:
+    # the alert k8s objects are loaded concurrently. Reads are shared by alerts of the same objects
+    __objects_loader = ThreadPoolExecutor(max_workers=ALERT_OBJECTS_LOADER_WORKERS, thread_name_prefix="alert-objects")
+
     @classmethod
     def __find_node_by_ip(cls, ip) -> Optional[Node]:
-        nodes: NodeList = NodeList.listNode().obj
-        for node in nodes.items:
-            addresses = [a.address for a in node.status.addresses]
-            logging.info(f"node {node.metadata.name} has addresses {addresses}")
-            if ip in addresses:
-                return node
-        return None
+        node_name = nodes_ip_index.find_node_name(ip)
+        if not node_name:
+            logging.info(f"No node with address {ip}")
+            return None
+        return k8s_objects_cache.read(Node, node_name)
 
     @classmethod
     def __load_node(cls, alert: PrometheusAlert, node_name: str) -> Optional[Node]:
@@ -129,11 +133,43 @@ class AlertEventBuilder:
             if ":" in node_name:
                 node = cls.__find_node_by_ip(node_name.split(":")[0])
             else:
-                node = Node().read(name=node_name)
+                node = k8s_objects_cache.read(Node, node_name)
         except Exception as e:
             logging.info(f"Error loading Node kubernetes object {alert}. error: {e}")
         return node
 
+    @classmethod
+    def __load_alert_node(cls, alert: PrometheusAlert) -> Optional[Node]:
+        labels = alert.labels
+        node = None
+        node_name = labels.get("node")
+        if node_name:
+            node = cls.__load_node(alert, node_name)
+
+        # we handle nodes differently than other resources
+        node_name = labels.get("instance", None)
+        job_name = labels.get("job", None)  # a prometheus "job" not a kubernetes "job" resource
+        # when the job_name is kube-state-metrics "instance" refers to the IP of kube-state-metrics not the node
+        # If the alert has pod, the 'instance' attribute contains the pod ip
+        if not node and node_name and job_name != "kube-state-metrics":
+            node = cls.__load_node(alert, node_name)
+        return node
+
+    @staticmethod
+    def __load_resource(mapping: ResourceMapping, resource_name: str, namespace: str, alert_name: str):
+        try:
+            resource = k8s_objects_cache.read(mapping.hikaru_class, resource_name, namespace)
+            logging.info(f"Loaded k8s {mapping.prometheus_label} {resource_name} for alert {alert_name}")
+            return resource
+        except Exception as e:
+            reason = getattr(e, "reason", "NA")
+            status = getattr(e, "status", 0)
+            logging.info(
+                f"Error loading kubernetes {mapping.attribute_name} {namespace}/{resource_name}. "
+                f"reason: {reason} status: {status}"
+            )
+            return None
+
     @staticmethod
     def _build_event_task(
         event: PrometheusTriggerEvent, sink_findings: Dict[str, List[Finding]]
@@ -148,36 +184,21 @@ class AlertEventBuilder:
         )
 
         namespace = labels.get("namespace", "default")
-
+        loader = AlertEventBuilder.__objects_loader
+        resources: Dict[str, Future] = {}
         for mapping in MAPPINGS:
-            try:
-                resource_name = labels.get(mapping.prometheus_label, None)
-                if not resource_name or "kube-state-metrics" in resource_name:
-                    continue
-                resource = mapping.hikaru_class().read(name=resource_name, namespace=namespace)
-                setattr(execution_event, mapping.attribute_name, resource)
-                logging.info(
-                    f"Loaded k8s {mapping.prometheus_label} {resource_name} for alert {execution_event.alert_name}"
-                )
-            except Exception as e:
-                reason = getattr(e, "reason", "NA")
-                status = getattr(e, "status", 0)
-                logging.info(
-                    f"Error loading kubernetes {mapping.attribute_name} {namespace}/{resource_name}. "
-                    f"reason: {reason} status: {status}"
-                )
-
-        node_name = labels.get("node")
-        if node_name:
-            execution_event.node = AlertEventBuilder.__load_node(execution_event.alert, node_name)
-
-        # we handle nodes differently than other resources
-        node_name = labels.get("instance", None)
-        job_name = labels.get("job", None)  # a prometheus "job" not a kubernetes "job" resource
-        # when the job_name is kube-state-metrics "instance" refers to the IP of kube-state-metrics not the node
-        # If the alert has pod, the 'instance' attribute contains the pod ip
-        if not execution_event.node and node_name and job_name != "kube-state-metrics":
-            execution_event.node = AlertEventBuilder.__load_node(execution_event.alert, node_name)
+            resource_name = labels.get(mapping.prometheus_label, None)
+            if not resource_name or "kube-state-metrics" in resource_name:
+                continue
+            resources[mapping.attribute_name] = loader.submit(
+                AlertEventBuilder.__load_resource, mapping, resource_name, namespace, execution_event.alert_name
+            )
+        node = loader.submit(AlertEventBuilder.__load_alert_node, execution_event.alert)
+
+        for attribute_name, resource in resources.items():
+            if resource.result() is not None:
+                setattr(execution_event, attribute_name, resource.result())
+        execution_event.node = node.result()
 
         return execution_event
 
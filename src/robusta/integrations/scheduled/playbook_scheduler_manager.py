@@ -8,3 +8,7 @@ class PlaybooksSchedulerManager(PlaybooksScheduler):
     def update(self, playbooks: List[PlaybookDefinition]):
         """Update the scheduler with the new deployed playbooks"""
         pass
+
+    def stop(self):
+        """Persist the scheduled jobs states on shutdown"""
+        pass
@@ -105,6 +105,9 @@ class PlaybooksSchedulerManagerImpl(PlaybooksSchedulerManager):
                     action_params=playbook_action.action_params,
                 )
 
+    def stop(self):
+        self.scheduler.stop()
+
     def __run_scheduled_task(self, runnable_params: dict, schedule_info: SchedulingInfo):
         scheduled_params = ScheduledIntegrationParams(**runnable_params)
 
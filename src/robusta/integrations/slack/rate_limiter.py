@@ -0,0 +1,158 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import prometheus_client
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web import SlackResponse
+
+from robusta.core.model.env_vars import SLACK_RATE_LIMIT_MAX_WAIT_SEC, SLACK_RATE_LIMIT_RETRIES
+
+slack_rate_limit_wait = prometheus_client.Histogram(
+    "slack_rate_limit_wait_seconds",
+    "Time slack api calls waited for the client side rate limit (seconds)",
+    labelnames=("method",),
+    buckets=(0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+slack_rate_limited_calls = prometheus_client.Counter(
+    "slack_rate_limited_calls", "Number of slack api calls rejected with a 429 response", labelnames=("method",)
+)
+slack_rate_limit_rejected_calls = prometheus_client.Counter(
+    "slack_rate_limit_rejected_calls",
+    "Number of slack api calls rejected by the client side rate limit, after waiting too long",
+    labelnames=("method",),
+)
+
+# calls per minute of the slack rate limits tiers https://api.slack.com/docs/rate-limits
+TIERS_CALLS_PER_MINUTE = {1: 1, 2: 20, 3: 50, 4: 100}
+METHODS_TIERS = {
+    "auth.test": 4,
+    "files.getUploadURLExternal": 4,
+    "files.completeUploadExternal": 4,
+    "files.info": 4,
+    "conversations.list": 2,
+    "users.list": 2,
+}
+DEFAULT_TIER = 3
+# chat.postMessage has a special limit, of about one message per second per channel, with short bursts
+POST_MESSAGE_METHOD = "chat.postMessage"
+POST_MESSAGE_BURST = 3
+
+
+class SlackRateLimitExceeded(Exception):
+    pass
+
+
+class _Bucket:
+    """
+    Token bucket, that lets calls go into debt. Each call reserves the next free slot, so waiting calls are served
+    in order, and a burst of calls is spread over time. Calls that would wait longer than max_wait are rejected
+    """
+
+    def __init__(self, calls_per_sec: float, capacity: int):
+        self.calls_per_sec = calls_per_sec
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def reserve(self, now: float, max_wait: float) -> Optional[float]:
+        """Take a token, and return how long to wait before using it. None, without a token, if it's over max_wait"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.calls_per_sec)
+        self.updated = now
+        tokens = self.tokens - 1
+        wait = max(-tokens / self.calls_per_sec if tokens < 0 else 0, self.paused_until - now)
+        if wait > max_wait:
+            return None
+        self.tokens = tokens
+        return wait
+
+
+class SlackRateLimiter:
+    """
+    Client side slack rate limits, per api method, and per channel for chat.postMessage.
+    The limits apply per token, so one limiter is shared by all the clients of the same token.
+    """
+
+    __token_limiters: Dict[str, "SlackRateLimiter"] = {}
+    __token_limiters_lock = threading.Lock()
+
+    def __init__(self, max_wait_sec: float = SLACK_RATE_LIMIT_MAX_WAIT_SEC):
+        self.max_wait_sec = max_wait_sec
+        self.__lock = threading.Lock()
+        self.__buckets: Dict[Tuple[str, Optional[str]], _Bucket] = {}
+
+    @classmethod
+    def for_token(cls, token: str) -> "SlackRateLimiter":
+        with cls.__token_limiters_lock:
+            limiter = cls.__token_limiters.get(token)
+            if limiter is None:
+                limiter = cls()
+                cls.__token_limiters[token] = limiter
+            return limiter
+
+    def acquire(self, method: str, channel: Optional[str] = None):
+        """Wait until the method can be called. Raises SlackRateLimitExceeded if it's longer than max_wait_sec"""
+        with self.__lock:
+            wait = self.__bucket(method, channel).reserve(time.monotonic(), self.max_wait_sec)
+        if wait is None:
+            slack_rate_limit_rejected_calls.labels(method).inc()
+            raise SlackRateLimitExceeded(f"Slack {method} calls are rate limited for over {self.max_wait_sec} seconds")
+        if wait > 0:
+            slack_rate_limit_wait.labels(method).observe(wait)
+            time.sleep(wait)
+
+    def pause(self, method: str, channel: Optional[str], seconds: float):
+        """Hold the method calls, after slack rejected a call with Retry-After"""
+        with self.__lock:
+            bucket = self.__bucket(method, channel)
+            bucket.paused_until = max(bucket.paused_until, time.monotonic() + seconds)
+
+    def __bucket(self, method: str, channel: Optional[str]) -> _Bucket:
+        key = (method, channel if method == POST_MESSAGE_METHOD else None)
+        bucket = self.__buckets.get(key)
+        if bucket is None:
+            if method == POST_MESSAGE_METHOD:
+                bucket = _Bucket(calls_per_sec=1, capacity=POST_MESSAGE_BURST)
+            else:
+                calls_per_minute = TIERS_CALLS_PER_MINUTE[METHODS_TIERS.get(method, DEFAULT_TIER)]
+                bucket = _Bucket(calls_per_sec=calls_per_minute / 60, capacity=max(1, calls_per_minute // 10))
+            self.__buckets[key] = bucket
+        return bucket
+
+
+class RateLimitedWebClient(WebClient):
+    """
+    Slack WebClient, that waits for the client side rate limit before each api call.
+    Calls rejected with 429 pause the method calls for Retry-After seconds, and are retried
+    """
+
+    def __init__(self, *args, rate_limiter: SlackRateLimiter, max_retries: int = SLACK_RATE_LIMIT_RETRIES, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+
+    def api_call(self, api_method: str, **kwargs) -> SlackResponse:
+        channel = self.__channel(kwargs)
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(api_method, channel)
+            try:
+                return super().api_call(api_method, **kwargs)
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                retry_after = float(e.response.headers.get("Retry-After", 1))
+                slack_rate_limited_calls.labels(api_method).inc()
+                logging.warning(f"Slack rate limited {api_method}. Retrying in {retry_after} seconds")
+                self.rate_limiter.pause(api_method, channel, retry_after)
+
+    @staticmethod
+    def __channel(kwargs: Dict[str, Any]) -> Optional[str]:
+        for args in [kwargs.get("json"), kwargs.get("data"), kwargs.get("params")]:
+            if isinstance(args, dict) and args.get("channel"):
+                return args["channel"]
+        return None
@@ -1,13 +1,18 @@
 import logging
 import ssl
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Set
 
 import certifi
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
-from robusta.core.model.env_vars import ADDITIONAL_CERTIFICATE, SLACK_TABLE_COLUMNS_LIMIT
+from robusta.core.model.env_vars import (
+    ADDITIONAL_CERTIFICATE,
+    SLACK_RATE_LIMIT_ENABLED,
+    SLACK_TABLE_COLUMNS_LIMIT,
+    SLACK_UPLOAD_WORKERS,
+)
 from robusta.core.reporting.base import Emojis, Finding, FindingStatus
 from robusta.core.reporting.blocks import (
     BaseBlock,
@@ -29,12 +34,16 @@ from robusta.core.reporting.consts import EnrichmentAnnotation, FindingSource, S
 from robusta.core.reporting.utils import add_pngs_for_all_svgs
 from robusta.core.sinks.slack.slack_sink_params import SlackSinkParams
 from robusta.core.sinks.transformer import Transformer
+from robusta.integrations.slack.rate_limiter import RateLimitedWebClient, SlackRateLimiter
 
 ACTION_TRIGGER_PLAYBOOK = "trigger_playbook"
 ACTION_LINK = "link"
 SlackBlock = Dict[str, Any]
 MAX_BLOCK_CHARS = 3000
 
+# shared by all the slack senders. Threads are created on demand
+upload_executor = ThreadPoolExecutor(max_workers=SLACK_UPLOAD_WORKERS, thread_name_prefix="slack-upload")
+
 
 class SlackSender:
     verified_api_tokens: Set[str] = set()
@@ -51,7 +60,12 @@ class SlackSender:
             except Exception as e:
                 logging.exception(f"Failed to use custom certificate. {e}")
 
-        self.slack_client = WebClient(token=slack_token, ssl=ssl_context)
+        if SLACK_RATE_LIMIT_ENABLED:
+            self.slack_client = RateLimitedWebClient(
+                token=slack_token, ssl=ssl_context, rate_limiter=SlackRateLimiter.for_token(slack_token)
+            )
+        else:
+            self.slack_client = WebClient(token=slack_token, ssl=ssl_context)
         self.signing_key = signing_key
         self.account_id = account_id
         self.cluster_name = cluster_name
@@ -194,14 +208,12 @@ class SlackSender:
             return []  # no reason to crash the entire report
 
     def __upload_file_to_slack(self, block: FileBlock, max_log_file_limit_kb: int) -> str:
-        truncated_content = block.truncate_content(max_file_size_bytes=max_log_file_limit_kb * 1000)
-
         """Upload a file to slack and return a link to it"""
-        with tempfile.NamedTemporaryFile() as f:
-            f.write(truncated_content)
-            f.flush()
-            result = self.slack_client.files_upload_v2(title=block.filename, file=f.name, filename=block.filename)
-            return result["file"]["permalink"]
+        truncated_content = block.truncate_content(max_file_size_bytes=max_log_file_limit_kb * 1000)
+        result = self.slack_client.files_upload_v2(
+            title=block.filename, content=truncated_content, filename=block.filename
+        )
+        return result["file"]["permalink"]
 
     def prepare_slack_text(self, message: str, max_log_file_limit_kb: int, files: List[FileBlock] = []):
         if files:
@@ -209,13 +221,20 @@ class SlackSender:
             # in order to be actually shared. well, I'm actually not sure about that, but when I tried adding the files
             # to a separate block and not including them in `title` or the first block then the link was present but
             # the file wasn't actually shared and the link was broken
-            uploaded_files = []
-            for file_block in files:
-                # slack throws an error if you write empty files, so skip it
-                if len(file_block.contents) == 0:
-                    continue
-                permalink = self.__upload_file_to_slack(file_block, max_log_file_limit_kb=max_log_file_limit_kb)
-                uploaded_files.append(f"* <{permalink} | {file_block.filename}>")
+            # slack throws an error if you write empty files, so skip it
+            files = [file_block for file_block in files if len(file_block.contents) > 0]
+            # the files are uploaded concurrently, and referenced in the original order
+            if len(files) > 1:
+                permalinks = list(
+                    upload_executor.map(
+                        lambda file_block: self.__upload_file_to_slack(file_block, max_log_file_limit_kb), files
+                    )
+                )
+            else:
+                permalinks = [self.__upload_file_to_slack(file_block, max_log_file_limit_kb) for file_block in files]
+            uploaded_files = [
+                f"* <{permalink} | {file_block.filename}>" for permalink, file_block in zip(permalinks, files)
+            ]
 
             file_references = "\n".join(uploaded_files)
             message = f"{message}\n{file_references}"
@@ -10,6 +10,8 @@ from robusta.core.sinks.robusta.robusta_sink_params import RobustaSinkConfigWrap
 from robusta.core.sinks.sink_base import SinkBase
 from robusta.core.sinks.sink_config import SinkConfigBase
 from robusta.core.sinks.sink_factory import SinkFactory
+from robusta.integrations.kubernetes.base_triggers import K8sTriggerEvent
+from robusta.integrations.kubernetes.trigger_index import K8sTriggerIndex
 from robusta.integrations.receiver import ActionRequestReceiver
 from robusta.integrations.scheduled.playbook_scheduler_manager import PlaybooksSchedulerManager
 from robusta.model.alert_relabel_config import AlertRelabel
@@ -134,7 +136,12 @@ class PlaybooksRegistryImpl(PlaybooksRegistry):
             for event in playbooks_trigger_events:
                 self.triggers_to_playbooks[event].append(playbook_def)
 
+        # k8s events are the most frequent ones. Their playbooks are found using an index
+        self.k8s_trigger_index = K8sTriggerIndex(self.triggers_to_playbooks.get(K8sTriggerEvent.__name__, []))
+
     def get_playbooks(self, trigger_event: TriggerEvent) -> List[PlaybookDefinition]:
+        if isinstance(trigger_event, K8sTriggerEvent):
+            return self.k8s_trigger_index.get_playbooks(trigger_event.k8s_payload)
         return self.triggers_to_playbooks.get(trigger_event.get_event_name(), [])
 
     def get_default_sinks(self) -> List[str]:
@@ -8,8 +8,9 @@ import subprocess
 import sys
 import threading
 from inspect import getmembers
-from typing import Dict, Optional
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 
+import prometheus_client
 import yaml
 
 from robusta.cli.utils import get_package_name
@@ -37,8 +38,18 @@ from robusta.integrations.scheduled.trigger import ScheduledTriggerEvent
 from robusta.model.config import PlaybooksRegistry, PlaybooksRegistryImpl, Registry, SinksRegistry
 from robusta.model.playbook_definition import PlaybookDefinition
 from robusta.utils.cluster_provider_discovery import cluster_provider
+from robusta.utils.directory_hash import directory_content_hash
 from robusta.utils.file_system_watcher import FileSystemWatcher
 
+reload_phase_duration = prometheus_client.Summary(
+    "config_reload_phase_seconds", "Config reload duration, per reload phase (seconds)", labelnames=("phase",)
+)
+
+
+class LoadedPackage(NamedTuple):
+    content_hash: Optional[str]
+    actions: List[Callable]
+
 
 class ConfigLoader:
     # the structure on disk is:
@@ -59,6 +70,9 @@ class ConfigLoader:
         self.event_handler = event_handler
         self.root_playbook_path = PLAYBOOKS_ROOT
         self.reload_lock = threading.RLock()
+        # used to skip installing and importing playbooks packages that didn't change since the previous reload
+        self.__installed_repos: Dict[str, str] = {}  # local path to content hash
+        self.__loaded_packages: Dict[str, LoadedPackage] = {}
         self.watcher = FileSystemWatcher(self.root_playbook_path, self.__reload_playbook_packages)
         self.conf_watcher = FileSystemWatcher(self.config_file_path, self.__reload_playbook_packages)
         self.__reload_playbook_packages("initialization")
@@ -104,9 +118,31 @@ class ConfigLoader:
         actions_registry: ActionsRegistry,
         playbooks_repos: Dict[str, PlaybookRepo],
     ):
+        with reload_phase_duration.labels("install").time():
+            playbook_packages = self.__install_playbooks_repos(playbooks_repos)
+
+        with reload_phase_duration.labels("import").time():
+            # packages may use the packages loaded before them, so once a package is reloaded, the next ones are too
+            reload_next = False
+            for package_name, content_hash in playbook_packages:
+                content_hash = content_hash or self.__get_package_content_hash(package_name)
+                loaded = self.__loaded_packages.get(package_name)
+                if not reload_next and loaded and content_hash and loaded.content_hash == content_hash:
+                    logging.info(f"Actions package {package_name} didn't change. Skipping import")
+                else:
+                    reload_next = True
+                    loaded = LoadedPackage(content_hash, self.__import_playbooks_package(package_name))
+                    self.__loaded_packages[package_name] = loaded
+
+                for action_func in loaded.actions:
+                    actions_registry.add_action(action_func)
+
+    def __install_playbooks_repos(self, playbooks_repos: Dict[str, PlaybookRepo]) -> List[Tuple[str, Optional[str]]]:
+        """Returns the playbooks packages names, with their content hash if known"""
         playbook_packages = []
         for playbook_package, playbooks_repo in playbooks_repos.items():
             try:
+                content_hash = None
                 if playbooks_repo.pip_install:  # skip playbooks that are already in site-packages
                     if playbooks_repo.url.startswith(GIT_SSH_PREFIX) or playbooks_repo.url.startswith(GIT_HTTPS_PREFIX):
                         repo = GitRepo(playbooks_repo.url, playbooks_repo.key.get_secret_value(), playbooks_repo.branch)
@@ -123,23 +159,39 @@ class ConfigLoader:
                         logging.error(f"Playbooks local path {local_path} does not exist. Skipping")
                         continue
 
-                    # Adding to pip the playbooks repo from local_path
-                    subprocess.check_call([sys.executable, "-m", "pip", "install", "--no-build-isolation", local_path])
+                    content_hash = directory_content_hash(local_path)
+                    if self.__installed_repos.get(local_path) == content_hash:
+                        logging.info(f"Playbooks repo {local_path} didn't change. Skipping pip install")
+                    else:
+                        # Adding to pip the playbooks repo from local_path
+                        subprocess.check_call(
+                            [sys.executable, "-m", "pip", "install", "--no-build-isolation", local_path]
+                        )
+                        self.__installed_repos[local_path] = content_hash
                     playbook_package = self.__get_package_name(local_path=local_path)
 
-                playbook_packages.append(playbook_package)
+                playbook_packages.append((playbook_package, content_hash))
             except Exception:
                 logging.error(f"Failed to add playbooks repo {playbook_package}", exc_info=True)
+        return playbook_packages
 
-        for package_name in playbook_packages:
-            self.__import_playbooks_package(actions_registry, package_name)
+    @classmethod
+    def __get_package_content_hash(cls, package_name: str) -> Optional[str]:
+        try:
+            spec = importlib.util.find_spec(package_name)
+            if spec and spec.submodule_search_locations:
+                return directory_content_hash(*spec.submodule_search_locations)
+        except Exception:
+            logging.warning(f"Failed to calculate the content hash of actions package {package_name}", exc_info=True)
+        return None
 
     @classmethod
-    def __import_playbooks_package(cls, actions_registry: ActionsRegistry, package_name: str):
+    def __import_playbooks_package(cls, package_name: str) -> List[Callable]:
         logging.info(f"Importing actions package {package_name}")
         # Reload is required for modules that are already loaded
         pkg = importlib.reload(importlib.import_module(package_name))
         playbooks_modules = [name for _, name, _ in pkgutil.walk_packages(path=pkg.__path__)]
+        actions: List[Callable] = []
         for playbooks_module in playbooks_modules:
             try:
                 module_name = ".".join([package_name, playbooks_module])
@@ -147,16 +199,17 @@ class ConfigLoader:
                 # Reload is required for modules that are already loaded
                 m = importlib.reload(importlib.import_module(module_name))
                 playbook_actions = getmembers(m, Action.is_action)
-                for action_name, action_func in playbook_actions:
-                    actions_registry.add_action(action_func)
+                actions.extend(action_func for _, action_func in playbook_actions)
             except Exception:
                 logging.error(f"failed to module {playbooks_module}", exc_info=True)
+        return actions
 
     def __reload_playbook_packages(self, change_name):
         logging.info(f"Reloading playbook packages due to change on {change_name}")
-        with self.reload_lock:
+        with self.reload_lock, reload_phase_duration.labels("total").time():
             try:
-                runner_config = self.__load_runner_config(self.config_file_path)
+                with reload_phase_duration.labels("config").time():
+                    runner_config = self.__load_runner_config(self.config_file_path)
                 if runner_config is None:
                     return
                 cluster_provider.init_provider_discovery()
@@ -210,7 +263,8 @@ class ConfigLoader:
                 # clear git repos, so it would be re-initialized
                 GitRepoManager.clear_git_repos()
 
-                self.__reload_scheduler(playbooks_registry)
+                with reload_phase_duration.labels("scheduler").time():
+                    self.__reload_scheduler(playbooks_registry)
                 self.registry.set_actions(action_registry)
                 self.registry.set_playbooks(playbooks_registry)
                 self.registry.set_sinks(sinks_registry)
@@ -241,9 +295,11 @@ class ConfigLoader:
         actions_registry: ActionsRegistry,
         registry: Registry,
     ) -> (SinksRegistry, PlaybooksRegistry):
-        existing_sinks = sinks_registry.get_all() if sinks_registry else {}
-        new_sinks = SinksRegistry.construct_new_sinks(runner_config.sinks_config, existing_sinks, registry)
-        sinks_registry = SinksRegistry(new_sinks)
+        with reload_phase_duration.labels("sinks").time():
+            # only new sinks, and sinks with changed params, are created
+            existing_sinks = sinks_registry.get_all() if sinks_registry else {}
+            new_sinks = SinksRegistry.construct_new_sinks(runner_config.sinks_config, existing_sinks, registry)
+            sinks_registry = SinksRegistry(new_sinks)
 
         # TODO we will replace it with a more generic mechanism, as part of the triggers separation task
         # First, we load the internal playbooks, then add the user activated playbooks
@@ -265,12 +321,13 @@ class ConfigLoader:
         else:
             logging.warning("No active playbooks configured")
 
-        playbooks_registry = PlaybooksRegistryImpl(
-            active_playbooks,
-            actions_registry,
-            runner_config.global_config,
-            sinks_registry.default_sinks,
-        )
+        with reload_phase_duration.labels("playbooks").time():
+            playbooks_registry = PlaybooksRegistryImpl(
+                active_playbooks,
+                actions_registry,
+                runner_config.global_config,
+                sinks_registry.default_sinks,
+            )
 
         return sinks_registry, playbooks_registry
 
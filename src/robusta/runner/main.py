@@ -2,12 +2,14 @@ import signal
 
 from robusta.core.model.env_vars import (
     ADDITIONAL_CERTIFICATE,
+    DEBUGGER_POD_POOL_ENABLED,
     ENABLE_TELEMETRY,
     ROBUSTA_TELEMETRY_ENDPOINT,
     SEND_ADDITIONAL_TELEMETRY,
     TELEMETRY_PERIODIC_SEC,
 )
 from robusta.core.playbooks.playbooks_event_handler_impl import PlaybooksEventHandlerImpl
+from robusta.integrations.kubernetes.custom_models import RobustaPod
 from robusta.model.config import Registry
 from robusta.patch.patch import create_monkey_patches
 from robusta.runner.config_loader import ConfigLoader
@@ -27,6 +29,8 @@ def main():
         logging.info("added custom certificate")
 
     create_monkey_patches()
+    if DEBUGGER_POD_POOL_ENABLED:
+        RobustaPod.delete_orphaned_debugger_pods()
     registry = Registry()
     event_handler = PlaybooksEventHandlerImpl(registry)
     loader = ConfigLoader(registry, event_handler)
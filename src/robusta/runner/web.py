@@ -1,27 +1,39 @@
 import logging
 from datetime import datetime
+from typing import Optional, Tuple, Union
 
 from flask import Flask, abort, jsonify, request
 from prometheus_client import make_wsgi_app
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
 
-from robusta.core.model.env_vars import NUM_EVENT_THREADS, PORT, TRACE_INCOMING_ALERTS, TRACE_INCOMING_REQUESTS
+from robusta.core.model.env_vars import (
+    INCOMING_EVENTS_COALESCE_WINDOW_SEC,
+    INCOMING_EVENTS_KEYED_QUEUE,
+    NUM_EVENT_THREADS,
+    PORT,
+    TRACE_INCOMING_ALERTS,
+    TRACE_INCOMING_REQUESTS,
+)
+from robusta.core.model.k8s_operation_type import K8sOperationType
 from robusta.core.playbooks.playbooks_event_handler import PlaybooksEventHandler
 from robusta.core.triggers.helm_releases_triggers import HelmReleasesTriggerEvent, IncomingHelmReleasesEventPayload
 from robusta.integrations.kubernetes.base_triggers import IncomingK8sEventPayload, K8sTriggerEvent
+from robusta.integrations.kubernetes.event_coalescer import K8sEventCoalescer, k8s_object_key, merge_k8s_updates
+from robusta.integrations.kubernetes.objects_cache import k8s_objects_cache, nodes_ip_index
 from robusta.integrations.prometheus.models import AlertManagerEvent, PrometheusAlert
 from robusta.integrations.prometheus.trigger import PrometheusTriggerEvent
 from robusta.model.alert_relabel_config import AlertRelabelOp
 from robusta.runner.config_loader import ConfigLoader
-from robusta.utils.task_queue import QueueMetrics, TaskQueue
+from robusta.utils.task_queue import KeyedTaskQueue, QueueMetrics, TaskKey, TaskPriority, TaskQueue
 
 app = Flask(__name__)
 app.wsgi_app = DispatcherMiddleware(app.wsgi_app, {"/metrics": make_wsgi_app()})
 
 
 class Web:
-    api_server_queue: TaskQueue
-    alerts_queue: TaskQueue
+    api_server_queue: Union[TaskQueue, KeyedTaskQueue]
+    alerts_queue: Union[TaskQueue, KeyedTaskQueue]
+    k8s_event_coalescer: Optional[K8sEventCoalescer] = None
     event_handler: PlaybooksEventHandler
     metrics: QueueMetrics
     loader: ConfigLoader
@@ -29,8 +41,21 @@ class Web:
     @staticmethod
     def init(event_handler: PlaybooksEventHandler, loader: ConfigLoader):
         Web.metrics = QueueMetrics()
-        Web.api_server_queue = TaskQueue(name="api_server_queue", num_workers=NUM_EVENT_THREADS, metrics=Web.metrics)
-        Web.alerts_queue = TaskQueue(name="alerts_queue", num_workers=NUM_EVENT_THREADS, metrics=Web.metrics)
+        if INCOMING_EVENTS_KEYED_QUEUE:
+            Web.api_server_queue = KeyedTaskQueue(
+                name="api_server_queue",
+                num_workers=NUM_EVENT_THREADS,
+                metrics=Web.metrics,
+                merge_args=Web._merge_k8s_updates,
+            )
+            Web.alerts_queue = KeyedTaskQueue(name="alerts_queue", num_workers=NUM_EVENT_THREADS, metrics=Web.metrics)
+        else:
+            Web.api_server_queue = TaskQueue(
+                name="api_server_queue", num_workers=NUM_EVENT_THREADS, metrics=Web.metrics
+            )
+            Web.alerts_queue = TaskQueue(name="alerts_queue", num_workers=NUM_EVENT_THREADS, metrics=Web.metrics)
+        if INCOMING_EVENTS_COALESCE_WINDOW_SEC > 0:
+            Web.k8s_event_coalescer = K8sEventCoalescer(INCOMING_EVENTS_COALESCE_WINDOW_SEC, Web._queue_k8s_event)
         Web.event_handler = event_handler
         Web.loader = loader
 
@@ -57,7 +82,11 @@ class Web:
         alert_manager_event = AlertManagerEvent(**req_json)
         for alert in alert_manager_event.alerts:
             alert = Web._relabel_alert(alert)
-            Web.alerts_queue.add_task(Web.event_handler.handle_trigger, PrometheusTriggerEvent(alert=alert))
+            Web.alerts_queue.add_keyed_task(
+                TaskKey(key=alert.fingerprint or None, priority=TaskPriority.HIGH),
+                Web.event_handler.handle_trigger,
+                PrometheusTriggerEvent(alert=alert),
+            )
 
         Web.event_handler.get_telemetry().last_alert_at = str(datetime.now())
         return jsonify(success=True)
@@ -81,9 +110,38 @@ class Web:
         data = request.get_json()["data"]
         Web._trace_incoming("api server", data)
         k8s_payload = IncomingK8sEventPayload(**data)
-        Web.api_server_queue.add_task(Web.event_handler.handle_trigger, K8sTriggerEvent(k8s_payload=k8s_payload))
+        # keep the objects loaded for alerts fresh
+        k8s_objects_cache.on_k8s_event(k8s_payload)
+        nodes_ip_index.on_k8s_event(k8s_payload)
+        if Web.k8s_event_coalescer:
+            Web.k8s_event_coalescer.add(k8s_payload)
+        else:
+            Web._queue_k8s_event(k8s_payload)
         return jsonify(success=True)
 
+    @staticmethod
+    def _queue_k8s_event(k8s_payload: IncomingK8sEventPayload):
+        Web.api_server_queue.add_keyed_task(
+            Web._k8s_task_key(k8s_payload), Web.event_handler.handle_trigger, K8sTriggerEvent(k8s_payload=k8s_payload)
+        )
+
+    @staticmethod
+    def _k8s_task_key(k8s_payload: IncomingK8sEventPayload) -> TaskKey:
+        """Updates are the most frequent and the least urgent events. A pending update is superseded by the next one"""
+        is_update = k8s_payload.operation == K8sOperationType.UPDATE.value
+        return TaskKey(
+            key=k8s_object_key(k8s_payload),
+            priority=TaskPriority.LOW if is_update else TaskPriority.NORMAL,
+            coalesce=is_update,
+        )
+
+    @staticmethod
+    def _merge_k8s_updates(pending_args: Tuple, new_args: Tuple) -> Tuple:
+        pending_event: K8sTriggerEvent = pending_args[0]
+        new_event: K8sTriggerEvent = new_args[0]
+        merge_k8s_updates(pending_event.k8s_payload, new_event.k8s_payload)
+        return new_args
+
     @staticmethod
     @app.route("/api/trigger", methods=["POST"])
     def handle_manual_trigger():
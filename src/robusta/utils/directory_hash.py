@@ -0,0 +1,26 @@
+import hashlib
+import os
+
+# generated directories and files, that don't change the directory content
+SKIPPED_DIRS = {".git", "__pycache__", "build", "dist"}
+SKIPPED_SUFFIXES = (".pyc", ".pyo", ".egg-info")
+
+
+def directory_content_hash(*paths: str) -> str:
+    """
+    Hash of the files names and contents under the given directories.
+    Changes when a file is added, removed, renamed or modified.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRS and not d.endswith(SKIPPED_SUFFIXES))
+            for file_name in sorted(files):
+                if file_name.endswith(SKIPPED_SUFFIXES):
+                    continue
+                file_path = os.path.join(root, file_name)
+                digest.update(f"{os.path.relpath(file_path, path)}\0{os.path.getsize(file_path)}\0".encode())
+                with open(file_path, "rb") as file:
+                    for chunk in iter(lambda: file.read(65536), b""):
+                        digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,141 @@
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class PrefixTrie(Generic[T]):
+    """
+    Maps string prefixes to values.
+    Finding the values of all the prefixes of a string takes O(len(string)), regardless of the number of prefixes.
+    """
+
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children: Dict[str, "PrefixTrie[T]"] = {}
+        self.values: List[T] = []
+
+    def add(self, prefix: str, value: T):
+        node = self
+        for char in prefix:
+            child = node.children.get(char)
+            if child is None:
+                child = PrefixTrie()
+                node.children[char] = child
+            node = child
+        node.values.append(value)
+
+    def match(self, text: Optional[str]) -> List[T]:
+        """Values of all the prefixes of text, shortest prefix first. The values of the empty prefix always match"""
+        matches = list(self.values)
+        node = self
+        for char in text or "":
+            node = node.children.get(char)
+            if node is None:
+                break
+            matches.extend(node.values)
+        return matches
+
+
+class RadixTrie(Generic[T]):
+    """
+    Compressed prefix trie, mapping keys to values. Edges are labeled with strings instead of single characters,
+    so the trie has less than two nodes per key.
+    Finding the longest key that is a prefix of a string takes O(len(string)), regardless of the number of keys.
+    Lookups can run concurrently with a single writer, since each change replaces a child edge or a values list in
+    one assignment. Values lists are never changed in place.
+    """
+
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        # first character of the edge label -> (edge label, child)
+        self.children: Dict[str, Tuple[str, "RadixTrie[T]"]] = {}
+        self.values: List[T] = []
+
+    def add(self, key: str, value: T):
+        """Add a value of the key. Values already stored for the key are not added again"""
+        node = self
+        while key:
+            edge = node.children.get(key[0])
+            if edge is None:
+                child = RadixTrie()
+                node.children[key[0]] = (key, child)
+                node = child
+                break
+
+            label, child = edge
+            common = _common_prefix_length(label, key)
+            if common < len(label):
+                # split the edge. The new middle node is complete before it's linked
+                middle = RadixTrie()
+                middle.children[label[common]] = (label[common:], child)
+                node.children[key[0]] = (label[:common], middle)
+                child = middle
+            node = child
+            key = key[common:]
+
+        if value not in node.values:
+            node.values = node.values + [value]
+
+    def remove(self, key: str, value: T) -> bool:
+        """Remove a value of the key. Returns False if the key doesn't have this value"""
+        path: List[Tuple["RadixTrie[T]", str]] = []  # (parent, first character of the edge)
+        node = self
+        while key:
+            edge = node.children.get(key[0])
+            if edge is None or not key.startswith(edge[0]):
+                return False
+            path.append((node, key[0]))
+            node = edge[1]
+            key = key[len(edge[0]) :]
+
+        if value not in node.values:
+            return False
+        node.values = [node_value for node_value in node.values if node_value != value]
+        if node.values or not path:
+            return True
+
+        # prune the node, or merge it with its only child, so the trie stays compressed
+        parent, char = path[-1]
+        label = parent.children[char][0]
+        if len(node.children) == 1:
+            ((child_label, child),) = node.children.values()
+            parent.children[char] = (label + child_label, child)
+        elif not node.children:
+            del parent.children[char]
+            if len(path) > 1 and not parent.values and len(parent.children) == 1:
+                grandparent, parent_char = path[-2]
+                parent_label = grandparent.children[parent_char][0]
+                ((child_label, child),) = parent.children.values()
+                grandparent.children[parent_char] = (parent_label + child_label, child)
+        return True
+
+    def longest_match(self, text: Optional[str]) -> Optional[T]:
+        """The first value of the longest key that is a prefix of text"""
+        text = text or ""
+        values = self.values
+        match = values[0] if values else None
+        node = self
+        position = 0
+        while position < len(text):
+            edge = node.children.get(text[position])
+            if edge is None:
+                break
+            label, node = edge
+            if not text.startswith(label, position):
+                break
+            position += len(label)
+            # read once, the writer may replace the list between reads
+            values = node.values
+            if values:
+                match = values[0]
+        return match
+
+
+def _common_prefix_length(first: str, second: str) -> int:
+    length = min(len(first), len(second))
+    for index in range(length):
+        if first[index] != second[index]:
+            return index
+    return length
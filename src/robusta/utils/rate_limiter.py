@@ -1,29 +1,111 @@
 import logging
 import threading
-from collections import defaultdict
-from datetime import datetime
+import time
+from collections import OrderedDict
+from typing import List, Tuple
+
+import prometheus_client
+
+from robusta.core.model.env_vars import RATE_LIMITER_MAX_KEYS, RATE_LIMITER_SHARDS
+
+rate_limiter_keys = prometheus_client.Gauge("rate_limiter_keys", "Current number of rate limited operation keys")
+rate_limiter_checks = prometheus_client.Counter(
+    "rate_limiter_checks", "Number of rate limited operations, allowed or limited", labelnames=("result",)
+)
+rate_limiter_evictions = prometheus_client.Counter(
+    "rate_limiter_evictions", "Number of rate limited operation keys evicted before they expired"
+)
+
+
+class _Bucket:
+    """Token bucket of one key. Refilled with max_calls tokens every period"""
+
+    __slots__ = ("tokens", "updated", "expires")
+
+    def __init__(self, tokens: float, updated: float, expires: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.expires = expires
+
+
+class _Shard:
+    """
+    Buckets of some of the keys, by last use. A bucket is full again one period after its last use, so it expires
+    then, and is evicted. Above max_keys, the least recently used buckets are evicted
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.buckets: "OrderedDict[Tuple[str, str], _Bucket]" = OrderedDict()
+
+    def mark_and_test(self, key: Tuple[str, str], period_seconds: float, max_calls: int, now: float) -> bool:
+        with self.lock:
+            self.__evict(now)
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = _Bucket(tokens=max_calls, updated=now, expires=now)
+                self.buckets[key] = bucket
+            else:
+                bucket.tokens = min(max_calls, bucket.tokens + (now - bucket.updated) * max_calls / period_seconds)
+                bucket.updated = now
+                self.buckets.move_to_end(key)
+
+            if bucket.tokens < 1:
+                return False
+            bucket.tokens -= 1
+            bucket.expires = now + period_seconds
+            return True
+
+    def __evict(self, now: float):
+        # the front buckets are the least recently used. Stop at the first one that didn't expire
+        while self.buckets:
+            key, bucket = next(iter(self.buckets.items()))
+            if bucket.expires > now and len(self.buckets) < self.max_keys:
+                return
+            if bucket.expires > now:
+                rate_limiter_evictions.inc()
+            del self.buckets[key]
 
 
 class RateLimiter:
+    """
+    Rate limits operations per id, process wide.
 
-    limiter_lock = threading.Lock()
-    limiter_map = defaultdict(None)
+    Keys are spread over lock striped shards, so concurrent operations rarely wait for each other. The state of a key
+    is dropped once it can't limit anything anymore, and the least recently used keys are evicted above
+    RATE_LIMITER_MAX_KEYS, so the memory is bounded.
+    """
+
+    shards: List[_Shard] = [
+        _Shard(max_keys=max(1, RATE_LIMITER_MAX_KEYS // RATE_LIMITER_SHARDS)) for _ in range(RATE_LIMITER_SHARDS)
+    ]
 
     @staticmethod
-    def mark_and_test(operation: str, id: str, period_seconds: int) -> bool:
-        with RateLimiter.limiter_lock:
-            limiter_key = operation + id
-            last_run = RateLimiter.limiter_map.get(limiter_key)
-            curr_seconds = datetime.utcnow().timestamp()
-            if last_run:
-                if curr_seconds - last_run > period_seconds:
-                    RateLimiter.limiter_map[limiter_key] = curr_seconds
-                    logging.debug(f"rate limited operation is allowed because enough time has passed: {limiter_key}")
-                    return True
-                else:
-                    logging.debug(f"rate limited operation is NOT allowed: {limiter_key}")
-                    return False
-            else:
-                logging.debug(f"rate limited operation is allowed because it is the first time: {limiter_key}")
-                RateLimiter.limiter_map[limiter_key] = curr_seconds
-                return True
+    def mark_and_test(operation: str, id: str, period_seconds: int, max_calls: int = 1) -> bool:
+        """
+        Returns True if the operation is allowed, and counts it.
+        By default, the operation is allowed once per period_seconds. With max_calls, up to max_calls operations
+        are allowed per period_seconds, with token bucket semantics, so unused calls don't accumulate over max_calls
+        """
+        limiter_key = (operation, id)
+        if period_seconds <= 0:
+            allowed = True
+        else:
+            shard = RateLimiter.shards[hash(limiter_key) % len(RateLimiter.shards)]
+            allowed = shard.mark_and_test(limiter_key, period_seconds, max_calls, time.monotonic())
+
+        if allowed:
+            logging.debug(f"rate limited operation is allowed: {operation}{id}")
+            rate_limiter_checks.labels("allowed").inc()
+        else:
+            logging.debug(f"rate limited operation is NOT allowed: {operation}{id}")
+            rate_limiter_checks.labels("limited").inc()
+        return allowed
+
+    @staticmethod
+    def size() -> int:
+        return sum(len(shard.buckets) for shard in RateLimiter.shards)
+
+
+rate_limiter_keys.set_function(RateLimiter.size)
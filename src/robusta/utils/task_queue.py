@@ -1,13 +1,30 @@
+import heapq
+import itertools
 import logging
+import threading
 import time
+from enum import IntEnum
 from queue import Full, Queue
 from threading import Thread
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 
 import prometheus_client
 
 from robusta.core.model.env_vars import INCOMING_EVENTS_QUEUE_MAX_SIZE
 
 
+class TaskPriority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class TaskKey(NamedTuple):
+    key: Optional[str] = None  # tasks with the same key run by the same worker, in order
+    priority: TaskPriority = TaskPriority.NORMAL
+    coalesce: bool = False  # replace a pending task with the same key, instead of adding a new one
+
+
 class QueueMetrics:
     def __init__(self):
         self.queue_event = prometheus_client.Counter(
@@ -19,16 +36,36 @@ class QueueMetrics:
             labelnames=("queue_name",),
         )
         self.queue_size = prometheus_client.Gauge("queue_size", "Current size of the queue", labelnames=("queue_name",))
+        self.priority_queue_size = prometheus_client.Gauge(
+            "queue_priority_size", "Current size of the queue, per priority", labelnames=("queue_name", "priority")
+        )
+        self.queue_latency = prometheus_client.Summary(
+            "queue_latency",
+            "Time tasks wait in the queue (seconds)",
+            labelnames=("queue_name", "priority"),
+        )
 
     def size_callback(self, queue_name, queue_size_callback_fn):
         self.queue_size.labels(queue_name).set_function(queue_size_callback_fn)
 
+    def priority_size_callback(self, queue_name, priority: TaskPriority, queue_size_callback_fn):
+        self.priority_queue_size.labels(queue_name, priority.name).set_function(queue_size_callback_fn)
+
     def on_rejected(self, queue_name):
         self.queue_event.labels(queue_name, "rejected").inc()
 
     def on_queued(self, queue_name):
         self.queue_event.labels(queue_name, "queued").inc()
 
+    def on_coalesced(self, queue_name):
+        self.queue_event.labels(queue_name, "coalesced").inc()
+
+    def on_evicted(self, queue_name):
+        self.queue_event.labels(queue_name, "evicted").inc()
+
+    def on_dequeued(self, queue_name, priority: TaskPriority, latency: float):
+        self.queue_latency.labels(queue_name, priority.name).observe(latency)
+
     def on_processed(self, queue_name, processing_time: float):
         self.queue_event.labels(queue_name, "processed").inc()
         self.total_process_time.labels(queue_name).observe(processing_time)
@@ -53,6 +90,10 @@ class TaskQueue(Queue):
         except Full:
             self.metrics.on_rejected(self.name)
 
+    def add_keyed_task(self, task_key: TaskKey, task, *args, **kwargs):
+        # keys and priorities are used only by KeyedTaskQueue
+        self.add_task(task, *args, **kwargs)
+
     def __start_workers(self):
         for i in range(self.num_workers):
             t = Thread(target=self.worker)
@@ -71,3 +112,172 @@ class TaskQueue(Queue):
 
             self.metrics.on_processed(self.name, time.time() - start_time)
             self.task_done()
+
+
+class _QueuedTask:
+    __slots__ = ("task", "args", "kwargs", "task_key", "order", "queued_at", "cancelled")
+
+    def __init__(self, task, args: Tuple, kwargs: Dict, task_key: TaskKey, order: int, queued_at: float):
+        self.task = task
+        self.args = args
+        self.kwargs = kwargs
+        self.task_key = task_key
+        self.order = order
+        self.queued_at = queued_at
+        self.cancelled = False
+
+
+class KeyedTaskQueue:
+    """
+    Bounded task queue, with per key ordering, priorities and coalescing.
+
+    Tasks with the same key always run on the same worker, so they are executed in order.
+    Each worker runs its higher priority tasks first. When the queue is full, a new task evicts the newest task
+    of a lower priority, if there is one, and is rejected otherwise.
+    A task is never prioritized over pending tasks with the same key.
+    A coalescing task replaces the pending coalescing task with the same key, keeping its place in the queue.
+    The pending and the new arguments are merged with merge_args, which keeps the new arguments by default.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        num_workers: int,
+        metrics: QueueMetrics,
+        max_size: int = INCOMING_EVENTS_QUEUE_MAX_SIZE,
+        merge_args: Optional[Callable[[Tuple, Tuple], Tuple]] = None,
+    ):
+        logging.info(f"Initialized keyed task queue: {num_workers} workers. Max size {max_size}")
+        self.name = name
+        self.num_workers = num_workers
+        self.metrics = metrics
+        self.max_size = max_size
+        self.__merge_args = merge_args or (lambda pending_args, new_args: new_args)
+        self.__lock = threading.Lock()
+        self.__all_done = threading.Condition(self.__lock)
+        self.__workers_ready = [threading.Condition(self.__lock) for _ in range(num_workers)]
+        self.__heaps: List[List[Tuple[int, int, int, _QueuedTask]]] = [[] for _ in range(num_workers)]
+        # pending tasks per priority, by insertion order. Used for the eviction and the metrics
+        self.__pending: Dict[TaskPriority, Dict[int, _QueuedTask]] = {priority: {} for priority in TaskPriority}
+        self.__pending_keys: Dict[str, _QueuedTask] = {}
+        self.__size = 0
+        self.__unfinished = 0
+        self.__ids = itertools.count()
+        self.__round_robin = itertools.count()
+
+        self.metrics.size_callback(self.name, lambda: self.__size)
+        for priority in TaskPriority:
+            self.metrics.priority_size_callback(self.name, priority, lambda p=priority: len(self.__pending[p]))
+        self.__start_workers()
+
+    def qsize(self) -> int:
+        return self.__size
+
+    def add_task(self, task, *args, **kwargs):
+        self.add_keyed_task(TaskKey(), task, *args, **kwargs)
+
+    def add_keyed_task(self, task_key: TaskKey, task, *args, **kwargs):
+        with self.__lock:
+            pending = self.__pending_keys.get(task_key.key) if task_key.key is not None else None
+            if pending and pending.task_key.coalesce and task_key.coalesce:
+                args = self.__merge_args(pending.args, args)
+                self.__cancel(pending)
+                self.__push(task, args, kwargs, pending.task_key, pending.order, pending.queued_at)
+                self.metrics.on_coalesced(self.name)
+                return
+
+            if pending and pending.task_key.priority > task_key.priority:
+                # a task can't run before the pending tasks with the same key
+                task_key = task_key._replace(priority=pending.task_key.priority)
+
+            if self.__size >= self.max_size and not self.__evict(task_key.priority):
+                self.metrics.on_rejected(self.name)
+                return
+
+            self.__push(task, args, kwargs, task_key, next(self.__ids), time.time())
+            self.__unfinished += 1
+
+        self.metrics.on_queued(self.name)
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all the queued tasks were processed"""
+        with self.__all_done:
+            return self.__all_done.wait_for(lambda: self.__unfinished == 0, timeout)
+
+    def __worker_index(self, key: Optional[str]) -> int:
+        if key is None:
+            return next(self.__round_robin) % self.num_workers
+        return hash(key) % self.num_workers
+
+    def __push(self, task, args: Tuple, kwargs: Dict, task_key: TaskKey, order: int, queued_at: float):
+        queued = _QueuedTask(task, args, kwargs, task_key, order, queued_at)
+        task_id = next(self.__ids)
+        worker_index = self.__worker_index(task_key.key)
+        heapq.heappush(self.__heaps[worker_index], (task_key.priority, order, task_id, queued))
+        self.__pending[task_key.priority][id(queued)] = queued
+        if task_key.key is not None:
+            self.__pending_keys[task_key.key] = queued
+        self.__size += 1
+        self.__workers_ready[worker_index].notify()
+
+    def __cancel(self, queued: _QueuedTask):
+        """Remove a pending task. It's skipped by the worker when reaching the top of the heap"""
+        queued.cancelled = True
+        self.__remove_pending(queued)
+
+    def __remove_pending(self, queued: _QueuedTask):
+        self.__pending[queued.task_key.priority].pop(id(queued), None)
+        if queued.task_key.key is not None and self.__pending_keys.get(queued.task_key.key) is queued:
+            del self.__pending_keys[queued.task_key.key]
+        self.__size -= 1
+
+    def __evict(self, priority: TaskPriority) -> bool:
+        for lower_priority in reversed(TaskPriority):
+            if lower_priority <= priority:
+                return False
+            pending = self.__pending[lower_priority]
+            if pending:
+                newest = pending[next(reversed(pending))]
+                self.__cancel(newest)
+                self.__task_finished()
+                self.metrics.on_evicted(self.name)
+                return True
+        return False
+
+    def __task_finished(self):
+        self.__unfinished -= 1
+        if self.__unfinished == 0:
+            self.__all_done.notify_all()
+
+    def __start_workers(self):
+        for i in range(self.num_workers):
+            t = Thread(target=self.worker, args=(i,))
+            t.daemon = True
+            t.start()
+
+    def __next_task(self, worker_index: int) -> _QueuedTask:
+        heap = self.__heaps[worker_index]
+        with self.__workers_ready[worker_index]:
+            while True:
+                while heap and heap[0][3].cancelled:
+                    heapq.heappop(heap)
+                if heap:
+                    queued = heapq.heappop(heap)[3]
+                    self.__remove_pending(queued)
+                    return queued
+                self.__workers_ready[worker_index].wait()
+
+    def worker(self, worker_index: int):
+        while True:
+            queued = self.__next_task(worker_index)
+            start_time = time.time()
+            self.metrics.on_dequeued(self.name, queued.task_key.priority, start_time - queued.queued_at)
+
+            try:
+                queued.task(*queued.args, **queued.kwargs)
+            except Exception:
+                logging.error("Task worker error", exc_info=True)
+
+            self.metrics.on_processed(self.name, time.time() - start_time)
+            with self.__lock:
+                self.__task_finished()
@@ -0,0 +1,75 @@
+"""
+Compares a full discovery relist cycle with the watch based informers, on a synthetic cluster.
+
+Run with:
+    PYTHONPATH=src python -m tests.benchmarks.discovery_benchmark --objects 50000
+"""
+import argparse
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from robusta.core.discovery.discovery import Discovery
+from robusta.core.discovery.informer import DiscoveryInformers
+from tests.utils.fake_api_server import FakeApiServer, make_cluster, make_pod
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, duration, peak / (1024 * 1024)
+
+
+def informers_cycle(informers: DiscoveryInformers):
+    for informer in informers.informers:
+        if informer.resource_version is None:
+            informer.relist()
+        informer.watch()
+    return informers.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=50000)
+    parser.add_argument("--churn", type=float, default=0.01, help="fraction of pods updated between cycles")
+    args = parser.parse_args()
+
+    api_server = FakeApiServer()
+    make_cluster(api_server, args.objects)
+    print(f"synthetic cluster: {api_server.resource_version} objects, {api_server.count('Pod')} pods")
+
+    for label, parallel, compact in [
+        ("full relist cycle:", False, False),
+        ("full relist cycle (parallel):", True, False),
+        ("full relist cycle (compact):", False, True),
+    ]:
+        with patch("robusta.core.discovery.discovery.client", api_server.client()), patch(
+            "robusta.core.discovery.discovery.threading"
+        ), patch("robusta.core.discovery.discovery.DISCOVERY_PARALLEL_LISTING", parallel), patch(
+            "robusta.core.discovery.discovery.DISCOVERY_COMPACT_DECODE", compact
+        ):
+            results, relist_time, relist_peak = measure(Discovery.discovery_process)
+        print(f"{label:<29} {relist_time:8.2f}s  peak {relist_peak:8.1f}MiB  {len(results.services)} services")
+
+    informers = DiscoveryInformers(api_server.listers(), api_server.stream_fn)
+    deltas, sync_time, sync_peak = measure(lambda: informers_cycle(informers))
+    print(f"informers initial list:      {sync_time:8.2f}s  peak {sync_peak:8.1f}MiB  {len(deltas.services)} services")
+
+    updates = int(api_server.count("Pod") * args.churn)
+    for i in range(updates):
+        pod = make_pod(f"app-{i}-0", f"ns-{i % 50}", f"node-{i % 200}", f"app-{i}")
+        pod["status"]["phase"] = "Pending"
+        api_server.update(pod)
+    deltas, watch_time, watch_peak = measure(lambda: informers_cycle(informers))
+    print(
+        f"informers watch cycle:       {watch_time:8.2f}s  peak {watch_peak:8.1f}MiB  "
+        f"{updates} pod updates, {len(deltas.nodes)} nodes changed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Measures writing findings with the file sink: the indented json format, which opens the file for every finding,
+compared to the buffered jsonl format.
+
+Run with:
+    PYTHONPATH=src python -m tests.benchmarks.file_sink_benchmark --findings 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import List
+
+from robusta.core.reporting import Finding, ListBlock, MarkdownBlock, TableBlock
+from robusta.core.sinks.file.file_sink import FileSink
+from robusta.core.sinks.file.file_sink_params import FileSinkConfigWrapper, FileSinkParms
+
+
+class MockRegistry:
+    def get_global_config(self) -> dict:
+        return {"account_id": "account", "cluster_name": "cluster", "signing_key": "key"}
+
+
+def make_finding(i: int) -> Finding:
+    finding = Finding(title=f"Crashing pod api-{i}", aggregation_key="CrashLoopBackoff", description="pod crashed")
+    finding.add_enrichment(
+        [
+            MarkdownBlock(f"Pod api-{i} restarted 5 times"),
+            ListBlock([f"container-{c}" for c in range(5)]),
+            TableBlock([[f"event-{r}", "Warning", "BackOff"] for r in range(10)], headers=["name", "type", "reason"]),
+        ]
+    )
+    return finding
+
+
+def write(sink: FileSink, findings: List[Finding]) -> float:
+    """Seconds per finding"""
+    start = time.perf_counter()
+    for finding in findings:
+        sink.write_finding(finding, platform_enabled=False)
+    sink.stop()
+    return (time.perf_counter() - start) / len(findings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--findings", type=int, default=20000)
+    args = parser.parse_args()
+
+    findings = [make_finding(i) for i in range(args.findings)]
+    with tempfile.TemporaryDirectory() as directory:
+        results = {}
+        for file_format in ["json", "jsonl"]:
+            params = FileSinkParms(name="file", file_name=os.path.join(directory, file_format), format=file_format)
+            results[file_format] = write(FileSink(FileSinkConfigWrapper(file_sink=params), MockRegistry()), findings)
+
+    print(f"{args.findings} findings")
+    print(f"json:  {results['json'] * 1e6:8.1f} us/finding")
+    print(f"jsonl: {results['jsonl'] * 1e6:8.1f} us/finding  ({results['json'] / results['jsonl']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Measures the cost of preparing a finding for each sink: the deep copy the events handler used to make per sink,
+compared to the copy on write finding copies, that share the enrichment blocks.
+The finding is a typical crash report, with a logs file, a graph image, a table and a few markdown blocks.
+Files contents are immutable bytes, so even deepcopy shares them. The cost is copying all the blocks and their fields.
+
+Run with:
+    PYTHONPATH=src python -m tests.benchmarks.finding_copy_benchmark --sinks 8 --log-kb 1024
+"""
+import argparse
+import copy
+import os
+import time
+import tracemalloc
+from typing import Callable, List
+
+from robusta.core.reporting import Finding
+from robusta.core.reporting.blocks import FileBlock, MarkdownBlock, TableBlock
+
+
+def make_finding(log_kb: int, image_kb: int) -> Finding:
+    finding = Finding(title="Crashing pod api-server-5d8f", aggregation_key="CrashLoopBackoff")
+    finding.add_enrichment([MarkdownBlock("*Crash Info*"), TableBlock([["restarts", "12"], ["reason", "Error"]])])
+    log_line = b"2024-01-01T00:00:00Z ERROR connection refused while connecting to the database\n"
+    logs = log_line * (log_kb * 1024 // len(log_line))
+    finding.add_enrichment([FileBlock("api-server.log", logs)])
+    finding.add_enrichment([MarkdownBlock("*Memory usage*"), FileBlock("memory.png", os.urandom(image_kb * 1024))])
+    return finding
+
+
+def measure(copy_fn: Callable[[Finding], Finding], finding: Finding, sinks: int, rounds: int):
+    """Seconds per finding, and the peak memory allocated for the sinks copies of one finding"""
+    tracemalloc.start()
+    copies: List[Finding] = [copy_fn(finding) for _ in range(sinks)]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del copies
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for _ in range(sinks):
+            copy_fn(finding)
+    return (time.perf_counter() - start) / rounds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sinks", type=int, default=8)
+    parser.add_argument("--log-kb", type=int, default=1024)
+    parser.add_argument("--image-kb", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    finding = make_finding(args.log_kb, args.image_kb)
+    deep_time, deep_peak = measure(copy.deepcopy, finding, args.sinks, args.rounds)
+    cow_time, cow_peak = measure(Finding.copy_for_sink, finding, args.sinks, args.rounds)
+    print(f"{args.sinks} sinks, {args.log_kb}KB logs, {args.image_kb}KB image")
+    print(f"deepcopy:      {deep_time * 1000:8.2f} ms/finding  {deep_peak / 1024:10.0f} KB allocated")
+    print(
+        f"copy_for_sink: {cow_time * 1000:8.2f} ms/finding  {cow_peak / 1024:10.0f} KB allocated"
+        f"  ({deep_time / cow_time:.0f}x faster, {deep_peak / max(cow_peak, 1):.0f}x less memory)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Measures routing findings to sinks: matching each finding against the match rules of every sink.
+Compares evaluating the raw rules (Filterable.matches) to the precompiled FilterableMatcher.
+
+Run with:
+    PYTHONPATH=src python -m tests.benchmarks.sink_routing_benchmark --findings 100000 --sinks 20
+"""
+import argparse
+import random
+import time
+from typing import Callable, Dict, List
+
+from robusta.core.reporting.base import Finding, FindingSeverity, FindingSubject, FilterableMatcher
+from robusta.core.reporting.consts import FindingSubjectType
+
+NAMESPACES = ["prod", "prod-eu", "staging", "dev", "kube-system", "monitoring"]
+ALERTS = ["CrashLoopBackoff", "KubePodNotReady", "KubeJobFailed", "HighCPU", "OOMKilled", "NodeNotReady"]
+TEAMS = ["payments", "search", "infra", "data"]
+
+
+def make_rules(rand: random.Random, count: int) -> List[Dict]:
+    templates = [
+        lambda: {"namespace": rand.choice(NAMESPACES)},
+        lambda: {"namespace": rand.sample(NAMESPACES, 2), "severity": "HIGH"},
+        lambda: {"identifier": rand.choice(ALERTS) + "$"},
+        lambda: {"namespace": "prod.*", "labels": {"team": rand.choice(TEAMS)}},
+        lambda: {"title": ".*(Crash|OOM).*", "kind": "pod"},
+        lambda: {"labels": [{"team": team} for team in rand.sample(TEAMS, 2)], "severity": ["HIGH", "MEDIUM"]},
+        lambda: {},
+    ]
+    return [rand.choice(templates)() for _ in range(count)]
+
+
+def make_findings(rand: random.Random, count: int) -> List[Finding]:
+    findings = []
+    for i in range(count):
+        alert = rand.choice(ALERTS)
+        subject = FindingSubject(
+            name=f"pod-{i}",
+            subject_type=FindingSubjectType.TYPE_POD,
+            namespace=rand.choice(NAMESPACES),
+            labels={"team": rand.choice(TEAMS), "app": f"app-{i % 50}"},
+        )
+        severity = rand.choice([FindingSeverity.HIGH, FindingSeverity.MEDIUM, FindingSeverity.LOW])
+        findings.append(Finding(title=f"{alert} on pod-{i}", aggregation_key=alert, severity=severity, subject=subject))
+    return findings
+
+
+def route(findings: List[Finding], sinks: List[Callable[[Finding], bool]]) -> float:
+    """Seconds per finding"""
+    start = time.perf_counter()
+    for finding in findings:
+        for matches in sinks:
+            matches(finding)
+    return (time.perf_counter() - start) / len(findings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--findings", type=int, default=100000)
+    parser.add_argument("--sinks", type=int, default=20)
+    args = parser.parse_args()
+
+    rand = random.Random(0)
+    rules = make_rules(rand, args.sinks)
+    findings = make_findings(rand, args.findings)
+
+    raw_sinks = [lambda finding, rule=rule: finding.matches(rule) for rule in rules]
+    compiled_sinks = [FilterableMatcher(rule).matches for rule in rules]
+    for finding in findings[:1000]:
+        assert [matches(finding) for matches in raw_sinks] == [matches(finding) for matches in compiled_sinks]
+
+    before = route(findings, raw_sinks)
+    after = route(findings, compiled_sinks)
+    print(f"{args.findings} findings, {args.sinks} sinks")
+    print(f"raw match rules:   {before * 1e6:8.1f} us/finding")
+    print(f"compiled matchers: {after * 1e6:8.1f} us/finding  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Measures k8s events dispatch throughput: finding the fired triggers of an event.
+Compares scanning all the playbooks, with the payload copy every trigger used to make, to the trigger index.
+
+Run with:
+    PYTHONPATH=src python -m tests.benchmarks.trigger_dispatch_benchmark --playbooks 300
+"""
+import argparse
+import random
+import time
+
+from robusta.integrations.kubernetes.base_triggers import K8sTriggerEvent
+from robusta.integrations.kubernetes.trigger_index import K8sTriggerIndex
+from tests.utils.trigger_playbooks import make_event, make_playbooks
+
+
+def scan_all(playbooks, event: K8sTriggerEvent) -> int:
+    fired = 0
+    for playbook in playbooks:
+        for trigger in playbook.triggers:
+            # each trigger used to copy the whole event payload, before checking it
+            if trigger.get().should_fire(K8sTriggerEvent(**event.dict()), playbook.get_id(), {}):
+                fired += 1
+                break
+    return fired
+
+
+def indexed(index: K8sTriggerIndex, event: K8sTriggerEvent) -> int:
+    fired = 0
+    for playbook in index.get_playbooks(event.k8s_payload):
+        for trigger in playbook.triggers:
+            if trigger.get().should_fire(event, playbook.get_id(), {}):
+                fired += 1
+                break
+    return fired
+
+
+def events_per_sec(dispatch, events) -> float:
+    start = time.perf_counter()
+    for event in events:
+        dispatch(event)
+    return len(events) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--playbooks", type=int, default=300)
+    parser.add_argument("--events", type=int, default=2000)
+    args = parser.parse_args()
+
+    playbooks = make_playbooks(args.playbooks)
+    for playbook in playbooks:
+        for action in playbook.get_actions():
+            action.set_func_hash("")
+        playbook.post_init()
+    index = K8sTriggerIndex(playbooks)
+    rand = random.Random(0)
+    events = [make_event(rand) for _ in range(args.events)]
+
+    before = events_per_sec(lambda event: scan_all(playbooks, event), events[: max(len(events) // 10, 1)])
+    after = events_per_sec(lambda event: indexed(index, event), events)
+    print(f"{args.playbooks} playbooks")
+    print(f"scan all playbooks: {before:10.0f} events/sec")
+    print(f"trigger index:      {after:10.0f} events/sec  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
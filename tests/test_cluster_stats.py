@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+import pytest
+
+from robusta.core.discovery.cluster_stats import ClusterStatsProvider
+from tests.utils.fake_api_server import FakeApiServer, make_cluster
+
+
+@pytest.fixture(scope="module")
+def api_server() -> FakeApiServer:
+    api_server = FakeApiServer()
+    make_cluster(api_server, 300, namespaces=3, nodes=5)
+    return api_server
+
+
+def expected_counts(api_server: FakeApiServer) -> dict:
+    kinds = ["Deployment", "StatefulSet", "DaemonSet", "ReplicaSet", "Pod", "Node", "Job"]
+    return {kind: api_server.count(kind) for kind in kinds}
+
+
+def stats_counts(provider: ClusterStatsProvider) -> dict:
+    stats = provider.get_stats()
+    return {
+        "Deployment": stats.deployments,
+        "StatefulSet": stats.statefulsets,
+        "DaemonSet": stats.daemonsets,
+        "ReplicaSet": stats.replicasets,
+        "Pod": stats.pods,
+        "Node": stats.nodes,
+        "Job": stats.jobs,
+    }
+
+
+class TestClusterStatsProvider:
+    @pytest.mark.parametrize("remaining_item_count", [True, False])
+    def test_count_objects(self, api_server, remaining_item_count):
+        provider = ClusterStatsProvider(api_client=api_server.api_client(remaining_item_count))
+        with patch("robusta.core.discovery.cluster_stats.CLUSTER_STATS_PAGE_SIZE", 10):
+            assert stats_counts(provider) == expected_counts(api_server)
+            assert provider.get_stats().k8s_version == "v1.26.0"
+
+    def test_paging_without_remaining_item_count(self, api_server):
+        provider = ClusterStatsProvider(api_client=api_server.api_client(remaining_item_count=False))
+        calls_before = api_server.list_calls["Pod"]
+        with patch("robusta.core.discovery.cluster_stats.CLUSTER_STATS_PAGE_SIZE", 10):
+            assert provider.count_objects("Pod") == api_server.count("Pod")
+        assert api_server.list_calls["Pod"] - calls_before == -(-api_server.count("Pod") // 10)
+
+    def test_cached(self, api_server):
+        provider = ClusterStatsProvider(api_client=api_server.api_client())
+        provider.update_counts({"Pod": 12345, "Node": 7})
+        calls_before = dict(api_server.list_calls)
+        stats = provider.get_stats()
+        assert (stats.pods, stats.nodes) == (12345, 7)
+        assert stats.deployments == api_server.count("Deployment")
+        assert api_server.list_calls["Pod"] == calls_before["Pod"]
+
+        # within the ttl, nothing is listed
+        calls_before = dict(api_server.list_calls)
+        assert provider.get_stats() is stats
+        assert api_server.list_calls == calls_before
+
+    def test_expired_counts(self, api_server):
+        provider = ClusterStatsProvider(ttl_sec=0, counts_max_age_sec=0, api_client=api_server.api_client())
+        provider.update_counts({"Pod": 12345})
+        assert provider.get_stats().pods == api_server.count("Pod")
@@ -0,0 +1,181 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from robusta.integrations.kubernetes import custom_models
+from robusta.integrations.kubernetes.custom_models import DEBUGGER_POOL_LABEL, RobustaPod
+from robusta.integrations.kubernetes.debugger_pod_pool import DebuggerPodKey, DebuggerPodPool
+
+
+class FakePods:
+    def __init__(self, startup_sec: float = 0):
+        self.startup_sec = startup_sec
+        self.created = []
+        self.deleted = []
+        self.lock = threading.Lock()
+
+    def create(self, key: DebuggerPodKey):
+        time.sleep(self.startup_sec)
+        with self.lock:
+            pod = f"debug-{key.node_name}-{len(self.created)}"
+            self.created.append(pod)
+        return pod
+
+    def delete(self, pod):
+        with self.lock:
+            self.deleted.append(pod)
+
+
+def create_pool(pods: FakePods, **kwargs) -> DebuggerPodPool:
+    return DebuggerPodPool(create_pod=pods.create, delete_pod=pods.delete, **kwargs)
+
+
+def test_warm_pods_are_reused():
+    pods = FakePods()
+    pool = create_pool(pods)
+    with pool.lease("node-1", "toolkit") as first:
+        pass
+    with pool.lease("node-1", "toolkit") as second:
+        pass
+    with pool.lease("node-1", "toolkit", {"team": "a"}) as annotated:
+        pass
+    with pool.lease("node-2", "toolkit") as other_node:
+        pass
+
+    assert first == second
+    assert len({first, annotated, other_node}) == 3
+    assert pool.idle_count() == 3
+    assert pods.deleted == []
+
+
+def test_failed_lease_deletes_pod():
+    pods = FakePods()
+    pool = create_pool(pods)
+    with pytest.raises(Exception):
+        with pool.lease("node-1", "toolkit") as pod:
+            raise Exception("exec failed")
+    assert pods.deleted == [pod]
+
+    with pool.lease("node-1", "toolkit") as new_pod:
+        pass
+    assert new_pod != pod
+
+
+def test_node_limit():
+    pods = FakePods(startup_sec=0.05)
+    pool = create_pool(pods, max_pods_per_node=2, acquire_timeout_sec=5)
+    active = []
+    max_active = []
+    lock = threading.Lock()
+
+    def run():
+        with pool.lease("node-1", "toolkit") as pod:
+            with lock:
+                active.append(pod)
+                max_active.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(pod)
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(max_active) == 2
+    assert len(pods.created) == 2
+
+
+def test_idle_pod_of_other_image_is_replaced():
+    pods = FakePods()
+    pool = create_pool(pods, max_pods_per_node=1)
+    with pool.lease("node-1", "toolkit") as toolkit_pod:
+        pass
+    with pool.lease("node-1", "java-toolkit") as java_pod:
+        pass
+    assert pods.deleted == [toolkit_pod]
+    assert pool.idle_count() == 1
+    assert java_pod != toolkit_pod
+
+
+def test_acquire_timeout():
+    pods = FakePods()
+    pool = create_pool(pods, max_pods_per_node=1, acquire_timeout_sec=0.1)
+    with pool.lease("node-1", "toolkit"):
+        with pytest.raises(Exception, match="Timed out"):
+            with pool.lease("node-1", "toolkit"):
+                pass
+
+
+def test_idle_and_old_pods_are_deleted():
+    pods = FakePods()
+    pool = create_pool(pods, idle_ttl_sec=0.1, max_age_sec=0.3)
+    with pool.lease("node-1", "toolkit") as pod:
+        pass
+    # idle pods are reaped by the background thread
+    deadline = time.time() + 5
+    while pod not in pods.deleted and time.time() < deadline:
+        time.sleep(0.05)
+    assert pods.deleted == [pod]
+    assert pool.idle_count() == 0
+
+    # a pod that got too old isn't returned to the pool
+    with pool.lease("node-1", "toolkit") as old_pod:
+        time.sleep(0.35)
+    assert old_pod in pods.deleted
+
+    with pool.lease("node-1", "toolkit"):
+        pass
+    pool.clear()
+    assert pool.idle_count() == 0
+    assert len(pods.deleted) == 3
+
+
+def test_orphaned_pods_deleted(monkeypatch):
+    listed = []
+    deleted = []
+
+    def pod(name, runner=None):
+        labels = {custom_models.DEBUGGER_POOL_RUNNER_LABEL: runner} if runner else {}
+        return SimpleNamespace(metadata=SimpleNamespace(name=name, namespace="robusta", labels=labels))
+
+    # the previous runner is still running during a rolling update
+    debugger_pods = [pod("debug-0", "runner-old"), pod("debug-1", "runner-crashed"), pod("debug-2", "runner-old")]
+    all_pods = debugger_pods + [pod("runner-old"), pod("runner-new")]
+
+    def list_pods(namespace, label_selector=None):
+        listed.append((namespace, label_selector))
+        return SimpleNamespace(obj=SimpleNamespace(items=debugger_pods if label_selector else all_pods))
+
+    monkeypatch.setattr(custom_models.PodList, "listNamespacedPod", list_pods)
+    monkeypatch.setattr(RobustaPod, "deleteNamespacedPod", lambda name, namespace: deleted.append(name))
+    RobustaPod.delete_orphaned_debugger_pods()
+    assert listed[0] == (
+        custom_models.INSTALLATION_NAMESPACE,
+        f"app={DEBUGGER_POOL_LABEL},robusta-release={custom_models.RELEASE_NAME},robusta-runner",
+    )
+    assert deleted == ["debug-1"]
+
+
+def test_pooled_pod_owned_by_runner(monkeypatch):
+    created = {}
+
+    def create_debugger_pod(*args, **kwargs):
+        created.update(kwargs)
+        return SimpleNamespace(metadata=SimpleNamespace(name="debug-0", namespace="robusta"))
+
+    runner = SimpleNamespace(metadata=SimpleNamespace(name="runner-new", uid="runner-uid"))
+    monkeypatch.setattr(custom_models, "RUNNER_POD_NAME", "runner-new")
+    monkeypatch.setattr(RobustaPod, "readNamespacedPod", lambda name, namespace: SimpleNamespace(obj=runner))
+    monkeypatch.setattr(RobustaPod, "create_debugger_pod", create_debugger_pod)
+    monkeypatch.setattr(custom_models, "watch_pod_status", lambda *args: custom_models.RUNNING_STATE)
+    custom_models.get_runner_owner_reference.cache_clear()
+
+    RobustaPod.create_pooled_debugger_pod(DebuggerPodKey("node-1", "image", ()))
+    assert created["labels"][custom_models.DEBUGGER_POOL_RUNNER_LABEL] == "runner-new"
+    (owner,) = created["owner_references"]
+    assert (owner.kind, owner.name, owner.uid) == ("Pod", "runner-new", "runner-uid")
+    custom_models.get_runner_owner_reference.cache_clear()
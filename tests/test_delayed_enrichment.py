@@ -0,0 +1,93 @@
+import threading
+import time
+
+from robusta.core.model.events import ExecutionBaseEvent
+from robusta.core.playbooks.delayed_enrichment import DelayedEnrichmentRunner, delayed_enrichments
+from robusta.core.reporting import MarkdownBlock
+
+
+class Deliveries:
+    def __init__(self):
+        self.events = []
+        self.delivered = threading.Event()
+
+    def __call__(self, execution_event: ExecutionBaseEvent):
+        self.events.append(execution_event)
+        self.delivered.set()
+
+
+def enrichment_texts(execution_event: ExecutionBaseEvent, sink: str = "sink"):
+    return [enrichment.blocks[0].text for enrichment in execution_event.sink_findings[sink][0].enrichments]
+
+
+def add_text(text: str):
+    return lambda event: event.add_enrichment([MarkdownBlock(text)])
+
+
+def test_delivered_after_all_delayed_enrichments():
+    deliveries = Deliveries()
+    runner = DelayedEnrichmentRunner(deliver=deliveries, timeout_sec=5)
+    event = ExecutionBaseEvent(named_sinks=["sink"])
+    event.add_enrichment([MarkdownBlock("now")])
+    event.add_delayed_enrichment(0.2, add_text("later"))
+    event.add_delayed_enrichment(0.1, add_text("soon"))
+
+    start_time = time.time()
+    runner.run_later(event, event.delayed_enrichments)
+    assert time.time() - start_time < 0.1  # the calling thread isn't held
+    assert not deliveries.events
+
+    assert deliveries.delivered.wait(5)
+    assert time.time() - start_time >= 0.2
+    assert deliveries.events == [event]
+    assert enrichment_texts(event) == ["now", "soon", "later"]
+
+
+def test_failed_enrichment_does_not_block_delivery():
+    deliveries = Deliveries()
+    runner = DelayedEnrichmentRunner(deliver=deliveries, timeout_sec=5)
+    event = ExecutionBaseEvent(named_sinks=["sink"])
+
+    def fail(_):
+        raise Exception("prometheus is down")
+
+    failed_before = delayed_enrichments.labels("failed")._value.get()
+    event.add_delayed_enrichment(0, fail)
+    event.add_delayed_enrichment(0, add_text("logs"))
+    runner.run_later(event, event.delayed_enrichments)
+
+    assert deliveries.delivered.wait(5)
+    assert enrichment_texts(event) == ["logs"]
+    assert delayed_enrichments.labels("failed")._value.get() == failed_before + 1
+
+
+def test_timeout_delivers_without_slow_enrichments():
+    deliveries = Deliveries()
+    runner = DelayedEnrichmentRunner(deliver=deliveries, timeout_sec=0.2)
+    event = ExecutionBaseEvent(named_sinks=["sink"])
+    release = threading.Event()
+
+    def slow(slow_event):
+        release.wait(5)
+        slow_event.add_enrichment([MarkdownBlock("too late")])
+
+    expired_before = delayed_enrichments.labels("expired")._value.get()
+    event.add_enrichment([MarkdownBlock("now")])
+    event.add_delayed_enrichment(0, slow)
+    runner.run_later(event, event.delayed_enrichments)
+
+    assert deliveries.delivered.wait(5)
+    assert enrichment_texts(event) == ["now"]
+    assert delayed_enrichments.labels("expired")._value.get() == expired_before + 1
+    release.set()
+
+
+def test_run_now():
+    event = ExecutionBaseEvent(named_sinks=["sink"])
+    event.add_delayed_enrichment(0.1, add_text("later"))
+    event.add_delayed_enrichment(0, add_text("now"))
+
+    start_time = time.time()
+    DelayedEnrichmentRunner.run_now(event.delayed_enrichments)
+    assert time.time() - start_time >= 0.1
+    assert enrichment_texts(event) == ["now", "later"]
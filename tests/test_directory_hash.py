@@ -0,0 +1,25 @@
+from robusta.utils.directory_hash import directory_content_hash
+
+
+def write(path, content: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_directory_content_hash(tmp_path):
+    write(tmp_path / "pyproject.toml", "[tool.poetry]")
+    write(tmp_path / "playbooks" / "actions.py", "def action(): pass")
+    original = directory_content_hash(str(tmp_path))
+
+    # generated files don't change the hash
+    write(tmp_path / "playbooks" / "__pycache__" / "actions.cpython-311.pyc", "compiled")
+    write(tmp_path / "build" / "lib" / "actions.py", "def action(): pass")
+    write(tmp_path / "playbooks.egg-info" / "PKG-INFO", "info")
+    assert directory_content_hash(str(tmp_path)) == original
+
+    write(tmp_path / "playbooks" / "actions.py", "def action(): return 1")
+    modified = directory_content_hash(str(tmp_path))
+    assert modified != original
+
+    (tmp_path / "playbooks" / "actions.py").rename(tmp_path / "playbooks" / "other_actions.py")
+    assert directory_content_hash(str(tmp_path)) not in (original, modified)
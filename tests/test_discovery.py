@@ -0,0 +1,85 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from robusta.core.discovery.compact import StreamingListDecoder
+from robusta.core.discovery.discovery import Discovery, DiscoveryResults
+from tests.utils.fake_api_server import FakeApiServer, FakeResponse, make_cluster
+
+
+def run_discovery(api_server: FakeApiServer, parallel: bool, compact: bool = False) -> DiscoveryResults:
+    with patch("robusta.core.discovery.discovery.client", api_server.client()), patch(
+        "robusta.core.discovery.discovery.threading"
+    ), patch("robusta.core.discovery.discovery.DISCOVERY_PARALLEL_LISTING", parallel), patch(
+        "robusta.core.discovery.discovery.DISCOVERY_COMPACT_DECODE", compact
+    ):
+        return Discovery.discovery_process()
+
+
+def assert_same_results(expected: DiscoveryResults, actual: DiscoveryResults):
+    key = lambda info: info.get_service_key()  # noqa: E731
+    assert sorted(expected.services, key=key) == sorted(actual.services, key=key)
+    assert sorted(expected.jobs, key=key) == sorted(actual.jobs, key=key)
+    assert expected.node_requests == actual.node_requests
+    assert expected.pods_running_count == actual.pods_running_count
+    assert len(expected.nodes.items) == len(actual.nodes.items)
+
+
+@pytest.fixture(scope="module")
+def api_server() -> FakeApiServer:
+    api_server = FakeApiServer()
+    make_cluster(api_server, 500, namespaces=5, nodes=10)
+    return api_server
+
+
+class TestDiscoveryProcess:
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_list_durations(self, api_server, parallel):
+        results = run_discovery(api_server, parallel)
+        assert set(results.list_durations.keys()) == {
+            "Deployment",
+            "StatefulSet",
+            "DaemonSet",
+            "ReplicaSet",
+            "Pod",
+            "Node",
+            "Job",
+            "HelmRelease",
+            "Namespace",
+        }
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_object_counts(self, api_server, compact):
+        results = run_discovery(api_server, False, compact)
+        kinds = ["Deployment", "StatefulSet", "DaemonSet", "ReplicaSet", "Pod", "Node", "Job"]
+        assert results.object_counts == {kind: api_server.count(kind) for kind in kinds}
+
+    def test_parallel_same_as_serial(self, api_server):
+        serial = run_discovery(api_server, False)
+        parallel = run_discovery(api_server, True)
+        assert_same_results(serial, parallel)
+        assert serial.pods_running_count == api_server.count("Pod")
+        assert len(serial.nodes.items) == 10
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_compact_same_as_regular(self, api_server, parallel):
+        assert_same_results(run_discovery(api_server, False), run_discovery(api_server, parallel, compact=True))
+
+
+class TestStreamingListDecoder:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+    def test_decode(self, chunk_size):
+        items = [{"metadata": {"name": f"pod-\u00e9-{i}"}, "spec": {"replicas": i, "ratio": 1.5}} for i in range(20)]
+        response = FakeResponse(
+            json.dumps({"kind": "PodList", "items": items, "metadata": {"continue": "abc"}}).encode()
+        )
+        decoder = StreamingListDecoder(response, chunk_size=chunk_size)
+        assert list(decoder) == items
+        assert decoder.continue_ref == "abc"
+        assert response.released
+
+    def test_null_items(self):
+        decoder = StreamingListDecoder(FakeResponse(b'{"metadata": {}, "items": null}'))
+        assert list(decoder) == []
+        assert decoder.continue_ref is None
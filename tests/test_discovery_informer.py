@@ -0,0 +1,89 @@
+from robusta.core.discovery.informer import DiscoveryInformers, ResourceInformer
+from robusta.core.model.k8s_operation_type import K8sOperationType
+from tests.utils.fake_api_server import FakeApiServer, make_namespace, make_node, make_pod, make_workload
+
+
+def run_once(informers: DiscoveryInformers):
+    # the fake watch stream ends when there are no more events, so a single pass is enough
+    for informer in informers.informers:
+        if informer.resource_version is None:
+            informer.relist()
+        informer.watch()
+
+
+class TestResourceInformer:
+    def test_list_then_watch(self):
+        api_server = FakeApiServer()
+        api_server.add(make_namespace("default"))
+        events = []
+        informer = ResourceInformer(
+            "Namespace",
+            api_server.list_fn("Namespace"),
+            lambda operation, key, obj: events.append((operation, key)),
+            api_server.stream_fn("Namespace"),
+        )
+        informer.relist()
+        assert events == [(K8sOperationType.CREATE, "/default")]
+
+        api_server.add(make_namespace("other"))
+        api_server.delete(make_namespace("default"))
+        informer.watch()
+        assert events[1:] == [(K8sOperationType.CREATE, "/other"), (K8sOperationType.DELETE, "/default")]
+        assert api_server.list_calls["Namespace"] == 1
+
+    def test_relist_on_gone(self):
+        api_server = FakeApiServer()
+        api_server.add(make_namespace("default"))
+        api_server.add(make_namespace("other"))
+        events = []
+        informer = ResourceInformer(
+            "Namespace",
+            api_server.list_fn("Namespace"),
+            lambda operation, key, obj: events.append((operation, key)),
+            api_server.stream_fn("Namespace"),
+        )
+        informer.relist()
+        events.clear()
+
+        api_server.delete(make_namespace("other"))
+        api_server.add(make_namespace("new"))
+        api_server.compact()
+        informer.resource_version = None  # what run() does on 410
+        informer.relist()
+        assert sorted(events, key=lambda event: event[1]) == [
+            (K8sOperationType.CREATE, "/new"),
+            (K8sOperationType.DELETE, "/other"),
+        ]
+
+
+class TestDiscoveryInformers:
+    def test_deltas(self):
+        api_server = FakeApiServer()
+        api_server.add(make_namespace("default"))
+        api_server.add(make_node("node-1"))
+        api_server.add(make_workload("Deployment", "web", "default", replicas=2))
+        api_server.add(make_pod("web-1", "default", "node-1", "web"))
+        api_server.add(make_pod("standalone", "default", "node-1", "standalone", owner_kind=None))
+        informers = DiscoveryInformers(api_server.listers(), api_server.stream_fn)
+
+        run_once(informers)
+        deltas = informers.drain()
+        assert set(deltas.services.keys()) == {"default/Deployment/web", "default/Pod/standalone"}
+        assert deltas.synced_keys.services == {"default/Deployment/web", "default/Pod/standalone"}
+        assert set(deltas.namespaces.keys()) == {"default"}
+        assert len(deltas.node_requests["node-1"]) == 2
+        assert deltas.pods_running_count == 2
+        assert deltas.object_counts["Pod"] == 2 and deltas.object_counts["ReplicaSet"] == 0
+
+        api_server.delete(make_pod("standalone", "default", "node-1", "standalone", owner_kind=None))
+        run_once(informers)
+        deltas = informers.drain()
+        assert deltas.services == {"default/Pod/standalone": None}
+        assert deltas.synced_keys is None
+        assert len(deltas.node_requests["node-1"]) == 1
+        assert deltas.pods_running_count == 1
+
+        # nothing changed
+        run_once(informers)
+        deltas = informers.drain()
+        assert not deltas.services and not deltas.nodes and not deltas.jobs
@@ -0,0 +1,64 @@
+import time
+from typing import List
+
+from robusta.integrations.kubernetes.base_triggers import IncomingK8sEventPayload
+from robusta.integrations.kubernetes.event_coalescer import K8sEventCoalescer
+
+
+def make_payload(operation: str, name: str, version: int) -> IncomingK8sEventPayload:
+    def obj(obj_version: int) -> dict:
+        return {"metadata": {"name": name, "namespace": "default", "resourceVersion": str(obj_version)}}
+
+    return IncomingK8sEventPayload(
+        operation=operation,
+        kind="Pod",
+        clusterUid="cluster",
+        description="",
+        obj=obj(version),
+        oldObj=obj(version - 1) if operation == "update" else None,
+    )
+
+
+def versions(payload: IncomingK8sEventPayload):
+    old_version = payload.oldObj["metadata"]["resourceVersion"] if payload.oldObj else None
+    return payload.operation, payload.obj["metadata"]["name"], old_version, payload.obj["metadata"]["resourceVersion"]
+
+
+class TestK8sEventCoalescer:
+    def test_merge_updates(self):
+        dispatched: List[IncomingK8sEventPayload] = []
+        coalescer = K8sEventCoalescer(0.2, dispatched.append)
+        coalescer.add(make_payload("create", "pod-1", 1))
+        for version in range(2, 12):
+            coalescer.add(make_payload("update", "pod-1", version))
+            coalescer.add(make_payload("update", "pod-2", version))
+        assert [versions(payload) for payload in dispatched] == [("create", "pod-1", None, "1")]
+        assert coalescer.pending_count() == 2
+
+        time.sleep(0.5)
+        # the first old object, and the last object
+        assert [versions(payload) for payload in dispatched[1:]] == [
+            ("update", "pod-1", "1", "11"),
+            ("update", "pod-2", "1", "11"),
+        ]
+        assert coalescer.pending_count() == 0
+
+    def test_delete_after_pending_update(self):
+        dispatched: List[IncomingK8sEventPayload] = []
+        coalescer = K8sEventCoalescer(60, dispatched.append)
+        coalescer.add(make_payload("update", "pod-1", 2))
+        coalescer.add(make_payload("update", "pod-1", 3))
+        coalescer.add(make_payload("delete", "pod-1", 4))
+        assert [versions(payload) for payload in dispatched] == [
+            ("update", "pod-1", "1", "3"),
+            ("delete", "pod-1", None, "4"),
+        ]
+
+    def test_max_pending(self):
+        dispatched: List[IncomingK8sEventPayload] = []
+        coalescer = K8sEventCoalescer(60, dispatched.append, max_pending=1)
+        coalescer.add(make_payload("update", "pod-1", 2))
+        coalescer.add(make_payload("update", "pod-2", 2))
+        assert [versions(payload) for payload in dispatched] == [("update", "pod-2", "1", "2")]
+        coalescer.stop()
+        assert len(dispatched) == 2
@@ -0,0 +1,91 @@
+import ast
+import base64
+import gzip
+import json
+import os
+
+from robusta.core.sinks.robusta.dal.evidence_encoding import (
+    COMPRESSED_ENCODING,
+    ENCODE_SLICE_BYTES,
+    LEGACY_ENCODING,
+    StructuredDataWriter,
+    gzip_base64,
+)
+
+
+def decode(pieces) -> bytes:
+    return base64.b64decode("".join(pieces))
+
+
+def test_gzip_base64_multiple_slices():
+    contents = os.urandom(ENCODE_SLICE_BYTES) + b"log line\n" * ENCODE_SLICE_BYTES
+    assert decode(gzip_base64(contents, compress=False)) == contents
+    assert gzip.decompress(decode(gzip_base64(contents, compress=True))) == contents
+    assert gzip.decompress(decode(gzip_base64(b"", compress=True))) == b""
+
+
+def test_legacy_encoding_matches_json_dumps():
+    entries = [
+        {"type": "markdown", "data": 'some "quoted" text'},
+        {"type": "divider"},
+        {"type": "table", "data": {"headers": ["a", "b"], "rows": [[1, "x"]]}},
+    ]
+    image = os.urandom(1000)
+    writer = StructuredDataWriter(encoding=LEGACY_ENCODING)
+    for entry in entries:
+        writer.add(entry)
+    writer.add_file("graph.png", image, compress=False)
+    writer.add_file("pod.log", b"log line\n" * 1000, compress=True)
+
+    expected = entries + [{"type": "png", "data": str(base64.b64encode(image))}]
+    structured_data = json.loads(writer.to_json())
+    assert structured_data[:-1] == expected
+    assert structured_data[-1]["type"] == "gz"
+    assert gzip.decompress(base64.b64decode(ast.literal_eval(structured_data[-1]["data"]))) == b"log line\n" * 1000
+    assert writer.to_json().startswith(json.dumps(expected)[:-1])
+
+
+def test_compressed_encoding_chunks():
+    contents = b"log line\n" * 100000
+    image = os.urandom(5000)
+    writer = StructuredDataWriter(encoding=COMPRESSED_ENCODING, compress_min_bytes=1024, chunk_bytes=1000)
+    writer.add({"type": "markdown", "data": "short"})
+    writer.add({"type": "list", "data": ["item"] * 1000})
+    writer.add_file("pod.log", contents, compress=True)
+    writer.add_file("graph.png", image, compress=False)
+    writer.add_file("small.txt", b"small", compress=True)
+
+    markdown, items, log, graph, small = json.loads(writer.to_json())
+    assert markdown == {"type": "markdown", "data": "short"}
+
+    assert items["encoding"] == "gzip"
+    assert json.loads(gzip.decompress(decode(items["chunks"]))) == ["item"] * 1000
+
+    assert log["type"] == "log" and log["encoding"] == "gzip"
+    assert all(len(chunk) == 1000 for chunk in log["chunks"][:-1])
+    assert gzip.decompress(decode(log["chunks"])) == contents
+
+    # already compressed, and too small files, aren't compressed
+    assert graph["encoding"] == "" and len(graph["chunks"]) > 1
+    assert decode(graph["chunks"]) == image
+    assert small == {"type": "txt", "encoding": "", "chunks": [base64.b64encode(b"small").decode()]}
+
+
+def test_compressed_entry_keeps_other_keys():
+    graph_data = {"series": [{"timestamps": list(range(1000)), "values": [0.5] * 1000}]}
+    metadata = {"query": "container_memory_working_set_bytes", "step": "60s"}
+    writer = StructuredDataWriter(encoding=COMPRESSED_ENCODING, compress_min_bytes=1024)
+    writer.add({"type": "prometheus", "data": graph_data, "metadata": metadata, "version": 1.0})
+
+    (prometheus,) = json.loads(writer.to_json())
+    assert prometheus["type"] == "prometheus" and prometheus["encoding"] == "gzip"
+    assert prometheus["metadata"] == metadata and prometheus["version"] == 1.0
+    assert "data" not in prometheus
+    assert json.loads(gzip.decompress(decode(prometheus["chunks"]))) == graph_data
+
+
+def test_empty_writer():
+    writer = StructuredDataWriter()
+    assert not writer
+    writer.add({"type": "divider"})
+    assert writer
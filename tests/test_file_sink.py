@@ -0,0 +1,67 @@
+import gzip
+import json
+import os
+
+from robusta.core.reporting import MarkdownBlock
+from robusta.core.sinks.file.file_sink import FileSink
+from robusta.core.sinks.file.file_sink_params import FileRotationParams, FileSinkConfigWrapper, FileSinkParms
+from robusta.core.sinks.file.jsonl_writer import JsonlWriter
+from robusta.core.sinks.file.object_traverser import ObjectTraverser
+from tests.utils.sink_utils import MockRegistry, make_finding
+
+
+def make_sink(**params) -> FileSink:
+    return FileSink(FileSinkConfigWrapper(file_sink=FileSinkParms(name="file", **params)), MockRegistry())
+
+
+class TestFileSink:
+    def test_jsonl_buffered(self, tmp_path):
+        file_name = str(tmp_path / "findings.jsonl")
+        sink = make_sink(file_name=file_name, format="jsonl", flush_interval_sec=60)
+        for i in range(3):
+            sink.write_finding(
+                make_finding(f"finding-{i}", enrichments=[[MarkdownBlock("some text")]]), platform_enabled=False
+            )
+        assert not os.path.exists(file_name)
+
+        sink.stop()
+        with open(file_name) as file:
+            lines = file.read().splitlines()
+        assert [json.loads(line)["title"] for line in lines] == ["finding-0", "finding-1", "finding-2"]
+        assert "add_silence_url" not in json.loads(lines[0])
+
+    def test_json_format_unchanged(self, tmp_path):
+        file_name = str(tmp_path / "findings.json")
+        sink = make_sink(file_name=file_name)
+        sink.write_finding(make_finding("finding", enrichments=[[MarkdownBlock("some text")]]), platform_enabled=False)
+        with open(file_name) as file:
+            assert json.loads(file.read())["title"] == "finding"
+
+
+class TestJsonlWriter:
+    def test_rotation(self, tmp_path):
+        file_name = str(tmp_path / "findings.jsonl")
+        rotation = FileRotationParams(max_bytes=100, backup_count=2, compress=True)
+        writer = JsonlWriter(file_name, buffer_size=1, flush_interval_sec=60, rotation=rotation)
+        for i in range(11):
+            writer.write(json.dumps({"line": i, "padding": "x" * 40}))
+        writer.close()
+
+        assert sorted(os.listdir(tmp_path)) == ["findings.jsonl", "findings.jsonl.1.gz", "findings.jsonl.2.gz"]
+        with gzip.open(f"{file_name}.1.gz", "rt") as file:
+            assert [json.loads(line)["line"] for line in file] == [8, 9]
+        with open(file_name) as file:
+            assert [json.loads(line)["line"] for line in file] == [10]
+
+
+def test_traverser_excluded_paths():
+    traverser = ObjectTraverser(exclude_patterns=["^\\.a\\.b$"], exclude_empty_parent=False)
+    for _ in range(2):
+        assert traverser.to_dictionary({"a": {"b": 1, "c": 2}, "b": 3}) == {"a": {"c": 2}, "b": 3}
+
+
+def test_traverser_sequence_items_share_a_path_shape():
+    traverser = ObjectTraverser(exclude_patterns=["^\\.items\\.\\*\\.secret$"])
+    items = [{"name": f"item-{i}", "secret": "x"} for i in range(1000)]
+    assert traverser.to_dictionary({"items": items}) == {"items": [{"name": f"item-{i}"} for i in range(1000)]}
+    assert len(traverser._ObjectTraverser__excluded_paths) == 5
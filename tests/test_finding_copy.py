@@ -0,0 +1,45 @@
+from robusta.core.reporting import Finding
+from robusta.core.reporting.blocks import FileBlock, MarkdownBlock
+from robusta.core.sinks.robusta.dal.model_conversion import ModelConversion
+
+
+def make_finding() -> Finding:
+    finding = Finding(title="title", aggregation_key="key")
+    finding.add_enrichment([MarkdownBlock("text"), FileBlock("app.log", b"log line\n" * 100)], {"key": "value"})
+    return finding
+
+
+class TestFindingCopyForSink:
+    def test_blocks_are_shared(self):
+        finding = make_finding()
+        finding_copy = finding.copy_for_sink()
+        assert finding_copy is not finding
+        assert finding_copy.enrichments[0] is not finding.enrichments[0]
+        for block, copied_block in zip(finding.enrichments[0].blocks, finding_copy.enrichments[0].blocks):
+            assert copied_block is block
+
+    def test_sink_changes_dont_affect_the_original(self):
+        finding = make_finding()
+        finding_copy = finding.copy_for_sink()
+        finding_copy.title = "changed"
+        finding_copy.enrichments[0].blocks = [MarkdownBlock("other")]
+        finding_copy.enrichments[0].annotations["key"] = "changed"
+        finding_copy.add_enrichment([MarkdownBlock("sink enrichment")], suppress_warning=True)
+
+        assert finding.title == "title"
+        assert len(finding.enrichments) == 1
+        assert len(finding.enrichments[0].blocks) == 2
+        assert finding.enrichments[0].annotations == {"key": "value"}
+
+    def test_zipping_doesnt_change_shared_blocks(self):
+        finding = make_finding()
+        file_block: FileBlock = finding.enrichments[0].blocks[1]
+        contents = file_block.contents
+        finding_copy = finding.copy_for_sink()
+        evidence = ModelConversion.to_evidence_json(
+            "account", "cluster", "sink", "key", finding_copy.id, finding_copy.enrichments[0]
+        )
+
+        assert evidence["data"]
+        assert file_block.filename == "app.log"
+        assert file_block.contents is contents
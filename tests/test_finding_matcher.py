@@ -0,0 +1,47 @@
+import pytest
+
+from robusta.core.reporting.base import Finding, FindingSeverity, FindingSubject, FilterableMatcher
+from robusta.core.reporting.consts import FindingSubjectType
+
+
+def make_finding(title: str, namespace: str, labels: dict) -> Finding:
+    subject = FindingSubject(
+        name="api-5d8f", subject_type=FindingSubjectType.TYPE_POD, namespace=namespace, labels=labels
+    )
+    return Finding(title=title, aggregation_key="CrashLoopBackoff", severity=FindingSeverity.HIGH, subject=subject)
+
+
+FINDINGS = [
+    make_finding("Crashing pod api", "prod", {"app": "api", "team": "a"}),
+    make_finding("Crashing pod api\n", "prod-eu", {"app": "api"}),
+    make_finding("OOMKilled", "dev", {}),
+]
+
+
+@pytest.mark.parametrize(
+    "requirements",
+    [
+        {},
+        {"namespace": "prod"},
+        {"namespace": "prod$"},
+        {"namespace": "^prod$"},
+        {"namespace": ["dev", "staging"]},
+        {"namespace": "prod-.*"},
+        {"title": "Crashing pod api$"},
+        {"title": ".*Killed", "severity": "HIGH"},
+        {"identifier": "Crash", "kind": "pod"},
+        {"labels": {"app": "api"}},
+        {"labels": [{"team": "b"}, {"team": "a"}]},
+        {"labels": "app"},
+        {"unknown": "x"},
+        {"namespace": "prod", "labels": {"app": "api", "team": "a"}},
+    ],
+)
+def test_same_as_filterable_matches(requirements):
+    matcher = FilterableMatcher(requirements)
+    for finding in FINDINGS:
+        assert matcher.matches(finding) == finding.matches(requirements)
+
+
+def test_illegal_regex_never_matches():
+    assert not FilterableMatcher({"namespace": "prod["}).matches(FINDINGS[0])
@@ -0,0 +1,120 @@
+import base64
+import json
+from typing import Callable, List, Optional, Tuple
+
+import pytest
+
+from robusta.core.reporting import FileBlock, Finding, JsonBlock, MarkdownBlock
+from robusta.core.sinks.kafka import KafkaExportMode, KafkaSink, KafkaSinkConfigWrapper, KafkaSinkParams
+from robusta.core.sinks.kafka.kafka_sink import kafka_sink_messages
+from tests.utils.sink_utils import MockRegistry, make_finding
+
+
+class FakeFuture:
+    def __init__(self):
+        self.callbacks: List[Callable] = []
+        self.errbacks: List[Callable] = []
+
+    def add_callback(self, callback: Callable) -> "FakeFuture":
+        self.callbacks.append(callback)
+        return self
+
+    def add_errback(self, errback: Callable) -> "FakeFuture":
+        self.errbacks.append(errback)
+        return self
+
+
+class FakeProducer:
+    """Records the sent messages. Deliveries complete on flush, like batched sends of a real producer"""
+
+    def __init__(self, **config):
+        self.config = config
+        self.sent: List[Tuple[str, Optional[bytes], bytes]] = []
+        self.pending: List[FakeFuture] = []
+        self.fail = False
+        self.closed = False
+
+    def send(self, topic: str, value: bytes = None, key: bytes = None) -> FakeFuture:
+        self.sent.append((topic, key, value))
+        future = FakeFuture()
+        self.pending.append(future)
+        return future
+
+    def flush(self, timeout: float = None):
+        for future in self.pending:
+            for callback in future.errbacks if self.fail else future.callbacks:
+                callback(Exception("delivery failed") if self.fail else None)
+        self.pending = []
+
+    def close(self, timeout: float = None):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_producer(monkeypatch):
+    monkeypatch.setattr("robusta.core.sinks.kafka.kafka_sink.KafkaProducer", FakeProducer)
+
+
+def make_sink(name: str, **params) -> KafkaSink:
+    sink_params = KafkaSinkParams(name=name, kafka_url="localhost:9092", topic="findings", **params)
+    return KafkaSink(KafkaSinkConfigWrapper(kafka_sink=sink_params), MockRegistry())
+
+
+def crash_finding() -> Finding:
+    return make_finding(
+        aggregation_key="CrashLoopBackoff",
+        fingerprint="abc",
+        enrichments=[
+            [MarkdownBlock("pod crashed"), FileBlock("logs.bin", b"\x00\x01")],
+            [JsonBlock(json.dumps({"a": 1}))],
+        ],
+    )
+
+
+def messages_count(sink: str, status: str) -> float:
+    return kafka_sink_messages.labels(sink, status)._value.get()
+
+
+class TestKafkaSink:
+    def test_blocks_export(self):
+        sink = make_sink("blocks")
+        sink.write_finding(crash_finding(), platform_enabled=False)
+        assert [(key, json.loads(value)) for _, key, value in sink.producer.sent] == [
+            (None, {"a": 1, "cluster_name": "testcluster"})
+        ]
+
+    def test_findings_export(self):
+        sink = make_sink("findings", export=KafkaExportMode.Findings, compression_type="lz4")
+        assert sink.producer.config["compression_type"] == "lz4"
+        finding = crash_finding()
+        sink.write_finding(finding, platform_enabled=False)
+
+        topic, key, value = sink.producer.sent[0]
+        assert (topic, key) == ("findings", b"abc")
+        record = json.loads(value)
+        assert record["title"] == "Crashing pod"
+        assert record["cluster_name"] == "testcluster"
+        assert record["subject"]["name"] == finding.subject.name
+        assert [block["type"] for block in record["enrichments"][0]["blocks"]] == ["markdown", "file"]
+        assert base64.b64decode(record["enrichments"][0]["blocks"][1]["contents"]) == b"\x00\x01"
+        assert record["enrichments"][1]["blocks"] == [{"type": "json", "data": '{"a": 1}'}]
+
+    def test_msgpack(self):
+        msgpack = pytest.importorskip("msgpack")
+        sink = make_sink("msgpack", export=KafkaExportMode.Findings, serializer="msgpack")
+        sink.write_finding(crash_finding(), platform_enabled=False)
+        record = msgpack.unpackb(sink.producer.sent[0][2])
+        assert record["enrichments"][0]["blocks"][1]["contents"] == b"\x00\x01"
+
+    def test_delivery_metrics(self):
+        sink = make_sink("metrics", export=KafkaExportMode.Findings)
+        sink.write_finding(crash_finding(), platform_enabled=False)
+        assert messages_count("metrics", "delivered") == 0
+        sink.producer.flush()
+        assert messages_count("metrics", "delivered") == 1
+
+        sink.producer.fail = True
+        sink.write_finding(crash_finding(), platform_enabled=False)
+        sink.stop()
+        assert messages_count("metrics", "failed") == 1
+        assert sink.producer.closed
@@ -0,0 +1,143 @@
+import threading
+import time
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from kubernetes.client import ApiException
+
+from robusta.integrations.kubernetes.base_triggers import IncomingK8sEventPayload
+from robusta.integrations.kubernetes.objects_cache import K8sObjectsCache, NodesIpIndex
+
+
+class FakeObject:
+    def __init__(self, name: str, version: int):
+        self.name = name
+        self.version = version
+
+    def dup(self) -> "FakeObject":
+        return FakeObject(self.name, self.version)
+
+
+class FakePod:
+    """Reads objects like a hikaru class. Slow, to make concurrent reads overlap"""
+
+    kind = "Pod"
+    reads: List[str] = []
+    missing = set()
+
+    def read(self, name: str, namespace: str = None) -> FakeObject:
+        time.sleep(0.1)
+        FakePod.reads.append(name)
+        if name in FakePod.missing:
+            raise ApiException(status=404, reason="Not Found")
+        return FakeObject(name, len(FakePod.reads))
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_pod():
+    FakePod.reads = []
+    FakePod.missing = set()
+
+
+def read_concurrently(cache: K8sObjectsCache, names: List[str]) -> List:
+    results = [None] * len(names)
+
+    def read(index: int):
+        try:
+            results[index] = cache.read(FakePod, names[index], "default")
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(len(names))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def node_event(operation: str, name: str, addresses: List[str]) -> IncomingK8sEventPayload:
+    return IncomingK8sEventPayload(
+        operation=operation,
+        kind="Node",
+        clusterUid="cluster",
+        description="",
+        obj={"metadata": {"name": name}, "status": {"addresses": [{"address": address} for address in addresses]}},
+    )
+
+
+class TestK8sObjectsCache:
+    def test_concurrent_reads_share_one_call(self):
+        cache = K8sObjectsCache(ttl_sec=10)
+        results = read_concurrently(cache, ["pod-1"] * 10 + ["pod-2"] * 10)
+        assert sorted(FakePod.reads) == ["pod-1", "pod-2"]
+        # each reader gets its own copy
+        assert len({id(result) for result in results}) == 20
+        assert {result.name for result in results} == {"pod-1", "pod-2"}
+
+    def test_expiry_and_invalidation(self):
+        cache = K8sObjectsCache(ttl_sec=0.2)
+        cache.read(FakePod, "pod-1", "default")
+        cache.read(FakePod, "pod-1", "default")
+        assert FakePod.reads == ["pod-1"]
+
+        time.sleep(0.3)
+        assert cache.read(FakePod, "pod-1", "default").version == 2
+
+        cache.invalidate("Pod", "pod-1", "default")
+        assert cache.read(FakePod, "pod-1", "default").version == 3
+
+    def test_not_found_is_cached(self):
+        FakePod.missing = {"missing"}
+        cache = K8sObjectsCache(ttl_sec=10)
+        results = read_concurrently(cache, ["missing"] * 5)
+        assert all(isinstance(result, ApiException) and result.status == 404 for result in results)
+        with pytest.raises(ApiException):
+            cache.read(FakePod, "missing", "default")
+        assert FakePod.reads == ["missing"]
+
+    def test_max_size(self):
+        cache = K8sObjectsCache(ttl_sec=10, max_size=2)
+        for name in ["pod-1", "pod-2", "pod-3", "pod-1"]:
+            cache.read(FakePod, name, "default")
+        assert FakePod.reads == ["pod-1", "pod-2", "pod-3", "pod-1"]
+
+
+@pytest.fixture()
+def listed_nodes(monkeypatch) -> List[float]:
+    """Lists node-1, with address 10.0.0.1. Returns the lists times"""
+    lists = []
+
+    def list_nodes():
+        lists.append(time.time())
+        node = SimpleNamespace(
+            metadata=SimpleNamespace(name="node-1"),
+            status=SimpleNamespace(addresses=[SimpleNamespace(address="10.0.0.1")]),
+        )
+        return SimpleNamespace(obj=SimpleNamespace(items=[node]))
+
+    monkeypatch.setattr("robusta.integrations.kubernetes.objects_cache.NodeList.listNode", list_nodes)
+    return lists
+
+
+class TestNodesIpIndex:
+    def test_relist_once_per_interval(self, listed_nodes):
+        index = NodesIpIndex(min_relist_interval_sec=1000)
+        assert index.find_node_name("10.0.0.1") == "node-1"
+        assert index.find_node_name("10.0.0.9") is None
+        assert index.find_node_name("10.0.0.1") == "node-1"
+        assert len(listed_nodes) == 1
+
+    def test_node_events(self, listed_nodes):
+        index = NodesIpIndex(min_relist_interval_sec=1000)
+        assert index.find_node_name("10.0.0.1") == "node-1"
+        index.on_k8s_event(node_event("create", "node-2", ["10.0.0.2", "node-2.internal"]))
+        assert index.find_node_name("10.0.0.2") == "node-2"
+
+        index.on_k8s_event(node_event("update", "node-2", ["10.0.0.3"]))
+        index.on_k8s_event(node_event("delete", "node-1", ["10.0.0.1"]))
+        assert index.find_node_name("10.0.0.2") is None
+        assert index.find_node_name("10.0.0.3") == "node-2"
+        assert index.find_node_name("10.0.0.1") is None
+        assert len(listed_nodes) == 1
@@ -0,0 +1,62 @@
+import threading
+
+from robusta.utils.rate_limiter import RateLimiter, _Shard, rate_limiter_evictions
+
+
+def test_single_shot():
+    shard = _Shard(max_keys=100)
+    key = ("PodCrashLoopTrigger_1", "default:pod")
+    assert shard.mark_and_test(key, 60, 1, now=1000)
+    assert not shard.mark_and_test(key, 60, 1, now=1030)
+    assert not shard.mark_and_test(key, 60, 1, now=1059)
+    assert shard.mark_and_test(key, 60, 1, now=1061)
+    assert shard.mark_and_test(("PodCrashLoopTrigger_1", "default:other"), 60, 1, now=1061)
+
+
+def test_token_bucket():
+    shard = _Shard(max_keys=100)
+    key = ("argo_app_sync", "app")
+    assert [shard.mark_and_test(key, 60, 3, now=1000) for _ in range(4)] == [True, True, True, False]
+    # one token is refilled every 20 seconds
+    assert shard.mark_and_test(key, 60, 3, now=1020)
+    assert not shard.mark_and_test(key, 60, 3, now=1030)
+    # unused tokens don't accumulate over max_calls
+    assert [shard.mark_and_test(key, 60, 3, now=2000) for _ in range(4)] == [True, True, True, False]
+
+
+def test_expired_keys_are_evicted():
+    shard = _Shard(max_keys=100)
+    for index in range(50):
+        shard.mark_and_test(("op", str(index)), 60, 1, now=1000)
+    shard.mark_and_test(("op", "recent"), 60, 1, now=1050)
+    assert len(shard.buckets) == 51
+
+    shard.mark_and_test(("op", "new"), 60, 1, now=1070)
+    assert list(shard.buckets.keys()) == [("op", "recent"), ("op", "new")]
+
+
+def test_max_keys():
+    shard = _Shard(max_keys=10)
+    evictions_before = rate_limiter_evictions._value.get()
+    for index in range(25):
+        assert shard.mark_and_test(("op", str(index)), 60, 1, now=1000 + index)
+    assert len(shard.buckets) == 10
+    assert rate_limiter_evictions._value.get() == evictions_before + 15
+    # the least recently used keys were evicted
+    assert ("op", "24") in shard.buckets and ("op", "14") not in shard.buckets
+
+
+def test_rate_limiter_concurrent_calls():
+    allowed = []
+
+    def call():
+        allowed.append(RateLimiter.mark_and_test("test_rate_limiter_concurrent_calls", "id", 3600, max_calls=5))
+
+    threads = [threading.Thread(target=call) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert allowed.count(True) == 5
+    assert RateLimiter.mark_and_test("test_rate_limiter_concurrent_calls", "id", 0)
+    assert RateLimiter.size() >= 1
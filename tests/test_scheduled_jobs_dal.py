@@ -0,0 +1,153 @@
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import pytest
+from kubernetes.client import ApiException, V1ConfigMap, V1ConfigMapList
+
+from robusta.core.persistency.scheduled_jobs_states_dal import JOBS_CONFIGMAP_NAME, JOBS_SHARD_LABEL, SchedulerDal
+from robusta.core.schedule.model import FixedDelayRepeat, JobState, ScheduledJob
+from robusta.core.schedule.scheduler import Scheduler
+
+
+class FakeConfigMapsApi:
+    """The configmaps calls of CoreV1Api, with resourceVersion checks on merge patches"""
+
+    def __init__(self):
+        self.config_maps: Dict[str, V1ConfigMap] = {}
+        self.calls: List[str] = []
+        self.fail_patches = False
+        self.api_client = SimpleNamespace(call_api=self.call_api)
+
+    def read_namespaced_config_map(self, name: str, namespace: str) -> V1ConfigMap:
+        self.calls.append("read")
+        if name not in self.config_maps:
+            raise ApiException(status=404, reason="Not Found")
+        return self.config_maps[name]
+
+    def list_namespaced_config_map(self, namespace: str, label_selector: str) -> V1ConfigMapList:
+        self.calls.append("list")
+        items = [cm for cm in self.config_maps.values() if label_selector in (cm.metadata.labels or {})]
+        return V1ConfigMapList(items=items)
+
+    def create_namespaced_config_map(self, namespace: str, body: V1ConfigMap) -> V1ConfigMap:
+        self.calls.append("create")
+        if body.metadata.name in self.config_maps:
+            raise ApiException(status=409, reason="AlreadyExists")
+        body.metadata.resource_version = "1"
+        body.data = body.data or {}
+        self.config_maps[body.metadata.name] = body
+        return body
+
+    def call_api(self, path: str, method: str, path_params: Dict, body: Dict, **kwargs) -> Dict:
+        self.calls.append("patch")
+        assert method == "PATCH" and kwargs["header_params"]["Content-Type"] == "application/merge-patch+json"
+        if self.fail_patches:
+            raise ApiException(status=500, reason="Internal Server Error")
+        config_map = self.config_maps[path_params["name"]]
+        if body["metadata"]["resourceVersion"] != config_map.metadata.resource_version:
+            raise ApiException(status=409, reason="Conflict")
+        self.update(config_map, body["data"])
+        return {"metadata": {"resourceVersion": config_map.metadata.resource_version}}
+
+    @staticmethod
+    def update(config_map: V1ConfigMap, data: Dict[str, Optional[str]]):
+        for key, value in data.items():
+            if value is None:
+                config_map.data.pop(key, None)
+            else:
+                config_map.data[key] = value
+        config_map.metadata.resource_version = str(int(config_map.metadata.resource_version) + 1)
+
+
+def make_job(job_id: str, exec_count: int = 0) -> ScheduledJob:
+    return ScheduledJob(
+        job_id=job_id,
+        runnable_name="runnable",
+        runnable_params={"param": "x" * 50},
+        state=JobState(exec_count=exec_count),
+        scheduling_params=FixedDelayRepeat(seconds_delay=60),
+    )
+
+
+@pytest.fixture()
+def api() -> FakeConfigMapsApi:
+    return FakeConfigMapsApi()
+
+
+class TestSchedulerDal:
+    def test_batched_writes(self, api):
+        dal = SchedulerDal(api, flush_interval_sec=0)
+        for i in range(100):
+            dal.save_scheduled_job(make_job(f"job-{i}"))
+        dal.save_scheduled_job(make_job("job-0", exec_count=5))
+        dal.del_scheduled_job("job-1")
+        assert len(dal.list_scheduled_jobs()) == 99
+        assert dal.get_scheduled_job("job-0").state.exec_count == 5
+        assert api.calls == ["read", "create", "list"]
+
+        dal.flush()
+        assert api.calls[3:] == ["patch"]
+        assert len(api.config_maps[JOBS_CONFIGMAP_NAME].data) == 99
+
+        reloaded = SchedulerDal(api, flush_interval_sec=0)
+        assert reloaded.get_scheduled_job("job-0").state.exec_count == 5
+        assert reloaded.get_scheduled_job("job-1") is None
+
+    def test_shards(self, api):
+        dal = SchedulerDal(api, flush_interval_sec=0, shard_max_bytes=2000)
+        for i in range(30):
+            dal.save_scheduled_job(make_job(f"job-{i}"))
+        dal.flush()
+        assert len(api.config_maps) > 1
+        for config_map in api.config_maps.values():
+            assert sum(len(key) + len(value) for key, value in config_map.data.items()) <= 2000
+            if config_map.metadata.name != JOBS_CONFIGMAP_NAME:
+                assert JOBS_SHARD_LABEL in config_map.metadata.labels
+
+        for i in range(0, 30, 2):
+            dal.del_scheduled_job(f"job-{i}")
+        dal.flush()
+        reloaded = SchedulerDal(api, flush_interval_sec=0, shard_max_bytes=2000)
+        assert sorted(job.job_id for job in reloaded.list_scheduled_jobs()) == sorted(
+            f"job-{i}" for i in range(1, 30, 2)
+        )
+
+    def test_concurrent_writer(self, api):
+        dal = SchedulerDal(api, flush_interval_sec=0)
+        dal.save_scheduled_job(make_job("job-1"))
+        dal.flush()
+
+        # another runner writes its own job
+        FakeConfigMapsApi.update(api.config_maps[JOBS_CONFIGMAP_NAME], {"other": make_job("other").json()})
+        dal.save_scheduled_job(make_job("job-1", exec_count=1))
+        dal.flush()
+        data = api.config_maps[JOBS_CONFIGMAP_NAME].data
+        assert set(data.keys()) == {"job-1", "other"}
+        assert ScheduledJob.parse_raw(data["job-1"]).state.exec_count == 1
+
+    def test_failed_flush_is_retried(self, api):
+        dal = SchedulerDal(api, flush_interval_sec=0)
+        dal.save_scheduled_job(make_job("job-1"))
+        dal.save_scheduled_job(make_job("job-2"))
+        dal.flush()
+
+        api.fail_patches = True
+        dal.save_scheduled_job(make_job("job-1", exec_count=1))
+        dal.del_scheduled_job("job-2")
+        dal.flush()
+
+        api.fail_patches = False
+        dal.flush()
+        data = api.config_maps[JOBS_CONFIGMAP_NAME].data
+        assert list(data.keys()) == ["job-1"]
+        assert ScheduledJob.parse_raw(data["job-1"]).state.exec_count == 1
+
+    def test_pending_states_written_on_scheduler_stop(self, api):
+        scheduler = Scheduler()
+        scheduler.dal = SchedulerDal(api, flush_interval_sec=3600)
+        scheduler.dal.save_scheduled_job(make_job("job-1", exec_count=3))
+        assert "job-1" not in api.config_maps[JOBS_CONFIGMAP_NAME].data
+
+        scheduler.stop()
+        data = api.config_maps[JOBS_CONFIGMAP_NAME].data
+        assert ScheduledJob.parse_raw(data["job-1"]).state.exec_count == 3
@@ -0,0 +1,109 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+from robusta.core.schedule.job_timer import JobTimer
+from robusta.core.schedule.model import DynamicDelayRepeat, FixedDelayRepeat, JobState, JobStatus, ScheduledJob
+from robusta.core.schedule.scheduler import Scheduler
+
+
+class FakeSchedulerDal:
+    def __init__(self):
+        self.jobs: Dict[str, ScheduledJob] = {}
+
+    def save_scheduled_job(self, job: ScheduledJob):
+        self.jobs[job.job_id] = job
+
+    def get_scheduled_job(self, job_id: str) -> Optional[ScheduledJob]:
+        return self.jobs.get(job_id)
+
+    def del_scheduled_job(self, job_id: str):
+        self.jobs.pop(job_id, None)
+
+    def list_scheduled_jobs(self) -> List[ScheduledJob]:
+        return list(self.jobs.values())
+
+
+def wait_for(condition, timeout: float = 5) -> bool:
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def recorder(runs: List):
+    return lambda item: runs.append(item)
+
+
+class TestJobTimer:
+    def test_runs_by_due_time(self):
+        timer = JobTimer(workers=1)
+        runs = []
+        for name, delay in [("c", 0.3), ("a", 0.1), ("b", 0.2)]:
+            timer.schedule(delay, recorder(runs), {"item": name})
+        assert wait_for(lambda: len(runs) == 3)
+        assert runs == ["a", "b", "c"]
+
+    def test_cancel(self):
+        timer = JobTimer(workers=1)
+        runs = []
+        timer.schedule(0.1, recorder(runs), {"item": "cancelled"}).cancel()
+        timer.schedule(0.2, recorder(runs), {"item": "ran"})
+        assert wait_for(lambda: runs == ["ran"])
+        assert timer.pending_count() == 0
+
+    def test_many_jobs_share_threads(self):
+        threads_before = threading.active_count()
+        timer = JobTimer(workers=4)
+        runs = []
+        for i in range(500):
+            timer.schedule(0.5 + i / 1000, recorder(runs), {"item": i})
+        # one timer thread. The workers are started only when jobs are due
+        assert threading.active_count() <= threads_before + 1
+        assert wait_for(lambda: len(runs) == 500)
+        assert threading.active_count() <= threads_before + 5
+
+
+class TestScheduler:
+    def make_scheduler(self, monkeypatch, initial_delay: int = 0) -> Scheduler:
+        monkeypatch.setattr("robusta.core.schedule.scheduler.INITIAL_SCHEDULE_DELAY_SEC", initial_delay)
+        scheduler = Scheduler()
+        scheduler.dal = FakeSchedulerDal()
+        scheduler.timer = JobTimer(workers=2)
+        return scheduler
+
+    def test_dynamic_delay_job(self, monkeypatch):
+        scheduler = self.make_scheduler(monkeypatch)
+        executions = []
+        scheduler.register_task("runnable", lambda runnable_params, schedule_info: executions.append(schedule_info))
+        job = ScheduledJob(
+            job_id="dynamic",
+            runnable_name="runnable",
+            runnable_params={},
+            state=JobState(),
+            scheduling_params=DynamicDelayRepeat(delay_periods=[0, 0, 0]),
+        )
+        scheduler.schedule_job(job)
+        assert wait_for(lambda: scheduler.dal.get_scheduled_job("dynamic").state.job_status == JobStatus.DONE)
+        assert [info.execution_count for info in executions] == [0, 1, 2]
+        assert not scheduler.is_scheduled("dynamic")
+
+    def test_unschedule(self, monkeypatch):
+        scheduler = self.make_scheduler(monkeypatch, initial_delay=1)
+        executions = []
+        scheduler.register_task("runnable", lambda runnable_params, schedule_info: executions.append(schedule_info))
+        job = ScheduledJob(
+            job_id="fixed",
+            runnable_name="runnable",
+            runnable_params={},
+            state=JobState(),
+            scheduling_params=FixedDelayRepeat(repeat=3, seconds_delay=1),
+        )
+        scheduler.schedule_job(job)
+        assert scheduler.is_scheduled("fixed")
+        scheduler.unschedule_job("fixed")
+        time.sleep(1.2)
+        assert executions == []
+        assert scheduler.dal.get_scheduled_job("fixed") is None
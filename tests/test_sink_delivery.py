@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+from typing import List
+
+import pytest
+
+from robusta.core.reporting import Finding
+from robusta.core.sinks.sink_base import SinkBase
+from robusta.core.sinks.sink_base_params import DeliveryOverflowPolicy, DeliveryParams, SinkBaseParams
+from tests.utils.sink_utils import MockRegistry, make_finding
+
+
+class SlowSink(SinkBase):
+    """Records the written findings titles. Writing blocks until the sink is released"""
+
+    def __init__(self, delivery: DeliveryParams):
+        super().__init__(SinkBaseParams(name="slow_sink", delivery=delivery), MockRegistry())
+        self.written: List[str] = []
+        self.released = threading.Event()
+
+    def write_finding(self, finding: Finding, platform_enabled: bool):
+        self.released.wait()
+        self.written.append(finding.title)
+
+
+def deliver(sink: SlowSink, count: int) -> List[str]:
+    titles = [f"finding-{i}" for i in range(count)]
+    for title in titles:
+        sink.deliver_finding(make_finding(title), False)
+    return titles
+
+
+@pytest.fixture()
+def spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr("robusta.core.sinks.sink_delivery.SINK_DELIVERY_SPILL_DIR", str(tmp_path))
+    return tmp_path
+
+
+class TestSinkDelivery:
+    def test_handoff_does_not_wait_for_sink(self):
+        sink = SlowSink(DeliveryParams(workers=1, queue_size=10))
+        start = time.time()
+        titles = deliver(sink, 10)
+        assert time.time() - start < 1
+        assert sink.written == []
+
+        sink.released.set()
+        assert sink.delivery_queue.join(timeout=5)
+        assert sink.written == titles
+
+    def test_sync_delivery_without_queue(self):
+        sink = SlowSink(delivery=None)
+        sink.released.set()
+        deliver(sink, 2)
+        assert sink.delivery_queue is None
+        assert sink.written == ["finding-0", "finding-1"]
+
+    def test_drop_newest(self):
+        sink = SlowSink(DeliveryParams(workers=1, queue_size=2, overflow=DeliveryOverflowPolicy.DropNewest))
+        sink.deliver_finding(make_finding("in-progress"), False)
+        time.sleep(0.1)  # let the worker take the first finding
+        deliver(sink, 5)
+
+        sink.released.set()
+        assert sink.delivery_queue.join(timeout=5)
+        assert sink.written == ["in-progress", "finding-0", "finding-1"]
+
+    def test_drop_oldest(self):
+        sink = SlowSink(DeliveryParams(workers=1, queue_size=2, overflow=DeliveryOverflowPolicy.DropOldest))
+        sink.deliver_finding(make_finding("in-progress"), False)
+        time.sleep(0.1)
+        deliver(sink, 5)
+
+        sink.released.set()
+        assert sink.delivery_queue.join(timeout=5)
+        assert sink.written == ["in-progress", "finding-3", "finding-4"]
+
+    def test_block_timeout(self):
+        sink = SlowSink(
+            DeliveryParams(workers=1, queue_size=1, overflow=DeliveryOverflowPolicy.Block, block_timeout_sec=0.2)
+        )
+        sink.deliver_finding(make_finding("in-progress"), False)
+        time.sleep(0.1)
+        start = time.time()
+        deliver(sink, 2)
+        assert 0.2 <= time.time() - start < 2
+
+        sink.released.set()
+        assert sink.delivery_queue.join(timeout=5)
+        assert sink.written == ["in-progress", "finding-0"]
+
+    def test_spill_keeps_order(self, spill_dir):
+        sink = SlowSink(DeliveryParams(workers=1, queue_size=2, overflow=DeliveryOverflowPolicy.Spill))
+        titles = deliver(sink, 10)
+        assert sink.delivery_queue.size() >= 8
+        assert len(os.listdir(spill_dir)) == 1
+
+        sink.released.set()
+        assert sink.delivery_queue.join(timeout=5)
+        assert sink.written == titles
+
+        sink.stop()
+        sink.deliver_finding(make_finding("after-stop"), False)
+        time.sleep(0.1)
+        assert sink.written == titles
+
+    def test_stop_delivers_pending_findings(self):
+        sink = SlowSink(DeliveryParams(workers=2, queue_size=10))
+        titles = deliver(sink, 5)
+        sink.stop()
+        sink.released.set()
+        assert sink.delivery_queue.join(timeout=5)
+        assert sorted(sink.written) == titles
@@ -0,0 +1,105 @@
+import threading
+import time
+from typing import List
+
+import pytest
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web import SlackResponse
+
+from robusta.core.reporting import FileBlock
+from robusta.integrations.slack.rate_limiter import RateLimitedWebClient, SlackRateLimiter, SlackRateLimitExceeded
+from robusta.integrations.slack.sender import SlackSender
+
+
+def slack_response(client: WebClient, status_code: int, headers: dict = None) -> SlackResponse:
+    data = {"ok": status_code == 200}
+    return SlackResponse(
+        client=client,
+        http_verb="POST",
+        api_url="",
+        req_args={},
+        data=data,
+        headers=headers or {},
+        status_code=status_code,
+    )
+
+
+class TestSlackRateLimiter:
+    def test_post_message_burst_per_channel(self):
+        limiter = SlackRateLimiter()
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire("chat.postMessage", "alerts")
+        limiter.acquire("chat.postMessage", "other-channel")
+        assert time.monotonic() - start < 0.5
+
+        limiter.acquire("chat.postMessage", "alerts")
+        assert time.monotonic() - start >= 0.9
+
+    def test_pause(self):
+        limiter = SlackRateLimiter()
+        limiter.pause("files.info", None, 0.3)
+        start = time.monotonic()
+        limiter.acquire("files.info")
+        assert time.monotonic() - start >= 0.25
+
+    def test_max_wait(self):
+        limiter = SlackRateLimiter(max_wait_sec=0.5)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire("chat.postMessage", "alerts")
+        # the next call would wait a second
+        with pytest.raises(SlackRateLimitExceeded):
+            limiter.acquire("chat.postMessage", "alerts")
+
+        # the rejected call didn't take a token, so the next call waits less than max_wait
+        time.sleep(0.6)
+        limiter.acquire("chat.postMessage", "alerts")
+        assert 0.9 <= time.monotonic() - start < 1.5
+
+    def test_shared_per_token(self):
+        assert SlackRateLimiter.for_token("a") is SlackRateLimiter.for_token("a")
+        assert SlackRateLimiter.for_token("a") is not SlackRateLimiter.for_token("b")
+
+
+class TestRateLimitedWebClient:
+    def test_retry_after(self, monkeypatch):
+        calls: List[float] = []
+
+        def api_call(client, api_method: str, **kwargs):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                response = slack_response(client, 429, {"Retry-After": "0.2"})
+                raise SlackApiError("ratelimited", response)
+            return slack_response(client, 200)
+
+        monkeypatch.setattr(WebClient, "api_call", api_call)
+        client = RateLimitedWebClient(token="x", rate_limiter=SlackRateLimiter())
+        assert client.chat_postMessage(channel="alerts", text="hi").status_code == 200
+        assert len(calls) == 2
+        assert calls[1] - calls[0] >= 0.2
+
+    def test_retries_limit(self, monkeypatch):
+        def api_call(client, api_method: str, **kwargs):
+            raise SlackApiError("ratelimited", slack_response(client, 429, {"Retry-After": "0"}))
+
+        monkeypatch.setattr(WebClient, "api_call", api_call)
+        client = RateLimitedWebClient(token="x", rate_limiter=SlackRateLimiter(), max_retries=2)
+        with pytest.raises(SlackApiError):
+            client.files_info(file="f")
+
+
+def test_concurrent_uploads_keep_order(monkeypatch):
+    SlackSender.verified_api_tokens.add("upload-token")
+    sender = SlackSender("upload-token", "account", "cluster", "key")
+    uploading = threading.Barrier(3, timeout=5)
+
+    def files_upload_v2(title: str, content: bytes, filename: str):
+        uploading.wait()  # all the files are uploaded at the same time
+        return {"file": {"permalink": f"https://slack/{filename}"}}
+
+    monkeypatch.setattr(sender.slack_client, "files_upload_v2", files_upload_v2)
+    files = [FileBlock(f"file-{i}.txt", b"content") for i in range(3)] + [FileBlock("empty.txt", b"")]
+    message = sender.prepare_slack_text("title", max_log_file_limit_kb=1000, files=files)
+    assert message == "title\n" + "\n".join(f"* <https://slack/file-{i}.txt | file-{i}.txt>" for i in range(3))
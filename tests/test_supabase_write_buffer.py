@@ -0,0 +1,125 @@
+import time
+
+import pytest
+
+from robusta.core.sinks.robusta.dal.write_buffer import WriteBuffer, WriteMode
+from tests.utils.postgrest_stub import PostgrestStub
+
+
+@pytest.fixture()
+def stub():
+    stub = PostgrestStub()
+    yield stub
+    stub.shutdown()
+
+
+def make_buffer(stub: PostgrestStub, **kwargs) -> WriteBuffer:
+    params = dict(flush_interval_sec=60, batch_size=100, max_retries=2)
+    params.update(kwargs)
+    return WriteBuffer(stub.write_rows, **params)
+
+
+class TestWriteBuffer:
+    def test_multi_row_writes_in_order(self, stub):
+        buffer = make_buffer(stub)
+        for i in range(50):
+            buffer.add("ResourceEvents", [{"id": f"event-{i}"}, {"id": "shared", "extra": 1}], WriteMode.Upsert)
+            buffer.add("Evidence", [{"issue_id": i}])
+            buffer.add("Issues", [{"id": i, "title": "x"} if i % 2 else {"id": i}])
+        assert stub.requests == []
+
+        assert buffer.flush()
+        # one request per table and columns set, in the order the tables were added
+        assert stub.requests == ["ResourceEvents", "ResourceEvents", "Evidence", "Issues", "Issues"]
+        assert len(stub.tables["ResourceEvents"]) == 51
+        assert [row["issue_id"] for row in stub.tables["Evidence"]] == list(range(50))
+        assert len(stub.tables["Issues"]) == 50
+        assert buffer.size() == 0
+
+    def test_batch_size(self, stub):
+        buffer = make_buffer(stub, batch_size=10)
+        buffer.add("Evidence", [{"issue_id": i} for i in range(25)])
+        buffer.flush()
+        assert stub.requests == ["Evidence"] * 3
+
+    def test_retry_keeps_order(self, stub):
+        buffer = make_buffer(stub)
+        buffer.add("Evidence", [{"issue_id": 1}])
+        buffer.add("Issues", [{"id": 1}])
+        stub.fail_requests = 1
+        assert not buffer.flush()
+        assert buffer.size() == 2
+
+        buffer.add("Evidence", [{"issue_id": 2}])
+        assert buffer.flush()
+        assert [row["issue_id"] for row in stub.tables["Evidence"]] == [1, 2]
+        assert stub.tables["Issues"] == [{"id": 1}]
+
+    def test_dropped_after_max_retries(self, stub):
+        buffer = make_buffer(stub, max_retries=1)
+        buffer.add("Evidence", [{"issue_id": 1}])
+        buffer.add("Issues", [{"id": 1}])
+        stub.fail_requests = 2
+        assert not buffer.flush()
+        assert not buffer.flush()  # evidence dropped
+        assert buffer.flush()
+        assert stub.tables["Issues"] == [{"id": 1}]
+        assert "Evidence" not in stub.tables
+
+    def test_poison_row_dropped_alone(self, stub):
+        buffer = make_buffer(stub, max_retries=1)
+        buffer.add("Issues", [{"id": i} for i in range(20)])
+        stub.rejected_ids = {7}
+        assert not buffer.flush()
+        assert not buffer.flush()  # split after the retries
+        assert sorted(row["id"] for row in stub.tables["Issues"]) == [i for i in range(20) if i != 7]
+        assert buffer.size() == 0
+
+    def test_batch_max_bytes(self):
+        chunks = []
+        buffer = WriteBuffer(lambda table, mode, rows: chunks.append(len(rows)), batch_max_bytes=1000)
+        buffer.add("Evidence", [{"issue_id": i, "data": "x" * 300} for i in range(10)])
+        buffer.add("Evidence", [{"issue_id": 10, "data": "x" * 5000}, {"issue_id": 11, "data": "x"}])
+        assert buffer.flush()
+        assert chunks == [3, 3, 3, 1, 1, 1]
+        buffer.stop()
+
+    def test_background_flush_and_stop(self, stub):
+        buffer = make_buffer(stub, flush_interval_sec=0.05)
+        buffer.add("Issues", [{"id": 1}])
+        deadline = time.time() + 5
+        while not stub.tables["Issues"] and time.time() < deadline:
+            time.sleep(0.01)
+        assert stub.tables["Issues"] == [{"id": 1}]
+
+        buffer.add("Issues", [{"id": 2}])
+        buffer.stop()
+        assert stub.tables["Issues"] == [{"id": 1}, {"id": 2}]
+
+    def test_bounded(self, stub):
+        buffer = make_buffer(stub, max_rows=2, block_timeout_sec=0.1)
+        assert buffer.add("Issues", [{"id": 1}, {"id": 2}])
+        assert not buffer.add("Issues", [{"id": 3}])
+        buffer.flush()
+        assert buffer.add("Issues", [{"id": 3}])
+
+    def test_bounded_by_bytes(self, stub):
+        buffer = make_buffer(stub, max_bytes=100, block_timeout_sec=0.1)
+        assert buffer.add("Evidence", [{"data": "x" * 80}])
+        assert not buffer.add("Evidence", [{"data": "y" * 80}])
+        buffer.flush()
+        # a row larger than the buffer is added when it's empty
+        assert buffer.add("Evidence", [{"data": "z" * 200}])
+        buffer.flush()
+        assert [row["data"][0] for row in stub.tables["Evidence"]] == ["x", "z"]
+
+    def test_tables_order(self, stub):
+        buffer = make_buffer(stub, tables_order=["Evidence", "ResourceEvents", "Issues"])
+        buffer.add("Issues", [{"id": "f1"}])
+        buffer.add("Other", [{"id": "o1"}])
+        buffer.add("Evidence", [{"issue_id": "f2", "id": "f2-e"}])
+        buffer.add("Issues", [{"id": "f2"}])
+        assert buffer.flush()
+        # the evidence of f2 is written before the findings, even though f1 was added first
+        assert stub.requests == ["Evidence", "Issues", "Other"]
+        assert [row["id"] for row in stub.tables["Issues"]] == ["f1", "f2"]
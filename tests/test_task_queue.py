@@ -0,0 +1,76 @@
+import random
+import threading
+import time
+from unittest.mock import Mock
+
+from robusta.utils.task_queue import KeyedTaskQueue, TaskKey, TaskPriority
+
+
+def blocked_queue(**kwargs):
+    """A single worker queue, with the worker blocked until the returned event is set"""
+    queue = KeyedTaskQueue("test", num_workers=1, metrics=Mock(), **kwargs)
+    release = threading.Event()
+    started = threading.Event()
+    queue.add_task(lambda: (started.set(), release.wait()))
+    started.wait(5)
+    return queue, release
+
+
+class TestKeyedTaskQueue:
+    def test_same_key_in_order(self):
+        queue = KeyedTaskQueue("test", num_workers=4, metrics=Mock())
+        executed = []
+
+        def task(key: str, i: int):
+            time.sleep(random.random() / 1000)
+            executed.append((key, i))
+
+        for i in range(200):
+            key = f"key-{i % 10}"
+            queue.add_keyed_task(TaskKey(key=key), task, key, i)
+        assert queue.join(10)
+        assert len(executed) == 200
+        for key_index in range(10):
+            key = f"key-{key_index}"
+            assert [i for k, i in executed if k == key] == list(range(key_index, 200, 10))
+
+    def test_priorities(self):
+        queue, release = blocked_queue()
+        executed = []
+        queue.add_keyed_task(TaskKey(priority=TaskPriority.LOW), executed.append, "low")
+        queue.add_keyed_task(TaskKey(priority=TaskPriority.NORMAL), executed.append, "normal")
+        queue.add_keyed_task(TaskKey(priority=TaskPriority.HIGH), executed.append, "high")
+        # can't run before the pending task with the same key
+        queue.add_keyed_task(TaskKey(key="obj", priority=TaskPriority.LOW), executed.append, "obj-low")
+        queue.add_keyed_task(TaskKey(key="obj", priority=TaskPriority.HIGH), executed.append, "obj-high")
+        release.set()
+        assert queue.join(5)
+        assert executed == ["high", "normal", "low", "obj-low", "obj-high"]
+
+    def test_coalesce(self):
+        # keep the first value of the pending task, and the second value of the new one
+        queue, release = blocked_queue(merge_args=lambda pending, new: ((pending[0][0], new[0][1]),))
+        executed = []
+        queue.add_keyed_task(TaskKey(key="obj"), executed.append, ("create", "create"))
+        for i in range(5):
+            queue.add_keyed_task(TaskKey(key="obj", coalesce=True), executed.append, (i, i))
+        queue.add_keyed_task(TaskKey(key="other", coalesce=True), executed.append, ("other", "other"))
+        assert queue.qsize() == 3
+        release.set()
+        assert queue.join(5)
+        assert executed == [("create", "create"), (0, 4), ("other", "other")]
+        assert queue.metrics.on_coalesced.call_count == 4
+
+    def test_full(self):
+        queue, release = blocked_queue(max_size=2)
+        executed = []
+        queue.add_keyed_task(TaskKey(priority=TaskPriority.LOW), executed.append, "low-1")
+        queue.add_keyed_task(TaskKey(priority=TaskPriority.LOW), executed.append, "low-2")
+        queue.add_keyed_task(TaskKey(priority=TaskPriority.HIGH), executed.append, "high")  # evicts low-2
+        queue.add_keyed_task(TaskKey(priority=TaskPriority.LOW), executed.append, "low-3")  # rejected
+        assert queue.qsize() == 2
+        release.set()
+        assert queue.join(5)
+        assert executed == ["high", "low-1"]
+        assert queue.metrics.on_evicted.call_count == 1
+        assert queue.metrics.on_rejected.call_count == 1
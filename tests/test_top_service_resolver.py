@@ -0,0 +1,103 @@
+import random
+
+from robusta.core.discovery.top_service_resolver import TopLevelResource, TopServiceResolver
+from robusta.utils.prefix_trie import RadixTrie
+
+
+def longest_prefix(keys, text):
+    matches = [key for key in keys if text.startswith(key)]
+    return max(matches, key=len) if matches else None
+
+
+def test_radix_trie_longest_match():
+    trie = RadixTrie()
+    for key in ["foo", "foo-bar", "foo-baz", "fo", "bar"]:
+        trie.add(key, key)
+
+    assert trie.longest_match("foo-bar-7d4b9-x2x") == "foo-bar"
+    assert trie.longest_match("foo-baz") == "foo-baz"
+    assert trie.longest_match("foo-ba") == "foo"
+    assert trie.longest_match("fox") == "fo"
+    assert trie.longest_match("f") is None
+    assert trie.longest_match("") is None
+    assert trie.longest_match(None) is None
+
+
+def test_radix_trie_remove():
+    trie = RadixTrie()
+    trie.add("foo", 1)
+    trie.add("foo", 2)
+    trie.add("foo-bar", 3)
+
+    assert trie.longest_match("foo-bar-1") == 3
+    assert trie.remove("foo-bar", 3)
+    assert not trie.remove("foo-bar", 3)
+    assert not trie.remove("fo", 1)
+    assert trie.longest_match("foo-bar-1") == 1
+    assert trie.remove("foo", 1)
+    assert trie.longest_match("foo-bar-1") == 2
+    assert trie.remove("foo", 2)
+    assert trie.longest_match("foo-bar-1") is None
+    assert not trie.children
+
+
+def test_radix_trie_values_copy_on_write():
+    trie = RadixTrie()
+    trie.add("", 1)
+    values = trie.values
+    trie.add("", 2)
+    trie.remove("", 1)
+    # a lookup holding the old list keeps seeing it unchanged
+    assert values == [1]
+    assert trie.values == [2]
+
+
+def test_radix_trie_matches_brute_force():
+    rand = random.Random(7)
+    trie = RadixTrie()
+    keys = set()
+    for _ in range(2000):
+        key = "".join(rand.choice("ab-") for _ in range(rand.randint(1, 6)))
+        if key in keys and rand.random() < 0.5:
+            assert trie.remove(key, key)
+            keys.remove(key)
+        else:
+            trie.add(key, key)
+            keys.add(key)
+
+        text = "".join(rand.choice("ab-") for _ in range(rand.randint(0, 8)))
+        assert trie.longest_match(text) == longest_prefix(keys, text)
+
+
+def test_resolver_longest_prefix():
+    foo = TopLevelResource(name="foo", namespace="default", resource_type="Deployment")
+    foo_bar = TopLevelResource(name="foo-bar", namespace="default", resource_type="Deployment")
+    other = TopLevelResource(name="foo-bar", namespace="other", resource_type="StatefulSet")
+    TopServiceResolver.store_cached_resources([foo, foo_bar, other])
+
+    assert TopServiceResolver.guess_cached_resource("foo-bar-5d8f7-abcde", "default") == foo_bar
+    assert TopServiceResolver.guess_cached_resource("foo-5d8f7-abcde", "default") == foo
+    assert TopServiceResolver.guess_cached_resource("foo-bar-0", "other") == other
+    assert TopServiceResolver.guess_cached_resource("bar", "default") is None
+    assert TopServiceResolver.guess_cached_resource("foo", "missing") is None
+    assert TopServiceResolver.guess_cached_resource(None, "default") is None
+    assert TopServiceResolver.guess_service_key("foo-bar-0", "default") == "default/Deployment/foo-bar"
+
+
+def test_resolver_incremental_updates():
+    foo = TopLevelResource(name="foo", namespace="default", resource_type="Deployment")
+    foo_bar = TopLevelResource(name="foo-bar", namespace="default", resource_type="Deployment")
+    TopServiceResolver.store_cached_resources([foo])
+
+    TopServiceResolver.add_cached_resource(foo_bar)
+    assert TopServiceResolver.guess_cached_resource("foo-bar-0", "default") == foo_bar
+
+    TopServiceResolver.remove_cached_resource(foo_bar)
+    assert TopServiceResolver.guess_cached_resource("foo-bar-0", "default") == foo
+
+    # recent updates are applied to a rebuild from a stale read
+    TopServiceResolver.add_cached_resource(foo_bar)
+    TopServiceResolver.remove_cached_resource(foo)
+    TopServiceResolver.store_cached_resources([foo])
+    assert TopServiceResolver.guess_cached_resource("foo-bar-0", "default") == foo_bar
+    assert TopServiceResolver.guess_cached_resource("foo-0", "default") is None
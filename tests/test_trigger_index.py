@@ -0,0 +1,55 @@
+import random
+from typing import List
+
+from robusta.integrations.kubernetes.base_triggers import IncomingK8sEventPayload
+from robusta.integrations.kubernetes.trigger_index import K8sTriggerIndex
+from robusta.model.playbook_definition import PlaybookDefinition
+from tests.utils.trigger_playbooks import make_event, make_playbooks
+
+
+def should_fire(playbook, event) -> bool:
+    return any(trigger.get().should_fire(event, "playbook", {}) for trigger in playbook.triggers)
+
+
+class TestK8sTriggerIndex:
+    def test_same_as_scanning_all_playbooks(self):
+        playbooks = make_playbooks(300)
+        index = K8sTriggerIndex(playbooks)
+        rand = random.Random(1)
+        fired_events = 0
+        for _ in range(500):
+            event = make_event(rand)
+            expected = [playbook for playbook in playbooks if should_fire(playbook, event)]
+            candidates = index.get_playbooks(event.k8s_payload)
+            assert [playbook for playbook in candidates if should_fire(playbook, event)] == expected
+            fired_events += 1 if expected else 0
+        assert fired_events > 0
+
+    def test_prefixes_and_labels(self):
+        playbooks = [
+            PlaybookDefinition(triggers=[trigger], actions=[{"noop": {}}])
+            for trigger in [
+                {"on_pod_update": {"name_prefix": "app-1"}},
+                {"on_pod_update": {"name_prefix": "app-12", "namespace_prefix": "ns-1"}},
+                {"on_pod_update": {"labels_selector": "team=team-1,tier="}},
+                {"on_pod_create": {}},
+                {"on_deployment_update": {}},
+                {"on_kubernetes_any_resource_update": {"namespace_prefix": "ns-2"}},
+            ]
+        ]
+        index = K8sTriggerIndex(playbooks)
+
+        def matches(name: str, namespace: str, labels: dict) -> List[int]:
+            payload = IncomingK8sEventPayload(
+                operation="update",
+                kind="Pod",
+                clusterUid="cluster",
+                description="",
+                obj={"metadata": {"name": name, "namespace": namespace, "labels": labels}},
+            )
+            return [playbooks.index(playbook) for playbook in index.get_playbooks(payload)]
+
+        assert matches("app-123", "ns-1", {}) == [0, 1]
+        assert matches("app-123", "ns-2", {}) == [0, 5]
+        assert matches("app-2", "ns-3", {"team": "team-1"}) == [2]
+        assert matches("app-2", "ns-3", {"team": "team-1", "tier": "backend"}) == []
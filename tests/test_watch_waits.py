@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+from kubernetes.client import ApiException
+
+from robusta.integrations.kubernetes import api_client_utils
+from robusta.integrations.kubernetes.api_client_utils import WatchedObject, wait_until_watched
+
+
+def pod(phase: str):
+    return SimpleNamespace(status=SimpleNamespace(phase=phase))
+
+
+class FakeWatch:
+    """Streams the given events, or raises the given error"""
+
+    events = []
+    error = None
+    streams = []
+
+    def stream(self, func, *args, **kwargs):
+        FakeWatch.streams.append((func, args, kwargs))
+        if FakeWatch.error:
+            raise FakeWatch.error
+        yield from FakeWatch.events
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def fake_watch(monkeypatch):
+    monkeypatch.setattr(api_client_utils.watch, "Watch", FakeWatch)
+    FakeWatch.events = []
+    FakeWatch.error = None
+    FakeWatch.streams = []
+    return FakeWatch
+
+
+def list_pods(*args, **kwargs):
+    raise AssertionError("called by the watch only")
+
+
+class Reads:
+    def __init__(self, phases):
+        self.phases = list(phases)
+        self.count = 0
+
+    def __call__(self, name, namespace):
+        self.count += 1
+        return pod(self.phases.pop(0))
+
+
+def test_resolved_by_watch_events(fake_watch):
+    fake_watch.events = [
+        {"type": "ADDED", "object": pod("Pending")},
+        {"type": "MODIFIED", "object": pod("Running")},
+    ]
+    reads = Reads([])
+    watched = WatchedObject("debugger", "robusta", list_pods, reads)
+
+    result = wait_until_watched(watched, lambda p: p.status.phase == "Running", 10)
+    assert result.status.phase == "Running"
+    assert reads.count == 0
+
+    func, args, kwargs = fake_watch.streams[0]
+    assert func is list_pods and args == ("robusta",)
+    assert kwargs["field_selector"] == "metadata.name=debugger"
+
+
+def test_deleted_object_does_not_match(fake_watch):
+    fake_watch.events = [{"type": "DELETED", "object": pod("Running")}]
+    watched = WatchedObject("debugger", "robusta", list_pods, Reads([]))
+    with pytest.raises(Exception, match="Failed to reach wait condition"):
+        wait_until_watched(watched, lambda p: p.status.phase == "Running", 0.2)
+
+
+def test_polling_when_watch_fails(fake_watch):
+    fake_watch.error = ApiException(status=403, reason="Forbidden")
+    reads = Reads(["Pending", "Pending", "Running"])
+    watched = WatchedObject("debugger", "robusta", list_pods, reads)
+
+    result = wait_until_watched(watched, lambda p: p.status.phase == "Running", 10, poll_interval_sec=0.01)
+    assert result.status.phase == "Running"
+    assert reads.count == 3
@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import pytest
+
+from robusta.core.reporting import MarkdownBlock
+from robusta.core.sinks.webhook import WebhookBatchParams, WebhookSink, WebhookSinkConfigWrapper, WebhookSinkParams
+from tests.utils.sink_utils import MockRegistry, make_finding
+
+
+class WebhookServer:
+    """Records the bodies posted to it"""
+
+    def __init__(self):
+        self.bodies: List[bytes] = []
+        bodies = self.bodies
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                bodies.append(self.rfile.read(int(self.headers["Content-Length"])))
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture()
+def server():
+    server = WebhookServer()
+    yield server
+    server.server.shutdown()
+
+
+def make_sink(server: WebhookServer, **params) -> WebhookSink:
+    sink_params = WebhookSinkParams(name="webhook", url=server.url, **params)
+    return WebhookSink(WebhookSinkConfigWrapper(webhook_sink=sink_params), MockRegistry())
+
+
+class TestWebhookSink:
+    def test_text(self, server):
+        sink = make_sink(server, size_limit=40)
+        finding = make_finding(
+            "title", description="some description", enrichments=[[MarkdownBlock("line 1"), MarkdownBlock("line 2")]]
+        )
+        sink.write_finding(finding, platform_enabled=False)
+        assert server.bodies == [b"\ntitle\n\nSource: testcluster\n"]
+
+    def test_json_same_as_round_trip(self, server):
+        sink = make_sink(server, format="json", size_limit=100000)
+        finding = make_finding(
+            "title", description="some description", enrichments=[[MarkdownBlock("line 1"), MarkdownBlock("line 2")]]
+        )
+        sink.write_finding(finding, platform_enabled=False)
+        expected = json.loads(json.dumps(finding, default=lambda o: getattr(o, "__dict__", str(o))))
+        assert json.loads(server.bodies[0]) == expected
+
+    def test_batch_by_size(self, server):
+        sink = make_sink(server, format="json", batch=WebhookBatchParams(max_findings=3, max_delay_ms=60000))
+        for i in range(6):
+            sink.write_finding(make_finding(f"finding-{i}"), platform_enabled=False)
+        sink.stop()
+        batches = [[finding["title"] for finding in json.loads(body)] for body in server.bodies]
+        assert batches == [["finding-0", "finding-1", "finding-2"], ["finding-3", "finding-4", "finding-5"]]
+
+    def test_batch_by_delay(self, server):
+        sink = make_sink(server, format="json", batch=WebhookBatchParams(max_findings=100, max_delay_ms=100))
+        sink.write_finding(make_finding("finding-0"), platform_enabled=False)
+        sink.write_finding(make_finding("finding-1"), platform_enabled=False)
+        deadline = time.time() + 5
+        while not server.bodies and time.time() < deadline:
+            time.sleep(0.01)
+        assert [finding["title"] for finding in json.loads(server.bodies[0])] == ["finding-0", "finding-1"]
+        sink.stop()
+
+    def test_batch_requires_json(self):
+        with pytest.raises(ValueError):
+            WebhookSinkParams(name="webhook", url="http://localhost", batch=WebhookBatchParams())
@@ -0,0 +1,283 @@
+import copy
+import json
+import threading
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from kubernetes.client import ApiClient, ApiException
+
+LIST_TYPES = {
+    "Deployment": "V1DeploymentList",
+    "StatefulSet": "V1StatefulSetList",
+    "DaemonSet": "V1DaemonSetList",
+    "ReplicaSet": "V1ReplicaSetList",
+    "Pod": "V1PodList",
+    "Job": "V1JobList",
+    "Node": "V1NodeList",
+    "Namespace": "V1NamespaceList",
+    "Secret": "V1SecretList",
+}
+
+
+class FakeResponse:
+    """Raw list response, returned when listing with `_preload_content=False`"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.released = False
+
+    def stream(self, amt: int = 2**16) -> Iterable[bytes]:
+        for start in range(0, len(self.data), amt):
+            yield self.data[start : start + amt]
+
+    def release_conn(self):
+        self.released = True
+
+
+class FakeApiServer:
+    """
+    In memory k8s API server, for discovery tests and benchmarks.
+    Objects are stored as raw json, and deserialized on every list or watch, the same way the k8s client does it.
+    """
+
+    def __init__(self):
+        self.resource_version = 0
+        self.list_calls: Dict[str, int] = defaultdict(int)
+        self.__objects: Dict[str, Dict[str, dict]] = defaultdict(dict)  # kind to object key to raw object
+        self.__events: Dict[str, List[Tuple[int, str, dict]]] = defaultdict(list)
+        self.__compacted_version = 0
+        self.__api_client = ApiClient()
+        self.__lock = threading.Lock()
+
+    def __write(self, event_type: str, obj: dict):
+        obj = copy.deepcopy(obj)
+        with self.__lock:
+            self.resource_version += 1
+            obj["metadata"]["resourceVersion"] = str(self.resource_version)
+            kind = obj["kind"]
+            key = f"{obj['metadata'].get('namespace', '')}/{obj['metadata']['name']}"
+            if event_type == "DELETED":
+                self.__objects[kind].pop(key, None)
+            else:
+                self.__objects[kind][key] = obj
+            self.__events[kind].append((self.resource_version, event_type, obj))
+
+    def add(self, obj: dict):
+        self.__write("ADDED", obj)
+
+    def update(self, obj: dict):
+        self.__write("MODIFIED", obj)
+
+    def delete(self, obj: dict):
+        self.__write("DELETED", obj)
+
+    def compact(self):
+        """Drop the event history. Watches from older resource versions will fail with 410 Gone"""
+        with self.__lock:
+            self.__events = defaultdict(list)
+            self.__compacted_version = self.resource_version
+
+    def count(self, kind: str) -> int:
+        return len(self.__objects[kind])
+
+    def __deserialize(self, data: dict, return_type: str):
+        return self.__api_client.deserialize(SimpleNamespace(data=json.dumps(data)), return_type)
+
+    def __list_page(self, kind: str, limit: Optional[int], _continue: Optional[str]) -> dict:
+        self.list_calls[kind] += 1
+        with self.__lock:
+            objects = list(self.__objects[kind].values())
+            resource_version = str(self.resource_version)
+
+        start = int(_continue or 0)
+        end = start + limit if limit else len(objects)
+        return {
+            "metadata": {
+                "resourceVersion": resource_version,
+                "continue": str(end) if end < len(objects) else None,
+                "remainingItemCount": max(len(objects) - end, 0) if limit else None,
+            },
+            "items": objects[start:end],
+        }
+
+    def list_fn(self, kind: str) -> Callable:
+        def list_objects(
+            limit: Optional[int] = None, _continue: Optional[str] = None, _preload_content: bool = True, **kwargs
+        ):
+            page = self.__list_page(kind, limit, _continue)
+            if not _preload_content:
+                return FakeResponse(json.dumps(page).encode("utf-8"))
+            return self.__deserialize(page, LIST_TYPES[kind])
+
+        return list_objects
+
+    def api_client(self, remaining_item_count: bool = True) -> SimpleNamespace:
+        """
+        Replacement for `ApiClient`, serving metadata only lists by path, and the server version.
+        Some api servers don't return remainingItemCount, which can be simulated with remaining_item_count=False
+        """
+        kinds = {f"{kind.lower()}s": kind for kind in LIST_TYPES.keys()}
+
+        def call_api(
+            path: str, method: str, path_params=None, query_params: Optional[List[Tuple]] = None, *args, **kwargs
+        ):
+            if path.startswith("/version"):
+                return SimpleNamespace(git_version="v1.26.0")
+            params = dict(query_params or [])
+            page = self.__list_page(kinds[path.rsplit("/", 1)[-1]], params.get("limit"), params.get("continue"))
+            page["items"] = [{"metadata": item["metadata"]} for item in page["items"]]
+            if not remaining_item_count:
+                page["metadata"].pop("remainingItemCount")
+            return page
+
+        return SimpleNamespace(call_api=call_api, select_header_accept=lambda accepts: ", ".join(accepts))
+
+    def stream_fn(self, kind: str) -> Callable[[str], Iterable[Dict]]:
+        """Watch events since the given resource version. Ends when no more events are available, like a watch timeout"""
+
+        def stream(resource_version: str) -> Iterable[Dict]:
+            if int(resource_version) < self.__compacted_version:
+                raise ApiException(status=410, reason="Expired: too old resource version")
+
+            with self.__lock:
+                events = [event for event in self.__events[kind] if event[0] > int(resource_version)]
+
+            for _, event_type, obj in events:
+                yield {
+                    "type": event_type,
+                    "object": self.__deserialize(obj, LIST_TYPES[kind][: -len("List")]),
+                    "raw_object": obj,
+                }
+
+        return stream
+
+    def listers(self) -> Dict[str, Callable]:
+        return {kind: self.list_fn(kind) for kind in LIST_TYPES.keys()}
+
+    def client(self) -> SimpleNamespace:
+        """Replacement for the `kubernetes.client` module, with the list methods used by discovery"""
+        apps = SimpleNamespace(
+            list_deployment_for_all_namespaces=self.list_fn("Deployment"),
+            list_stateful_set_for_all_namespaces=self.list_fn("StatefulSet"),
+            list_daemon_set_for_all_namespaces=self.list_fn("DaemonSet"),
+            list_replica_set_for_all_namespaces=self.list_fn("ReplicaSet"),
+        )
+        core = SimpleNamespace(
+            list_pod_for_all_namespaces=self.list_fn("Pod"),
+            list_node=self.list_fn("Node"),
+            list_namespace=self.list_fn("Namespace"),
+            list_secret_for_all_namespaces=self.list_fn("Secret"),
+        )
+        batch = SimpleNamespace(list_job_for_all_namespaces=self.list_fn("Job"), api_client=self.__api_client)
+        return SimpleNamespace(
+            AppsV1Api=lambda api_client=None: apps,
+            CoreV1Api=lambda api_client=None: core,
+            BatchV1Api=lambda api_client=None: batch,
+        )
+
+
+def _container(name: str) -> dict:
+    return {
+        "name": name,
+        "image": f"registry.local/{name}:1.0",
+        "env": [{"name": "LOG_LEVEL", "value": "info"}],
+        "ports": [{"containerPort": 8080}],
+        "resources": {"requests": {"cpu": "100m", "memory": "128Mi"}, "limits": {"memory": "256Mi"}},
+    }
+
+
+def _pod_template(app: str) -> dict:
+    return {"metadata": {"labels": {"app": app}}, "spec": {"containers": [_container(app)]}}
+
+
+def make_namespace(name: str) -> dict:
+    return {"kind": "Namespace", "metadata": {"name": name}}
+
+
+def make_node(name: str) -> dict:
+    return {
+        "kind": "Node",
+        "metadata": {"name": name, "labels": {"kubernetes.io/hostname": name}},
+        "spec": {},
+        "status": {
+            "capacity": {"cpu": "8", "memory": "32Gi"},
+            "allocatable": {"cpu": "7800m", "memory": "30Gi"},
+            "addresses": [{"type": "InternalIP", "address": "10.0.0.1"}],
+            "conditions": [{"type": "Ready", "status": "True"}],
+        },
+    }
+
+
+def make_workload(kind: str, name: str, namespace: str, replicas: int = 1) -> dict:
+    status = {"replicas": replicas, "readyReplicas": replicas}
+    if kind == "DaemonSet":
+        status = {
+            "numberReady": replicas,
+            "desiredNumberScheduled": replicas,
+            "currentNumberScheduled": replicas,
+            "numberMisscheduled": 0,
+        }
+    spec = {"replicas": replicas, "selector": {"matchLabels": {"app": name}}, "template": _pod_template(name)}
+    if kind == "StatefulSet":
+        spec["serviceName"] = name
+    return {
+        "kind": kind,
+        "metadata": {"name": name, "namespace": namespace, "labels": {"app": name}},
+        "spec": spec,
+        "status": status,
+    }
+
+
+def make_job(name: str, namespace: str) -> dict:
+    return {
+        "kind": "Job",
+        "metadata": {"name": name, "namespace": namespace, "labels": {"job-name": name}},
+        "spec": {"template": _pod_template(name), "backoffLimit": 6, "completions": 1},
+        "status": {"active": 1},
+    }
+
+
+def make_pod(name: str, namespace: str, node: str, app: str, owner_kind: Optional[str] = "ReplicaSet") -> dict:
+    metadata = {"name": name, "namespace": namespace, "labels": {"app": app}}
+    if owner_kind:
+        metadata["ownerReferences"] = [{"apiVersion": "v1", "kind": owner_kind, "name": app, "uid": app}]
+    return {
+        "kind": "Pod",
+        "metadata": metadata,
+        "spec": {"nodeName": node, "containers": [_container(app)]},
+        "status": {"phase": "Running", "conditions": [{"type": "Ready", "status": "True"}]},
+    }
+
+
+def make_cluster(api_server: FakeApiServer, num_objects: int, namespaces: int = 50, nodes: int = 200):
+    """
+    Populate the api server with a synthetic cluster of about num_objects objects.
+    Most of the objects are pods, like in real clusters
+    """
+    for i in range(namespaces):
+        api_server.add(make_namespace(f"ns-{i}"))
+    for i in range(nodes):
+        api_server.add(make_node(f"node-{i}"))
+
+    workloads = max((num_objects - namespaces - nodes) // 10, 1)
+    for i in range(workloads):
+        namespace = f"ns-{i % namespaces}"
+        kind = ["Deployment", "Deployment", "Deployment", "StatefulSet", "DaemonSet", "Job"][i % 6]
+        name = f"app-{i}"
+        if kind == "Job":
+            api_server.add(make_job(name, namespace))
+        else:
+            api_server.add(make_workload(kind, name, namespace, replicas=8))
+        if kind == "Deployment":
+            replica_set = make_workload("ReplicaSet", f"{name}-rs", namespace)
+            replica_set["metadata"]["ownerReferences"] = [
+                {"apiVersion": "apps/v1", "kind": "Deployment", "name": name, "uid": name}
+            ]
+            api_server.add(replica_set)
+        for replica in range(8):
+            api_server.add(make_pod(f"{name}-{replica}", namespace, f"node-{(i + replica) % nodes}", name))
+
+    # ReplicaSets with no owner are reported as services of their own
+    for i in range(namespaces):
+        api_server.add(make_workload("ReplicaSet", f"standalone-{i}", f"ns-{i}", replicas=2))
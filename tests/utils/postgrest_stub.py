@@ -0,0 +1,68 @@
+import json
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Set
+
+import requests
+
+
+class PostgrestStub:
+    """
+    Local stub of the PostgREST tables endpoint, POST /rest/v1/<table>.
+    Like PostgREST, multi row requests must have the same keys in all the rows, and
+    resolution=ignore-duplicates skips rows with an existing id. Set fail_requests to fail the next requests.
+    Requests with a row of rejected_ids fail as a whole, like a constraint violation in a multi row insert.
+    """
+
+    def __init__(self):
+        self.tables: Dict[str, List[dict]] = defaultdict(list)
+        self.requests: List[str] = []
+        self.fail_requests = 0
+        self.rejected_ids: Set = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                table = self.path.split("?")[0].rsplit("/", 1)[-1]
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                rows = body if isinstance(body, list) else [body]
+                status = stub.handle(table, rows, self.headers.get("Prefer", ""))
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/rest/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, table: str, rows: List[dict], prefer: str) -> int:
+        self.requests.append(table)
+        if self.fail_requests:
+            self.fail_requests -= 1
+            return 503
+        if len({tuple(sorted(row.keys())) for row in rows}) > 1:
+            return 400  # PGRST102 all object keys must match
+        if any(row.get("id") in self.rejected_ids for row in rows):
+            return 400
+        if "resolution=ignore-duplicates" in prefer:
+            existing = {row.get("id") for row in self.tables[table]}
+            for row in rows:
+                if row.get("id") is None or row["id"] not in existing:
+                    self.tables[table].append(row)
+                    existing.add(row.get("id"))
+        else:
+            self.tables[table].extend(rows)
+        return 201
+
+    def write_rows(self, table: str, mode: str, rows: List[dict]):
+        """Rows writer, with the request of the postgrest client"""
+        prefer = "return=minimal" + (",resolution=ignore-duplicates" if mode == "upsert" else "")
+        response = requests.post(f"{self.url}/{table}", json=rows, headers={"Prefer": prefer})
+        response.raise_for_status()
+
+    def shutdown(self):
+        self.server.shutdown()
@@ -0,0 +1,21 @@
+from typing import List, Optional
+
+from robusta.core.reporting import BaseBlock, Finding
+
+
+class MockRegistry:
+    def get_global_config(self) -> dict:
+        return {"account_id": 12345, "cluster_name": "testcluster", "signing_key": "SiGnKeY"}
+
+
+def make_finding(
+    title: str = "Crashing pod",
+    aggregation_key: str = "TestFinding",
+    enrichments: Optional[List[List[BaseBlock]]] = None,
+    **kwargs,
+) -> Finding:
+    """A finding with an enrichment per blocks list. kwargs are passed to Finding"""
+    finding = Finding(title=title, aggregation_key=aggregation_key, **kwargs)
+    for blocks in enrichments or []:
+        finding.add_enrichment(blocks)
+    return finding
@@ -0,0 +1,71 @@
+import random
+from typing import List
+
+from robusta.integrations.kubernetes.base_triggers import IncomingK8sEventPayload, K8sTriggerEvent
+from robusta.model.playbook_definition import PlaybookDefinition
+
+KINDS = ["pod", "deployment", "job", "node", "replicaset", "statefulset", "daemonset", "service"]
+OPERATIONS = ["create", "update", "delete"]
+KIND_NAMES = {
+    "pod": "Pod",
+    "deployment": "Deployment",
+    "job": "Job",
+    "node": "Node",
+    "replicaset": "ReplicaSet",
+    "statefulset": "StatefulSet",
+    "daemonset": "DaemonSet",
+    "service": "Service",
+}
+
+
+def make_playbooks(count: int, seed: int = 0) -> List[PlaybookDefinition]:
+    """Synthetic k8s playbooks, with a mix of kinds, operations, name and namespace prefixes and labels selectors"""
+    rand = random.Random(seed)
+    playbooks = []
+    for i in range(count):
+        params = {}
+        if rand.random() < 0.5:
+            params["name_prefix"] = f"app-{rand.randrange(20)}"
+        if rand.random() < 0.3:
+            params["namespace_prefix"] = f"ns-{rand.randrange(5)}"
+        if rand.random() < 0.3:
+            params["labels_selector"] = f"team=team-{rand.randrange(4)}"
+            if rand.random() < 0.3:
+                params["labels_selector"] += ",tier="
+
+        if i % 50 == 0:
+            trigger = {"on_kubernetes_any_resource_all_changes": params}
+        elif i % 50 == 1:
+            trigger = {"on_kubernetes_resource_operation": {**params, "resources": ["pod"], "operations": ["update"]}}
+        else:
+            operation = rand.choice(OPERATIONS + ["all_changes"])
+            trigger = {f"on_{rand.choice(KINDS)}_{operation}": params}
+        playbooks.append(PlaybookDefinition(triggers=[trigger], actions=[{f"action_{i}": {}}]))
+    return playbooks
+
+
+def make_event(rand: random.Random) -> K8sTriggerEvent:
+    kind = KIND_NAMES[rand.choice(KINDS)]
+    labels = {"team": f"team-{rand.randrange(4)}"}
+    if rand.random() < 0.5:
+        labels["tier"] = "backend"
+    obj = {
+        "kind": kind,
+        "metadata": {
+            "name": f"app-{rand.randrange(30)}-{rand.randrange(100)}",
+            "namespace": f"ns-{rand.randrange(8)}",
+            "labels": labels,
+        },
+        "spec": {"containers": [{"name": "main", "image": "registry.local/main:1.0"}] * 3},
+    }
+    return K8sTriggerEvent(
+        k8s_payload=IncomingK8sEventPayload(
+            operation=rand.choice(OPERATIONS),
+            kind=kind,
+            apiVersion="v1",
+            clusterUid="cluster",
+            description="",
+            obj=obj,
+            oldObj=obj,
+        )
+    )